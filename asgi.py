@@ -0,0 +1,40 @@
+"""
+Affiliate Product Review Bot - ASGI Entry Point
+รันแอปบนเซิร์ฟเวอร์ ASGI: uvicorn asgi:app --host 0.0.0.0 --port 5000
+แต่ละ request ของ Flask รันใน thread pool ของตัวเอง (ASGI_MAX_THREADS thread) จึงทำงานพร้อมกันได้
+และการเรียก backend ที่ไม่ขึ้นต่อกันภายใน request ใช้ fanout
+เส้นทางเดิม gunicorn main:app (WSGI แบบ sync) ยังใช้ได้ตามปกติ
+"""
+
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from asgiref.sync import sync_to_async
+    from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+except ImportError as e:
+    raise ImportError("ASGI mode requires asgiref: pip install asgiref uvicorn") from e
+
+from main import app as flask_app
+from src.config import config
+
+# WsgiToAsgi ของ asgiref ใช้ @sync_to_async ที่ thread_sensitive=True - ทุก request รันบน thread เดียวกันทีละรายการ
+_run_wsgi_app = inspect.unwrap(WsgiToAsgiInstance.__dict__['run_wsgi_app'])
+
+
+class ThreadPoolWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi ที่ส่งแต่ละ request เข้า thread pool (thread_sensitive=False)"""
+
+    def __init__(self, wsgi_application, max_threads: int = None, duplicate_header_limit: int = 100):
+        super().__init__(wsgi_application, duplicate_header_limit)
+        self.executor = ThreadPoolExecutor(max_workers=max_threads or config.ASGI_MAX_THREADS,
+                                           thread_name_prefix="asgi-request")
+
+    async def __call__(self, scope, receive, send):
+        instance = WsgiToAsgiInstance(self.wsgi_application, self.duplicate_header_limit)
+        instance.run_wsgi_app = sync_to_async(_run_wsgi_app.__get__(instance), thread_sensitive=False,
+                                              executor=self.executor)
+        await instance(scope, receive, send)
+
+
+app = ThreadPoolWsgiToAsgi(flask_app)
@@ -0,0 +1,4 @@
+"""
+📁 benchmarks/
+🎯 Benchmark suite ที่รันได้ในเครื่องโดยไม่ต้องเชื่อมต่อ Supabase/LINE จริง (python -m benchmarks.run)
+"""
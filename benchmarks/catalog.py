@@ -0,0 +1,98 @@
+"""
+📁 benchmarks/catalog.py
+🎯 สร้างแคตตาล็อกสินค้าสังเคราะห์ (ไทย/อังกฤษ) แบบ reproducible สำหรับ benchmark
+"""
+
+import csv
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+CATEGORIES = {
+    'โทรศัพท์มือถือ': ('PHN', ['โทรศัพท์', 'สมาร์ทโฟน', 'smartphone', 'เคสโทรศัพท์', 'สายชาร์จ', 'power bank']),
+    'ความงาม': ('BTY', ['ครีมกันแดด', 'เซรั่ม', 'serum', 'ลิปสติก', 'โฟมล้างหน้า', 'moisturizer']),
+    'สัตว์เลี้ยง': ('PET', ['อาหารแมว', 'อาหารสุนัข', 'cat food', 'ทรายแมว', 'ของเล่นแมว', 'dog treats']),
+    'กระเป๋า': ('BAG', ['กระเป๋าสะพาย', 'เป้', 'backpack', 'กระเป๋าสตางค์', 'tote bag']),
+    'เกมมิ่ง': ('GAM', ['เมาส์เกมมิ่ง', 'คีย์บอร์ด', 'gaming headset', 'จอยเกม', 'mouse pad']),
+    'เสื้อผ้าผู้หญิง': ('WFS', ['เดรส', 'เสื้อครอป', 'กระโปรง', 'blouse', 'ชุดนอน']),
+    'เสื้อผ้าผู้ชาย': ('MFS', ['เสื้อยืด', 'กางเกงยีนส์', 'เสื้อเชิ้ต', 'hoodie', 'shorts']),
+    'คอมพิวเตอร์': ('COM', ['โน้ตบุ๊ก', 'laptop', 'SSD', 'แรม', 'USB hub', 'webcam']),
+    'สุขภาพ': ('HLT', ['วิตามินซี', 'คอลลาเจน', 'whey protein', 'ยาดม', 'หน้ากากอนามัย']),
+    'อาหารเครื่องดื่ม': ('FOD', ['กาแฟ', 'ชาเขียว', 'ขนม', 'snack', 'น้ำผึ้ง']),
+    'เครื่องใช้ไฟฟ้า': ('ELC', ['หม้อทอดไร้น้ำมัน', 'air fryer', 'พัดลม', 'เครื่องดูดฝุ่น', 'กาต้มน้ำ']),
+    'กีฬา': ('SPT', ['เสื่อโยคะ', 'ดัมเบล', 'running shoes', 'ขวดน้ำ', 'ลูกฟุตบอล']),
+}
+
+BRANDS = ['Samsung', 'Xiaomi', 'Apple', 'Anker', 'Logitech', 'Nivea', 'Garnier', 'Whiskas',
+          'Royal Canin', 'Philips', 'Sharp', 'Nike', 'Adidas', 'Uniqlo', 'Mistine', 'Srichand']
+ADJECTIVES = ['รุ่นใหม่', 'ของแท้', 'premium', 'ขนาดพกพา', 'pro', 'mini', 'กันน้ำ', 'ราคาประหยัด',
+              'ใช้ง่าย', 'limited edition', 'แพ็คคู่', 'ยอดนิยม']
+SHOPS = ['Official Store', 'ร้านของดีราคาถูก', 'Mall Shop', 'Gadget House', 'Beauty Corner',
+         'Pet Lover', 'ช้อปสบาย', 'Sport Zone']
+
+# คำค้นหาตัวอย่างสำหรับ benchmark (มีทั้งคำที่เจอและไม่เจอ)
+SAMPLE_QUERIES = ['ครีมกันแดด', 'serum', 'อาหารแมว', 'laptop', 'เมาส์', 'กาแฟ', 'air fryer',
+                  'Samsung', 'กระเป๋า', 'โยคะ', 'ของแท้', 'ไม่มีสินค้านี้แน่นอน']
+
+
+def generate_catalog(size: int, seed: int = 42) -> List[Dict]:
+    """สร้างสินค้า size รายการ (ผลลัพธ์เหมือนเดิมทุกครั้งสำหรับ seed เดียวกัน)"""
+    rng = random.Random(seed)
+    categories = list(CATEGORIES.items())
+    start = datetime(2025, 1, 1)
+    products = []
+
+    for i in range(size):
+        category, (prefix, nouns) = categories[i % len(categories)]
+        noun = rng.choice(nouns)
+        brand = rng.choice(BRANDS)
+        adjective = rng.choice(ADJECTIVES)
+        price = round(rng.lognormvariate(6.0, 1.1), 0) + 9
+        commission_rate = rng.choice([3.0, 5.0, 7.0, 8.0, 10.0, 12.0])
+        created_at = start + timedelta(minutes=i * 7)
+        code = f"{prefix}{i:07d}"
+
+        products.append({
+            'product_code': code,
+            'product_name': f"{noun} {brand} {adjective}",
+            'price': float(price),
+            'sold_count': int(rng.paretovariate(1.2) * 20),
+            'shop_name': rng.choice(SHOPS),
+            'commission_rate': commission_rate,
+            'commission_amount': round(price * commission_rate / 100, 2),
+            'product_link': f"https://shopee.co.th/product/{code}",
+            'offer_link': f"https://s.shopee.co.th/{code}",
+            'category': category,
+            'description': f"{noun} จาก {brand} {adjective} คุณภาพดี ส่งไว",
+            'image_url': '',
+            'rating': round(rng.uniform(3.0, 5.0), 1),
+            'created_at': created_at.isoformat(),
+            'updated_at': created_at.isoformat()
+        })
+
+    return products
+
+
+def write_import_csv(path: str, size: int, seed: int = 7) -> str:
+    """เขียนไฟล์ CSV สำหรับทดสอบ importers (คอลัมน์ที่ทั้ง BulkProductImporter และ AdminCSVImporter รับได้)"""
+    products = generate_catalog(size, seed=seed)
+    fields = ['product_name', 'category', 'price', 'affiliate_link', 'offer_link', 'product_link',
+              'shop_name', 'commission_rate', 'rating', 'sold_count', 'description']
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for product in products:
+            writer.writerow({
+                'product_name': product['product_name'],
+                'category': product['category'],
+                'price': product['price'],
+                'affiliate_link': product['offer_link'],
+                'offer_link': product['offer_link'],
+                'product_link': product['product_link'],
+                'shop_name': product['shop_name'],
+                'commission_rate': product['commission_rate'],
+                'rating': product['rating'],
+                'sold_count': product['sold_count'],
+                'description': product['description']
+            })
+    return path
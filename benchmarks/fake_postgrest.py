@@ -0,0 +1,408 @@
+"""
+📁 benchmarks/fake_postgrest.py
+🎯 Supabase/PostgREST client จำลองในโปรเซส ใช้ SQLite เป็นที่เก็บข้อมูล
+รองรับ query builder เท่าที่ SupabaseDatabase ใช้ และหน่วงเวลาต่อ round trip ได้ (จำลอง network)
+"""
+
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.search_analytics import SearchRollups
+
+PRODUCT_COLUMNS = [
+    'id', 'product_code', 'product_name', 'price', 'sold_count', 'shop_name',
+    'commission_rate', 'commission_amount', 'product_link', 'offer_link',
+    'category', 'description', 'image_url', 'rating', 'created_at', 'updated_at'
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_code TEXT UNIQUE NOT NULL,
+    product_name TEXT NOT NULL,
+    price REAL NOT NULL,
+    sold_count INTEGER DEFAULT 0,
+    shop_name TEXT NOT NULL,
+    commission_rate REAL NOT NULL,
+    commission_amount REAL NOT NULL,
+    product_link TEXT NOT NULL,
+    offer_link TEXT NOT NULL,
+    category TEXT,
+    description TEXT,
+    image_url TEXT,
+    rating REAL DEFAULT 0,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
+CREATE INDEX IF NOT EXISTS idx_products_sold_count ON products(sold_count);
+CREATE INDEX IF NOT EXISTS idx_products_created_at ON products(created_at);
+CREATE TABLE IF NOT EXISTS product_searches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    search_query TEXT NOT NULL,
+    product_id INTEGER,
+    user_id TEXT,
+    result_count INTEGER,
+    created_at TEXT
+);
+"""
+
+
+class FakeAPIError(Exception):
+    """เทียบเท่า postgrest.exceptions.APIError"""
+
+
+class FakeResponse:
+    """ผลลัพธ์ของ execute() (มี .data และ .count เหมือน APIResponse)"""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class FakeQueryBuilder:
+    """query builder แบบ chain: select/insert/update/delete + filters + order/range"""
+
+    def __init__(self, client: 'FakeSupabaseClient', table: str):
+        self.client = client
+        self.table_name = table
+        self.operation = 'select'
+        self.columns = '*'
+        self.count_mode = None
+        self.payload = None
+        self.conditions: List[str] = []
+        self.params: List[Any] = []
+        self.ordering: List[str] = []
+        self.limit_value: Optional[int] = None
+        self.offset_value: Optional[int] = None
+        self.single_row = False
+
+    # ===== operations =====
+
+    def select(self, columns: str = '*', count: str = None):
+        self.operation = 'select'
+        self.columns = columns
+        self.count_mode = count
+        return self
+
+    def insert(self, data):
+        self.operation = 'insert'
+        self.payload = data
+        return self
+
+    def update(self, data: Dict):
+        self.operation = 'update'
+        self.payload = data
+        return self
+
+    def delete(self):
+        self.operation = 'delete'
+        return self
+
+    # ===== filters =====
+
+    def _add(self, condition: str, *params):
+        self.conditions.append(condition)
+        self.params.extend(params)
+        return self
+
+    def eq(self, column: str, value):
+        return self._add(f"{_column(column)} = ?", value)
+
+    def neq(self, column: str, value):
+        return self._add(f"{_column(column)} != ?", value)
+
+    def gt(self, column: str, value):
+        return self._add(f"{_column(column)} > ?", value)
+
+    def gte(self, column: str, value):
+        return self._add(f"{_column(column)} >= ?", value)
+
+    def lt(self, column: str, value):
+        return self._add(f"{_column(column)} < ?", value)
+
+    def lte(self, column: str, value):
+        return self._add(f"{_column(column)} <= ?", value)
+
+    def like(self, column: str, pattern: str):
+        return self._add(f"{_column(column)} GLOB ?", _like_to_glob(pattern))
+
+    def ilike(self, column: str, pattern: str):
+        return self._add(f"{_column(column)} LIKE ?", pattern.replace('*', '%'))
+
+    def in_(self, column: str, values: Iterable):
+        values = list(values)
+        if not values:
+            return self._add("0")
+        return self._add(f"{_column(column)} IN ({','.join('?' * len(values))})", *values)
+
+    def or_(self, filters: str):
+        """รูปแบบ PostgREST: 'col.op.value,col.op.value' (รองรับ and(...)/or(...) ซ้อน และค่าใน "...")"""
+        condition, params = _logic_tree(filters, 'OR')
+        return self._add(condition, *params)
+
+    # ===== modifiers =====
+
+    def order(self, column: str, desc: bool = False):
+        self.ordering.append(f"{_column(column)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, count: int):
+        self.limit_value = int(count)
+        return self
+
+    def range(self, start: int, end: int):
+        self.offset_value = int(start)
+        self.limit_value = int(end) - int(start) + 1
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    # ===== execute =====
+
+    def execute(self) -> FakeResponse:
+        return self.client._execute(self)
+
+    def _where(self) -> str:
+        return f" WHERE {' AND '.join(self.conditions)}" if self.conditions else ''
+
+
+_COMPARISONS = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+
+def _split_top_level(filters: str) -> List[str]:
+    """แยกเงื่อนไขด้วย ',' ที่ไม่อยู่ในวงเล็บหรือเครื่องหมายคำพูด"""
+    parts, current, depth, quoted = [], '', 0, False
+    for char in filters:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(current)
+            current = ''
+            continue
+        current += char
+    parts.append(current)
+    return parts
+
+
+def _logic_tree(filters: str, joiner: str) -> Tuple[str, List]:
+    parts, params = [], []
+    for expression in _split_top_level(filters):
+        for name in ('and', 'or'):
+            if expression.startswith(f"{name}(") and expression.endswith(')'):
+                condition, nested = _logic_tree(expression[len(name) + 1:-1], name.upper())
+                break
+        else:
+            condition, nested = _filter_condition(expression)
+        parts.append(condition)
+        params.extend(nested)
+    return '(' + f' {joiner} '.join(parts) + ')', params
+
+
+def _filter_condition(expression: str) -> Tuple[str, List]:
+    column, operator, value = expression.split('.', 2)
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        value = value[1:-1]
+    if operator == 'ilike':
+        return f"{_column(column)} LIKE ?", [value.replace('*', '%')]
+    if operator == 'like':
+        return f"{_column(column)} GLOB ?", [_like_to_glob(value)]
+    if operator in _COMPARISONS:
+        return f"{_column(column)} {_COMPARISONS[operator]} ?", [value]
+    raise FakeAPIError(f"Unsupported operator in or_: {operator}")
+
+
+def _column(name: str) -> str:
+    if not name.replace('_', '').isalnum():
+        raise FakeAPIError(f"Invalid column name: {name}")
+    return name
+
+
+def _like_to_glob(pattern: str) -> str:
+    return pattern.replace('*', '%').replace('%', '*').replace('_', '?')
+
+
+class FakeRpc:
+    def __init__(self, client: 'FakeSupabaseClient', name: str, params: Dict):
+        self.client = client
+        self.name = name
+        self.params = params or {}
+
+    def execute(self) -> FakeResponse:
+        return self.client._execute_rpc(self.name, self.params)
+
+
+class FakeSupabaseClient:
+    """Client จำลองของ supabase-py (table/rpc) เก็บข้อมูลใน SQLite
+
+    latency_ms/jitter_ms: เวลาหน่วงต่อ execute() หนึ่งครั้ง เพื่อจำลอง round trip ไปยัง PostgREST
+    """
+
+    def __init__(self, db_path: str = ':memory:', latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, seed: int = 42):
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.round_trips = 0
+        # แทน trigger ของ product_searches ใน setup_search_rollups.sql
+        self.search_rollups = SearchRollups(self.connection, raw_table='product_searches')
+
+    def table(self, name: str) -> FakeQueryBuilder:
+        return FakeQueryBuilder(self, name)
+
+    def from_(self, name: str) -> FakeQueryBuilder:
+        return self.table(name)
+
+    def rpc(self, name: str, params: Dict = None) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    # ===== การโหลดข้อมูล =====
+
+    def load_products(self, products: Iterable[Dict]):
+        """โหลดสินค้าจำนวนมากโดยตรง (ไม่นับเป็น round trip)"""
+        now = datetime.now().isoformat()
+        columns = PRODUCT_COLUMNS[1:]
+        rows = (
+            tuple(product.get(c, now if c in ('created_at', 'updated_at') else None) for c in columns)
+            for product in products
+        )
+        with self._lock:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO products ({','.join(columns)}) VALUES ({','.join('?' * len(columns))})",
+                rows
+            )
+            self.connection.commit()
+
+    def reset_counters(self):
+        with self._lock:
+            self.round_trips = 0
+
+    # ===== ภายใน =====
+
+    def _delay(self):
+        with self._lock:
+            self.round_trips += 1
+        delay = self.latency_ms
+        if self.jitter_ms:
+            delay += self._random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _execute(self, query: FakeQueryBuilder) -> FakeResponse:
+        self._delay()
+        table = _column(query.table_name)
+        with self._lock:
+            try:
+                if query.operation == 'select':
+                    return self._select(query, table)
+                if query.operation == 'insert':
+                    return self._insert(query, table)
+                if query.operation == 'update':
+                    return self._update(query, table)
+                return self._delete(query, table)
+            except sqlite3.Error as e:
+                raise FakeAPIError(str(e)) from e
+
+    def _select(self, query: FakeQueryBuilder, table: str) -> FakeResponse:
+        where = query._where()
+        count = None
+        if query.count_mode == 'exact':
+            count = self.connection.execute(f"SELECT COUNT(*) FROM {table}{where}", query.params).fetchone()[0]
+
+        if query.columns.strip() == 'count':
+            total = self.connection.execute(f"SELECT COUNT(*) FROM {table}{where}", query.params).fetchone()[0]
+            return FakeResponse([{'count': total}], count)
+
+        columns = '*' if query.columns.strip() == '*' else ', '.join(
+            _column(c.strip()) for c in query.columns.split(',')
+        )
+        sql = f"SELECT {columns} FROM {table}{where}"
+        if query.ordering:
+            sql += " ORDER BY " + ', '.join(query.ordering)
+        if query.limit_value is not None:
+            sql += f" LIMIT {query.limit_value}"
+            if query.offset_value:
+                sql += f" OFFSET {query.offset_value}"
+
+        rows = [dict(row) for row in self.connection.execute(sql, query.params)]
+        if query.single_row:
+            if len(rows) != 1:
+                raise FakeAPIError("JSON object requested, multiple (or no) rows returned")
+            return FakeResponse(rows[0], count)
+        return FakeResponse(rows, count)
+
+    def _insert(self, query: FakeQueryBuilder, table: str) -> FakeResponse:
+        records = query.payload if isinstance(query.payload, list) else [query.payload]
+        now = datetime.now().isoformat()
+        inserted = []
+        for record in records:
+            record = dict(record)
+            record.setdefault('created_at', now)
+            if table == 'products':
+                record.setdefault('updated_at', now)
+            columns = [_column(c) for c in record]
+            cursor = self.connection.execute(
+                f"INSERT INTO {table} ({','.join(columns)}) VALUES ({','.join('?' * len(columns))})",
+                list(record.values())
+            )
+            inserted.append(dict(self.connection.execute(
+                f"SELECT * FROM {table} WHERE rowid = ?", (cursor.lastrowid,)
+            ).fetchone()))
+            if table == 'product_searches':
+                self.search_rollups.record(record['search_query'], record.get('result_count') or 0, commit=False)
+        self.connection.commit()
+        return FakeResponse(inserted)
+
+    def _update(self, query: FakeQueryBuilder, table: str) -> FakeResponse:
+        where = query._where()
+        assignments = ', '.join(f"{_column(c)} = ?" for c in query.payload)
+        ids = [row[0] for row in self.connection.execute(f"SELECT rowid FROM {table}{where}", query.params)]
+        self.connection.execute(f"UPDATE {table} SET {assignments}{where}",
+                                list(query.payload.values()) + query.params)
+        self.connection.commit()
+        return FakeResponse(self._rows_by_id(table, ids))
+
+    def _delete(self, query: FakeQueryBuilder, table: str) -> FakeResponse:
+        where = query._where()
+        rows = [dict(row) for row in self.connection.execute(f"SELECT * FROM {table}{where}", query.params)]
+        self.connection.execute(f"DELETE FROM {table}{where}", query.params)
+        self.connection.commit()
+        return FakeResponse(rows)
+
+    def _rows_by_id(self, table: str, ids: List[int]) -> List[Dict]:
+        if not ids:
+            return []
+        return [dict(row) for row in self.connection.execute(
+            f"SELECT * FROM {table} WHERE rowid IN ({','.join('?' * len(ids))})", ids
+        )]
+
+    def _execute_rpc(self, name: str, params: Dict) -> FakeResponse:
+        self._delay()
+        with self._lock:
+            if name == 'get_average_price':
+                value = self.connection.execute("SELECT COALESCE(AVG(price), 0) FROM products").fetchone()[0]
+                return FakeResponse(round(value, 2))
+            if name == 'get_popular_searches':
+                return FakeResponse(self.search_rollups.popular(params.get('search_limit', 10), params.get('days', 30)))
+            if name == 'get_search_stats':
+                return FakeResponse(self.search_rollups.stats(
+                    params.get('days', 7), params.get('search_limit', 10), params.get('popular_days', 30)))
+            if name == 'get_total_searches':
+                return FakeResponse(self.search_rollups.totals()['searches'])
+            if name == 'compact_search_logs':
+                return FakeResponse(self.search_rollups.compact())
+        raise FakeAPIError(f"Unknown RPC function: {name}")
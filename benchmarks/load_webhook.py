@@ -0,0 +1,287 @@
+"""
+📁 benchmarks/load_webhook.py
+🎯 Load generator ของ LINE webhook: เซ็น payload ด้วย channel secret แล้วยิงเข้า /callback ของ main.app
+ตามอัตราที่กำหนด (MessagingApi ถูกแทนด้วย stub และ Supabase ใช้ PostgREST จำลอง)
+
+ตัวอย่าง:
+    python -m benchmarks.load_webhook --rate 50 --duration 30 --workers 8 --catalog-size 10000
+    python -m benchmarks.load_webhook --event-log captured_webhooks.jsonl --rate 20
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.config import config
+from src.utils.metrics import Histogram
+
+from .catalog import SAMPLE_QUERIES, generate_catalog
+from .run import RESULTS_DIR, git_revision, install_fake_backend, use_catalog
+from .stubs import StubMessagingApi
+
+# สัดส่วนข้อความของผู้ใช้ (ประเภท, น้ำหนัก, ตัวอย่างข้อความ)
+DEFAULT_MIX = [
+    ('greeting', 10, ['สวัสดี', 'hello', 'หวัดดี']),
+    ('category', 20, ['หมวดหมู่', 'หมวด ความงาม', 'หมวด คอมพิวเตอร์', 'หมวด สัตว์เลี้ยง']),
+    ('search', 40, SAMPLE_QUERIES),
+    ('pagination', 15, ['หน้า2:ครีมกันแดด', 'หน้า3:serum', 'หน้า2:อาหารแมว:sort:price_low']),
+    ('bestsellers', 10, ['ขายดี', 'ทรนด์']),
+    ('admin', 5, ['admin', '/stats', '/products']),
+]
+
+
+def sign(body: str, channel_secret: str) -> str:
+    """ลายเซ็น X-Line-Signature (HMAC-SHA256 ของ body แล้ว base64)"""
+    digest = hmac.new(channel_secret.encode('utf-8'), body.encode('utf-8'), hashlib.sha256).digest()
+    return base64.b64encode(digest).decode('utf-8')
+
+
+def make_webhook_body(text: str, user_id: str) -> str:
+    """สร้าง webhook body แบบเดียวกับที่ LINE ส่ง (text message event หนึ่งรายการ)"""
+    event = {
+        'type': 'message',
+        'mode': 'active',
+        'timestamp': int(time.time() * 1000),
+        'webhookEventId': uuid.uuid4().hex.upper()[:26],
+        'deliveryContext': {'isRedelivery': False},
+        'replyToken': uuid.uuid4().hex,
+        'source': {'type': 'user', 'userId': user_id},
+        'message': {'type': 'text', 'id': str(random.randint(10 ** 15, 10 ** 16)),
+                    'quoteToken': uuid.uuid4().hex, 'text': text}
+    }
+    return json.dumps({'destination': 'Uloadtest', 'events': [event]}, ensure_ascii=False)
+
+
+def classify_message(text: str) -> str:
+    """จัดประเภทข้อความตามลำดับการตรวจของ AffiliateLineHandler"""
+    lowered = text.strip().lower()
+    if lowered in [word.lower() for word in config.ADMIN_KEYWORDS] or lowered.startswith('/'):
+        return 'admin'
+    if lowered in ['สวัสดี', 'hello', 'hi', 'ดี', 'หวัดดี', 'ครับ', 'ค่ะ', 'สวัสดีครับ', 'สวัสดีค่ะ']:
+        return 'greeting'
+    if lowered.startswith('หน้า') and ':' in lowered:
+        return 'pagination'
+    if lowered in ['หมวดหมู่', 'categories', 'category', 'c', 'หมวด'] or lowered.startswith('หมวด '):
+        return 'category'
+    if lowered in ['ขายดี', 'นิยม', 'ฮิต', 'bestseller', 'b', 'ทรนด์', 'trending', 'hot']:
+        return 'bestsellers'
+    if lowered.startswith('รหัส '):
+        return 'product_code'
+    return 'search'
+
+
+def synthetic_traffic(count: int, users: int, seed: int = 42) -> Iterator[Tuple[str, str]]:
+    """สร้าง (ประเภท, body) ตาม DEFAULT_MIX"""
+    rng = random.Random(seed)
+    kinds = [kind for kind, _, _ in DEFAULT_MIX]
+    weights = [weight for _, weight, _ in DEFAULT_MIX]
+    samples = {kind: texts for kind, _, texts in DEFAULT_MIX}
+
+    for _ in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        user_id = config.ADMIN_USER_ID if kind == 'admin' else f"U{rng.randrange(users):032x}"
+        yield kind, make_webhook_body(rng.choice(samples[kind]), user_id)
+
+
+def captured_traffic(path: str) -> List[Tuple[str, str]]:
+    """อ่าน webhook ที่บันทึกไว้ (หนึ่ง body ต่อบรรทัด หรือ {"body": "..."} จาก WEBHOOK_CAPTURE_PATH)"""
+    traffic = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            body = record['body'] if 'body' in record else json.dumps(record, ensure_ascii=False)
+            events = json.loads(body).get('events', [])
+            texts = [e['message']['text'] for e in events
+                     if e.get('type') == 'message' and e.get('message', {}).get('type') == 'text']
+            traffic.append((classify_message(texts[0]) if texts else 'other', body))
+    return traffic
+
+
+class LoadReport:
+    """เก็บ latency และจำนวนการเรียก backend แยกตามประเภทข้อความ"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = Histogram('load_latency_seconds')
+        self.service_time = Histogram('load_service_seconds')
+        self.statuses = defaultdict(int)
+        self.backend_calls = defaultdict(lambda: defaultdict(int))
+        self.traces = defaultdict(int)
+        self.event_kinds: Dict[str, str] = {}
+
+    def on_trace(self, trace):
+        kind = self.event_kinds.get(trace.trace_id, 'unknown')
+        with self._lock:
+            self.traces[kind] += 1
+            for span in trace.spans:
+                self.backend_calls[kind][span.kind] += 1
+
+    def record(self, kind: str, status: int, latency: float, service_time: float):
+        self.latency.observe(latency, kind=kind)
+        self.latency.observe(latency, kind='all')
+        self.service_time.observe(service_time, kind=kind)
+        with self._lock:
+            self.statuses[status] += 1
+
+    def summary(self, elapsed: float) -> Dict:
+        per_kind = {}
+        for labels in self.latency.labels():
+            kind = labels['kind']
+            latency = self.latency.snapshot(kind=kind)
+            entry = {
+                'requests': latency['count'],
+                'latency_p50_ms': round(latency['p50'] * 1000, 2),
+                'latency_p95_ms': round(latency['p95'] * 1000, 2),
+                'latency_p99_ms': round(latency['p99'] * 1000, 2),
+                'latency_max_ms': round(latency['max'] * 1000, 2)
+            }
+            if kind != 'all':
+                service = self.service_time.snapshot(kind=kind)
+                traces = self.traces.get(kind, 0)
+                entry['service_p95_ms'] = round(service['p95'] * 1000, 2)
+                entry['backend_calls_per_message'] = {
+                    backend: round(count / traces, 2) for backend, count in self.backend_calls[kind].items()
+                } if traces else {}
+            per_kind[kind] = entry
+
+        total = sum(self.statuses.values())
+        return {
+            'requests': total,
+            'elapsed_seconds': round(elapsed, 3),
+            'requests_per_sec': round(total / elapsed, 2) if elapsed else 0.0,
+            'status_codes': dict(self.statuses),
+            'by_type': per_kind
+        }
+
+
+def run_load(traffic: List[Tuple[str, str]], rate: float, workers: int) -> Dict:
+    """ยิง traffic เข้า main.app ด้วยอัตรา rate ต่อวินาที (0 = เร็วที่สุด)"""
+    import main
+    from src.handlers.affiliate_handler import affiliate_handler
+    from src.utils.tracing import tracer
+
+    line_api = StubMessagingApi()
+    affiliate_handler.line_bot_api = tracer.instrument(line_api, ('reply_message', 'push_message'), kind='line')
+    report = LoadReport()
+    tracer.add_listener(report.on_trace)
+    local = threading.local()
+
+    for kind, body in traffic:
+        for event in json.loads(body).get('events', []):
+            if event.get('webhookEventId'):
+                report.event_kinds[event['webhookEventId']] = kind
+
+    def send(kind: str, body: str, scheduled: float):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = main.app.test_client()
+        started = time.perf_counter()
+        response = client.post('/callback', data=body.encode('utf-8'), headers={
+            'Content-Type': 'application/json',
+            'X-Line-Signature': sign(body, config.LINE_CHANNEL_SECRET)
+        })
+        finished = time.perf_counter()
+        # latency วัดจากเวลาที่ควรส่ง เพื่อไม่ให้คิวที่ค้างถูกซ่อน (coordinated omission)
+        report.record(kind, response.status_code, finished - scheduled, finished - started)
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='load') as executor:
+            for i, (kind, body) in enumerate(traffic):
+                scheduled = started + (i / rate if rate > 0 else 0)
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(send, kind, body, max(scheduled, started))
+    finally:
+        tracer.remove_listener(report.on_trace)
+
+    summary = report.summary(time.perf_counter() - started)
+    summary['line_replies'] = line_api.replies
+    return summary
+
+
+def main(argv: List[str] = None) -> Dict:
+    parser = argparse.ArgumentParser(description='LINE webhook load generator')
+    parser.add_argument('--rate', type=float, default=20.0, help='จำนวน request ต่อวินาที (0 = เร็วที่สุด)')
+    parser.add_argument('--duration', type=float, default=10.0, help='ระยะเวลา (วินาที) สำหรับ traffic สังเคราะห์')
+    parser.add_argument('--requests', type=int, help='จำนวน request (แทน --duration)')
+    parser.add_argument('--workers', type=int, default=8, help='จำนวน thread ที่ส่งพร้อมกัน')
+    parser.add_argument('--users', type=int, default=200, help='จำนวนผู้ใช้สังเคราะห์')
+    parser.add_argument('--catalog-size', type=int, default=10000)
+    parser.add_argument('--engine', choices=['supabase', 'sqlite', 'memory'], default='supabase',
+                        help='PRODUCT_STORE_ENGINE ที่ใช้ (supabase = PostgREST จำลอง)')
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='เวลาหน่วงต่อ round trip ของ PostgREST จำลอง')
+    parser.add_argument('--event-log', help='ไฟล์ webhook ที่บันทึกไว้ (JSONL) สำหรับ replay')
+    parser.add_argument('--output', help='ไฟล์ JSON ผลลัพธ์')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logging.disable(logging.ERROR)
+
+    # ต้องมี channel secret ก่อนสร้าง handler เพื่อให้ใช้ WebhookHandler จริง (ตรวจลายเซ็นจริง)
+    config.LINE_CHANNEL_SECRET = config.LINE_CHANNEL_SECRET or 'load-test-channel-secret'
+    config.LINE_CHANNEL_ACCESS_TOKEN = config.LINE_CHANNEL_ACCESS_TOKEN or 'load-test-access-token'
+    install_fake_backend()
+    use_catalog(args.catalog_size, args.latency_ms, 0.0)
+    if args.engine != 'supabase':
+        from src.utils.product_store import create_product_store
+        config.PRODUCT_STORE_ENGINE = args.engine
+        config.PRODUCT_STORE_PATH = ':memory:'
+        create_product_store().load_products(generate_catalog(args.catalog_size))
+
+    if args.event_log:
+        traffic = captured_traffic(args.event_log)
+    else:
+        count = args.requests or max(int(args.rate * args.duration), 1)
+        traffic = list(synthetic_traffic(count, args.users))
+
+    summary = run_load(traffic, args.rate, args.workers)
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'target_rate': args.rate,
+            'workers': args.workers,
+            'catalog_size': args.catalog_size,
+            'latency_ms': args.latency_ms,
+            'engine': args.engine,
+            'source': args.event_log or 'synthetic'
+        },
+        'results': summary
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report['meta']['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n{summary['requests']} requests in {summary['elapsed_seconds']}s "
+          f"({summary['requests_per_sec']} req/s), status {summary['status_codes']}")
+    for kind, entry in sorted(summary['by_type'].items()):
+        calls = entry.get('backend_calls_per_message', {})
+        print(f"{kind:<12} n={entry['requests']:<5} p50 {entry['latency_p50_ms']:>8.2f}  "
+              f"p95 {entry['latency_p95_ms']:>8.2f}  p99 {entry['latency_p99_ms']:>8.2f} ms  backend/msg {calls}")
+    print(f"\nReport written to {output}")
+    return report
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,291 @@
+"""
+📁 benchmarks/run.py
+🎯 Benchmark suite: SupabaseDatabase, AffiliateLineHandler.handle_message, AISearchEngine และ importers
+รันกับ PostgREST จำลอง (SQLite) บนแคตตาล็อกสังเคราะห์ แล้วรายงาน throughput / tail latency เป็น JSON
+
+ตัวอย่าง:
+    python -m benchmarks.run --sizes 1000 10000 100000 --latency-ms 2
+    python -m benchmarks.run --sizes 1000 --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Sequence
+
+from src.config import config
+from src.utils import supabase_database
+from src.utils.metrics import Histogram
+
+from .catalog import SAMPLE_QUERIES, generate_catalog, write_import_csv
+from .fake_postgrest import FakeSupabaseClient
+from .stubs import StubMessagingApi, make_text_event
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+class ClientSwitch:
+    """client ที่ทุก SupabaseDatabase ถือไว้ - สลับ backend จริงได้ระหว่างรอบของแต่ละขนาดแคตตาล็อก"""
+
+    def __init__(self):
+        self.current: FakeSupabaseClient = None
+
+    def __getattr__(self, name):
+        return getattr(self.current, name)
+
+
+backend = ClientSwitch()
+
+
+def install_fake_backend():
+    """ให้ SupabaseDatabase ทุก instance (รวมถึง singleton ของโมดูลอื่น) ใช้ backend จำลอง
+
+    ต้องเรียกก่อน import โมดูลที่สร้าง SupabaseDatabase ตอนโหลด (handlers, importers ฯลฯ)
+    """
+    config.SUPABASE_URL = config.SUPABASE_URL or 'http://postgrest.local'
+    config.SUPABASE_KEY = config.SUPABASE_KEY or 'benchmark-key'
+    config.USE_SUPABASE = True
+    config.PRODUCT_STORE_ENGINE = 'supabase'
+    supabase_database.SUPABASE_AVAILABLE = True
+    supabase_database.create_client = lambda url, key: backend
+
+
+def use_catalog(size: int, latency_ms: float, jitter_ms: float) -> FakeSupabaseClient:
+    """สร้าง backend ใหม่พร้อมแคตตาล็อกขนาด size แล้วสลับให้ทุก instance ใช้"""
+    client = FakeSupabaseClient(latency_ms=latency_ms, jitter_ms=jitter_ms)
+    client.load_products(generate_catalog(size))
+    backend.current = client
+    return client
+
+
+def measure(func: Callable, inputs: Sequence, iterations: int, client: FakeSupabaseClient = None) -> Dict:
+    """เรียก func(input) วนตาม iterations แล้วสรุป throughput และ p50/p95/p99"""
+    histogram = Histogram('benchmark_seconds')
+    round_trips = client.round_trips if client else 0
+    started = time.perf_counter()
+
+    for i in range(iterations):
+        value = inputs[i % len(inputs)]
+        call_started = time.perf_counter()
+        func(value)
+        histogram.observe(time.perf_counter() - call_started)
+
+    elapsed = time.perf_counter() - started
+    snapshot = histogram.snapshot()
+    result = {
+        'iterations': iterations,
+        'total_seconds': round(elapsed, 4),
+        'ops_per_sec': round(iterations / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(snapshot['sum'] / iterations * 1000, 3),
+        'p50_ms': round(snapshot['p50'] * 1000, 3),
+        'p95_ms': round(snapshot['p95'] * 1000, 3),
+        'p99_ms': round(snapshot['p99'] * 1000, 3),
+        'max_ms': round(snapshot['max'] * 1000, 3)
+    }
+    if client:
+        result['round_trips_per_op'] = round((client.round_trips - round_trips) / iterations, 2)
+    return result
+
+
+# ===== กลุ่ม benchmark =====
+
+def bench_database(client: FakeSupabaseClient, catalog_codes: List[str], iterations: int) -> Dict:
+    db = supabase_database.SupabaseDatabase()
+    categories = db.get_categories() or ['ความงาม']
+
+    return {
+        'search_products': measure(lambda q: db.search_products(q, limit=5), SAMPLE_QUERIES, iterations, client),
+        'search_products_page3_by_price': measure(
+            lambda q: db.search_products(q, limit=10, offset=20, order_by='price_low'),
+            SAMPLE_QUERIES, iterations, client),
+        'get_product_by_code': measure(db.get_product_by_code, catalog_codes, iterations, client),
+        'get_categories': measure(lambda _: db.get_categories(), [None], iterations, client),
+        'get_products_by_category': measure(db.get_products_by_category, categories, iterations, client),
+        'get_top_products_by_metric': measure(
+            lambda metric: db.get_top_products_by_metric(metric, 10),
+            ['sold_count', 'rating', 'price'], iterations, client),
+        'get_stats': measure(lambda _: db.get_stats(), [None], max(iterations // 5, 1), client)
+    }
+
+
+def bench_handler(client: FakeSupabaseClient, catalog_codes: List[str], iterations: int) -> Dict:
+    from src.handlers.affiliate_handler import affiliate_handler
+
+    line_api = StubMessagingApi()
+    affiliate_handler.line_bot_api = line_api
+
+    messages = {
+        'greeting': ['สวัสดี'],
+        'product_search': SAMPLE_QUERIES,
+        'categories': ['หมวดหมู่'],
+        'browse_category': ['หมวด ความงาม', 'หมวด คอมพิวเตอร์'],
+        'product_code': [f"รหัส {code}" for code in catalog_codes[:20]],
+        'bestsellers': ['ขายดี'],
+        'trending': ['ทรนด์']
+    }
+
+    results = {}
+    for name, texts in messages.items():
+        events = [make_text_event(text, user_id=f"U{i % 50:04d}") for i, text in enumerate(texts * 5)]
+        results[name] = measure(affiliate_handler.handle_message, events, iterations, client)
+    results['replies_sent'] = line_api.replies
+    return results
+
+
+def bench_ai_search(client: FakeSupabaseClient, iterations: int) -> Dict:
+    from src.utils.ai_search import ai_search
+
+    results = {}
+    for candidates in (100, 1000):
+        products = client.table('products').select('*').limit(candidates).execute().data
+        results[f"enhanced_product_search_{candidates}"] = measure(
+            lambda q: ai_search.enhanced_product_search(q, products, 10), SAMPLE_QUERIES, iterations
+        )
+    return results
+
+
+def bench_importers(rows: int, latency_ms: float, jitter_ms: float) -> Dict:
+    from src.utils.bulk_importer import BulkProductImporter
+    from src.utils.csv_importer_admin import AdminCSVImporter
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = write_import_csv(os.path.join(tmp_dir, 'import.csv'), rows)
+
+        # สร้าง importer ใหม่หลังสลับ backend - singleton ของโมดูลเชื่อมต่อตอน import ก่อนมี backend จึงเขียนไม่ได้
+        for name, run in (
+            ('admin_csv_importer', lambda: AdminCSVImporter(supabase_database.SupabaseDatabase()).import_csv_file(csv_path)),
+            ('bulk_importer', lambda: BulkProductImporter().import_from_file(csv_path))
+        ):
+            client = use_catalog(0, latency_ms, jitter_ms)
+            started = time.perf_counter()
+            outcome = run()
+            elapsed = time.perf_counter() - started
+            imported = client.connection.execute('SELECT COUNT(*) FROM products').fetchone()[0]
+            if imported != rows:
+                raise RuntimeError(f"{name} imported {imported}/{rows} rows - benchmark did not measure an import")
+            results[name] = {
+                'rows': rows,
+                'imported': imported,
+                'total_seconds': round(elapsed, 4),
+                'rows_per_sec': round(rows / elapsed, 2) if elapsed else 0.0,
+                'round_trips_per_row': round(client.round_trips / rows, 2),
+                'errors': len(outcome.get('errors', [])) if isinstance(outcome.get('errors'), list) else outcome.get('errors')
+            }
+    return results
+
+
+# ===== รายงาน =====
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, timeout=10).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+def compare_reports(current: Dict, baseline: Dict) -> List[str]:
+    """เทียบ p95 และ throughput กับรายงานก่อนหน้า"""
+    lines = []
+    for size, groups in current['results'].items():
+        for group, benchmarks in groups.items():
+            for name, result in benchmarks.items():
+                before = baseline.get('results', {}).get(size, {}).get(group, {}).get(name)
+                if not isinstance(result, dict) or not isinstance(before, dict) or 'p95_ms' not in result:
+                    continue
+                p95_change = (result['p95_ms'] / before['p95_ms'] - 1) * 100 if before['p95_ms'] else 0.0
+                ops_change = (result['ops_per_sec'] / before['ops_per_sec'] - 1) * 100 if before['ops_per_sec'] else 0.0
+                lines.append(f"{size:>7} {group}.{name:<34} p95 {before['p95_ms']:>9.2f} -> {result['p95_ms']:>9.2f} ms "
+                             f"({p95_change:+6.1f}%)  ops/s {ops_change:+6.1f}%")
+    return lines
+
+
+def print_summary(report: Dict):
+    for size, groups in report['results'].items():
+        print(f"\n=== {size} products ===")
+        for group, benchmarks in groups.items():
+            for name, result in benchmarks.items():
+                if isinstance(result, dict) and 'p95_ms' in result:
+                    print(f"{group}.{name:<36} {result['ops_per_sec']:>10.1f} ops/s  "
+                          f"p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms")
+                elif isinstance(result, dict) and 'rows_per_sec' in result:
+                    print(f"{group}.{name:<36} {result['rows_per_sec']:>10.1f} rows/s  imported {result['imported']}/{result['rows']}")
+
+
+def main(argv: List[str] = None) -> Dict:
+    parser = argparse.ArgumentParser(description='Smart Service System benchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='ขนาดแคตตาล็อก')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='เวลาหน่วงต่อ round trip ของ PostgREST จำลอง')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='เวลาหน่วงสุ่มเพิ่มต่อ round trip')
+    parser.add_argument('--iterations', type=int, default=50, help='จำนวนครั้งต่อ benchmark')
+    parser.add_argument('--import-rows', type=int, default=500, help='จำนวนแถวในไฟล์ทดสอบ importers')
+    parser.add_argument('--groups', nargs='+', default=['database', 'handler', 'ai_search', 'importers'])
+    parser.add_argument('--output', help='ไฟล์ JSON ผลลัพธ์ (ค่าเริ่มต้น benchmarks/results/<เวลา>.json)')
+    parser.add_argument('--compare', help='รายงาน JSON ก่อนหน้าสำหรับเทียบผล')
+    parser.add_argument('--verbose', action='store_true', help='แสดง log ของระบบระหว่างรัน')
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logging.disable(logging.ERROR)
+    install_fake_backend()
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'latency_ms': args.latency_ms,
+            'jitter_ms': args.jitter_ms,
+            'iterations': args.iterations
+        },
+        'results': {}
+    }
+
+    for size in args.sizes:
+        client = use_catalog(size, args.latency_ms, args.jitter_ms)
+        codes = [row[0] for row in client.connection.execute(
+            'SELECT product_code FROM products WHERE id % ? = 0 LIMIT 200', (max(size // 200, 1),))]
+        groups = {}
+        if 'database' in args.groups:
+            groups['database'] = bench_database(client, codes, args.iterations)
+        if 'handler' in args.groups:
+            groups['handler'] = bench_handler(client, codes, max(args.iterations // 2, 1))
+        if 'ai_search' in args.groups:
+            groups['ai_search'] = bench_ai_search(client, args.iterations)
+        report['results'][str(size)] = groups
+
+    if 'importers' in args.groups:
+        report['results']['importers'] = {
+            'importers': bench_importers(args.import_rows, args.latency_ms, args.jitter_ms)
+        }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report['meta']['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print_summary(report)
+    print(f"\nReport written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\n=== Compared with {baseline.get('meta', {}).get('revision', args.compare)} ===")
+        print('\n'.join(compare_reports(report, baseline)) or 'ไม่มี benchmark ที่ตรงกัน')
+
+    return report
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,80 @@
+"""
+📁 benchmarks/serialization.py
+🎯 Benchmark การ serialize response ของ /api/products: jsonify เดิม (json มาตรฐาน) เทียบกับ FastJSONProvider
+วัดเวลา CPU ต่อ response และขนาดไบต์ (ไม่บีบอัด / gzip / brotli) ทั้งแบบทุกฟิลด์และแบบเลือกฟิลด์
+
+ตัวอย่าง:
+    python -m benchmarks.serialization --products 200
+    python -m benchmarks.serialization --products 1000 --fields product_code,price --output benchmarks/results/serialization.json
+"""
+
+import argparse
+import json
+import logging
+import time
+from typing import Callable, Dict, List
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from src.utils.api_response import (BROTLI_AVAILABLE, ORJSON_AVAILABLE, FastJSONProvider,
+                                    ResponseCompressor, parse_fields, select_fields)
+
+from .catalog import generate_catalog
+
+
+def measure(render: Callable[[], bytes], repeat: int) -> Dict:
+    """serialize repeat ครั้ง แล้วคืนเวลาเฉลี่ยต่อ response และขนาดไบต์"""
+    body = render()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render()
+    elapsed = time.perf_counter() - started
+    sizes = {'raw': len(body), 'gzip': len(ResponseCompressor.compress(body, 'gzip'))}
+    if BROTLI_AVAILABLE:
+        sizes['br'] = len(ResponseCompressor.compress(body, 'br'))
+    return {'ms_per_response': round(elapsed / repeat * 1000, 3), 'bytes': sizes}
+
+
+def main(argv: List[str] = None) -> Dict:
+    parser = argparse.ArgumentParser(description='API response serialization benchmark')
+    parser.add_argument('--products', type=int, default=200, help='จำนวนสินค้าต่อ response')
+    parser.add_argument('--fields', default='product_code,product_name,price', help='ฟิลด์ของแบบเลือกฟิลด์')
+    parser.add_argument('--repeat', type=int, default=200, help='จำนวนรอบที่วัด')
+    parser.add_argument('--output', help='ไฟล์ JSON ผลลัพธ์')
+    args = parser.parse_args(argv)
+    logging.disable(logging.ERROR)
+
+    products = generate_catalog(args.products)
+    projected = select_fields(products, parse_fields(args.fields))
+    stdlib_app, fast_app = Flask('stdlib'), Flask('fast')
+    stdlib_app.json = DefaultJSONProvider(stdlib_app)
+    fast_app.json = FastJSONProvider(fast_app)
+
+    def render(app: Flask, rows: List[Dict]) -> Callable[[], bytes]:
+        payload = {'success': True, 'count': len(rows), 'products': rows}
+        return lambda: app.json.response(payload).get_data()
+
+    report = {
+        'products': args.products,
+        'orjson': ORJSON_AVAILABLE,
+        'brotli': BROTLI_AVAILABLE,
+        'stdlib': measure(render(stdlib_app, products), args.repeat),
+        'fast': measure(render(fast_app, products), args.repeat),
+        'fast_fields': measure(render(fast_app, projected), args.repeat)
+    }
+
+    print(f"{args.products} products/response (orjson={ORJSON_AVAILABLE}, brotli={BROTLI_AVAILABLE})")
+    for mode in ('stdlib', 'fast', 'fast_fields'):
+        result = report[mode]
+        sizes = '  '.join(f"{encoding} {size:>9,} B" for encoding, size in result['bytes'].items())
+        print(f"  {mode:<12} {result['ms_per_response']:>8.3f} ms  {sizes}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    main()
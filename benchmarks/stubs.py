@@ -0,0 +1,51 @@
+"""
+📁 benchmarks/stubs.py
+🎯 ตัวแทน LINE Messaging API และ event สำหรับรัน handler โดยไม่ต้องเชื่อมต่อ LINE จริง
+"""
+
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+
+class StubMessagingApi:
+    """เก็บจำนวนข้อความที่ตอบกลับแทนการเรียก api.line.me (หน่วงเวลาได้)"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.replies = 0
+        self.pushes = 0
+        self.last_request = None
+        self._lock = threading.Lock()
+
+    def _wait(self):
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+
+    def reply_message(self, reply_message_request, *args, **kwargs):
+        self._wait()
+        with self._lock:
+            self.replies += 1
+            self.last_request = reply_message_request
+
+    def push_message(self, push_message_request, *args, **kwargs):
+        self._wait()
+        with self._lock:
+            self.pushes += 1
+            self.last_request = push_message_request
+
+    def __getattr__(self, name):
+        # เมธอดอื่นของ MessagingApi (rich menu, profile ฯลฯ) ไม่ทำอะไร
+        return lambda *args, **kwargs: None
+
+
+def make_text_event(text: str, user_id: str = 'Ubenchmark'):
+    """สร้าง event ที่มีโครงสร้างเหมือน linebot.v3.webhooks.MessageEvent (เฉพาะฟิลด์ที่ handler ใช้)"""
+    return SimpleNamespace(
+        type='message',
+        webhook_event_id=uuid.uuid4().hex,
+        reply_token=uuid.uuid4().hex,
+        source=SimpleNamespace(type='user', user_id=user_id),
+        message=SimpleNamespace(type='text', id=uuid.uuid4().hex, text=text)
+    )
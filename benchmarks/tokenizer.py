@@ -0,0 +1,73 @@
+"""
+📁 benchmarks/tokenizer.py
+🎯 Benchmark ตัวตัดคำไทย: tokens/วินาที แบบไม่ใช้ cache (ตัดจริงทุกครั้ง) และแบบ cache (ข้อความซ้ำ)
+ใช้ชื่อ+คำอธิบายสินค้าจากแคตตาล็อกสังเคราะห์ โดยลบช่องว่างออกเพื่อให้ได้ข้อความไทยช่วงยาวแบบข้อความจริง
+
+ตัวอย่าง:
+    python -m benchmarks.tokenizer --products 20000
+    python -m benchmarks.tokenizer --products 5000 --output benchmarks/results/tokenizer.json
+"""
+
+import argparse
+import json
+import logging
+import time
+from typing import Callable, Dict, List
+
+from src.utils.thai_tokenizer import ThaiTokenizer
+
+from .catalog import generate_catalog
+
+
+def measure(tokenize: Callable[[str], List[str]], texts: List[str], repeat: int) -> Dict:
+    """ตัดคำทุกข้อความ repeat รอบ แล้วคืนจำนวน token และ throughput"""
+    tokens = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            tokens += len(tokenize(text))
+    elapsed = time.perf_counter() - started
+    return {
+        'texts': len(texts) * repeat,
+        'tokens': tokens,
+        'seconds': round(elapsed, 3),
+        'tokens_per_second': round(tokens / elapsed) if elapsed else 0,
+        'chars_per_second': round(sum(map(len, texts)) * repeat / elapsed) if elapsed else 0
+    }
+
+
+def main(argv: List[str] = None) -> Dict:
+    parser = argparse.ArgumentParser(description='Thai tokenizer benchmark')
+    parser.add_argument('--products', type=int, default=10000, help='จำนวนสินค้าที่ใช้เป็นข้อความ')
+    parser.add_argument('--repeat', type=int, default=3, help='จำนวนรอบของแบบ cache')
+    parser.add_argument('--output', help='ไฟล์ JSON ผลลัพธ์')
+    args = parser.parse_args(argv)
+    logging.disable(logging.ERROR)
+
+    texts = [''.join(f"{p['product_name']} {p['description']}".split()) for p in generate_catalog(args.products)]
+    tokenizer = ThaiTokenizer()
+    uncached = ThaiTokenizer(cache_size=1)  # cache 1 รายการ = ตัดใหม่ทุกข้อความ
+
+    report = {
+        'dictionary_words': len(tokenizer),
+        'uncached': measure(uncached.tokenize, texts, 1),
+        'cached': measure(tokenizer.tokenize, texts, args.repeat),
+        'cache': tokenizer.cache_info()._asdict(),
+        'sample': {texts[0]: tokenizer.tokenize(texts[0])}
+    }
+
+    print(f"Dictionary: {report['dictionary_words']} words, {len(texts)} texts "
+          f"(avg {sum(map(len, texts)) / max(len(texts), 1):.0f} chars)")
+    for mode in ('uncached', 'cached'):
+        result = report[mode]
+        print(f"  {mode:<9} {result['tokens_per_second']:>12,} tokens/s  {result['chars_per_second']:>12,} chars/s")
+    print(f"  sample: {texts[0]} -> {report['sample'][texts[0]]}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -3,15 +3,33 @@ Affiliate Product Review Bot - Main Application
 ระบบ LINE Bot สำหรับรีวิวสินค้าและ Affiliate Marketing
 """
 
-from flask import Flask, request, abort, render_template, jsonify
-from linebot.exceptions import InvalidSignatureError
+import json
+import threading
+import time
+from datetime import datetime
+
+from flask import Flask, request, abort, render_template, jsonify, Response, stream_with_context, g
+from linebot.v3.exceptions import InvalidSignatureError
 
 # Import modules ใหม่ที่เราสร้าง
 from src.config import config
 from src.utils.supabase_database import SupabaseDatabase
+from src.utils.product_store import create_product_store, search_logging_paused
 from src.handlers.affiliate_handler import affiliate_handler
 from src.utils.ai_search import ai_search
+from src.utils.suggestion_index import suggestion_index
+from src.utils.spell_corrector import spell_corrector
+from src.utils.semantic_search import semantic_search
+from src.utils.search_pipeline import search_pipeline
+from src.utils.search_warmup import search_cache, search_warmer
+from src.utils.http_cache import response_cache
+from src.utils.api_response import FastJSONProvider, response_compressor, parse_fields, select_fields
+from src.utils.catalog_export import CatalogExport, EXPORT_FORMATS
+from src.utils.fanout import fanout
 from src.utils.review_generator import review_generator
+from src.utils.batch_generator import batch_generator
+from src.utils.metrics import metrics
+from src.utils.tracing import tracer
 import logging
 
 # ตั้งค่า logging
@@ -24,9 +42,17 @@ logger = logging.getLogger(__name__)
 # ตั้งค่า Flask App
 app = Flask(__name__)
 app.config['SECRET_KEY'] = config.SECRET_KEY
+app.json = FastJSONProvider(app)
 
 # สร้าง database instance
-db = SupabaseDatabase()
+db = create_product_store()
+suggestion_index.bind_database(db)
+semantic_search.bind_database(db)
+search_pipeline.bind_database(db)
+search_warmer.bind_database(db)
+
+# warm คำค้นหายอดนิยมใน background ตั้งแต่เริ่ม process (รวมถึงตอนรันผ่าน gunicorn)
+search_warmer.start()
 
 def create_app():
     """สร้างและตั้งค่า Flask application"""
@@ -44,6 +70,41 @@ def create_app():
     
     return app
 
+# ===== Request Metrics =====
+
+http_requests = metrics.counter('http_requests_total', 'HTTP requests by endpoint and status')
+http_latency = metrics.histogram('http_request_duration_seconds', 'HTTP request latency by endpoint')
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        http_latency.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+        http_requests.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
+
+@app.after_request
+def compress_response(response):
+    return response_compressor(response)
+
+# ===== Webhook Capture =====
+
+_capture_lock = threading.Lock()
+
+def capture_webhook(body: str):
+    """บันทึก webhook body ลง WEBHOOK_CAPTURE_PATH (หนึ่งบรรทัดต่อ request) เพื่อนำไป replay"""
+    try:
+        line = json.dumps({"captured_at": time.time(), "body": body}, ensure_ascii=False)
+        with _capture_lock, open(config.WEBHOOK_CAPTURE_PATH, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+    except Exception as e:
+        logger.error(f"Webhook capture error: {e}")
+
 # ===== Flask Routes =====
 
 @app.route('/')
@@ -56,9 +117,12 @@ def home():
             "/health": "ตรวจสอบสถานะระบบ",
             "/callback": "LINE Bot Webhook",
             "/api/products": "จัดการสินค้า",
-            "/api/search": "ค้นหาสินค้า",
+            "/api/search": "ค้นหาสินค้า (mode=semantic สำหรับค้นหาเชิงความหมาย)",
             "/api/stats": "สถิติระบบ",
-            "/api/review": "สร้างรีวิว"
+            "/api/review": "สร้างรีวิว",
+            "/api/review/batch": "สร้างรีวิว/โปรโมตหลายสินค้า (NDJSON stream)",
+            "/metrics": "Metrics ของระบบ (Prometheus)",
+            "/api/traces": "สรุปการเรียก backend ต่อข้อความ LINE แยกตาม handler"
         }
     })
 
@@ -73,7 +137,8 @@ def health_check():
         "database_connected": db.connected if hasattr(db, 'connected') else True,
         "line_bot_active": config.LINE_CHANNEL_ACCESS_TOKEN is not None,
         "ai_search_enabled": config.USE_AI_SEARCH,
-        "supabase_enabled": config.USE_SUPABASE
+        "supabase_enabled": config.USE_SUPABASE,
+        "product_mirror": SupabaseDatabase.mirror.get_status() if SupabaseDatabase.mirror else None
     })
 
 @app.route('/ping')
@@ -81,37 +146,87 @@ def ping():
     """Simple ping endpoint เพื่อป้องกันเซิร์ฟเวอร์หยุด"""
     return "pong", 200
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Metrics ทั้งหมดในรูปแบบ Prometheus text format"""
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/traces')
+def traces_api():
+    """สรุป trace แยกตาม handler และ trace ที่ช้า/มีรูปแบบ N+1 ล่าสุด"""
+    return jsonify({
+        "slow_threshold_ms": tracer.slow_ms,
+        "handlers": tracer.get_summary(),
+        "recent_slow": list(tracer.recent_slow)
+    })
+
+def log_cached_search(entry):
+    """search ที่ตอบจาก response cache ยังนับเป็นการค้นหาในสถิติ (คำค้นหาที่ใช้ตอบจริง เหมือนตอนไม่ hit)"""
+    query = request.args.get('query', '').strip()
+    if query:
+        body = json.loads(entry.body)
+        db.log_search(body.get('corrected_query') or query, body.get('count', 0))
+
 @app.route('/api/search', methods=['GET'])
+@response_cache.cached(on_hit=log_cached_search)
 def search_products_api():
     """API สำหรับค้นหาสินค้า"""
     try:
         query = request.args.get('query', '').strip()
         limit = int(request.args.get('limit', config.MAX_RESULTS_PER_SEARCH))
+        offset = int(request.args.get('offset', 0))
         use_ai = request.args.get('ai', 'false').lower() == 'true'
+        mode = request.args.get('mode', 'lexical').lower()
         
-        logger.info(f"Product search API: '{query}' (limit={limit}, ai={use_ai})")
+        logger.info(f"Product search API: '{query}' (limit={limit}, offset={offset}, ai={use_ai}, mode={mode})")
         
         if not query:
             return jsonify({"error": "กรุณาระบุคำค้นหา"}), 400
         
-        # ค้นหาสินค้า
-        products = db.search_products(query, limit)
-        
-        # ใช้ AI search หากเปิดใช้งาน
-        if use_ai and products:
-            products = ai_search.enhanced_product_search(query, products, limit)
+        corrected, pipeline = None, None
+        # การค้นหาภายใน (ครั้งแรก, ครั้งที่แก้คำผิด) ไม่บันทึก log - บันทึกครั้งเดียวด้านล่างด้วยคำค้นหาที่ใช้ตอบจริง
+        with search_logging_paused():
+            if use_ai:
+                # ค้นหาหลายขั้น: ผู้สมัครจากหลายแหล่ง -> จัดอันดับด้วย feature + AI -> แบ่งหน้า
+                pipeline = search_cache.get('pipeline', search_cache.key(query, limit, offset))
+                if pipeline is None:
+                    pipeline = search_pipeline.search(query, limit, offset)
+                    search_cache.put('pipeline', search_cache.key(query, limit, offset), pipeline)
+                products, corrected = pipeline['products'], pipeline['corrected_query']
+            else:
+                # semantic = ANN บน embedding ผสมคะแนน lexical, ไม่พบค่อยใช้การค้นหาปกติ
+                products = semantic_search.search(query, limit) if mode == 'semantic' and not offset else []
+                if not products:
+                    # วลีราคา ("ไม่เกิน 500") เป็นตัวกรองของ search_products แทนที่จะค้นเป็นข้อความ
+                    text, min_price, max_price = ai_search.query_parser.search_filters(query)
+                    # search_products คืน dict ที่มีรายการสินค้าใน 'products'
+                    products = db.search_products(text, limit, offset, min_price=min_price,
+                                                  max_price=max_price).get('products', [])
+                    
+                    # ไม่พบ - ลองแก้คำที่พิมพ์ผิดแล้วค้นหาอีกครั้ง
+                    if not products:
+                        corrected = spell_corrector.correct(text)
+                        if corrected:
+                            products = db.search_products(corrected, limit, offset, min_price=min_price,
+                                                          max_price=max_price).get('products', [])
+        db.log_search(corrected or query, len(products))
         
         if products:
-            logger.info(f"Search successful: found {len(products)} products for '{query}'")
-            return jsonify({
+            logger.info(f"Search successful: found {len(products)} products for '{corrected or query}'")
+            response = {
                 "success": True,
                 "query": query,
                 "count": len(products),
                 "products": products
-            })
+            }
+            if corrected:
+                response["corrected_query"] = corrected
+            if pipeline:
+                response.update(total=pipeline['total'], has_more=pipeline['has_more'], stages=pipeline['stages'])
+            return jsonify(response)
         else:
             logger.info(f"Search not found: '{query}'")
-            suggestions = ["อิเล็กทรอนิกส์", "แฟชั่น", "ความงาม", "สุขภาพ"]
+            suggestions = suggestion_index.related(query, 4) or ["อิเล็กทรอนิกส์", "แฟชั่น", "ความงาม", "สุขภาพ"]
             return jsonify({
                 "success": False,
                 "message": f"ไม่พบสินค้า '{query}'",
@@ -122,6 +237,26 @@ def search_products_api():
         logger.error(f"Search API error: {e}")
         return jsonify({"error": "เกิดข้อผิดพลาดในการค้นหา"}), 500
 
+@app.route('/api/suggest', methods=['GET'])
+def suggest_api():
+    """API คำแนะนำขณะพิมพ์ (search-as-you-type) จาก prefix ที่ผู้ใช้พิมพ์"""
+    try:
+        prefix = request.args.get('q', '')
+        limit = min(int(request.args.get('limit', 5)), config.SUGGEST_TOP_K)
+        kinds = [kind for kind in request.args.get('kind', '').split(',') if kind] or None
+        
+        return jsonify({
+            "success": True,
+            "query": prefix,
+            "suggestions": suggestion_index.suggest(prefix, limit, kinds)
+        })
+        
+    except ValueError:
+        return jsonify({"error": "limit ต้องเป็นตัวเลข"}), 400
+    except Exception as e:
+        logger.error(f"Suggest API error: {e}")
+        return jsonify({"error": "เกิดข้อผิดพลาดในการแนะนำคำค้นหา"}), 500
+
 @app.route("/callback", methods=['POST'])
 def line_callback():
     """Webhook สำหรับรับข้อความจาก LINE - Affiliate Bot"""
@@ -136,6 +271,10 @@ def line_callback():
         # ประมวลผล webhook - ใช้ affiliate handler
         affiliate_handler.handler.handle(body, signature)
         
+        # บันทึกเฉพาะ webhook ที่ลายเซ็นถูกต้องและประมวลผลสำเร็จ (ไม่ให้ request ปลอมเขียนลงดิสก์)
+        if config.WEBHOOK_CAPTURE_PATH:
+            capture_webhook(body)
+        
         if config.DEBUG:
             logger.info("LINE webhook processed successfully")
         
@@ -151,6 +290,7 @@ def line_callback():
         abort(500)
 
 @app.route('/api/products', methods=['GET', 'POST', 'PUT', 'DELETE'])
+@response_cache.cached()
 def products_api():
     """API สำหรับจัดการสินค้า"""
     try:
@@ -158,6 +298,7 @@ def products_api():
             # ดึงสินค้าทั้งหมดหรือตามเงื่อนไข
             category = request.args.get('category')
             limit = int(request.args.get('limit', 50))
+            fields = parse_fields(request.args.get('fields'))  # เช่น ?fields=product_code,price
             
             if category:
                 products = db.get_products_by_category(category)
@@ -167,7 +308,7 @@ def products_api():
             return jsonify({
                 "success": True,
                 "count": len(products),
-                "products": products
+                "products": select_fields(products, fields)
             })
         
         elif request.method == 'POST':
@@ -223,12 +364,43 @@ def products_api():
         logger.error(f"Products API error: {e}")
         return jsonify({"error": "เกิดข้อผิดพลาดในการจัดการสินค้า"}), 500
 
+@app.route('/api/products/export', methods=['GET'])
+def export_products_api():
+    """API export แคตตาล็อกทั้งหมดแบบ stream (NDJSON หรือ CSV) - ?format=csv&fields=...&updated_since=ISO เวลา"""
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"format ต้องเป็น {' หรือ '.join(EXPORT_FORMATS)}"}), 400
+    
+    updated_since = request.args.get('updated_since', '').strip() or None
+    if updated_since:
+        try:
+            datetime.fromisoformat(updated_since)
+        except ValueError:
+            return jsonify({"error": "updated_since ต้องเป็นเวลารูปแบบ ISO 8601"}), 400
+    
+    export = CatalogExport(db, export_format, parse_fields(request.args.get('fields')), updated_since)
+    try:
+        # อ่านหน้าแรกก่อนเริ่ม stream - ถ้าฐานข้อมูลใช้ไม่ได้ยังตอบ error เป็น status ได้
+        export.first_page()
+    except Exception as e:
+        logger.error(f"Export API error: {e}")
+        return jsonify({"error": "ไม่สามารถอ่านข้อมูลสินค้าได้"}), 503
+    
+    filename = f"products.{export_format}"
+    return Response(stream_with_context(export.chunks()), content_type=export.content_type,
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
 @app.route('/api/stats')
+@response_cache.cached(ttl=config.HTTP_CACHE_STATS_TTL_SECONDS, versioned=False)
 def stats_api():
     """API สำหรับดูสถิติระบบ"""
     try:
-        stats = db.get_stats()
-        popular_searches = db.get_popular_searches(10)
+        stats, popular_searches, search_stats = fanout.run(
+            'stats_api',
+            db.get_stats,
+            lambda: db.get_popular_searches(10),
+            lambda: db.get_search_stats(7, 10)
+        )
         
         result = {
             "system": {
@@ -239,7 +411,10 @@ def stats_api():
                 "supabase_enabled": config.USE_SUPABASE
             },
             "database": stats,
-            "popular_searches": popular_searches
+            "popular_searches": popular_searches,
+            "search_analytics": search_stats,
+            "search_warmup": search_warmer.get_status(),
+            "http_cache": response_cache.stats()
         }
         
         logger.info("Stats API accessed")
@@ -296,6 +471,51 @@ def generate_review_api():
         logger.error(f"Review API error: {e}")
         return jsonify({"error": "เกิดข้อผิดพลาดในการสร้างรีวิว"}), 500
 
+@app.route('/api/review/batch', methods=['POST'])
+def generate_review_batch_api():
+    """API สำหรับสร้างรีวิว/คำโปรโมตหลายสินค้าพร้อมกัน - ตอบกลับเป็น NDJSON stream"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data.get('product_codes'):
+        return jsonify({"error": "กรุณาระบุ product_codes"}), 400
+    
+    codes = data['product_codes']
+    if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+        return jsonify({"error": "product_codes ต้องเป็นรายการของรหัสสินค้า (string)"}), 400
+    
+    product_codes = list(dict.fromkeys(codes))
+    if len(product_codes) > config.BATCH_MAX_PRODUCTS:
+        return jsonify({"error": f"ระบุสินค้าได้ไม่เกิน {config.BATCH_MAX_PRODUCTS} รายการ"}), 400
+    
+    kind = 'promotion' if data.get('type') == 'promotion' else 'review'
+    styles = data.get('styles')
+    use_ai = bool(data.get('ai', False))
+    
+    # ดึงสินค้าทั้งหมดใน query เดียว
+    products = db.get_products_by_codes(product_codes)
+    found_codes = {p.get('product_code') for p in products}
+    
+    def generate():
+        started = time.perf_counter()
+        count = 0
+        
+        for code in product_codes:
+            if code not in found_codes:
+                yield json.dumps({"product_code": code, "error": "ไม่พบสินค้า"}, ensure_ascii=False) + "\n"
+        
+        try:
+            for result in batch_generator.generate(products, styles, kind, use_ai):
+                count += 1
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.error(f"Batch review error: {e}")
+            yield json.dumps({"error": "เกิดข้อผิดพลาดในการสร้างเนื้อหา"}, ensure_ascii=False) + "\n"
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Batch generated {count} {kind}(s) for {len(products)} product(s) in {elapsed_ms:.0f}ms")
+        yield json.dumps({"done": True, "count": count, "elapsed_ms": round(elapsed_ms, 1)}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 # ===== Error Handlers =====
 
 @app.errorhandler(404)
@@ -0,0 +1,165 @@
+-- SQL สำหรับสร้าง rollup ของสถิติการค้นหา (search_rollups) ใน Supabase
+-- ใช้ SQL Editor ใน Supabase Dashboard (รันซ้ำได้)
+-- rollup รายชั่วโมง/รายวัน ต่อคำค้นหาที่ normalize แล้ว อัปเดตด้วย trigger ตอน INSERT ลง product_searches
+-- trigger อัปเดตเฉพาะแถวของคำค้นหานั้น (ไม่มีแถวผลรวมกลางที่ทุก INSERT ต้องรอล็อกเดียวกัน)
+-- ผลรวมและคำค้นหายอดนิยมคำนวณจากแถวรายวันตอนอ่าน จึงไม่ช้าลงตามจำนวน log ที่สะสม
+
+-- 1. ตาราง rollup (query = '' คือการค้นหาด้วยคำว่าง เช่น เปิดหมวดหมู่)
+CREATE TABLE IF NOT EXISTS search_rollups (
+    bucket TEXT NOT NULL,           -- hour | day
+    query TEXT NOT NULL,
+    period TEXT NOT NULL,           -- 2026-01-31T14 | 2026-01-31
+    display_query TEXT,
+    searches BIGINT NOT NULL DEFAULT 0,
+    results BIGINT NOT NULL DEFAULT 0,
+    zero_results BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, query, period)
+);
+CREATE INDEX IF NOT EXISTS idx_search_rollups_top ON search_rollups (bucket, period, searches DESC);
+CREATE INDEX IF NOT EXISTS idx_searches_created_at ON product_searches (created_at);
+
+ALTER TABLE search_rollups ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Allow public read on search rollups" ON search_rollups;
+CREATE POLICY "Allow public read on search rollups" ON search_rollups
+    FOR SELECT USING (true);
+
+-- rollup รุ่นแรกมีแถวผลรวม (bucket 'all' และ query '' ของทุกการค้นหา) ที่จะถูกนับซ้ำ - ล้างแล้วสร้างใหม่ในขั้นที่ 3
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM search_rollups WHERE bucket = 'all') THEN
+        DELETE FROM search_rollups;
+    END IF;
+END;
+$$;
+
+-- 2. อัปเดต rollup ทีละการค้นหา: หนึ่งแถวต่อ bucket ของคำค้นหานั้น
+CREATE OR REPLACE FUNCTION rollup_search(
+    raw_query TEXT, result_count INTEGER, searched_at TIMESTAMP, search_count INTEGER DEFAULT 1
+)
+RETURNS VOID
+LANGUAGE SQL
+AS $$
+    INSERT INTO search_rollups AS r (bucket, query, period, display_query, searches, results, zero_results)
+    SELECT b.bucket, lower(regexp_replace(btrim(COALESCE(raw_query, '')), '\s+', ' ', 'g')), b.period,
+           btrim(COALESCE(raw_query, '')), search_count,
+           COALESCE(result_count, 0) * search_count,
+           CASE WHEN COALESCE(result_count, 0) = 0 THEN search_count ELSE 0 END
+    FROM (VALUES
+        ('hour', to_char(searched_at, 'YYYY-MM-DD"T"HH24')),
+        ('day', to_char(searched_at, 'YYYY-MM-DD'))
+    ) AS b (bucket, period)
+    ON CONFLICT (bucket, query, period) DO UPDATE SET
+        display_query = EXCLUDED.display_query,
+        searches = r.searches + EXCLUDED.searches,
+        results = r.results + EXCLUDED.results,
+        zero_results = r.zero_results + EXCLUDED.zero_results;
+$$;
+
+CREATE OR REPLACE FUNCTION rollup_product_search()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM rollup_search(NEW.search_query, NEW.result_count, COALESCE(NEW.created_at, NOW()));
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS product_searches_rollup ON product_searches;
+CREATE TRIGGER product_searches_rollup
+    AFTER INSERT ON product_searches
+    FOR EACH ROW EXECUTE FUNCTION rollup_product_search();
+
+-- 3. สร้าง rollup จาก log เดิม (ครั้งเดียว เมื่อยังไม่มี rollup)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM search_rollups) THEN
+        PERFORM rollup_search(search_query, result_count, date_trunc('hour', created_at), COUNT(*)::INTEGER)
+        FROM product_searches
+        GROUP BY search_query, result_count, date_trunc('hour', created_at);
+    END IF;
+END;
+$$;
+
+-- 4. ฟังก์ชันอ่านสถิติ (เรียกผ่าน rpc) - get_popular_searches เดิมคืนคอลัมน์น้อยกว่า ต้อง DROP ก่อน
+-- คำค้นหายอดนิยมนับเฉพาะ days วันล่าสุด (เหมือนเดิม 30 วัน) จาก rollup รายวัน
+DROP FUNCTION IF EXISTS get_popular_searches(INTEGER);
+DROP FUNCTION IF EXISTS get_popular_searches(INTEGER, INTEGER);
+CREATE OR REPLACE FUNCTION get_popular_searches(search_limit INTEGER DEFAULT 10, days INTEGER DEFAULT 30)
+RETURNS TABLE (
+    search_query TEXT,
+    search_count BIGINT,
+    avg_results NUMERIC,
+    zero_result_rate NUMERIC
+)
+LANGUAGE SQL
+AS $$
+    SELECT (array_agg(display_query ORDER BY period DESC))[1],
+           SUM(searches)::BIGINT,
+           ROUND(SUM(results)::NUMERIC / GREATEST(SUM(searches), 1), 2),
+           ROUND(SUM(zero_results) * 100.0 / GREATEST(SUM(searches), 1), 2)
+    FROM search_rollups
+    WHERE bucket = 'day' AND query <> ''
+      AND period >= to_char(NOW() - (days - 1) * INTERVAL '1 day', 'YYYY-MM-DD')
+    GROUP BY query
+    ORDER BY SUM(searches) DESC, query
+    LIMIT search_limit;
+$$;
+
+-- จำนวนการค้นหาทั้งหมดเท่าที่ rollup รายวันยังเก็บอยู่ (get_stats)
+CREATE OR REPLACE FUNCTION get_total_searches()
+RETURNS BIGINT
+LANGUAGE SQL
+AS $$
+    SELECT COALESCE(SUM(searches), 0)::BIGINT FROM search_rollups WHERE bucket = 'day';
+$$;
+
+DROP FUNCTION IF EXISTS get_search_stats(INTEGER, INTEGER);
+CREATE OR REPLACE FUNCTION get_search_stats(days INTEGER DEFAULT 7, search_limit INTEGER DEFAULT 10,
+                                            popular_days INTEGER DEFAULT 30)
+RETURNS JSON
+LANGUAGE SQL
+AS $$
+    WITH daily AS (
+        SELECT period, SUM(searches) AS searches, SUM(results) AS results, SUM(zero_results) AS zero_results
+        FROM search_rollups
+        WHERE bucket = 'day' AND period >= to_char(NOW() - (days - 1) * INTERVAL '1 day', 'YYYY-MM-DD')
+        GROUP BY period
+    )
+    SELECT json_build_object(
+        'searches', COALESCE(SUM(d.searches), 0),
+        'avg_results', COALESCE(ROUND(SUM(d.results)::NUMERIC / NULLIF(SUM(d.searches), 0), 2), 0),
+        'zero_result_rate', COALESCE(ROUND(SUM(d.zero_results) * 100.0 / NULLIF(SUM(d.searches), 0), 2), 0),
+        'popular_queries', (SELECT COALESCE(json_agg(p), '[]'::JSON)
+                            FROM get_popular_searches(search_limit, popular_days) p),
+        'daily', COALESCE(json_agg(json_build_object(
+            'period', d.period,
+            'searches', d.searches,
+            'avg_results', ROUND(d.results::NUMERIC / GREATEST(d.searches, 1), 2),
+            'zero_result_rate', ROUND(d.zero_results * 100.0 / GREATEST(d.searches, 1), 2)
+        ) ORDER BY d.period DESC) FILTER (WHERE d.period IS NOT NULL), '[]'::JSON)
+    )
+    FROM daily d;
+$$;
+
+-- 5. compaction: ลบ log ดิบและ rollup รายชั่วโมง/รายวันที่เก่ากว่าระยะเก็บ (0 = เก็บตลอด)
+-- SupabaseDatabase.log_search เรียกอย่างมากหนึ่งครั้งต่อ SEARCH_COMPACT_INTERVAL_SECONDS (หรือตั้ง pg_cron แทน)
+CREATE OR REPLACE FUNCTION compact_search_logs(raw_days INTEGER DEFAULT 30, hourly_days INTEGER DEFAULT 14,
+                                               daily_days INTEGER DEFAULT 400)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF raw_days > 0 THEN
+        DELETE FROM product_searches WHERE created_at < NOW() - raw_days * INTERVAL '1 day';
+    END IF;
+    IF hourly_days > 0 THEN
+        DELETE FROM search_rollups
+        WHERE bucket = 'hour' AND period < to_char(NOW() - hourly_days * INTERVAL '1 day', 'YYYY-MM-DD"T"HH24');
+    END IF;
+    IF daily_days > 0 THEN
+        DELETE FROM search_rollups
+        WHERE bucket = 'day' AND period < to_char(NOW() - daily_days * INTERVAL '1 day', 'YYYY-MM-DD');
+    END IF;
+END;
+$$;
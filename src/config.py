@@ -24,6 +24,13 @@ class Config:
     SQLITE_DATABASE = 'affiliate_products.db'
     USE_SUPABASE = os.environ.get('USE_SUPABASE', 'True').lower() == 'true'
     
+    # engine ของแคตตาล็อกสินค้า: supabase | sqlite | memory (ดู src/utils/product_store.py)
+    PRODUCT_STORE_ENGINE = os.environ.get('PRODUCT_STORE_ENGINE', 'supabase').lower()
+    PRODUCT_STORE_PATH = os.environ.get('PRODUCT_STORE_PATH', SQLITE_DATABASE)
+    
+    # ฐานความรู้เดิม (DatabaseAdapter): SQLite แทนไฟล์ JSON
+    USE_SQLITE = os.environ.get('USE_SQLITE', 'False').lower() == 'true'
+    
     # Flask Configuration
     SECRET_KEY = os.environ.get('SECRET_KEY', 'affiliate-review-bot-secret-key')
     DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
@@ -33,11 +40,115 @@ class Config:
     # AI Configuration
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
     USE_AI_SEARCH = os.environ.get('USE_AI_SEARCH', 'False').lower() == 'true'
+    AI_REVIEW_MODEL = os.environ.get('AI_REVIEW_MODEL', 'gpt-3.5-turbo')
+    AI_MAX_CONCURRENCY = int(os.environ.get('AI_MAX_CONCURRENCY', '4'))
+    AI_REQUEST_TIMEOUT = float(os.environ.get('AI_REQUEST_TIMEOUT', '20'))
+    BATCH_MAX_PRODUCTS = int(os.environ.get('BATCH_MAX_PRODUCTS', '200'))
+    GENERATION_CACHE_PATH = os.environ.get('GENERATION_CACHE_PATH', 'generation_cache.db')
+    GENERATION_CACHE_MAX_MB = int(os.environ.get('GENERATION_CACHE_MAX_MB', '50'))
+    
+    # Logging Configuration
+    LOG_DIR = os.environ.get('LOG_DIR', 'logs')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').lower()  # text หรือ json
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT', '7'))
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+    LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '1.0'))
+    
+    # Monitoring Configuration
+    TRACE_ENABLED = os.environ.get('TRACE_ENABLED', 'True').lower() == 'true'
+    TRACE_SLOW_MS = float(os.environ.get('TRACE_SLOW_MS', '1000'))
+    TRACE_N_PLUS_ONE_THRESHOLD = int(os.environ.get('TRACE_N_PLUS_ONE_THRESHOLD', '5'))
+
+    # สำเนา products ใน SQLite ของแต่ละ worker: อ่านจากสำเนา เขียนไป Supabase
+    USE_PRODUCT_MIRROR = os.environ.get('USE_PRODUCT_MIRROR', 'False').lower() == 'true'
+    PRODUCT_MIRROR_PATH = os.environ.get('PRODUCT_MIRROR_PATH', ':memory:')
+    PRODUCT_MIRROR_POLL_SECONDS = float(os.environ.get('PRODUCT_MIRROR_POLL_SECONDS', '30'))
+    PRODUCT_MIRROR_PAGE_SIZE = int(os.environ.get('PRODUCT_MIRROR_PAGE_SIZE', '1000'))
+    PRODUCT_MIRROR_RECONCILE_SECONDS = float(os.environ.get('PRODUCT_MIRROR_RECONCILE_SECONDS', '600'))
+    # reconcile ไม่ลบเกินสัดส่วนนี้ของสำเนาในรอบเดียว (รายการจาก Supabase ว่าง/สั้นผิดปกติ = ข้ามรอบนั้น)
+    PRODUCT_MIRROR_MAX_DELETE_FRACTION = float(os.environ.get('PRODUCT_MIRROR_MAX_DELETE_FRACTION', '0.5'))
+    
+    # log การค้นหาของ Supabase: เข้าคิวแล้วเขียนเป็นชุดเบื้องหลัง (false = INSERT ทีละแถวระหว่างค้นหา)
+    SEARCH_LOG_ASYNC = os.environ.get('SEARCH_LOG_ASYNC', 'true').lower() == 'true'
+    SEARCH_LOG_BATCH_SIZE = int(os.environ.get('SEARCH_LOG_BATCH_SIZE', '100'))
+    SEARCH_LOG_FLUSH_SECONDS = float(os.environ.get('SEARCH_LOG_FLUSH_SECONDS', '2'))
+    SEARCH_LOG_MAX_PENDING = int(os.environ.get('SEARCH_LOG_MAX_PENDING', '10000'))
+
+    # บันทึก webhook body ที่รับเข้ามาลงไฟล์ JSONL สำหรับ replay ด้วย benchmarks/load_webhook.py (ว่าง = ปิด)
+    WEBHOOK_CAPTURE_PATH = os.environ.get('WEBHOOK_CAPTURE_PATH', '')
     
     # Affiliate Configuration
     DEFAULT_COMMISSION_RATE = float(os.environ.get('DEFAULT_COMMISSION_RATE', '5.0'))
     MAX_RESULTS_PER_SEARCH = int(os.environ.get('MAX_RESULTS_PER_SEARCH', '5'))
     
+    # Recommendation Configuration
+    TRENDING_REFRESH_SECONDS = int(os.environ.get('TRENDING_REFRESH_SECONDS', '300'))
+    TRENDING_CAPACITY = int(os.environ.get('TRENDING_CAPACITY', '200'))
+    TRENDING_VELOCITY_WINDOW_HOURS = float(os.environ.get('TRENDING_VELOCITY_WINDOW_HOURS', '24'))
+    
+    # Search Suggestion Configuration (คำแนะนำขณะพิมพ์ /api/suggest)
+    SUGGEST_TOP_K = int(os.environ.get('SUGGEST_TOP_K', '10'))
+    SUGGEST_MAX_PRODUCTS = int(os.environ.get('SUGGEST_MAX_PRODUCTS', '5000'))
+    SUGGEST_MAX_QUERIES = int(os.environ.get('SUGGEST_MAX_QUERIES', '200'))
+    SUGGEST_REFRESH_SECONDS = int(os.environ.get('SUGGEST_REFRESH_SECONDS', '600'))
+    SPELL_MAX_DISTANCE = int(os.environ.get('SPELL_MAX_DISTANCE', '2'))
+    
+    # Semantic Search Configuration (ค้นหาเชิงความหมาย /api/search?mode=semantic)
+    SEMANTIC_ENCODER = os.environ.get('SEMANTIC_ENCODER', 'hashing').lower()
+    SEMANTIC_DIM = int(os.environ.get('SEMANTIC_DIM', '256'))
+    SEMANTIC_OPENAI_MODEL = os.environ.get('SEMANTIC_OPENAI_MODEL', 'text-embedding-3-small')
+    SEMANTIC_INDEX_PATH = os.environ.get('SEMANTIC_INDEX_PATH', 'semantic_index')
+    SEMANTIC_MAX_PRODUCTS = int(os.environ.get('SEMANTIC_MAX_PRODUCTS', '200000'))
+    SEMANTIC_NPROBE = int(os.environ.get('SEMANTIC_NPROBE', '16'))
+    SEMANTIC_LEXICAL_WEIGHT = float(os.environ.get('SEMANTIC_LEXICAL_WEIGHT', '0.3'))
+    
+    # Search Pipeline Configuration (ค้นหาหลายขั้น /api/search?ai=true): จำนวนผู้สมัคร และงบเวลาของแต่ละขั้น (ms)
+    SEARCH_CANDIDATES = int(os.environ.get('SEARCH_CANDIDATES', '300'))
+    SEARCH_RERANK_DEPTH = int(os.environ.get('SEARCH_RERANK_DEPTH', '50'))
+    SEARCH_CANDIDATE_BUDGET_MS = float(os.environ.get('SEARCH_CANDIDATE_BUDGET_MS', '150'))
+    SEARCH_RERANK_BUDGET_MS = float(os.environ.get('SEARCH_RERANK_BUDGET_MS', '50'))
+    SEARCH_PAGINATE_BUDGET_MS = float(os.environ.get('SEARCH_PAGINATE_BUDGET_MS', '5'))
+    QUERY_CACHE_SIZE = int(os.environ.get('QUERY_CACHE_SIZE', '2048'))  # จำนวนคำค้นหาที่เก็บผลการแปลงไว้
+    THAI_SEGMENT_CACHE_SIZE = int(os.environ.get('THAI_SEGMENT_CACHE_SIZE', '20000'))  # ผลตัดคำไทยที่เก็บไว้
+    
+    # Search Cache / Warm-up: คำค้นหายอดนิยม N อันดับจาก product_searches ถูกค้นล่วงหน้าตอนเริ่มและตามรอบเวลา (0 = ปิด)
+    SEARCH_CACHE_SIZE = int(os.environ.get('SEARCH_CACHE_SIZE', '2000'))
+    SEARCH_CACHE_TTL_SECONDS = int(os.environ.get('SEARCH_CACHE_TTL_SECONDS', '900'))
+    SEARCH_WARMUP_QUERIES = int(os.environ.get('SEARCH_WARMUP_QUERIES', '50'))
+    SEARCH_WARMUP_INTERVAL_SECONDS = int(os.environ.get('SEARCH_WARMUP_INTERVAL_SECONDS', '600'))
+    
+    # Search Analytics: ระยะเก็บ log ดิบ / rollup รายชั่วโมง / rollup รายวัน (วัน, 0 = เก็บตลอด), รอบ compaction
+    # และช่วงวันของคำค้นหายอดนิยม (get_popular_searches)
+    SEARCH_LOG_RETENTION_DAYS = int(os.environ.get('SEARCH_LOG_RETENTION_DAYS', '30'))
+    SEARCH_ROLLUP_HOURLY_DAYS = int(os.environ.get('SEARCH_ROLLUP_HOURLY_DAYS', '14'))
+    SEARCH_ROLLUP_DAILY_DAYS = int(os.environ.get('SEARCH_ROLLUP_DAILY_DAYS', '400'))
+    SEARCH_COMPACT_INTERVAL_SECONDS = int(os.environ.get('SEARCH_COMPACT_INTERVAL_SECONDS', '3600'))
+    SEARCH_POPULAR_DAYS = int(os.environ.get('SEARCH_POPULAR_DAYS', '30'))
+    
+    # HTTP Response Cache: cache ของ /api/products, /api/search, /api/stats + ETag/304 (max-age 0 = ตรวจสอบกับเซิร์ฟเวอร์ทุกครั้ง)
+    HTTP_CACHE_ENABLED = os.environ.get('HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+    HTTP_CACHE_SIZE = int(os.environ.get('HTTP_CACHE_SIZE', '1000'))
+    HTTP_CACHE_TTL_SECONDS = int(os.environ.get('HTTP_CACHE_TTL_SECONDS', '300'))
+    HTTP_CACHE_STATS_TTL_SECONDS = int(os.environ.get('HTTP_CACHE_STATS_TTL_SECONDS', '10'))
+    HTTP_CACHE_MAX_AGE = int(os.environ.get('HTTP_CACHE_MAX_AGE', '0'))
+    
+    # Response Compression: บีบอัด JSON/ข้อความที่ใหญ่กว่า COMPRESS_MIN_BYTES ด้วย brotli (ถ้าติดตั้ง) หรือ gzip
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', '1024'))
+    GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '6'))
+    BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '5'))
+    
+    # Catalog Export (/api/products/export): จำนวนสินค้าต่อหน้าของการอ่านแบบ keyset (= ขนาดหนึ่ง chunk)
+    EXPORT_PAGE_SIZE = int(os.environ.get('EXPORT_PAGE_SIZE', '1000'))
+
+    # Backend fan-out (เรียก backend ที่ไม่ขึ้นต่อกันพร้อมกัน)
+    FANOUT_ENABLED = os.environ.get('FANOUT_ENABLED', 'true').lower() == 'true'
+    FANOUT_MAX_WORKERS = int(os.environ.get('FANOUT_MAX_WORKERS', '16'))
+    
+    # ASGI (uvicorn asgi:app): จำนวน thread ที่รัน view ของ Flask พร้อมกัน
+    ASGI_MAX_THREADS = int(os.environ.get('ASGI_MAX_THREADS', '32'))
+    
     # Admin Configuration
     ADMIN_KEYWORDS = ["admin", "แอดมิน", "เมนูแอดมิน", "จัดการสินค้า"]
     ADMIN_USER_ID = os.environ.get('ADMIN_USER_ID', 'default_admin_user')
@@ -74,6 +185,10 @@ class Config:
     @classmethod
     def get_database_name(cls):
         """ได้ชื่อฐานข้อมูลที่ใช้"""
+        if cls.PRODUCT_STORE_ENGINE == 'sqlite':
+            return "SQLite"
+        if cls.PRODUCT_STORE_ENGINE == 'memory':
+            return "In-memory"
         return "Supabase" if cls.USE_SUPABASE else "SQLite"
     
     @classmethod
@@ -4,7 +4,6 @@
 """
 
 import re
-import traceback
 from typing import Dict, List, Optional
 from urllib.parse import quote
 
@@ -19,25 +18,38 @@ from linebot.exceptions import InvalidSignatureError
 from linebot.v3.webhooks import MessageEvent, TextMessageContent
 
 from ..config import config
-from ..utils.supabase_database import SupabaseDatabase
+from ..utils.product_store import create_product_store, search_logging_paused
 from ..utils.promotion_generator import PromotionGenerator
 from ..utils.rich_menu_manager import rich_menu_manager
 from ..utils.bulk_importer import bulk_importer
 from ..utils.ai_recommender import ai_recommender
+from ..utils.ai_search import ai_search
 from ..utils.smart_category_manager import SmartCategoryManager
 from ..utils.smart_recommendation_engine import SmartRecommendationEngine
+from ..utils.suggestion_index import suggestion_index
+from ..utils.search_warmup import search_cache, search_warmer
+from ..utils.spell_corrector import spell_corrector
 from ..utils.csv_importer_admin import AdminCSVImporter
+from ..utils.fanout import fanout
+from ..utils.metrics import metrics
+from ..utils.tracing import tracer
+from ..utils.logger import system_logger
+
+logger = system_logger.get_child('affiliate_handler')
 
 class AffiliateLineHandler:
     """คลาสสำหรับจัดการ LINE Bot messages สำหรับ Affiliate Products"""
     
     def __init__(self):
         self.admin_state = {}  # เก็บสถานะของแต่ละ user
-        self.db = SupabaseDatabase()
+        self.db = create_product_store()
         self.promo_generator = PromotionGenerator()
         self.category_manager = SmartCategoryManager(self.db)
         self.recommendation_engine = SmartRecommendationEngine(self.db)
         self.csv_importer = AdminCSVImporter(self.db)
+        self.suggestions = suggestion_index
+        self.suggestions.bind_database(self.db)
+        search_warmer.add_warmer(self.warm_search)
         
         # ตั้งค่า LINE Bot API
         if config.LINE_CHANNEL_ACCESS_TOKEN and config.LINE_CHANNEL_SECRET:
@@ -45,24 +57,33 @@ class AffiliateLineHandler:
             self.line_bot_api = MessagingApi(ApiClient(configuration))
             self.handler = WebhookHandler(config.LINE_CHANNEL_SECRET)
             self._register_handlers()
-            print("[OK] Affiliate LINE Bot API พร้อมใช้งาน")
+            logger.info("Affiliate LINE Bot API พร้อมใช้งาน")
         else:
-            print("[WARNING] LINE Bot ทำงานในโหมดจำกัด (ไม่มี tokens)")
+            logger.warning("LINE Bot ทำงานในโหมดจำกัด (ไม่มี tokens)")
             self.line_bot_api = self._create_dummy_api()
             self.handler = self._create_dummy_handler()
+        
+        # จับเวลาการเรียก LINE Messaging API (reply/push) ทุกจุด
+        self.line_bot_api = tracer.instrument(
+            metrics.instrument(
+                self.line_bot_api, ('reply_message', 'push_message'),
+                'line_api_request_duration_seconds', 'Latency of LINE Messaging API calls'
+            ),
+            ('reply_message', 'push_message'), kind='line'
+        )
     
     def _create_dummy_api(self):
         """สร้าง dummy API สำหรับกรณีไม่มี LINE tokens"""
         class DummyLineBotApi:
             def reply_message(self, *args, **kwargs):
-                print("[DEBUG] Dummy LINE API: reply_message called")
+                logger.debug("Dummy LINE API: reply_message called")
         return DummyLineBotApi()
     
     def _create_dummy_handler(self):
         """สร้าง dummy handler สำหรับกรณีไม่มี LINE tokens"""
         class DummyWebhookHandler:
             def handle(self, *args, **kwargs):
-                print("[DEBUG] Dummy Handler: handle called")
+                logger.debug("Dummy Handler: handle called")
             def add(self, *args, **kwargs):
                 return lambda f: f
         return DummyWebhookHandler()
@@ -73,12 +94,20 @@ class AffiliateLineHandler:
         def handle_text_message(event):
             self.handle_message(event)
     
+    @metrics.timed('line_handle_message_duration_seconds', 'Time spent handling one LINE text message')
     def handle_message(self, event):
-        """จัดการข้อความที่ได้รับจาก LINE"""
+        """จัดการข้อความที่ได้รับจาก LINE (หนึ่ง trace ต่อหนึ่ง webhook event)"""
+        with tracer.trace('line_message',
+                          trace_id=getattr(event, 'webhook_event_id', None),
+                          user_id=event.source.user_id):
+            self._dispatch_message(event)
+    
+    def _dispatch_message(self, event):
+        """เลือก handler ตามข้อความที่ได้รับ"""
         user_id = event.source.user_id
         text = event.message.text.strip()
         
-        print(f"[DEBUG] Received message: '{text}' from user: {user_id}")
+        logger.debug("Received message: '%s' from user: %s", text, user_id)
         
         try:
             # ตรวจสอบคำสั่ง Admin
@@ -232,7 +261,7 @@ class AffiliateLineHandler:
             # ตรวจสอบว่าเป็นชื่อหมวดหมู่โดยตรงหรือไม่
             categories = self.db.get_categories()
             if text in categories:
-                print(f"[DEBUG] User selected category directly: {text}")
+                logger.debug("User selected category directly: %s", text)
                 self._browse_category(event, text, user_id)
                 return
             
@@ -240,7 +269,7 @@ class AffiliateLineHandler:
             self._handle_product_search(event, text, user_id)
             
         except Exception as e:
-            print(f"[ERROR] Affiliate LINE handler error: {traceback.format_exc()}")
+            logger.error(f"Affiliate LINE handler error: {e}", exc_info=True)
             self._reply_error_message(event)
     
     def _handle_admin_commands(self, event, text: str, user_id: str):
@@ -467,7 +496,7 @@ class AffiliateLineHandler:
             self._handle_product_search(event, query, user_id, page, category, min_price, max_price, order_by)
             
         except (ValueError, IndexError) as e:
-            print(f"[ERROR] Invalid pagination command: {text}, error: {e}")
+            logger.error(f"Invalid pagination command: {text}, error: {e}")
             self._reply_text(event, "❌ คำสั่งไม่ถูกต้อง กรุณาลองใหม่")
     
     def _handle_filter_command(self, event, filter_text: str, user_id: str):
@@ -493,7 +522,7 @@ class AffiliateLineHandler:
             self._handle_product_search(event, query, user_id, 1, category, min_price, max_price)
             
         except Exception as e:
-            print(f"[ERROR] Invalid filter command: {filter_text}, error: {e}")
+            logger.error(f"Invalid filter command: {filter_text}, error: {e}")
             self._reply_text(event, "❌ คำสั่งกรองไม่ถูกต้อง\n💡 ตัวอย่าง: 'กรอง แมว หมวดหมู่:สัตว์เลี้ยง ราคา:10-100'")
     
     def _handle_sort_command(self, event, sort_text: str, user_id: str):
@@ -518,7 +547,7 @@ class AffiliateLineHandler:
             self._handle_product_search(event, query, user_id, 1, None, None, None, order_by)
             
         except Exception as e:
-            print(f"[ERROR] Invalid sort command: {sort_text}, error: {e}")
+            logger.error(f"Invalid sort command: {sort_text}, error: {e}")
             self._reply_text(event, "❌ คำสั่งเรียงไม่ถูกต้อง\n💡 ตัวอย่าง: 'เรียง แมว ราคาถูก' (ใหม่/ราคาถูก/ราคาแพง/ขายดี/คะแนน/หมวดหมู่/ชื่อ)")
     
     def _handle_product_search(self, event, query: str, user_id: str = None, 
@@ -527,22 +556,19 @@ class AffiliateLineHandler:
                              order_by: str = 'created_at'):
         """จัดการการค้นหาสินค้าพร้อม pagination และ filtering"""
         try:
-            print(f"[DEBUG] Searching for: '{query}' (page {page})")
+            logger.debug("Searching for: '%s' (page %s)", query, page)
             
-            # คำนวณ offset สำหรับ pagination
-            limit = config.MAX_RESULTS_PER_SEARCH
-            offset = (page - 1) * limit
+            # วลีราคาในคำค้นหา เช่น "ครีม ไม่เกิน 500" เป็นตัวกรองราคา (ค่าจากคำสั่งกรองมีผลก่อน)
+            query, min_price, max_price = ai_search.query_parser.search_filters(query, min_price, max_price)
             
-            # ค้นหาสินค้า
-            search_result = self.db.search_products(
-                query=query, 
-                limit=limit, 
-                offset=offset,
-                category=category,
-                min_price=min_price,
-                max_price=max_price,
-                order_by=order_by
-            )
+            # คำค้นหายอดนิยมถูก warm ไว้ใน cache แล้ว (search_warmer) - ตอบจากหน่วยความจำได้ทันที
+            page_key = search_cache.key(query, page, category, min_price, max_price, order_by)
+            search_result = search_cache.get('line', page_key)
+            if search_result is None:
+                with search_logging_paused():  # บันทึกครั้งเดียวด้านล่าง ทั้งกรณี cache hit และ miss
+                    search_result = self._search_page(query, page, category, min_price, max_price, order_by)
+                search_cache.put('line', page_key, search_result)
+            self.db.log_search(query, len(search_result.get('products', [])), user_id)
             
             # อัปเดต AI recommendations จากการค้นหา
             if user_id and search_result.get('data'):
@@ -552,7 +578,7 @@ class AffiliateLineHandler:
             total = search_result.get('total', 0)
             has_more = search_result.get('has_more', False)
             
-            print(f"[DEBUG] Found {len(products)} products (total: {total}, has_more: {has_more})")
+            logger.debug("Found %d products (total: %s, has_more: %s)", len(products), total, has_more)
             
             if products:
                 if len(products) == 1 and total == 1:
@@ -568,14 +594,41 @@ class AffiliateLineHandler:
                 self._send_not_found_message(event, query)
                 
         except Exception as e:
-            print(f"[ERROR] Product search error: {e}")
+            logger.error(f"Product search error: {e}")
             self._reply_text(event, "❌ เกิดข้อผิดพลาดในการค้นหา กรุณาลองใหม่")
     
+    def _search_page(self, query: str, page: int = 1, category: str = None, min_price: float = None,
+                     max_price: float = None, order_by: str = 'created_at') -> Dict:
+        """ผลค้นหาหนึ่งหน้าของ LINE (MAX_RESULTS_PER_SEARCH รายการต่อหน้า)"""
+        limit = config.MAX_RESULTS_PER_SEARCH
+        return self.db.search_products(
+            query=query,
+            limit=limit,
+            offset=(page - 1) * limit,
+            category=category,
+            min_price=min_price,
+            max_price=max_price,
+            order_by=order_by
+        )
+    
+    def warm_search(self, query: str):
+        """ตัว warm ของ search_warmer: ค้นหน้าแรกของคำค้นหาแล้วเก็บทั้งผลค้นหาและ Flex ที่ render แล้วไว้ใน cache"""
+        query, min_price, max_price = ai_search.query_parser.search_filters(query)
+        page_key = search_cache.key(query, 1, None, min_price, max_price, 'created_at')
+        search_result = self._search_page(query, 1, None, min_price, max_price)
+        search_cache.put('line', page_key, search_result, warmed=True)
+        
+        products, total = search_result.get('products', []), search_result.get('total', 0)
+        if products and not (len(products) == 1 and total == 1):
+            flex_message = self._render_products_page(products, query, 1, total, search_result.get('has_more', False),
+                                                      None, min_price, max_price)
+            search_cache.put('flex', page_key, flex_message, warmed=True)
+    
     def _handle_product_code_search(self, event, product_code: str):
         """ค้นหาสินค้าด้วยรหัสสินค้า"""
-        print(f"[DEBUG] Searching by product code: '{product_code}'")
+        logger.debug("Searching by product code: '%s'", product_code)
         product = self.db.get_product_by_code(product_code.upper())
-        print(f"[DEBUG] Product found: {product is not None}")
+        logger.debug("Product found: %s", product is not None)
         
         if product:
             self._send_product_simple(event, product)
@@ -584,7 +637,7 @@ class AffiliateLineHandler:
     
     def _handle_promotion_generation(self, event, product_code: str):
         """สร้างคำโปรโมตสินค้าอัตโนมัติ"""
-        print(f"[DEBUG] Generating promotion for product code: '{product_code}'")
+        logger.debug("Generating promotion for product code: '%s'", product_code)
         product = self.db.get_product_by_code(product_code.upper())
         
         if product:
@@ -862,7 +915,25 @@ class AffiliateLineHandler:
                                           page: int, total: int, has_more: bool,
                                           category: str = None, min_price: float = None, 
                                           max_price: float = None, order_by: str = 'created_at'):
-        """ส่งรายการสินค้าพร้อม pagination controls"""
+        """ส่งรายการสินค้าพร้อม pagination controls (Flex ของหน้าเดียวกันใช้ซ้ำจาก cache)"""
+        page_key = search_cache.key(query, page, category, min_price, max_price, order_by)
+        flex_message = search_cache.get('flex', page_key)
+        if flex_message is None:
+            flex_message = self._render_products_page(products, query, page, total, has_more,
+                                                      category, min_price, max_price, order_by)
+            search_cache.put('flex', page_key, flex_message)
+        
+        self.line_bot_api.reply_message(
+            ReplyMessageRequest(
+                reply_token=event.reply_token,
+                messages=[flex_message]
+            )
+        )
+    
+    def _render_products_page(self, products: List[Dict], query: str, page: int, total: int, has_more: bool,
+                              category: str = None, min_price: float = None,
+                              max_price: float = None, order_by: str = 'created_at') -> FlexMessage:
+        """สร้าง Flex Carousel ของสินค้าหนึ่งหน้าพร้อมปุ่มเปลี่ยนหน้า"""
         
         # สร้าง Flex Carousel สำหรับสินค้า
         flex_contents = self._create_products_carousel(products, query)
@@ -956,17 +1027,10 @@ class AffiliateLineHandler:
                 } if pagination_buttons else None
             })
         
-        flex_message = FlexMessage(
+        return FlexMessage(
             alt_text=f"🔍 เจอสินค้า {len(products)} รายการ (หน้า {page}/{total_pages})",
             contents=FlexContainer.from_dict(flex_contents)
         )
-        
-        self.line_bot_api.reply_message(
-            ReplyMessageRequest(
-                reply_token=event.reply_token,
-                messages=[flex_message]
-            )
-        )
     
     def _send_product_flex(self, event, product: Dict):
         """ส่ง Flex Message แสดงรายละเอียดสินค้า"""
@@ -1128,7 +1192,29 @@ class AffiliateLineHandler:
         )
     
     def _send_not_found_message(self, event, query: str):
-        """ส่งข้อความไม่พบสินค้า"""
+        """ส่งข้อความไม่พบสินค้า พร้อม "คุณหมายถึง" เมื่อแก้คำที่พิมพ์ผิดแล้วพบสินค้า"""
+        corrected = spell_corrector.correct(query)
+        if corrected:
+            with search_logging_paused():  # แค่นับผลของคำที่แก้แล้ว ผู้ใช้ยังไม่ได้ค้นหาคำนี้
+                total = self.db.search_products(corrected, limit=1).get('total', 0)
+            if total:
+                message = (
+                    f"❌ ไม่พบสินค้า '{query}'\n\n"
+                    f"🤔 คุณหมายถึง '{corrected}' ใช่ไหม?\n"
+                    f"พบ {total} รายการ - กดปุ่มด้านล่างเพื่อดูสินค้า"
+                )
+                quick_replies = QuickReply(items=self._suggestion_quick_reply_items([corrected], [
+                    {'label': '📋 หมวดหมู่', 'text': 'หมวดหมู่'},
+                    {'label': '🔥 ขายดี', 'text': 'ขายดี'}
+                ]))
+                self.line_bot_api.reply_message(
+                    ReplyMessageRequest(
+                        reply_token=event.reply_token,
+                        messages=[TextMessage(text=message, quick_reply=quick_replies)]
+                    )
+                )
+                return
+        
         message = (
             f"❌ ไม่พบสินค้า '{query}'\n\n"
             f"💡 ลองค้นหาด้วย:\n"
@@ -1200,7 +1286,7 @@ class AffiliateLineHandler:
             )
             
         except Exception as e:
-            print(f"Error showing categories: {e}")
+            logger.error(f"Error showing categories: {e}")
             self._reply_text(event, "❌ เกิดข้อผิดพลาดในการแสดงหมวดหมู่")
     
     def _get_category_icon(self, category: str) -> str:
@@ -1228,7 +1314,7 @@ class AffiliateLineHandler:
     def _browse_category(self, event, category_name: str, user_id: str):
         """เรียกดูสินค้าในหมวดหมู่เฉพาะ"""
         try:
-            print(f"[DEBUG] Browsing category: '{category_name}'")
+            logger.debug("Browsing category: '%s'", category_name)
             
             # ค้นหาสินค้าในหมวดหมู่นั้น เรียงตามยอดขาย
             search_result = self.db.search_products(
@@ -1243,7 +1329,7 @@ class AffiliateLineHandler:
             total = search_result.get('total', 0)
             has_more = search_result.get('has_more', False)
             
-            print(f"[DEBUG] Found {len(products)} products in category '{category_name}' (total: {total})")
+            logger.debug("Found %d products in category '%s' (total: %s)", len(products), category_name, total)
             
             if products:
                 # แสดงผลพร้อม pagination สำหรับหมวดหมู่
@@ -1252,7 +1338,7 @@ class AffiliateLineHandler:
                 self._reply_text(event, f"❌ ไม่พบสินค้าในหมวดหมู่ '{category_name}'\n💡 ลองเลือกหมวดหมู่อื่น หรือพิมพ์ 'หมวดหมู่' เพื่อดูทั้งหมด")
                 
         except Exception as e:
-            print(f"[ERROR] Category browse error: {e}")
+            logger.error(f"Category browse error: {e}")
             self._reply_text(event, "❌ เกิดข้อผิดพลาดในการเรียกดูหมวดหมู่")
     
     def _send_category_products(self, event, products: List[Dict], category_name: str,
@@ -1489,16 +1575,20 @@ class AffiliateLineHandler:
             self._reply_text(event, stats_text)
             
         except Exception as e:
-            print(f"[ERROR] Error showing category stats: {e}")
+            logger.error(f"Error showing category stats: {e}")
             self._reply_text(event, "❌ เกิดข้อผิดพลาดในการแสดงสถิติหมวดหมู่")
     
     def _show_admin_dashboard(self, event, user_id: str):
         """แสดง Admin Dashboard แบบครอบคลุม"""
         try:
-            # ดึงข้อมูลสถิติทั้งหมด
-            stats = self.db.get_stats()
-            categories_stats = self.db.get_categories_with_stats()
-            price_range = self.db.get_price_range()
+            # ดึงข้อมูลสถิติทั้งหมด (ไม่ขึ้นต่อกัน จึงเรียกพร้อมกัน)
+            stats, categories_stats, price_range, top_result = fanout.run(
+                'admin_dashboard',
+                self.db.get_stats,
+                self.db.get_categories_with_stats,
+                self.db.get_price_range,
+                lambda: self.db.search_products("", limit=3, order_by='popularity')
+            )
             
             # คำนวณสถิติเพิ่มเติม
             total_products = stats.get('total_products', 0)
@@ -1509,7 +1599,7 @@ class AffiliateLineHandler:
             hot_categories = [cat for cat in categories_stats if cat['popularity_score'] >= 50]
             
             # สินค้าที่ขายดีที่สุด (จำลอง - ต้องการ query พิเศษ)
-            top_products = self.db.search_products("", limit=3, order_by='popularity')['products']
+            top_products = top_result['products']
             
             dashboard_text = "🎛️ **Admin Dashboard - ภาพรวมระบบ**\n\n"
             
@@ -1581,7 +1671,7 @@ class AffiliateLineHandler:
             del self.admin_state[user_id]
             
         except Exception as e:
-            print(f"[ERROR] Error showing admin dashboard: {e}")
+            logger.error(f"Error showing admin dashboard: {e}")
             self._reply_text(event, "❌ เกิดข้อผิดพลาดในการแสดง Dashboard")
     
     def _handle_bulk_update(self, event, command: str):
@@ -1645,7 +1735,7 @@ class AffiliateLineHandler:
                 self._reply_text(event, f"❌ Bulk Update ล้มเหลว: {result['message']}")
                 
         except Exception as e:
-            print(f"[ERROR] Bulk update error: {e}")
+            logger.error(f"Bulk update error: {e}")
             self._reply_text(event, "❌ เกิดข้อผิดพลาดในการ Bulk Update")
     
     def _handle_bulk_delete(self, event, codes_str: str):
@@ -1678,7 +1768,7 @@ class AffiliateLineHandler:
                 self._reply_text(event, f"❌ Bulk Delete ล้มเหลว: {result['message']}")
                 
         except Exception as e:
-            print(f"[ERROR] Bulk delete error: {e}")
+            logger.error(f"Bulk delete error: {e}")
             self._reply_text(event, "❌ เกิดข้อผิดพลาดในการ Bulk Delete")
     
     def _handle_bulk_import(self, event, command: str):
@@ -1747,7 +1837,7 @@ class AffiliateLineHandler:
             self._reply_text(event, response)
                 
         except Exception as e:
-            print(f"[ERROR] Bulk import error: {e}")
+            logger.error(f"Bulk import error: {e}")
             self._reply_text(event, "❌ เกิดข้อผิดพลาดในการนำเข้าข้อมูล")
     
     def _update_category_system(self):
@@ -1759,15 +1849,15 @@ class AffiliateLineHandler:
             if categories:
                 # อัปเดต Smart Category Manager
                 self.category_manager.update_categories_from_database(categories)
-                print(f"[INFO] อัปเดตระบบหมวดหมู่แล้ว: {len(categories)} หมวดหมู่")
+                logger.info(f"อัปเดตระบบหมวดหมู่แล้ว: {len(categories)} หมวดหมู่")
             
         except Exception as e:
-            print(f"[ERROR] ไม่สามารถอัปเดตระบบหมวดหมู่ได้: {e}")
+            logger.error(f"ไม่สามารถอัปเดตระบบหมวดหมู่ได้: {e}")
     
     def _show_ai_recommendations(self, event, user_id: str, context: str = ""):
         """แสดงคำแนะนำสินค้าด้วย AI"""
         try:
-            print(f"[DEBUG] AI recommendations for user: {user_id}")
+            logger.debug("AI recommendations for user: %s", user_id)
             
             # ดึงคำแนะนำแบบปรับตัว
             recommendations = ai_recommender.get_personalized_recommendations(user_id, context, limit=6)
@@ -1833,7 +1923,7 @@ class AffiliateLineHandler:
             )
                 
         except Exception as e:
-            print(f"[ERROR] AI recommendations error: {e}")
+            logger.error(f"AI recommendations error: {e}")
             self._reply_text(event, "❌ เกิดข้อผิดพลาดในระบบแนะนำ AI")
     
     def _handle_top_products(self, event, command: str):
@@ -1896,7 +1986,7 @@ class AffiliateLineHandler:
             self._reply_text(event, response)
             
         except Exception as e:
-            print(f"[ERROR] Top products error: {e}")
+            logger.error(f"Top products error: {e}")
             self._reply_text(event, "❌ เกิดข้อผิดพลาดในการแสดงสินค้าอันดับสูง")
     
     def _create_modern_quick_reply(self, items: List[Dict[str, str]]) -> QuickReply:
@@ -1913,6 +2003,15 @@ class AffiliateLineHandler:
         
         return QuickReply(items=quick_reply_items)
     
+    def _suggestion_quick_reply_items(self, texts: List[str], fallback: List[Dict[str, str]],
+                                      limit: int = 8) -> List[QuickReplyItem]:
+        """Quick Reply จากคำแนะนำของ suggestion index เติมด้วยรายการเริ่มต้นจนครบ limit"""
+        items = [{'label': f"🔍 {text}"[:20], 'text': text} for text in texts]
+        seen = {item['text'] for item in items}
+        items += [item for item in fallback if item['text'] not in seen]
+        return [QuickReplyItem(action=MessageAction(label=item['label'], text=item['text']))
+                for item in items[:limit]]
+    
     def _show_welcome_message(self, event):
         """แสดงข้อความต้อนรับผู้ใช้ใหม่"""
         welcome_text = """🤖 สวัสดีครับ! ยินดีต้อนรับสู่ LINE Bot Affiliate
@@ -1953,17 +2052,18 @@ class AffiliateLineHandler:
 
 💡 หรือเลือกหมวดด้านล่าง"""
         
-        # Quick Reply แบบง่าย เด็กใช้ได้
-        quick_replies = QuickReply(items=[
-            QuickReplyItem(action=MessageAction(label="📱 มือถือ", text="มือถือ")),
-            QuickReplyItem(action=MessageAction(label="👕 เสื้อผ้า", text="เสื้อผ้า")),
-            QuickReplyItem(action=MessageAction(label="👟 รองเท้า", text="รองเท้า")),
-            QuickReplyItem(action=MessageAction(label="🎒 กระเป๋า", text="กระเป๋า")),
-            QuickReplyItem(action=MessageAction(label="💻 คอมพิวเตอร์", text="คอมพิวเตอร์")),
-            QuickReplyItem(action=MessageAction(label="🏠 ของใช้บ้าน", text="ของใช้บ้าน")),
-            QuickReplyItem(action=MessageAction(label="🔥 ขายดี", text="ขายดี")),
-            QuickReplyItem(action=MessageAction(label="💰 โปรโมชั่น", text="โปรโมชั่น"))
-        ])
+        # Quick Reply: คำค้นหา/หมวดหมู่ยอดนิยมจาก suggestion index แล้วเติมด้วยหมวดหลัก
+        popular = [item['text'] for item in self.suggestions.suggest('', 4, kinds=['query', 'category', 'brand'])]
+        quick_replies = QuickReply(items=self._suggestion_quick_reply_items(popular, [
+            {'label': "📱 มือถือ", 'text': "มือถือ"},
+            {'label': "👕 เสื้อผ้า", 'text': "เสื้อผ้า"},
+            {'label': "👟 รองเท้า", 'text': "รองเท้า"},
+            {'label': "🎒 กระเป๋า", 'text': "กระเป๋า"},
+            {'label': "💻 คอมพิวเตอร์", 'text': "คอมพิวเตอร์"},
+            {'label': "🏠 ของใช้บ้าน", 'text': "ของใช้บ้าน"},
+            {'label': "🔥 ขายดี", 'text': "ขายดี"},
+            {'label': "💰 โปรโมชั่น", 'text': "โปรโมชั่น"}
+        ]))
         
         self.line_bot_api.reply_message(
             ReplyMessageRequest(
@@ -1986,17 +2086,17 @@ class AffiliateLineHandler:
 
 หรือพิมพ์ 'หมวดหมู่' เพื่อดูสินค้าทั้งหมด"""
         
-        # Quick Reply สำหรับหมวดหมู่ที่มีสินค้า
-        quick_replies = QuickReply(items=[
-            QuickReplyItem(action=MessageAction(label="🐾 สัตว์เลี้ยง", text="สัตว์เลี้ยง")),
-            QuickReplyItem(action=MessageAction(label="💄 ความงาม", text="ความงาม")),
-            QuickReplyItem(action=MessageAction(label="👕 แฟชั่น", text="แฟชั่น")),
-            QuickReplyItem(action=MessageAction(label="💻 เทคโนโลยี", text="เทคโนโลยี")),
-            QuickReplyItem(action=MessageAction(label="🏠 ของใช้บ้าน", text="ของใช้บ้าน")),
-            QuickReplyItem(action=MessageAction(label="📋 หมวดหมู่", text="หมวดหมู่")),
-            QuickReplyItem(action=MessageAction(label="🔥 ขายดี", text="ขายดี")),
-            QuickReplyItem(action=MessageAction(label="🏠 หน้าหลัก", text="หน้าหลัก"))
-        ])
+        # Quick Reply: คำใกล้เคียงที่มีสินค้าจริง แล้วเติมด้วยหมวดหมู่ที่มีสินค้า
+        quick_replies = QuickReply(items=self._suggestion_quick_reply_items(self.suggestions.related(search_term, 3), [
+            {'label': "🐾 สัตว์เลี้ยง", 'text': "สัตว์เลี้ยง"},
+            {'label': "💄 ความงาม", 'text': "ความงาม"},
+            {'label': "👕 แฟชั่น", 'text': "แฟชั่น"},
+            {'label': "💻 เทคโนโลยี", 'text': "เทคโนโลยี"},
+            {'label': "🏠 ของใช้บ้าน", 'text': "ของใช้บ้าน"},
+            {'label': "📋 หมวดหมู่", 'text': "หมวดหมู่"},
+            {'label': "🔥 ขายดี", 'text': "ขายดี"},
+            {'label': "🏠 หน้าหลัก", 'text': "หน้าหลัก"}
+        ]))
         
         self.line_bot_api.reply_message(
             ReplyMessageRequest(
@@ -2020,7 +2120,7 @@ class AffiliateLineHandler:
                 self._show_smart_no_results_suggestion(event, search_query, detected_categories)
                 
         except Exception as e:
-            print(f"Error in smart category search: {e}")
+            logger.error(f"Error in smart category search: {e}")
             # Fallback ไปแสดงข้อความแนะนำแบบเดิม
             if "มือถือ" in search_query or "โทรศัพท์" in search_query:
                 self._handle_mobile_search_suggestion(event, search_query)
@@ -2070,6 +2170,9 @@ class AffiliateLineHandler:
     def _show_smart_no_results_suggestion(self, event, query: str, detected_categories: List[str]):
         """แสดงข้อแนะนำอัจฉริยะเมื่อไม่พบสินค้า"""
         suggestions = self.category_manager.get_smart_search_suggestions(query)
+        # คำใกล้เคียงที่มีสินค้าจริงจาก suggestion index มาก่อนคำแนะนำทั่วไป
+        related = self.suggestions.related(query, 3)
+        suggestions['alternative_searches'] = list(dict.fromkeys(related + suggestions['alternative_searches']))
         
         # สร้างข้อความแนะนำ
         suggestion_text = f"🔍 ไม่พบสินค้า '{query}'\\n\\n"
@@ -2094,10 +2197,9 @@ class AffiliateLineHandler:
         quick_reply_items = self.category_manager.get_category_based_quick_reply(
             suggestions['related_categories'][:5]
         )
-        quick_replies = QuickReply(items=[
-            QuickReplyItem(action=MessageAction(label=item['label'], text=item['text']))
-            for item in quick_reply_items
-        ])
+        quick_replies = QuickReply(items=self._suggestion_quick_reply_items(
+            related, quick_reply_items, limit=len(related) + len(quick_reply_items)
+        ))
         
         self.line_bot_api.reply_message(
             ReplyMessageRequest(
@@ -2137,7 +2239,7 @@ class AffiliateLineHandler:
                 self._show_search_guide(event)
                 
         except Exception as e:
-            print(f"Error showing personalized recommendations: {e}")
+            logger.error(f"Error showing personalized recommendations: {e}")
             self._show_search_guide(event)
     
     def _show_trending_products(self, event):
@@ -2178,7 +2280,7 @@ class AffiliateLineHandler:
                 self._show_search_guide(event)
                 
         except Exception as e:
-            print(f"Error showing trending products: {e}")
+            logger.error(f"Error showing trending products: {e}")
             self._show_search_guide(event)
     
     def _create_dynamic_quick_reply(self, products: List[Dict]) -> List[QuickReplyItem]:
@@ -2262,7 +2364,7 @@ class AffiliateLineHandler:
             )
             
         except Exception as e:
-            print(f"[ERROR] Show bestsellers error: {e}")
+            logger.error(f"Show bestsellers error: {e}")
             self._reply_text(event, "❌ เกิดข้อผิดพลาดในการแสดงสินค้าขายดี")
     
     def _show_promotions(self, event):
@@ -2410,5 +2512,8 @@ class AffiliateLineHandler:
         error_msg = "⚠️ เกิดข้อผิดพลาดภายในระบบ กรุณาลองใหม่อีกครั้ง หรือติดต่อผู้ดูแลระบบ"
         self._reply_text(event, error_msg)
 
+# ให้ trace ระบุได้ว่าการเรียก backend แต่ละครั้งมาจาก handler ใด (_show_*/_handle_*)
+tracer.trace_handlers(AffiliateLineHandler)
+
 # สร้าง instance สำหรับใช้งาน
-affiliate_handler = AffiliateLineHandler()
\ No newline at end of file
+affiliate_handler = AffiliateLineHandler()
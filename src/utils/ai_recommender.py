@@ -6,18 +6,23 @@
 import json
 import re
 from typing import Dict, List, Optional, Tuple
-from collections import defaultdict, Counter
+from collections import defaultdict
 from datetime import datetime, timedelta
 import logging
 
-from .supabase_database import SupabaseDatabase
+from .product_store import create_product_store
+from .user_profile_store import UserProfileStore
+from .trending_service import trending_service
+from .fanout import fanout
 
 class AIProductRecommender:
     """คลาสสำหรับระบบแนะนำสินค้าด้วย AI"""
     
     def __init__(self):
-        self.db = SupabaseDatabase()
+        self.db = create_product_store()
         self.logger = logging.getLogger(__name__)
+        self.trending = trending_service
+        self.trending.bind_database(self.db)
         
         # คำสำคัญสำหรับการจัดกลุ่มความสนใจ
         self.interest_keywords = {
@@ -30,9 +35,8 @@ class AIProductRecommender:
             'food': ['อาหาร', 'ขนม', 'เครื่องดื่ม', 'อาหารเสริม', 'วิตามิน', 'snack', 'supplement']
         }
         
-        # เก็บประวัติการสื่อสารของผู้ใช้
-        self.user_history = defaultdict(list)
-        self.user_interests = defaultdict(Counter)
+        # โปรไฟล์ความสนใจของผู้ใช้แบบ vector (decay ตามเวลา)
+        self.user_profiles = UserProfileStore(self.interest_keywords.keys())
         
     def extract_interests_from_text(self, text: str) -> List[str]:
         """สกัดความสนใจจากข้อความที่ผู้ใช้พิมพ์"""
@@ -51,11 +55,9 @@ class AIProductRecommender:
         """อัปเดตความสนใจของผู้ใช้จากการโต้ตอบ"""
         try:
             # สกัดความสนใจจากข้อความ
-            interests = self.extract_interests_from_text(message)
-            
-            # อัปเดตคะแนนความสนใจ
-            for interest in interests:
-                self.user_interests[user_id][interest] += 1
+            weights = defaultdict(float)
+            for interest in self.extract_interests_from_text(message):
+                weights[interest] += 1
                 
             # วิเคราะห์จากผลการค้นหา
             if search_results:
@@ -64,29 +66,19 @@ class AIProductRecommender:
                         f"{product.get('category', '')} {product.get('product_name', '')}"
                     )
                     for interest in category_interests:
-                        self.user_interests[user_id][interest] += 0.5  # น้ำหนักน้อยกว่าการพิมพ์โดยตรง
-            
-            # บันทึกประวัติ
-            self.user_history[user_id].append({
-                'timestamp': datetime.now().isoformat(),
-                'message': message,
-                'interests': interests,
-                'search_count': len(search_results) if search_results else 0
-            })
+                        weights[interest] += 0.5  # น้ำหนักน้อยกว่าการพิมพ์โดยตรง
             
-            # จำกัดประวัติไม่เกิน 50 รายการ
-            if len(self.user_history[user_id]) > 50:
-                self.user_history[user_id] = self.user_history[user_id][-50:]
+            self.user_profiles.record(
+                user_id, weights,
+                result_count=len(search_results) if search_results else 0
+            )
                 
         except Exception as e:
             self.logger.error(f"Error updating user interests: {e}")
     
-    def get_user_top_interests(self, user_id: str, limit: int = 3) -> List[Tuple[str, int]]:
+    def get_user_top_interests(self, user_id: str, limit: int = 3) -> List[Tuple[str, float]]:
         """ดึงความสนใจอันดับต้น ๆ ของผู้ใช้"""
-        if user_id not in self.user_interests:
-            return []
-        
-        return self.user_interests[user_id].most_common(limit)
+        return self.user_profiles.top_interests(user_id, limit)
     
     def recommend_by_interest(self, user_id: str, limit: int = 5) -> List[Dict]:
         """แนะนำสินค้าตามความสนใจของผู้ใช้"""
@@ -173,27 +165,15 @@ class AIProductRecommender:
     def recommend_trending_products(self, limit: int = 5) -> List[Dict]:
         """แนะนำสินค้าที่กำลังมาแรง"""
         try:
-            # ดึงสินค้าที่มียอดขายดีและคะแนนสูง
-            trending = self.db.get_top_products_by_metric('sold_count', limit * 2)
+            # leaderboard เรียงตาม trending_score ไว้แล้ว
+            products = self.trending.top(limit)
             
-            # คำนวณคะแนน trending (ยอดขาย + คะแนน + รีวิว)
-            scored_products = []
-            for product in trending:
+            for product in products:
                 sold_count = product.get('sold_count', 0)
-                rating = product.get('rating', 0)
-                review_count = product.get('review_count', 0)
-                
-                # สูตรคำนวณความนิยม
-                trending_score = (sold_count * 0.5) + (rating * 20 * 0.3) + (review_count * 0.2)
-                
-                product['recommendation_score'] = trending_score
+                product['recommendation_score'] = product['trending_score']
                 product['recommendation_reason'] = f"สินค้าขายดี (ขายไป {sold_count:,} ชิ้น)"
-                scored_products.append(product)
-            
-            # เรียงตามคะแนน trending
-            sorted_products = sorted(scored_products, key=lambda x: x.get('recommendation_score', 0), reverse=True)
             
-            return sorted_products[:limit]
+            return products
             
         except Exception as e:
             self.logger.error(f"Error in recommend_trending_products: {e}")
@@ -213,16 +193,15 @@ class AIProductRecommender:
                 'total_score': 0
             }
             
-            # 1. แนะนำตามความสนใจส่วนตัว (40%)
-            personal_recs = self.recommend_by_interest(user_id, limit=4)
+            # 1. ตามความสนใจส่วนตัว (40%) 2. สินค้าที่กำลังมาแรง (40%) 3. หมวดหมู่ยอดนิยม (20%) - เรียกพร้อมกัน
+            personal_recs, trending_recs, categories_recs = fanout.run(
+                'personalized_recommendations',
+                lambda: self.recommend_by_interest(user_id, limit=4),
+                lambda: self.recommend_trending_products(limit=3),
+                lambda: self._get_popular_categories_products(limit=2)
+            )
             recommendations['personal'] = personal_recs
-            
-            # 2. แนะนำสินค้าที่กำลังมาแรง (40%)
-            trending_recs = self.recommend_trending_products(limit=3)
             recommendations['trending'] = trending_recs
-            
-            # 3. แนะนำตามหมวดหมู่ยอดนิยม (20%)
-            categories_recs = self._get_popular_categories_products(limit=2)
             recommendations['categories'] = categories_recs
             
             # คำนวณคะแนนรวม
@@ -278,40 +257,16 @@ class AIProductRecommender:
     def get_user_profile_summary(self, user_id: str) -> Dict:
         """สร้างสรุปโปรไฟล์ผู้ใช้"""
         try:
-            profile = {
+            activity = self.user_profiles.summary(user_id)
+            
+            return {
                 'user_id': user_id,
                 'top_interests': self.get_user_top_interests(user_id, limit=5),
-                'interaction_count': len(self.user_history.get(user_id, [])),
-                'last_interaction': None,
-                'preferences': {}
+                'interaction_count': activity['interaction_count'],
+                'last_interaction': activity['last_activity'],
+                'preferences': activity['preferences']
             }
             
-            # ข้อมูลการโต้ตอบล่าสุด
-            user_interactions = self.user_history.get(user_id, [])
-            if user_interactions:
-                profile['last_interaction'] = user_interactions[-1]['timestamp']
-                
-                # วิเคราะห์รูปแบบการใช้งาน
-                recent_interactions = user_interactions[-10:]  # 10 ครั้งล่าสุด
-                
-                search_counts = [interaction.get('search_count', 0) for interaction in recent_interactions if interaction.get('search_count')]
-                if search_counts:
-                    profile['preferences']['avg_search_results'] = sum(search_counts) / len(search_counts)
-                
-                # ช่วงเวลาที่มักใช้งาน
-                hours = []
-                for interaction in recent_interactions:
-                    try:
-                        dt = datetime.fromisoformat(interaction['timestamp'].replace('Z', '+00:00'))
-                        hours.append(dt.hour)
-                    except:
-                        continue
-                
-                if hours:
-                    profile['preferences']['preferred_hours'] = Counter(hours).most_common(3)
-            
-            return profile
-            
         except Exception as e:
             self.logger.error(f"Error in get_user_profile_summary: {e}")
             return {'user_id': user_id, 'error': str(e)}
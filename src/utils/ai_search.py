@@ -16,6 +16,7 @@ except ImportError:
     OPENAI_AVAILABLE = False
 
 from ..config import config
+from .query_understanding import QueryUnderstanding, extract_price_range
 
 class AISearchEngine:
     """คลาสสำหรับการค้นหาสินค้าแบบ AI"""
@@ -60,6 +61,9 @@ class AISearchEngine:
             'อาหาร': ['food', 'snack', 'beverage', 'organic']
         }
         
+        # แปลงคำค้นหาเป็นโครงสร้าง (regex คอมไพล์ไว้ล่วงหน้า + LRU cache)
+        self.query_parser = QueryUnderstanding(self.synonyms, self.brands, self.categories)
+        
         # ตั้งค่า OpenAI client
         if OPENAI_AVAILABLE and config.OPENAI_API_KEY:
             try:
@@ -95,86 +99,18 @@ class AISearchEngine:
             self.logger.error(f"Enhanced search failed: {e}")
             return products[:limit]  # Fallback to original list
     
+    def score_products(self, query: str, products: List[Dict]) -> List[float]:
+        """คะแนนความเกี่ยวข้องของสินค้าแต่ละรายการ (ใช้เป็น feature ของ re-ranker ใน search pipeline)"""
+        query_processed = self._preprocess_query(query)
+        return [self._calculate_product_relevance_score(query_processed, product) for product in products]
+    
     def _preprocess_query(self, query: str) -> Dict:
-        """ประมวลผลคำค้นหาเบื้องต้น"""
-        query_lower = query.lower().strip()
-        
-        # ขยายคำค้นหาด้วย synonyms
-        expanded_terms = [query_lower]
-        
-        for thai_word, synonyms in self.synonyms.items():
-            if thai_word in query_lower:
-                expanded_terms.extend(synonyms)
-        
-        # ตรวจสอบแบรนด์
-        detected_brands = []
-        for brand, keywords in self.brands.items():
-            for keyword in keywords:
-                if keyword.lower() in query_lower:
-                    detected_brands.append(brand)
-                    expanded_terms.extend(keywords)
-                    break
-        
-        # ตรวจสอบหมวดหมู่
-        detected_categories = []
-        for category, keywords in self.categories.items():
-            if category in query_lower:
-                detected_categories.append(category)
-                expanded_terms.extend(keywords)
-            else:
-                for keyword in keywords:
-                    if keyword.lower() in query_lower:
-                        detected_categories.append(category)
-                        expanded_terms.extend([category])
-                        break
-        
-        # แยกคำด้วยช่องว่าง
-        words = query_lower.split()
-        
-        # ตรวจสอบช่วงราคา
-        price_range = self._extract_price_range(query_lower)
-        
-        return {
-            'original': query_lower,
-            'expanded_terms': list(set(expanded_terms)),  # ลบคำซ้ำ
-            'words': words,
-            'brands': detected_brands,
-            'categories': detected_categories,
-            'price_range': price_range,
-            'has_numbers': bool(re.search(r'\d', query_lower))
-        }
+        """ประมวลผลคำค้นหาเบื้องต้น (ผลถูก cache ใน query_parser - ห้ามแก้ไข dict ที่ได้)"""
+        return self.query_parser.parse(query)
     
     def _extract_price_range(self, query: str) -> Optional[Dict]:
         """แยกช่วงราคาจากคำค้นหา"""
-        # รูปแบบต่างๆ ของการระบุราคา
-        patterns = [
-            (r'ราคา.*?(\d+).*?(\d+)', 'range'),
-            (r'ไม่เกิน.*?(\d+)', 'max'),
-            (r'มากกว่า.*?(\d+)', 'min'),
-            (r'ประมาณ.*?(\d+)', 'around'),
-            (r'(\d+).*?บาท', 'around')
-        ]
-        
-        for pattern, price_type in patterns:
-            match = re.search(pattern, query)
-            if match:
-                if price_type == 'range':
-                    return {
-                        'min': int(match.group(1)),
-                        'max': int(match.group(2))
-                    }
-                elif price_type == 'max':
-                    return {'max': int(match.group(1))}
-                elif price_type == 'min':
-                    return {'min': int(match.group(1))}
-                elif price_type == 'around':
-                    price = int(match.group(1))
-                    return {
-                        'min': price * 0.8,
-                        'max': price * 1.2
-                    }
-        
-        return None
+        return extract_price_range(query)[0]
     
     def _calculate_product_relevance_score(self, query_info: Dict, product: Dict) -> float:
         """คำนวณคะแนนความเกี่ยวข้องสำหรับสินค้า"""
@@ -289,32 +225,27 @@ class AISearchEngine:
     
     def suggest_product_alternatives(self, query: str, products: List[Dict], limit: int = 5) -> List[str]:
         """แนะนำคำค้นหาทางเลือกสำหรับสินค้า"""
-        suggestions = set()
+        from .suggestion_index import suggestion_index
+        
+        # คำที่ขึ้นต้นเหมือนคำค้นหา เรียงตามความนิยม (prefix trie แทนการเทียบทุกคำในชื่อสินค้า)
+        suggestions = suggestion_index.related(query, limit)
         query_lower = query.lower()
         
         # หาคำที่คล้ายกันจาก synonyms
         for thai_word, synonyms in self.synonyms.items():
             if thai_word in query_lower:
-                suggestions.update(synonyms[:2])  # เอาแค่ 2 คำแรก
+                suggestions.extend(synonyms[:2])  # เอาแค่ 2 คำแรก
         
-        # หาคำที่คล้ายกันจากข้อมูลสินค้า
+        # หมวดหมู่ที่เกี่ยวข้อง
         for product in products[:20]:  # ตรวจแค่ 20 รายการแรก
-            # คำในชื่อสินค้าที่คล้ายกัน
-            product_words = product.get('product_name', '').split()
-            for word in product_words:
-                if len(word) > 2 and SequenceMatcher(None, query_lower, word.lower()).ratio() > 0.6:
-                    suggestions.add(word)
-            
-            # หมวดหมู่ที่เกี่ยวข้อง
             category = product.get('category', '')
             if category and len(category) > 1:
-                suggestions.add(category)
+                suggestions.append(category)
         
         # เพิ่มหมวดหมู่ยอดนิยม
-        popular_categories = ['อิเล็กทรอนิกส์', 'แฟชั่น', 'ความงาม', 'สุขภาพ']
-        suggestions.update(popular_categories)
+        suggestions.extend(['อิเล็กทรอนิกส์', 'แฟชั่น', 'ความงาม', 'สุขภาพ'])
         
-        return list(suggestions)[:limit]
+        return list(dict.fromkeys(suggestions))[:limit]
     
     def get_search_insights(self, query: str, products: List[Dict]) -> Dict:
         """วิเคราะห์ผลการค้นหาสินค้า"""
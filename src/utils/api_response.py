@@ -0,0 +1,181 @@
+"""
+📁 src/utils/api_response.py
+🎯 serialize JSON ให้เร็วขึ้น (orjson ถ้ามี ไม่มีก็ใช้ json มาตรฐาน) + บีบอัด response (brotli/gzip) + เลือกฟิลด์
+ข้อความไทยถูกเขียนเป็น UTF-8 ตรง ๆ แทน \\uXXXX จึงเล็กลงตั้งแต่ก่อนบีบอัด
+"""
+
+import gzip
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from flask import Response, request
+from flask.json.provider import DefaultJSONProvider
+
+from ..config import config
+from .metrics import metrics
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# จำนวนไบต์ของ response ก่อนบีบอัด (raw) และที่ส่งจริง (sent) แยกตาม encoding
+response_bytes = metrics.counter('http_response_bytes_total', 'HTTP response bytes by encoding, before/after compression')
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider ของ Flask ที่ใช้ orjson (ค่าที่ orjson ไม่รองรับ เช่น int เกิน 64 บิต ใช้ json มาตรฐานแทน)
+
+    คงพฤติกรรมเดิมของ jsonify: เรียง key, ค่า date/Decimal/UUID แปลงผ่าน default, จัดย่อหน้าในโหมด debug
+    """
+
+    ensure_ascii = False
+
+    def _options(self, kwargs: Dict) -> Optional[int]:
+        """ตัวเลือก orjson ที่ตรงกับ kwargs (None = ต้องใช้ json มาตรฐาน)"""
+        if not ORJSON_AVAILABLE or set(kwargs) - {'sort_keys', 'indent', 'separators', 'ensure_ascii', 'default'}:
+            return None
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME  # วันที่ใช้รูปแบบเดียวกับ Flask
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, **kwargs) -> bytes:
+        option = self._options(kwargs)
+        if option is not None:
+            try:
+                return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option)
+            except (TypeError, orjson.JSONEncodeError):
+                pass
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def response(self, *args, **kwargs) -> Response:
+        """jsonify: serialize เป็น bytes ครั้งเดียว (ไม่ผ่าน str)"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = self.dumps_bytes(obj, **({'indent': 2} if indent else {'separators': (',', ':')}))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def dumps_bytes(obj) -> bytes:
+    """JSON แบบ UTF-8 ไม่เรียง key สำหรับใช้นอก jsonify (เช่น แต่ละบรรทัดของ NDJSON stream)"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except (TypeError, orjson.JSONEncodeError):
+            pass
+    return json.dumps(obj, ensure_ascii=False, default=str, separators=(',', ':')).encode('utf-8')
+
+
+# ===== เลือกฟิลด์ (?fields=) =====
+
+def parse_fields(value: Optional[str]) -> List[str]:
+    """'product_code, price' -> ['product_code', 'price'] (ไม่ซ้ำ ตามลำดับที่ขอ)"""
+    return list(dict.fromkeys(name.strip() for name in (value or '').split(',') if name.strip()))
+
+
+def select_fields(rows: Iterable[Dict], fields: List[str]) -> List[Dict]:
+    """เก็บเฉพาะฟิลด์ที่ขอ (ไม่ระบุ = ทุกฟิลด์, ฟิลด์ที่ไม่มีในแถวถูกข้าม)"""
+    if not fields:
+        return list(rows)
+    return [{name: row[name] for name in fields if name in row} for row in rows]
+
+
+# ===== การบีบอัด =====
+
+class ResponseCompressor:
+    """บีบอัด response ที่ใหญ่กว่า COMPRESS_MIN_BYTES ตาม Accept-Encoding (br ก่อน gzip)
+
+    response ที่มี ETag แบบ strong (จาก response cache) เก็บผลการบีบอัดไว้ จึงบีบอัดครั้งเดียวต่อเนื้อหา
+    ETag ถูกเปลี่ยนเป็นแบบ weak เพราะ byte ต่างจากต้นฉบับ (If-None-Match เทียบแบบ weak จึงยังได้ 304)
+    """
+
+    def __init__(self, min_bytes: int = None, max_entries: int = None):
+        self.min_bytes = config.COMPRESS_MIN_BYTES if min_bytes is None else min_bytes
+        self.max_entries = max_entries or config.HTTP_CACHE_SIZE
+        self._lock = threading.Lock()
+        self._compressed: OrderedDict = OrderedDict()  # (etag, encoding) -> bytes
+
+    @staticmethod
+    def choose_encoding(accept_encodings) -> Optional[str]:
+        if BROTLI_AVAILABLE and accept_encodings['br']:
+            return 'br'
+        if accept_encodings['gzip']:
+            return 'gzip'
+        return None
+
+    @staticmethod
+    def compress(data: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(data, quality=config.BROTLI_QUALITY)
+        return gzip.compress(data, compresslevel=config.GZIP_LEVEL)
+
+    def _compress_cached(self, data: bytes, encoding: str, etag: Optional[str]) -> bytes:
+        if not etag:
+            return self.compress(data, encoding)
+        key = (etag, encoding)
+        with self._lock:
+            compressed = self._compressed.get(key)
+            if compressed is not None:
+                self._compressed.move_to_end(key)
+                return compressed
+        compressed = self.compress(data, encoding)
+        with self._lock:
+            self._compressed[key] = compressed
+            while len(self._compressed) > self.max_entries:
+                self._compressed.popitem(last=False)
+        return compressed
+
+    def __call__(self, response: Response) -> Response:
+        """after_request hook - คืน response เดิมถ้าไม่ต้องบีบอัด"""
+        if (not config.COMPRESS_ENABLED or response.direct_passthrough or response.is_streamed
+                or response.status_code != 200 or 'Content-Encoding' in response.headers
+                or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        encoding = self.choose_encoding(request.accept_encodings) if len(data) >= self.min_bytes else None
+        response_bytes.inc(len(data), encoding=encoding or 'identity', stage='raw')
+        if encoding is None:
+            response_bytes.inc(len(data), encoding='identity', stage='sent')
+            return response
+
+        try:
+            etag, weak = response.get_etag()
+            compressed = self._compress_cached(data, encoding, None if weak else etag)
+        except Exception as e:
+            logger.error(f"Response compression failed ({encoding}): {e}")
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            response.set_etag(etag, weak=True)
+        response_bytes.inc(len(compressed), encoding=encoding, stage='sent')
+        return response
+
+# สร้าง instance สำหรับใช้งาน
+response_compressor = ResponseCompressor()
@@ -0,0 +1,122 @@
+"""
+📁 src/utils/batch_generator.py
+🎯 สร้างรีวิว/คำโปรโมตสินค้าหลายรายการพร้อมกัน (batch) สำหรับ /api/review/batch
+"""
+
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Iterator, List, Optional
+
+from ..config import config
+from .review_generator import review_generator
+from .promotion_generator import PromotionGenerator
+
+REVIEW_STYLES = ['short', 'medium', 'long']
+PROMOTION_STYLES = ['casual', 'enthusiastic', 'informative']
+
+# thread pool ของงาน AI ใช้ร่วมกันทั้ง process - AI_MAX_CONCURRENCY จำกัดคำขอพร้อมกันรวมทุก batch
+_ai_executor: Optional[ThreadPoolExecutor] = None
+_ai_executor_lock = threading.Lock()
+
+
+def _ai_pool() -> ThreadPoolExecutor:
+    global _ai_executor
+    if _ai_executor is None:
+        with _ai_executor_lock:
+            if _ai_executor is None:
+                _ai_executor = ThreadPoolExecutor(max_workers=max(1, config.AI_MAX_CONCURRENCY),
+                                                  thread_name_prefix="ai-review")
+    return _ai_executor
+
+
+class BatchContentGenerator:
+    """สร้างเนื้อหาหลายสินค้า × หลายสไตล์
+
+    - เทมเพลตสร้างใน loop เดียวทันที
+    - งาน AI ส่งขนานกันผ่าน thread pool ที่ใช้ร่วมกันทั้ง process (จำกัดจำนวนพร้อมกัน + timeout)
+      ถ้า AI ล้มเหลวหรือเกินเวลา จะใช้เทมเพลตแทน
+    - ผลลัพธ์ถูก yield ออกทีละรายการทันทีที่พร้อม (เหมาะกับการ stream เป็น NDJSON)
+    """
+
+    def __init__(self, reviews=None, promotions=None, timeout: float = None):
+        self.logger = logging.getLogger(__name__)
+        self.reviews = reviews or review_generator
+        self.promotions = promotions or PromotionGenerator()
+        self.timeout = timeout or config.AI_REQUEST_TIMEOUT
+
+    def _result(self, product: Dict, kind: str, style: str, source: str, text: str) -> Dict:
+        return {
+            'product_code': product.get('product_code'),
+            'type': kind,
+            'style': style,
+            'source': source,
+            'text': text
+        }
+
+    def generate(self, products: List[Dict], styles: Optional[List[str]] = None,
+                 kind: str = 'review', use_ai: bool = False) -> Iterator[Dict]:
+        """สร้างเนื้อหาให้ทุกสินค้าในทุกสไตล์ที่ระบุ"""
+        if kind == 'promotion':
+            styles = [s for s in (styles or PROMOTION_STYLES) if s in PROMOTION_STYLES] or PROMOTION_STYLES
+            for product in products:
+                for style in styles:
+                    yield self._result(product, kind, style, 'template',
+                                       self.promotions.generate_promotion(product, style))
+            return
+
+        styles = [s for s in (styles or ['medium']) if s in REVIEW_STYLES] or ['medium']
+
+        if not (use_ai and self.reviews.can_use_ai()):
+            for product in products:
+                for style in styles:
+                    yield self._result(product, kind, style, 'template',
+                                       self.reviews.generate_review(product, style))
+            return
+
+        yield from self._generate_ai_batch(products, styles, kind)
+
+    def _generate_ai_batch(self, products: List[Dict], styles: List[str], kind: str) -> Iterator[Dict]:
+        """ส่งงาน AI แบบขนานและ fallback เป็นเทมเพลตเมื่อผิดพลาด/หมดเวลา"""
+        # แต่ละคำขอมี timeout ของตัวเอง และทั้ง batch มีกำหนดเวลาตามจำนวนรอบของ pool
+        rounds = math.ceil(len(products) * len(styles) / max(1, config.AI_MAX_CONCURRENCY))
+        deadline = time.monotonic() + self.timeout * max(rounds, 1)
+        executor = _ai_pool()
+        pending = {}
+
+        try:
+            for product in products:
+                for style in styles:
+                    future = executor.submit(self.reviews.request_ai_review, product, style, self.timeout)
+                    pending[future] = (product, style)
+
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    product, style = pending.pop(future)
+                    try:
+                        yield self._result(product, kind, style, 'ai', future.result())
+                    except Exception as e:
+                        self.logger.warning(f"AI review failed for {product.get('product_code')}: {e}")
+                        yield self._result(product, kind, style, 'template_fallback',
+                                           self.reviews.generate_review(product, style))
+
+            # งานที่เกินเวลา - ใช้เทมเพลตแทน
+            for future, (product, style) in list(pending.items()):
+                future.cancel()
+                del pending[future]
+                yield self._result(product, kind, style, 'template_fallback',
+                                   self.reviews.generate_review(product, style))
+        finally:
+            # ยกเลิกงานที่ยังรอคิวอยู่ (เช่น client ตัดการเชื่อมต่อกลาง stream) ไม่ให้กินโควตาของ batch อื่น
+            for future in pending:
+                future.cancel()
+
+# สร้าง instance สำหรับใช้งาน
+batch_generator = BatchContentGenerator()
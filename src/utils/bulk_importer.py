@@ -10,13 +10,13 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import logging
 
-from .supabase_database import SupabaseDatabase
+from .product_store import create_product_store
 
 class BulkProductImporter:
     """คลาสสำหรับนำเข้าสินค้าจำนวนมาก"""
     
     def __init__(self):
-        self.db = SupabaseDatabase()
+        self.db = create_product_store()
         self.logger = logging.getLogger(__name__)
         
         # คอลัมน์ที่จำเป็นสำหรับการนำเข้า
@@ -38,6 +38,9 @@ class BulkProductImporter:
             'original_price',
             'discount_percentage',
             'affiliate_link',
+            'product_link',
+            'offer_link',
+            'shop_name',
             'image_url',
             'brand',
             'rating',
@@ -136,6 +139,7 @@ class BulkProductImporter:
         
         # สร้างรหัสใหม่สำหรับรายการที่ไม่มีรหัส
         empty_codes = result_df['product_code'].isna() | (result_df['product_code'] == '')
+        next_numbers: Dict[str, int] = {}  # prefix -> ลำดับถัดไป (ค้นฐานข้อมูลครั้งเดียวต่อ prefix ไม่ให้รหัสในไฟล์ซ้ำกันเอง)
         
         for idx in result_df[empty_codes].index:
             # สร้างรหัสจากหมวดหมู่และลำดับ
@@ -145,8 +149,10 @@ class BulkProductImporter:
                 category_prefix = f"{category_prefix}{'X' * (3 - len(category_prefix))}"
             
             # หาลำดับถัดไป
-            existing_codes = self.db.get_product_codes_by_prefix(category_prefix)
-            next_number = len(existing_codes) + 1
+            if category_prefix not in next_numbers:
+                next_numbers[category_prefix] = len(self.db.get_product_codes_by_prefix(category_prefix)) + 1
+            next_number = next_numbers[category_prefix]
+            next_numbers[category_prefix] += 1
             
             result_df.loc[idx, 'product_code'] = f"{category_prefix}{next_number:04d}"
         
@@ -268,6 +274,11 @@ class BulkProductImporter:
         if 'commission_rate' not in product_data:
             product_data['commission_rate'] = 5.0
         
+        # คอลัมน์ที่ตาราง products ต้องมี (ใช้ affiliate_link แทนลิงก์ที่ไม่ได้ระบุ เหมือน AdminCSVImporter)
+        product_data.setdefault('shop_name', product_data.get('brand', 'ไม่ระบุ'))
+        product_data.setdefault('product_link', product_data['affiliate_link'])
+        product_data.setdefault('offer_link', product_data['affiliate_link'])
+        
         # เพิ่มวันที่
         product_data['created_at'] = datetime.now().isoformat()
         product_data['updated_at'] = datetime.now().isoformat()
@@ -0,0 +1,111 @@
+"""
+📁 src/utils/catalog_export.py
+🎯 export แคตตาล็อกทั้งหมดเป็น NDJSON หรือ CSV แบบ stream (/api/products/export)
+อ่านทีละหน้าด้วย keyset บน product_code แล้วเขียนหน้าละหนึ่ง chunk จึงใช้หน่วยความจำคงที่ไม่ว่าแคตตาล็อกใหญ่แค่ไหน
+updated_since กรองเฉพาะสินค้าที่แก้ไขตั้งแต่เวลานั้น สำหรับการซิงก์ต่อเนื่อง (incremental)
+"""
+
+import csv
+import io
+import logging
+from typing import Dict, Iterator, List, Optional
+
+from ..config import config
+from .api_response import dumps_bytes, select_fields
+from .metrics import metrics
+from .product_table import PRODUCT_COLUMNS
+
+# จำนวนสินค้าที่ export แยกตามรูปแบบ
+exported_products = metrics.counter('catalog_export_products_total', 'Products written by catalog export by format')
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8'
+}
+
+
+class ExportError(Exception):
+    """อ่านหน้าถัดไปจากฐานข้อมูลไม่สำเร็จระหว่าง export"""
+
+
+class CatalogExport:
+    """export หนึ่งครั้ง: เรียก first_page() ก่อนเริ่มส่ง response (error ตอนนี้ยังตอบเป็น status ได้)
+    แล้ววน chunks() ใน generator ของ response
+
+    error หลังเริ่มส่งแล้วทำให้ stream ถูกตัด (client เห็นการส่งไม่ครบ) แทนการส่งไฟล์ที่ขาดหายแบบเงียบ ๆ
+    """
+
+    def __init__(self, db, export_format: str = 'ndjson', fields: List[str] = None,
+                 updated_since: str = None, page_size: int = None):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        self.logger = logging.getLogger(__name__)
+        self.db = db
+        self.format = export_format
+        self.fields = fields or []
+        self.updated_since = updated_since
+        self.page_size = page_size or config.EXPORT_PAGE_SIZE
+        self.count = 0
+        self.max_updated_at = ''
+        self._first: Optional[List[Dict]] = None
+
+    @property
+    def content_type(self) -> str:
+        return EXPORT_FORMATS[self.format]
+
+    def _fetch(self, after: Optional[str]) -> List[Dict]:
+        page = self.db.get_products_page(after, self.page_size, self.updated_since)
+        if page is None:
+            raise ExportError(f"Failed to read products after {after!r}")
+        return page
+
+    def first_page(self) -> List[Dict]:
+        if self._first is None:
+            self._first = self._fetch(None)
+        return self._first
+
+    def pages(self) -> Iterator[List[Dict]]:
+        """ทุกหน้าเรียงตาม product_code (หน้าสุดท้ายสั้นกว่า page_size)"""
+        page = self.first_page()
+        while page:
+            yield page
+            if len(page) < self.page_size:
+                return
+            page = self._fetch(page[-1]['product_code'])
+
+    def chunks(self) -> Iterator[bytes]:
+        """ข้อมูลของ response หน้าละหนึ่ง chunk"""
+        try:
+            writer = self._ndjson_chunks() if self.format == 'ndjson' else self._csv_chunks()
+            yield from writer
+        except Exception as e:
+            self.logger.error(f"Catalog export failed after {self.count} products: {e}")
+            raise
+        self.logger.info(f"Catalog export ({self.format}): {self.count} products"
+                         + (f" updated since {self.updated_since}" if self.updated_since else ''))
+
+    def _track(self, page: List[Dict]) -> List[Dict]:
+        self.count += len(page)
+        self.max_updated_at = max([self.max_updated_at] + [str(row.get('updated_at') or '') for row in page])
+        exported_products.inc(len(page), format=self.format)
+        return select_fields(page, self.fields)
+
+    def _ndjson_chunks(self) -> Iterator[bytes]:
+        for page in self.pages():
+            yield b''.join(dumps_bytes(row) + b'\n' for row in self._track(page))
+        # บรรทัดสุดท้าย (เหมือน /api/review/batch): max_updated_at ใช้เป็น updated_since ของรอบถัดไปได้
+        yield dumps_bytes({'done': True, 'count': self.count, 'max_updated_at': self.max_updated_at or None}) + b'\n'
+
+    def _csv_chunks(self) -> Iterator[bytes]:
+        columns = self.fields or PRODUCT_COLUMNS
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+        buffer.write('\ufeff')  # BOM ให้ Excel อ่านภาษาไทยถูก
+        writer.writeheader()
+        for page in self.pages():
+            writer.writerows(self._track(page))
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
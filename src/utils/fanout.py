@@ -0,0 +1,107 @@
+"""
+📁 src/utils/fanout.py
+🎯 เรียก backend หลายรายการที่ไม่ขึ้นต่อกันพร้อมกัน (fan-out) ทั้งในโค้ด async (asyncio.gather) และ Flask แบบ sync
+client ของทุก engine (Supabase, SQLite, mirror) เป็นแบบ sync จึงรันแต่ละการเรียกใน thread pool ที่ใช้ร่วมกัน
+เวลารวมจึงเท่ากับการเรียกที่ช้าที่สุดแทนผลรวมของทุกการเรียก
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, Sequence
+
+from ..config import config
+from .metrics import metrics
+
+# เวลารวมของแต่ละ fan-out แยกตามชื่อและโหมด (concurrent | sequential)
+fanout_duration = metrics.histogram('backend_fanout_duration_seconds', 'Wall time of backend fan-outs by name and mode')
+
+# True ภายในการเรียกที่รันอยู่ใน thread pool - fan-out ซ้อนรันตามลำดับแทน (กัน pool เต็มจนรอกันเอง)
+_inside_fanout: ContextVar[bool] = ContextVar('inside_fanout', default=False)
+
+
+def _in_context(call: Callable[[], Any]) -> Callable[[], Any]:
+    """ผูกการเรียกกับสำเนา context ของผู้เรียก (trace ของ request, การพัก log การค้นหา)"""
+    context = contextvars.copy_context()
+
+    def run():
+        _inside_fanout.set(True)
+        return call()
+    return lambda: context.run(run)
+
+
+class FanOut:
+    """ตัวรันการเรียกที่ไม่ขึ้นต่อกันพร้อมกัน
+
+    - โค้ด async (ASGI): ``await fanout.gather('ชื่อ', call1, call2)``
+    - โค้ด sync (Flask view, LINE handler): ``fanout.run('ชื่อ', call1, call2)`` - ส่งเข้า thread pool เดียวกัน
+      แล้วรอด้วย concurrent.futures.wait (ไม่สร้าง event loop ใน thread ของ request)
+    ผลลัพธ์เรียงตามลำดับ calls, error ของการเรียกใดถูกส่งต่อ (หรือคืนเป็นค่าเมื่อ return_exceptions=True)
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers or config.FANOUT_MAX_WORKERS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fanout")
+        return self._executor
+
+    async def gather(self, name: str, *calls: Callable[[], Any], return_exceptions: bool = False) -> List[Any]:
+        """รันทุกการเรียกพร้อมกันใน thread pool แล้วรอผลด้วย asyncio.gather"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            return await asyncio.gather(*(loop.run_in_executor(self._pool(), _in_context(call)) for call in calls),
+                                        return_exceptions=return_exceptions)
+        finally:
+            fanout_duration.observe(time.perf_counter() - started, name=name, mode='concurrent')
+
+    def _sequential(self, name: str, calls: Sequence[Callable[[], Any]], return_exceptions: bool) -> List[Any]:
+        started = time.perf_counter()
+        results = []
+        try:
+            for call in calls:
+                try:
+                    results.append(call())
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results.append(e)
+            return results
+        finally:
+            fanout_duration.observe(time.perf_counter() - started, name=name, mode='sequential')
+
+    def run(self, name: str, *calls: Callable[[], Any], return_exceptions: bool = False) -> List[Any]:
+        """สำหรับโค้ด sync: รันพร้อมกัน (FANOUT_ENABLED=false, การเรียกเดียว หรือ fan-out ซ้อน = ตามลำดับ)"""
+        if not config.FANOUT_ENABLED or len(calls) < 2 or _inside_fanout.get():
+            return self._sequential(name, calls, return_exceptions)
+        
+        started = time.perf_counter()
+        try:
+            futures = [self._pool().submit(_in_context(call)) for call in calls]
+            wait(futures)
+            results = []
+            for future in futures:
+                error = future.exception()
+                if error is None:
+                    results.append(future.result())
+                elif return_exceptions:
+                    results.append(error)
+                else:
+                    raise error
+            return results
+        finally:
+            fanout_duration.observe(time.perf_counter() - started, name=name, mode='concurrent')
+
+# สร้าง instance สำหรับใช้งาน
+fanout = FanOut()
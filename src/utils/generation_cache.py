@@ -0,0 +1,159 @@
+"""
+📁 src/utils/generation_cache.py
+🎯 Cache ของข้อความที่สร้างด้วย AI (รีวิว/โปรโมต) แบบ content-addressed บน SQLite
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from ..config import config
+
+# ฟิลด์ที่มีผลต่อข้อความที่สร้าง - ฟิลด์อื่น (id, updated_at ฯลฯ) เปลี่ยนได้โดยไม่ต้องสร้างใหม่
+CONTENT_FIELDS = (
+    'product_name', 'price', 'shop_name', 'category', 'description', 'rating',
+    'sold_count', 'commission_rate', 'commission_amount', 'product_link', 'offer_link'
+)
+
+
+class GenerationCache:
+    """Cache ข้อความที่สร้างแล้ว key = (hash ของเนื้อหาสินค้า, ประเภท, สไตล์, model, prompt version)
+
+    เก็บบนดิสก์ด้วย SQLite และลบรายการที่ใช้ล่าสุดนานที่สุดออกเมื่อขนาดรวมเกิน max_bytes
+    """
+
+    def __init__(self, db_path: str = None, max_bytes: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path or config.GENERATION_CACHE_PATH
+        self.max_bytes = max_bytes if max_bytes is not None else config.GENERATION_CACHE_MAX_MB * 1024 * 1024
+        self._lock = threading.Lock()
+        self.connection = None
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        try:
+            self._init_database()
+        except Exception as e:
+            self.logger.error(f"Generation cache disabled: {e}")
+            self.connection = None
+
+    def _init_database(self):
+        """สร้างตาราง cache"""
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        cursor = self.connection.cursor()
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS generation_cache (
+                cache_key TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_generation_last_access ON generation_cache(last_access)')
+        self.connection.commit()
+
+        cursor.execute('SELECT COALESCE(SUM(size), 0) FROM generation_cache')
+        self.total_bytes = cursor.fetchone()[0]
+
+    @staticmethod
+    def content_hash(product: Dict, fields: Iterable[str] = CONTENT_FIELDS) -> str:
+        """hash ของฟิลด์สินค้าที่มีผลต่อข้อความ"""
+        payload = {field: product.get(field) for field in fields}
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def make_key(self, product: Dict, kind: str, style: str, model: str, prompt_version: str) -> str:
+        """สร้าง cache key"""
+        return f"{self.content_hash(product)}:{kind}:{style}:{model}:{prompt_version}"
+
+    def get(self, key: str) -> Optional[str]:
+        """อ่านข้อความจาก cache (None ถ้าไม่มี)"""
+        if not self.connection:
+            return None
+
+        with self._lock:
+            cursor = self.connection.cursor()
+            cursor.execute('SELECT content FROM generation_cache WHERE cache_key = ?', (key,))
+            row = cursor.fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            cursor.execute('UPDATE generation_cache SET last_access = ? WHERE cache_key = ?', (time.time(), key))
+            self.connection.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, content: str):
+        """บันทึกข้อความลง cache แล้ว evict ถ้าเกินขนาด"""
+        if not self.connection or not content:
+            return
+
+        size = len(content.encode('utf-8'))
+        now = time.time()
+
+        with self._lock:
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute('SELECT size FROM generation_cache WHERE cache_key = ?', (key,))
+                previous = cursor.fetchone()
+                cursor.execute('''
+                    INSERT OR REPLACE INTO generation_cache (cache_key, content, size, created_at, last_access)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (key, content, size, now, now))
+                self.total_bytes += size - (previous[0] if previous else 0)
+
+                if self.total_bytes > self.max_bytes:
+                    self._evict(cursor)
+
+                self.connection.commit()
+            except Exception as e:
+                self.logger.error(f"Failed to write generation cache: {e}")
+
+    def _evict(self, cursor):
+        """ลบรายการที่ไม่ได้ใช้นานที่สุดจนขนาดรวมเหลือ 90% ของ max_bytes"""
+        target = self.max_bytes * 0.9
+        cursor.execute('SELECT cache_key, size FROM generation_cache ORDER BY last_access ASC')
+        evicted = []
+        for cache_key, size in cursor.fetchall():
+            if self.total_bytes <= target:
+                break
+            evicted.append((cache_key,))
+            self.total_bytes -= size
+
+        cursor.executemany('DELETE FROM generation_cache WHERE cache_key = ?', evicted)
+        self.logger.debug(f"Evicted {len(evicted)} generation cache entries")
+
+    def get_stats(self) -> Dict:
+        """สถิติการใช้งาน cache"""
+        entries = 0
+        if self.connection:
+            with self._lock:
+                entries = self.connection.execute('SELECT COUNT(*) FROM generation_cache').fetchone()[0]
+
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'total_bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def clear(self):
+        """ล้าง cache ทั้งหมด"""
+        if not self.connection:
+            return
+        with self._lock:
+            self.connection.execute('DELETE FROM generation_cache')
+            self.connection.commit()
+            self.total_bytes = 0
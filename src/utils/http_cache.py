@@ -0,0 +1,178 @@
+"""
+📁 src/utils/http_cache.py
+🎯 cache ของ response JSON ฝั่งเซิร์ฟเวอร์ + ETag/Last-Modified/Cache-Control และ conditional GET (304)
+key = route + query string ที่ normalize แล้ว, response ที่ขึ้นกับแคตตาล็อกผูกกับเวอร์ชันที่เพิ่มขึ้นทุกครั้งที่เขียนสินค้า
+ผู้เรียกที่ poll ซ้ำ (dashboard, integrator) จึงได้ 304 หรือ body ที่ serialize ไว้แล้วโดยไม่ต้องค้นหาใหม่
+"""
+
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from flask import Response, make_response, request
+
+from ..config import config
+from .metrics import metrics
+from .product_store import ProductChangeNotifier
+
+# จำนวน request ที่ผ่าน cache แยกตาม endpoint และผล (hit | miss | not_modified)
+http_cache_requests = metrics.counter('http_cache_requests_total', 'HTTP response cache requests by endpoint and result')
+
+
+class CatalogVersion:
+    """เลขเวอร์ชันของแคตตาล็อก เพิ่มขึ้นทุกครั้งที่มีการเขียนสินค้า (add/update/delete)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+        self.changed_at = time.time()
+
+        ProductChangeNotifier.add_change_listener(self.on_product_change)
+
+    def bump(self) -> int:
+        with self._lock:
+            self.value += 1
+            self.changed_at = time.time()
+            return self.value
+
+    def on_product_change(self, action: str, product_code: str, data: Optional[Dict] = None):
+        """Listener สำหรับการเขียนสินค้า"""
+        self.bump()
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    mimetype: str
+    etag: str
+    last_modified: float
+    expires: float
+    version: Optional[int]  # None = ไม่ผูกกับแคตตาล็อก (หมดอายุตาม TTL เท่านั้น)
+
+
+class ResponseCache:
+    """cache แบบ LRU + TTL ของ response GET ที่สำเร็จ (200) ใช้เป็น decorator ของ view
+
+    versioned=True: รายการเก่าใช้ไม่ได้ทันทีเมื่อเวอร์ชันแคตตาล็อกเปลี่ยน (TTL กันการเขียนจากนอก process)
+    ETag = เวอร์ชัน + hash ของ body จึงถูกต้องแม้แต่ละ worker มีเลขเวอร์ชันของตัวเอง
+    """
+
+    def __init__(self, max_entries: int = None, ttl: int = None, version: CatalogVersion = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max_entries or config.HTTP_CACHE_SIZE
+        self.ttl = ttl or config.HTTP_CACHE_TTL_SECONDS
+        self.version = version or catalog_version
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()  # key -> CachedResponse
+
+    @staticmethod
+    def key(path: str, args) -> Tuple:
+        """key ของ request: path + พารามิเตอร์เรียงตามชื่อ (ไม่สนลำดับใน URL และพารามิเตอร์ว่าง)"""
+        return (path,) + tuple(sorted((name, value.strip()) for name, value in args.items(multi=True)
+                                      if value.strip()))
+
+    def get(self, key: Tuple, version: Optional[int]) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires < time.time() or entry.version != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key: Tuple, response: Response, ttl: int, version: Optional[int]) -> CachedResponse:
+        body = response.get_data()
+        digest = hashlib.sha1(body).hexdigest()[:16]
+        now = time.time()
+        entry = CachedResponse(
+            body=body,
+            mimetype=response.mimetype,
+            etag=digest if version is None else f"{version}-{digest}",
+            last_modified=now if version is None else self.version.changed_at,
+            expires=now + ttl,
+            version=version
+        )
+        self.put(key, entry)
+        return entry
+
+    def cached(self, ttl: int = None, max_age: int = None, versioned: bool = True,
+               on_hit: Callable[[CachedResponse], Any] = None):
+        """decorator ของ view: GET ที่เคยตอบแล้วตอบจาก cache, ส่ง 304 เมื่อ If-None-Match/If-Modified-Since ตรง
+
+        on_hit(entry) ถูกเรียกเมื่อตอบจาก cache (เช่น ยังบันทึกสถิติการค้นหา) - error ไม่กระทบ response
+        """
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method not in ('GET', 'HEAD') or not config.HTTP_CACHE_ENABLED:
+                    return view(*args, **kwargs)
+
+                endpoint = request.url_rule.rule if request.url_rule else request.path
+                key = self.key(request.path, request.args)
+                version = self.version.value if versioned else None
+                entry = self.get(key, version)
+
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    entry = self._store(key, response, ttl or self.ttl, version)
+                    result = 'miss'
+                else:
+                    response = Response(entry.body, mimetype=entry.mimetype)
+                    result = 'hit'
+                    if on_hit:
+                        try:
+                            on_hit(entry)
+                        except Exception as e:
+                            self.logger.error(f"HTTP cache hit callback failed for {endpoint}: {e}")
+
+                response.set_etag(entry.etag)
+                response.last_modified = datetime.fromtimestamp(int(entry.last_modified), timezone.utc)
+                response.cache_control.public = True
+                response.cache_control.max_age = config.HTTP_CACHE_MAX_AGE if max_age is None else max_age
+                response.cache_control.must_revalidate = True
+                response.make_conditional(request)
+                if response.status_code == 304:
+                    result = 'not_modified'
+
+                http_cache_requests.inc(endpoint=endpoint, result=result)
+                return response
+            return wrapper
+        return decorator
+
+    def stats(self) -> Dict[str, Any]:
+        """จำนวนรายการ, เวอร์ชันแคตตาล็อก และจำนวน request แยกตาม endpoint/ผล"""
+        with self._lock:
+            entries = len(self._entries)
+        requests_by_endpoint: Dict[str, Dict[str, int]] = {}
+        for labels in http_cache_requests.labels():
+            requests_by_endpoint.setdefault(labels['endpoint'], {})[labels['result']] = \
+                int(http_cache_requests.value(**labels))
+        return {
+            'enabled': config.HTTP_CACHE_ENABLED,
+            'entries': entries,
+            'catalog_version': self.version.value,
+            'requests': requests_by_endpoint
+        }
+
+# สร้าง instance สำหรับใช้งาน
+catalog_version = CatalogVersion()
+response_cache = ResponseCache()
@@ -3,59 +3,213 @@ Logging System สำหรับ Smart Service System
 จัดการ logging และ error tracking
 """
 
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
+import random
 import sys
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from typing import Dict, Optional
 from ..config import config
+from .metrics import MetricsRegistry, metrics
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+_exception_formatter = logging.Formatter()
+
+# ไฟล์ lock ของโฟลเดอร์ log ที่ process นี้ถืออยู่ (เปิดค้างไว้ตลอดอายุ process)
+_writer_locks: Dict[str, object] = {}
+_writer_locks_guard = threading.Lock()
+
+
+def _log_file_suffix(logs_dir: str) -> str:
+    """'' ถ้า process นี้เป็นผู้เขียนไฟล์ log หลักของโฟลเดอร์ (ถือ lock ได้), มิฉะนั้น '.<pid>'
+
+    RotatingFileHandler หมุนไฟล์ถูกต้องเฉพาะเมื่อมีผู้เขียนคนเดียว - gunicorn หลาย worker
+    จึงมี worker เดียวเขียน smart_service.log และ worker อื่นเขียน smart_service.<pid>.log ของตัวเอง
+    ระบบที่ไม่มี fcntl (Windows ไม่รัน gunicorn) ใช้ไฟล์หลักเสมอ
+    """
+    if not FCNTL_AVAILABLE:
+        return ''
+    logs_dir = os.path.abspath(logs_dir)
+    with _writer_locks_guard:
+        if logs_dir in _writer_locks:
+            return ''
+        lock_file = open(os.path.join(logs_dir, 'smart_service.log.lock'), 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return f'.{os.getpid()}'
+        _writer_locks[logs_dir] = lock_file
+        return ''
+
+class JsonFormatter(logging.Formatter):
+    """Formatter สำหรับ log แบบ structured (หนึ่ง JSON object ต่อบรรทัด)"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+class DebugSampler(logging.Filter):
+    """เก็บ log ระดับ DEBUG เพียงบางส่วนตาม sample_rate (0-1) - ระดับอื่นผ่านทั้งหมด"""
+    
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__()
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.dropped = 0
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.sample_rate >= 1.0:
+            return True
+        if random.random() < self.sample_rate:
+            return True
+        self.dropped += 1
+        return False
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler ที่ไม่รอเมื่อคิวเต็ม (ทิ้ง record และนับจำนวนไว้แทน)"""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """รวมข้อความกับ args และแปลง traceback เป็นข้อความก่อนส่งข้าม thread"""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 class SystemLogger:
-    """คลาสสำหรับจัดการ logging"""
+    """คลาสสำหรับจัดการ logging
+    
+    thread ที่เรียก log แค่ใส่ record ลงคิว ส่วนการเขียน console/ไฟล์ทำโดย QueueListener
+    บน background thread ทำให้ request ไม่ต้องรอ disk I/O
+    แต่ละไฟล์ log มีผู้เขียนเพียง process เดียว (ดู _log_file_suffix)
+    """
     
     def __init__(self, name: str = "SmartService"):
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.DEBUG if config.DEBUG else logging.INFO)
+        # console handler อยู่ใน pipeline แล้ว ไม่ต้องส่งต่อให้ root logger ซ้ำ
+        self.logger.propagate = False
+        self.listener: Optional[QueueListener] = None
+        self.log_path: Optional[str] = None
+        self.error_log_path: Optional[str] = None
+        self.queue_handler: Optional[NonBlockingQueueHandler] = None
+        self.sampler = DebugSampler(config.LOG_DEBUG_SAMPLE_RATE)
         
         # ป้องกันการสร้าง handler ซ้ำ
         if not self.logger.handlers:
             self._setup_handlers()
     
     def _setup_handlers(self):
-        """ตั้งค่า logging handlers"""
+        """ตั้งค่า logging pipeline: QueueHandler -> QueueListener -> console/ไฟล์"""
         
         # สร้างโฟลเดอร์ logs ถ้าไม่มี
-        logs_dir = "logs"
-        if not os.path.exists(logs_dir):
-            os.makedirs(logs_dir)
+        logs_dir = config.LOG_DIR
+        os.makedirs(logs_dir, exist_ok=True)
+        suffix = _log_file_suffix(logs_dir)
+        self.log_path = os.path.join(logs_dir, f'smart_service{suffix}.log')
+        self.error_log_path = os.path.join(logs_dir, f'errors{suffix}.log')
         
         # Format สำหรับ log messages
-        formatter = logging.Formatter(
-            '[%(asctime)s] %(levelname)s in %(name)s: %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        if config.LOG_FORMAT == 'json':
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(
+                '[%(asctime)s] %(levelname)s in %(name)s: %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
         
         # Console Handler - แสดงใน terminal
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
-        
-        # File Handler - บันทึกในไฟล์
-        today = datetime.now().strftime('%Y-%m-%d')
-        log_file = os.path.join(logs_dir, f'smart_service_{today}.log')
         
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        # File Handler - หมุนไฟล์ตามขนาด
+        file_handler = RotatingFileHandler(
+            self.log_path,
+            maxBytes=config.LOG_MAX_BYTES,
+            backupCount=config.LOG_BACKUP_COUNT,
+            encoding='utf-8',
+            delay=True
+        )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
         
-        # Error Handler - ไฟล์แยกสำหรับ errors
-        error_file = os.path.join(logs_dir, f'errors_{today}.log')
-        error_handler = logging.FileHandler(error_file, encoding='utf-8')
+        # Error Handler - ไฟล์แยกสำหรับ errors หมุนไฟล์ทุกเที่ยงคืน
+        error_handler = TimedRotatingFileHandler(
+            self.error_log_path,
+            when='midnight',
+            backupCount=config.LOG_BACKUP_COUNT,
+            encoding='utf-8',
+            delay=True
+        )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(formatter)
-        self.logger.addHandler(error_handler)
+        
+        # Queue - thread ที่ log แค่ใส่คิว (sampling DEBUG ก่อนเข้าคิว)
+        log_queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+        self.queue_handler = NonBlockingQueueHandler(log_queue)
+        self.queue_handler.addFilter(self.sampler)
+        self.logger.addHandler(self.queue_handler)
+        
+        self.listener = QueueListener(
+            log_queue, console_handler, file_handler, error_handler,
+            respect_handler_level=True
+        )
+        self.listener.start()
+        atexit.register(self.shutdown)
+    
+    def shutdown(self):
+        """เขียน log ที่ค้างในคิวให้หมดแล้วหยุด background thread"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+    
+    def get_stats(self) -> dict:
+        """จำนวน record ที่ถูกทิ้ง (คิวเต็ม / sampling)"""
+        return {
+            "queue_dropped": self.queue_handler.dropped if self.queue_handler else 0,
+            "debug_sampled_out": self.sampler.dropped,
+            "queue_size": self.queue_handler.queue.qsize() if self.queue_handler else 0
+        }
+    
+    def get_child(self, name: str) -> logging.Logger:
+        """logger ของโมดูลที่ส่งผ่าน pipeline เดียวกัน"""
+        return self.logger.getChild(name)
     
     def info(self, message: str, extra_data: Optional[dict] = None):
         """Log ข้อมูลทั่วไป"""
@@ -150,26 +304,57 @@ class ErrorHandler:
 
 # Performance Monitor
 class PerformanceMonitor:
-    """คลาสสำหรับติดตาม performance"""
+    """คลาสสำหรับติดตาม performance
     
-    def __init__(self, logger: SystemLogger):
+    เวลาเริ่มถูกเก็บแยกตาม thread ทำให้หลาย request จับเวลา operation เดียวกันพร้อมกันได้
+    และทุกผลลัพธ์ถูกบันทึกลง histogram `operation_duration_seconds` (ดูได้ที่ /metrics)
+    """
+    
+    def __init__(self, logger: SystemLogger, registry: MetricsRegistry = None):
         self.logger = logger
-        self.start_times = {}
+        self.registry = registry or metrics
+        self.histogram = self.registry.histogram(
+            'operation_duration_seconds', 'Duration of timed operations'
+        )
+        self._local = threading.local()
+    
+    @property
+    def start_times(self) -> dict:
+        """เวลาเริ่มของ operation ใน thread ปัจจุบัน"""
+        start_times = getattr(self._local, 'start_times', None)
+        if start_times is None:
+            start_times = self._local.start_times = {}
+        return start_times
     
     def start_timer(self, operation: str):
         """เริ่มจับเวลา operation"""
-        self.start_times[operation] = datetime.now()
+        self.start_times.setdefault(operation, []).append(time.perf_counter())
         self.logger.debug(f"Started timing: {operation}")
     
     def end_timer(self, operation: str) -> float:
         """จบการจับเวลาและ log ผลลัพธ์"""
-        if operation not in self.start_times:
+        started = self.start_times.get(operation)
+        if not started:
             self.logger.warning(f"No start time found for operation: {operation}")
             return 0.0
         
-        start_time = self.start_times.pop(operation)
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - started.pop()
+        if not started:
+            del self.start_times[operation]
         
+        return self._record(operation, duration)
+    
+    @contextmanager
+    def measure(self, operation: str):
+        """จับเวลาด้วย with: `with performance_monitor.measure("load"):`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(operation, time.perf_counter() - start)
+    
+    def _record(self, operation: str, duration: float) -> float:
+        self.histogram.observe(duration, operation=operation)
         self.logger.info(f"Operation '{operation}' completed in {duration:.3f} seconds")
         
         # แจ้งเตือนถ้าใช้เวลานาน
@@ -0,0 +1,329 @@
+"""
+📁 src/utils/metrics.py
+🎯 ระบบเก็บ metrics ภายในโปรเซส: Counter, Gauge และ Histogram ของ latency (แบบ HDR)
+ปลอดภัยต่อการใช้งานหลาย thread และส่งออกเป็น Prometheus text format ผ่าน /metrics
+"""
+
+import functools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# ความละเอียดของ histogram: 32 ช่องย่อยต่อหนึ่งช่วงกำลังสอง (คลาดเคลื่อนไม่เกิน ~3%)
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+LINEAR_LIMIT = SUB_BUCKET_COUNT * 2
+# ค่าสูงสุดที่เก็บได้ (ไมโครวินาที) ~ 1 ชั่วโมง ค่าที่เกินจะถูกนับในช่องสุดท้าย
+MAX_TRACKABLE_US = 3_600_000_000
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def bucket_index(value_us: int) -> int:
+    """หา index ของช่อง histogram สำหรับค่า (ไมโครวินาที)"""
+    if value_us < LINEAR_LIMIT:
+        return max(value_us, 0)
+    shift = value_us.bit_length() - (SUB_BUCKET_BITS + 1)
+    return LINEAR_LIMIT + (shift - 1) * SUB_BUCKET_COUNT + ((value_us >> shift) - SUB_BUCKET_COUNT)
+
+
+def bucket_upper_bound(index: int) -> int:
+    """ค่าสูงสุด (ไมโครวินาที) ที่อยู่ในช่อง index"""
+    if index < LINEAR_LIMIT:
+        return index
+    shift = (index - LINEAR_LIMIT) // SUB_BUCKET_COUNT + 1
+    mantissa = (index - LINEAR_LIMIT) % SUB_BUCKET_COUNT + SUB_BUCKET_COUNT
+    return ((mantissa + 1) << shift) - 1
+
+
+BUCKET_COUNT = bucket_index(MAX_TRACKABLE_US) + 1
+
+
+class _Metric:
+    """ฐานของ metric ที่แยกค่าตาม label"""
+
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, description: str = ''):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+        self._series: Dict[LabelKey, object] = {}
+
+    def labels(self) -> List[Dict[str, str]]:
+        """รายการชุด label ที่มีค่าอยู่"""
+        with self._lock:
+            return [dict(key) for key in self._series]
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.description or self.name}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+
+
+class Counter(_Metric):
+    """ตัวนับที่เพิ่มขึ้นอย่างเดียว"""
+
+    metric_type = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(_label_key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._series.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """ค่าที่ขึ้นลงได้ (เช่น จำนวน request ที่กำลังทำงาน)"""
+
+    metric_type = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._series[_label_key(labels)] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class _HistogramSeries:
+    """ข้อมูลของ histogram หนึ่งชุด label"""
+
+    __slots__ = ('counts', 'count', 'total', 'min_us', 'max_us')
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.min_us = None
+        self.max_us = 0
+
+    def record(self, seconds: float):
+        value_us = min(max(int(seconds * 1_000_000), 0), MAX_TRACKABLE_US)
+        self.counts[bucket_index(value_us)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def quantile(self, q: float) -> float:
+        """ค่า (วินาที) ที่ quantile q"""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(q * self.count + 0.999999))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            seen += bucket_count
+            if seen >= rank:
+                value_us = min(bucket_upper_bound(index), self.max_us)
+                return max(value_us, self.min_us or 0) / 1_000_000
+        return self.max_us / 1_000_000
+
+
+class Histogram(_Metric):
+    """Histogram ของ latency แบบ log-linear (HDR) ค่าเก็บเป็นวินาที"""
+
+    metric_type = 'summary'
+
+    def __init__(self, name: str, description: str = '', quantiles: Iterable[float] = DEFAULT_QUANTILES):
+        super().__init__(name, description)
+        self.quantiles = tuple(quantiles)
+
+    def observe(self, seconds: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries()
+            series.record(seconds)
+
+    def snapshot(self, **labels) -> Dict:
+        """สรุปค่า count/sum/min/max และ p50/p95/p99 ของชุด label"""
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            if series is None:
+                return {'count': 0, 'sum': 0.0, 'min': 0.0, 'max': 0.0,
+                        **{f"p{int(q * 100)}": 0.0 for q in self.quantiles}}
+            return self._summarize(series)
+
+    def _summarize(self, series: _HistogramSeries) -> Dict:
+        summary = {
+            'count': series.count,
+            'sum': round(series.total, 6),
+            'min': (series.min_us or 0) / 1_000_000,
+            'max': series.max_us / 1_000_000
+        }
+        for q in self.quantiles:
+            summary[f"p{int(q * 100)}"] = series.quantile(q)
+        return summary
+
+    def snapshots(self) -> Dict[LabelKey, Dict]:
+        with self._lock:
+            return {key: self._summarize(series) for key, series in self._series.items()}
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, summary in self.snapshots().items():
+            for q in self.quantiles:
+                lines.append(f"{self.name}{_format_labels(key, ('quantile', str(q)))} "
+                             f"{_format_value(summary[f'p{int(q * 100)}'])}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(summary['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {summary['count']}")
+        return lines
+
+
+class Timer:
+    """context manager จับเวลาแล้วบันทึกลง histogram"""
+
+    __slots__ = ('histogram', 'labels', 'start', 'elapsed')
+
+    def __init__(self, histogram: Histogram, labels: Dict):
+        self.histogram = histogram
+        self.labels = labels
+        self.start = 0.0
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.start
+        self.histogram.observe(self.elapsed, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """ที่รวม metrics ทั้งหมดของโปรเซส"""
+
+    def __init__(self, namespace: str = ''):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name: str, description: str):
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        metric = self._metrics.get(full_name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(full_name)
+                if metric is None:
+                    metric = self._metrics[full_name] = cls(full_name, description)
+        if type(metric) is not cls:
+            raise ValueError(f"Metric '{full_name}' already registered as {metric.metric_type}")
+        return metric
+
+    def counter(self, name: str, description: str = '') -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str = '') -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(self, name: str, description: str = '') -> Histogram:
+        return self._get_or_create(Histogram, name, description)
+
+    def timer(self, name: str, description: str = '', **labels) -> Timer:
+        """ใช้กับ with: `with metrics.timer('db_seconds', function='search'):`"""
+        return Timer(self.histogram(name, description), labels)
+
+    def timed(self, name: str, description: str = '', **labels) -> Callable:
+        """decorator จับเวลาฟังก์ชัน (ค่าเริ่มต้นใช้ชื่อฟังก์ชันเป็น label `function`)"""
+        def decorator(func):
+            histogram = self.histogram(name, description)
+            series_labels = labels or {'function': func.__name__}
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with Timer(histogram, series_labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def instrument(self, target, methods: Iterable[str], name: str, description: str = ''):
+        """ห่อ object ภายนอก (เช่น LINE MessagingApi) ให้จับเวลาเมธอดที่ระบุ"""
+        return _InstrumentedProxy(target, self.histogram(name, description), frozenset(methods))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render_prometheus(self) -> str:
+        """ส่งออกทุก metric เป็น Prometheus text exposition format"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """ล้างค่าทั้งหมด (ใช้ในการทดสอบ)"""
+        with self._lock:
+            for metric in self._metrics.values():
+                metric.clear()
+
+
+class _InstrumentedProxy:
+    """proxy ที่จับเวลาการเรียกเมธอดที่กำหนด ส่วนที่เหลือส่งต่อให้ object เดิม"""
+
+    def __init__(self, target, histogram: Histogram, methods: frozenset):
+        self._target = target
+        self._histogram = histogram
+        self._methods = methods
+
+    def __getattr__(self, attribute):
+        value = getattr(self._target, attribute)
+        if attribute not in self._methods or not callable(value):
+            return value
+
+        histogram = self._histogram
+
+        @functools.wraps(value)
+        def wrapper(*args, **kwargs):
+            with Timer(histogram, {'method': attribute}):
+                return value(*args, **kwargs)
+        return wrapper
+
+
+# สร้าง instance สำหรับใช้งาน
+metrics = MetricsRegistry()
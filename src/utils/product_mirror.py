@@ -0,0 +1,230 @@
+"""
+📁 src/utils/product_mirror.py
+🎯 สำเนาตาราง products ของ Supabase ใน SQLite ภายในแต่ละ worker (read replica)
+อ่านจากสำเนาในเครื่องแทนการเรียกเครือข่าย ส่วนการเขียนยังไปที่ Supabase ตามเดิม
+สำเนาถูกซิงก์ด้วยการดึงแถวที่ updated_at ใหม่กว่ารอบก่อน และอัปเดตทันทีเมื่อ worker นี้เขียนข้อมูลเอง
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from ..config import config
+from .metrics import metrics
+from .product_store import SQLiteProductStore
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mirror_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+mirror_rows = metrics.gauge('product_mirror_rows', 'Products in the local SQLite mirror')
+mirror_lag = metrics.gauge('product_mirror_lag_seconds', 'Seconds since the last successful mirror sync')
+mirror_syncs = metrics.counter('product_mirror_syncs_total', 'Mirror sync runs by kind and result')
+
+
+def _shift(timestamp: str, seconds: float) -> str:
+    """เลื่อน timestamp (ISO) ย้อนหลัง เพื่อไม่พลาดแถวที่ commit ช้ากว่าเวลา updated_at ของตัวเอง"""
+    try:
+        return (datetime.fromisoformat(timestamp) - timedelta(seconds=seconds)).isoformat()
+    except (TypeError, ValueError):
+        return timestamp
+
+
+class ProductMirror:
+    """ซิงก์ products จาก Supabase ลง SQLiteProductStore (`store`) ซึ่ง SupabaseDatabase ใช้ตอบการอ่าน"""
+
+    def __init__(self, db_path: str = None, poll_seconds: float = None, page_size: int = None,
+                 reconcile_seconds: float = None, overlap_seconds: float = 5.0):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path or config.PRODUCT_MIRROR_PATH or ':memory:'
+        self.poll_seconds = poll_seconds or config.PRODUCT_MIRROR_POLL_SECONDS
+        self.page_size = page_size or config.PRODUCT_MIRROR_PAGE_SIZE
+        self.reconcile_seconds = reconcile_seconds or config.PRODUCT_MIRROR_RECONCILE_SECONDS
+        self.overlap_seconds = overlap_seconds
+
+        # คำค้นหาถูกบันทึกที่ Supabase โดย SupabaseDatabase แล้ว สำเนาจึงไม่ต้องเก็บซ้ำ
+        self.store = SQLiteProductStore(self.db_path, log_searches=False)
+        self.store.connection.executescript(STATE_SCHEMA)
+
+        self.client = None
+        self.last_sync: Optional[float] = None
+        self.last_reconcile: Optional[float] = None
+        self.sync_errors = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # ไฟล์ที่ซิงก์ไว้จากรอบก่อนใช้อ่านได้ทันที แม้ Supabase ยังเชื่อมต่อไม่ได้
+        self.ready = self._get_state('watermark') is not None
+
+    # ===== สถานะ =====
+
+    def _get_state(self, key: str) -> Optional[str]:
+        with self.store.lock:
+            row = self.store.connection.execute("SELECT value FROM mirror_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str):
+        self.store.connection.execute(
+            "INSERT INTO mirror_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value))
+
+    def count(self) -> int:
+        return self.store.count()
+
+    def total_searches(self) -> int:
+        """จำนวนการค้นหาทั้งหมดจาก Supabase ณ รอบซิงก์ล่าสุด"""
+        return int(self._get_state('total_searches') or 0)
+
+    def get_status(self) -> Dict[str, Any]:
+        """สถานะของสำเนา สำหรับ /health"""
+        lag = time.time() - self.last_sync if self.last_sync else None
+        return {
+            'ready': self.ready,
+            'rows': self.count(),
+            'watermark': self._get_state('watermark'),
+            'lag_seconds': round(lag, 1) if lag is not None else None,
+            'sync_errors': self.sync_errors,
+            'path': self.db_path
+        }
+
+    # ===== การซิงก์ =====
+
+    def _fetch_pages(self, client, columns: str = '*', since: str = None):
+        """ดึง products ทีละหน้าแบบ keyset ต่อจากแถวสุดท้ายของหน้าก่อน
+
+        แถวเต็มเรียงตาม (updated_at, product_code), รายการรหัสเรียงตาม product_code
+        แถวที่ถูกอัปเดตระหว่างซิงก์ย้ายไปท้ายลำดับจึงได้ซ้ำแทนที่จะหาย (offset จะเลื่อนจนข้ามแถวถัดไป)
+        """
+        full_rows = columns == '*'
+        last = None
+        while True:
+            builder = client.table('products').select(columns)
+            if since:
+                builder = builder.gte('updated_at', since)
+            if full_rows:
+                if last:
+                    updated_at, code = last
+                    builder = builder.or_(f'updated_at.gt."{updated_at}",'
+                                          f'and(updated_at.eq."{updated_at}",product_code.gt."{code}")')
+                builder = builder.order('updated_at').order('product_code')
+            else:
+                if last:
+                    builder = builder.gt('product_code', last)
+                builder = builder.order('product_code')
+            rows = builder.limit(self.page_size).execute().data or []
+            yield rows
+            if len(rows) < self.page_size:
+                return
+            last = (rows[-1]['updated_at'], rows[-1]['product_code']) if full_rows else rows[-1]['product_code']
+
+    def sync(self, client=None) -> int:
+        """ดึงแถวที่เปลี่ยนตั้งแต่ watermark (ครั้งแรกดึงทั้งหมด) คืนจำนวนแถวที่ซิงก์"""
+        client = client or self.client
+        watermark = self._get_state('watermark')
+        kind = 'incremental' if watermark else 'full'
+        since = _shift(watermark, self.overlap_seconds) if watermark else None
+        synced = 0
+
+        try:
+            for rows in self._fetch_pages(client, since=since):
+                with self.store.lock:
+                    self.store.upsert_rows(rows, commit=False)
+                    newest = max((row.get('updated_at') or '' for row in rows), default='')
+                    if newest and (watermark is None or newest > watermark):
+                        watermark = newest
+                    self._set_state('watermark', watermark or '')
+                    self.store.connection.commit()
+                synced += len(rows)
+        except Exception as e:
+            self.sync_errors += 1
+            mirror_syncs.inc(kind=kind, result='error')
+            self.logger.error(f"Product mirror {kind} sync failed: {e}")
+            return synced
+
+        self.ready = True
+        self.last_sync = time.time()
+        mirror_syncs.inc(kind=kind, result='ok')
+        mirror_rows.set(self.count())
+        mirror_lag.set(0)
+        if synced:
+            self.logger.info(f"Product mirror {kind} sync: {synced} rows")
+        return synced
+
+    def reconcile(self, client=None) -> int:
+        """ลบแถวที่ถูกลบใน Supabase โดย worker อื่น (การ poll updated_at มองไม่เห็นการลบ)"""
+        client = client or self.client
+        try:
+            remote = set()
+            for rows in self._fetch_pages(client, columns='product_code'):
+                remote.update(row['product_code'] for row in rows)
+        except Exception as e:
+            self.sync_errors += 1
+            mirror_syncs.inc(kind='reconcile', result='error')
+            self.logger.error(f"Product mirror reconcile failed: {e}")
+            return 0
+
+        local = self.store.product_codes()
+        removed = [code for code in local if code not in remote]
+        # รายการว่างหรือสั้นผิดปกติ (error ชั่วคราว, การแบ่งหน้าผิด) ต้องไม่ล้างสำเนา - ข้ามรอบนี้แล้วลองใหม่รอบหน้า
+        if removed and (not remote or len(removed) > len(local) * config.PRODUCT_MIRROR_MAX_DELETE_FRACTION):
+            mirror_syncs.inc(kind='reconcile', result='refused')
+            self.logger.error(f"Product mirror reconcile refused: Supabase listed {len(remote)} products, "
+                              f"would remove {len(removed)} of {len(local)} local rows")
+            return 0
+        self.store.remove_rows(removed)
+
+        self.last_reconcile = time.time()
+        mirror_syncs.inc(kind='reconcile', result='ok')
+        mirror_rows.set(self.count())
+        if removed:
+            self.logger.info(f"Product mirror reconcile removed {len(removed)} rows")
+        return len(removed)
+
+    def sync_search_total(self, client=None) -> Optional[int]:
+        """เก็บจำนวนการค้นหาทั้งหมด (rpc get_total_searches) ไว้ในสำเนา ให้ get_stats อ่านได้โดยไม่เรียกเครือข่าย"""
+        client = client or self.client
+        try:
+            total = int(client.rpc('get_total_searches').execute().data or 0)
+        except Exception as e:
+            self.logger.warning(f"Product mirror search total sync failed: {e}")
+            return None
+        with self.store.lock:
+            self._set_state('total_searches', str(total))
+            self.store.connection.commit()
+        return total
+
+    def apply_change(self, action: str, product_code: str, data: Optional[Dict] = None):
+        """listener ของ SupabaseDatabase: สะท้อนการเขียนของ worker นี้ทันทีโดยไม่ต้องรอรอบ poll"""
+        if action == 'delete':
+            self.store.remove_rows([product_code])
+        elif data:
+            self.store.upsert_rows([data])
+
+    def start(self, client):
+        """เริ่ม thread ซิงก์เบื้องหลัง (ซิงก์ครั้งแรกใน thread เดียวกันเพื่อไม่ให้บล็อกการเริ่มระบบ)"""
+        self.client = client
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='product-mirror', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sync()
+            self.sync_search_total()
+            if self.last_reconcile is None or time.time() - self.last_reconcile >= self.reconcile_seconds:
+                self.reconcile()
+            if self.last_sync:
+                mirror_lag.set(time.time() - self.last_sync)
+            self._stop.wait(self.poll_seconds)
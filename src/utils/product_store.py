@@ -0,0 +1,836 @@
+"""
+📁 src/utils/product_store.py
+🎯 interface กลางของแคตตาล็อกสินค้า (ProductStore) และ engine ในเครื่อง: SQLite (มีดัชนี + FTS) และ in-memory
+เลือก engine ด้วย PRODUCT_STORE_ENGINE = supabase | sqlite | memory ผ่าน create_product_store()
+"""
+
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple, runtime_checkable
+
+import numpy as np
+
+from ..config import config
+from .metrics import metrics
+from .product_table import PRODUCT_COLUMNS, ProductTable
+from .search_analytics import SearchRollups
+
+UPDATABLE_COLUMNS = [c for c in PRODUCT_COLUMNS if c not in ('id', 'product_code', 'created_at')]
+
+# ลำดับการเรียงของ search_products: [(คอลัมน์, มากไปน้อย)] ตรงกับ SupabaseDatabase.search_products
+SEARCH_ORDERING: Dict[str, List[Tuple[str, bool]]] = {
+    'popularity': [('sold_count', True)],
+    'price_low': [('price', False)],
+    'price_high': [('price', True)],
+    'rating': [('rating', True)],
+    'category': [('category', False), ('sold_count', True)],
+    'product_name': [('product_name', False)],
+}
+DEFAULT_ORDERING = [('created_at', True)]
+TOP_METRICS = ['sold_count', 'price', 'rating', 'commission_amount']
+
+# เมธอดที่ทุก engine ต้องมี (ใช้จับเวลาของ engine ในเครื่อง)
+STORE_METHODS = (
+    'add_product', 'search_products', 'get_product_by_code', 'get_products_by_codes', 'update_product',
+    'delete_product', 'get_all_products', 'get_products_page', 'get_products_by_category', 'log_search',
+    'get_popular_searches', 'get_search_stats', 'get_categories', 'get_categories_with_stats', 'get_price_range',
+    'get_stats', 'bulk_update_products', 'bulk_delete_products', 'get_products_by_category_bulk',
+    'get_low_stock_products', 'get_top_products_by_metric', 'get_product_codes_by_prefix'
+)
+
+
+@runtime_checkable
+class ProductStore(Protocol):
+    """สิ่งที่ engine ของแคตตาล็อกสินค้าต้องมี (SupabaseDatabase, SQLiteProductStore, InMemoryProductStore)"""
+
+    connected: bool
+
+    def add_product(self, product_data: Dict[str, Any]) -> Optional[Dict]: ...
+    def search_products(self, query: str, limit: int = 5, offset: int = 0, category: str = None,
+                        min_price: float = None, max_price: float = None, order_by: str = 'created_at') -> Dict: ...
+    def get_product_by_code(self, product_code: str) -> Optional[Dict]: ...
+    def get_products_by_codes(self, product_codes: List[str]) -> List[Dict]: ...
+    def update_product(self, product_code: str, update_data: Dict) -> bool: ...
+    def delete_product(self, product_code: str) -> bool: ...
+    def get_all_products(self, limit: int = 100) -> List[Dict]: ...
+    def get_products_page(self, after: str = None, limit: int = 500,
+                          updated_since: str = None) -> Optional[List[Dict]]: ...
+    def get_products_by_category(self, category: str) -> List[Dict]: ...
+    def log_search(self, query: str, result_count: int, user_id: str = None) -> bool: ...
+    def get_popular_searches(self, limit: int = 10) -> List[Dict]: ...
+    def get_search_stats(self, days: int = 7, limit: int = 10) -> Dict[str, Any]: ...
+    def get_categories(self) -> List[str]: ...
+    def get_categories_with_stats(self) -> List[Dict[str, Any]]: ...
+    def get_price_range(self) -> Dict[str, float]: ...
+    def get_stats(self) -> Dict[str, Any]: ...
+    def bulk_update_products(self, product_codes: List[str], update_data: Dict[str, Any]) -> Dict[str, Any]: ...
+    def bulk_delete_products(self, product_codes: List[str]) -> Dict[str, Any]: ...
+    def get_products_by_category_bulk(self, categories: List[str], limit: int = 100) -> Dict[str, List[Dict]]: ...
+    def get_low_stock_products(self, threshold: int = 10) -> List[Dict]: ...
+    def get_top_products_by_metric(self, metric: str = 'sold_count', limit: int = 10) -> List[Dict]: ...
+    def get_product_codes_by_prefix(self, prefix: str) -> List[str]: ...
+
+
+class ProductChangeNotifier:
+    """ทะเบียน listener ของการเขียนสินค้า ใช้ร่วมกันทุก engine: listener(action, product_code, data)"""
+
+    # ใช้ร่วมกันทุก instance เพราะแต่ละโมดูลสร้าง store ของตัวเอง
+    _change_listeners: List[Callable[[str, str, Optional[Dict]], None]] = []
+
+    @classmethod
+    def add_change_listener(cls, listener: Callable[[str, str, Optional[Dict]], None]):
+        """ลงทะเบียน callback สำหรับการเปลี่ยนแปลงสินค้า (add/update/delete)"""
+        if listener not in cls._change_listeners:
+            cls._change_listeners.append(listener)
+
+    @classmethod
+    def remove_change_listener(cls, listener: Callable[[str, str, Optional[Dict]], None]):
+        """ยกเลิก callback ที่ลงทะเบียนไว้"""
+        if listener in cls._change_listeners:
+            cls._change_listeners.remove(listener)
+
+    def _notify_change(self, action: str, product_code: str, data: Optional[Dict] = None):
+        """แจ้ง listeners ว่าสินค้ามีการเปลี่ยนแปลง - error ของ listener ไม่กระทบการเขียน"""
+        for listener in list(self._change_listeners):
+            try:
+                listener(action, product_code, data)
+            except Exception as e:
+                self.logger.error(f"Product change listener failed: {e}")
+
+
+# ContextVar (แทน thread-local) เพื่อให้การเรียกที่ fan-out ไปยัง thread อื่นได้ค่าเดียวกับผู้เรียก
+_search_logging_paused: ContextVar[bool] = ContextVar('search_logging_paused', default=False)
+
+
+@contextmanager
+def search_logging_paused():
+    """ระหว่าง block นี้ search_products ใน context ปัจจุบัน (รวมการเรียกผ่าน fanout) ไม่บันทึก product_searches (เช่น งาน warm-up)"""
+    token = _search_logging_paused.set(True)
+    try:
+        yield
+    finally:
+        _search_logging_paused.reset(token)
+
+
+def search_logging_enabled() -> bool:
+    return not _search_logging_paused.get()
+
+
+def build_product_record(product_data: Dict[str, Any]) -> Dict[str, Any]:
+    """แปลงข้อมูลสินค้าที่รับเข้ามาเป็นแถวที่จะบันทึก (คำนวณ commission_amount)"""
+    return {
+        'product_code': product_data['product_code'],
+        'product_name': product_data['product_name'],
+        'price': float(product_data['price']),
+        'sold_count': int(product_data.get('sold_count', 0)),
+        'shop_name': product_data['shop_name'],
+        'commission_rate': float(product_data['commission_rate']),
+        'commission_amount': (product_data['price'] * product_data['commission_rate']) / 100,
+        'product_link': product_data['product_link'],
+        'offer_link': product_data['offer_link'],
+        'category': product_data.get('category', ''),
+        'description': product_data.get('description', ''),
+        'image_url': product_data.get('image_url', ''),
+        'rating': float(product_data.get('rating', 0))
+    }
+
+
+def popularity_score(product_count: int, total_sold: int, avg_rating: float) -> float:
+    """คะแนนความนิยมของหมวดหมู่ (จำนวนสินค้า 40%, ยอดขาย 40%, คะแนน 20%)"""
+    return round(
+        (product_count * 0.4) +
+        (min(total_sold / 100, 100) * 0.4) +
+        (avg_rating * 20 * 0.2), 2)
+
+
+def _prepare_update(update_data: Dict, current: Optional[Dict]) -> Dict:
+    """คอลัมน์ที่จะอัปเดต พร้อมคำนวณ commission_amount ใหม่เมื่อราคาหรืออัตราเปลี่ยน"""
+    values = {k: v for k, v in update_data.items() if k in UPDATABLE_COLUMNS}
+    if current and ('price' in values or 'commission_rate' in values):
+        price = values.get('price', current['price'])
+        rate = values.get('commission_rate', current['commission_rate'])
+        values['commission_amount'] = (float(price) * float(rate)) / 100
+    values['updated_at'] = datetime.now().isoformat()
+    return values
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_code TEXT UNIQUE NOT NULL,
+    product_name TEXT NOT NULL,
+    price REAL NOT NULL DEFAULT 0,
+    sold_count INTEGER DEFAULT 0,
+    shop_name TEXT,
+    commission_rate REAL DEFAULT 0,
+    commission_amount REAL DEFAULT 0,
+    product_link TEXT,
+    offer_link TEXT,
+    category TEXT,
+    description TEXT,
+    image_url TEXT,
+    rating REAL DEFAULT 0,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products(category, sold_count);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products(price);
+CREATE INDEX IF NOT EXISTS idx_products_sold_count ON products(sold_count);
+CREATE INDEX IF NOT EXISTS idx_products_rating ON products(rating);
+CREATE INDEX IF NOT EXISTS idx_products_created_at ON products(created_at);
+CREATE INDEX IF NOT EXISTS idx_products_updated_at ON products(updated_at);
+CREATE TABLE IF NOT EXISTS product_searches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    search_query TEXT NOT NULL,
+    user_id TEXT,
+    result_count INTEGER,
+    created_at TEXT
+);
+"""
+
+# FTS5 แบบ trigram ค้นหา substring ได้ทั้งภาษาไทย (ไม่มีช่องว่างระหว่างคำ) และอังกฤษ
+SQLITE_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE products_fts USING fts5(
+    product_name, description, category,
+    content='products', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN
+    INSERT INTO products_fts(rowid, product_name, description, category)
+    VALUES (new.id, new.product_name, new.description, new.category);
+END;
+CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, product_name, description, category)
+    VALUES ('delete', old.id, old.product_name, old.description, old.category);
+END;
+CREATE TRIGGER products_fts_update AFTER UPDATE ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, product_name, description, category)
+    VALUES ('delete', old.id, old.product_name, old.description, old.category);
+    INSERT INTO products_fts(rowid, product_name, description, category)
+    VALUES (new.id, new.product_name, new.description, new.category);
+END;
+INSERT INTO products_fts(products_fts) VALUES ('rebuild');
+"""
+
+MIN_FTS_QUERY_LENGTH = 3  # trigram ค้นหาคำที่สั้นกว่า 3 ตัวอักษรไม่ได้
+
+
+class SQLiteProductStore(ProductChangeNotifier):
+    """แคตตาล็อกสินค้าใน SQLite (ไฟล์หรือ ':memory:') ใช้ connection เดียวพร้อมล็อก"""
+
+    engine = 'sqlite'
+
+    def __init__(self, db_path: str = None, log_searches: bool = True):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path or config.PRODUCT_STORE_PATH
+        self.log_searches = log_searches
+        self.connected = True
+
+        # connection เดียวใช้ร่วมกันทุก thread (':memory:' แยก connection ไม่ได้) จึงต้องล็อกทุกครั้ง
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        if self.db_path != ':memory:':
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SQLITE_SCHEMA)
+        self.fts = self._create_fts()
+        # สถิติการค้นหาอ่านจาก rollup ที่อัปเดตพร้อม log (ไม่ GROUP BY ทั้งตาราง product_searches)
+        self.search_rollups = SearchRollups(
+            self.connection, self.lock, raw_table='product_searches',
+            raw_select="SELECT search_query, result_count, created_at FROM product_searches")
+
+    def _create_fts(self) -> bool:
+        """สร้างดัชนี FTS (ถ้า SQLite ไม่รองรับ trigram จะค้นหาด้วย LIKE แทน)"""
+        exists = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'").fetchone()
+        if exists:
+            return True
+        try:
+            self.connection.executescript(SQLITE_FTS_SCHEMA)
+            return True
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"SQLite FTS5 trigram not available, using LIKE search: {e}")
+            return False
+
+    # ===== ข้อมูลดิบ (ใช้โดย ProductMirror และการโหลดแคตตาล็อก) =====
+
+    def upsert_rows(self, rows: List[Dict], commit: bool = True):
+        """บันทึกแถวตามที่ได้รับ (ไม่คำนวณใหม่และไม่แจ้ง listener)"""
+        if not rows:
+            return
+        columns = ', '.join(PRODUCT_COLUMNS)
+        updates = ', '.join(f"{c} = excluded.{c}" for c in PRODUCT_COLUMNS if c not in ('id', 'product_code'))
+        with self.lock:
+            self.connection.executemany(
+                f"INSERT INTO products ({columns}) VALUES ({', '.join('?' * len(PRODUCT_COLUMNS))}) "
+                f"ON CONFLICT(product_code) DO UPDATE SET id = COALESCE(excluded.id, id), {updates}",
+                [tuple(row.get(c) for c in PRODUCT_COLUMNS) for row in rows if row.get('product_code')]
+            )
+            if commit:
+                self.connection.commit()
+
+    def remove_rows(self, product_codes: List[str], commit: bool = True):
+        with self.lock:
+            self.connection.executemany("DELETE FROM products WHERE product_code = ?",
+                                        [(code,) for code in product_codes])
+            if commit:
+                self.connection.commit()
+
+    def load_products(self, products: List[Dict]) -> int:
+        """โหลดแคตตาล็อกทั้งชุด (ทดสอบ/benchmark)"""
+        self.upsert_rows(products)
+        return len(products)
+
+    def product_codes(self) -> List[str]:
+        return [row['product_code'] for row in self._query("SELECT product_code FROM products")]
+
+    def count(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def _query(self, sql: str, params=()) -> List[Dict]:
+        with self.lock:
+            return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def _scalar(self, sql: str, params=()):
+        with self.lock:
+            return self.connection.execute(sql, params).fetchone()[0]
+
+    # ===== การเขียน =====
+
+    def add_product(self, product_data: Dict[str, Any]) -> Optional[Dict]:
+        """เพิ่มสินค้าใหม่"""
+        try:
+            data = build_product_record(product_data)
+            data['created_at'] = data['updated_at'] = datetime.now().isoformat()
+            with self.lock:
+                cursor = self.connection.execute(
+                    f"INSERT INTO products ({', '.join(data)}) VALUES ({', '.join('?' * len(data))})",
+                    list(data.values()))
+                self.connection.commit()
+                row = self._query("SELECT * FROM products WHERE id = ?", (cursor.lastrowid,))[0]
+
+            self.logger.info(f"Added product: {data['product_name']}")
+            self._notify_change('add', data['product_code'], row)
+            return row
+
+        except Exception as e:
+            self.logger.error(f"Error adding product: {e}")
+            return None
+
+    def update_product(self, product_code: str, update_data: Dict) -> bool:
+        """อัปเดตข้อมูลสินค้า"""
+        try:
+            with self.lock:
+                current = self.get_product_by_code(product_code)
+                if not current:
+                    return False
+                values = _prepare_update(update_data, current)
+                self.connection.execute(
+                    f"UPDATE products SET {', '.join(f'{c} = ?' for c in values)} WHERE product_code = ?",
+                    list(values.values()) + [product_code])
+                self.connection.commit()
+                row = self.get_product_by_code(product_code)
+
+            self._notify_change('update', product_code, row)
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error updating product: {e}")
+            return False
+
+    def delete_product(self, product_code: str) -> bool:
+        """ลบสินค้า"""
+        try:
+            with self.lock:
+                deleted = self.connection.execute(
+                    "DELETE FROM products WHERE product_code = ?", (product_code,)).rowcount
+                self.connection.commit()
+
+            if deleted:
+                self._notify_change('delete', product_code)
+            return deleted > 0
+
+        except Exception as e:
+            self.logger.error(f"Error deleting product: {e}")
+            return False
+
+    def bulk_update_products(self, product_codes: List[str], update_data: Dict[str, Any]) -> Dict[str, Any]:
+        """อัปเดตสินค้าหลายรายการพร้อมกัน (ใน transaction เดียว)"""
+        try:
+            with self.lock:
+                rows = self.get_products_by_codes(product_codes)
+                for row in rows:
+                    values = _prepare_update(update_data, row)
+                    self.connection.execute(
+                        f"UPDATE products SET {', '.join(f'{c} = ?' for c in values)} WHERE product_code = ?",
+                        list(values.values()) + [row['product_code']])
+                self.connection.commit()
+                updated = self.get_products_by_codes([row['product_code'] for row in rows])
+
+            for row in updated:
+                self._notify_change('update', row['product_code'], row)
+
+            if 'price' in update_data or 'commission_rate' in update_data:
+                return {
+                    "success": True,
+                    "updated_count": len(updated),
+                    "updated_codes": [row['product_code'] for row in updated]
+                }
+            return {
+                "success": True,
+                "updated_count": len(updated),
+                "message": f"Updated {len(updated)} products"
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error in bulk update: {e}")
+            return {"success": False, "message": str(e)}
+
+    def bulk_delete_products(self, product_codes: List[str]) -> Dict[str, Any]:
+        """ลบสินค้าหลายรายการพร้อมกัน"""
+        try:
+            with self.lock:
+                existing = [row['product_code'] for row in self.get_products_by_codes(product_codes)]
+                self.remove_rows(existing)
+
+            for code in existing:
+                self._notify_change('delete', code)
+
+            return {
+                "success": True,
+                "deleted_count": len(existing),
+                "message": f"Deleted {len(existing)} products"
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error in bulk delete: {e}")
+            return {"success": False, "message": str(e)}
+
+    def log_search(self, query: str, result_count: int, user_id: str = None) -> bool:
+        """บันทึกการค้นหา"""
+        if not self.log_searches or not search_logging_enabled():
+            return False
+        try:
+            now = datetime.now()
+            with self.lock:
+                self.search_rollups.ensure()
+                self.connection.execute(
+                    "INSERT INTO product_searches (search_query, user_id, result_count, created_at) VALUES (?, ?, ?, ?)",
+                    (query, user_id, result_count, now.isoformat()))
+                self.search_rollups.record(query, result_count, now)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error logging search: {e}")
+            return False
+
+    # ===== การอ่าน =====
+
+    def _match(self, query: str) -> Tuple[Optional[str], List[Any]]:
+        """เงื่อนไขค้นหาแบบ substring ใน ชื่อ/คำอธิบาย/หมวดหมู่ (เทียบเท่า ilike '%query%')"""
+        if not query:
+            return None, []
+        if self.fts and len(query) >= MIN_FTS_QUERY_LENGTH and not any(c in query for c in '%_'):
+            phrase = '"' + query.replace('"', '""') + '"'
+            return "id IN (SELECT rowid FROM products_fts WHERE products_fts MATCH ?)", [phrase]
+        pattern = f"%{query}%"
+        return "(product_name LIKE ? OR description LIKE ? OR category LIKE ?)", [pattern] * 3
+
+    def search_products(self, query: str, limit: int = 5, offset: int = 0, category: str = None,
+                        min_price: float = None, max_price: float = None, order_by: str = 'created_at') -> Dict:
+        """ค้นหาสินค้าพร้อม pagination และ filtering"""
+        try:
+            conditions, params = [], []
+            match, match_params = self._match(query)
+            if match:
+                conditions.append(match)
+                params.extend(match_params)
+            if category:
+                conditions.append("category = ?")
+                params.append(category)
+            if min_price is not None:
+                conditions.append("price >= ?")
+                params.append(min_price)
+            if max_price is not None:
+                conditions.append("price <= ?")
+                params.append(max_price)
+
+            where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+            ordering = ', '.join(f"{column} {'DESC' if desc else 'ASC'}"
+                                 for column, desc in SEARCH_ORDERING.get(order_by, DEFAULT_ORDERING))
+            products = self._query(f"SELECT * FROM products{where} ORDER BY {ordering} LIMIT ? OFFSET ?",
+                                   params + [limit, offset])
+            total = self._scalar(f"SELECT COUNT(*) FROM products{where}", params)
+
+            self.log_search(query, len(products))
+
+            return {
+                "products": products,
+                "total": total,
+                "has_more": (offset + limit) < total,
+                "current_offset": offset,
+                "limit": limit
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error searching products: {e}")
+            return {"products": [], "total": 0, "has_more": False}
+
+    def get_product_by_code(self, product_code: str) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM products WHERE product_code = ?", (product_code,))
+        return rows[0] if rows else None
+
+    def get_products_by_codes(self, product_codes: List[str]) -> List[Dict]:
+        codes = list(product_codes)
+        if not codes:
+            return []
+        return self._query(f"SELECT * FROM products WHERE product_code IN ({','.join('?' * len(codes))})", codes)
+
+    def get_all_products(self, limit: int = 100) -> List[Dict]:
+        return self._query("SELECT * FROM products ORDER BY created_at DESC LIMIT ?", (limit,))
+
+    def get_products_page(self, after: str = None, limit: int = 500, updated_since: str = None) -> List[Dict]:
+        conditions, params = [], []
+        if after is not None:
+            conditions.append("product_code > ?")
+            params.append(after)
+        if updated_since:
+            conditions.append("updated_at >= ?")
+            params.append(updated_since)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ''
+        return self._query(f"SELECT * FROM products {where}ORDER BY product_code LIMIT ?", (*params, limit))
+
+    def get_products_by_category(self, category: str) -> List[Dict]:
+        return self._query("SELECT * FROM products WHERE category = ? ORDER BY rating DESC", (category,))
+
+    def get_products_by_category_bulk(self, categories: List[str], limit: int = 100) -> Dict[str, List[Dict]]:
+        return {
+            category: self._query(
+                "SELECT * FROM products WHERE category = ? ORDER BY sold_count DESC LIMIT ?", (category, limit))
+            for category in categories
+        }
+
+    def get_popular_searches(self, limit: int = 10) -> List[Dict]:
+        return self.search_rollups.popular(limit)
+
+    def get_search_stats(self, days: int = 7, limit: int = 10) -> Dict[str, Any]:
+        return self.search_rollups.stats(days, limit)
+
+    def get_categories(self) -> List[str]:
+        rows = self._query("SELECT DISTINCT category FROM products WHERE category IS NOT NULL AND category != ''")
+        return sorted(row['category'] for row in rows)
+
+    def get_categories_with_stats(self) -> List[Dict[str, Any]]:
+        rows = self._query("""
+            SELECT COALESCE(NULLIF(category, ''), 'อื่นๆ') AS name,
+                   COUNT(*) AS product_count,
+                   COALESCE(SUM(sold_count), 0) AS total_sold,
+                   COALESCE(AVG(price), 0) AS avg_price,
+                   COALESCE(AVG(CASE WHEN rating > 0 THEN rating END), 0) AS avg_rating
+            FROM products GROUP BY name
+        """)
+        for stats in rows:
+            stats['popularity_score'] = popularity_score(stats['product_count'], stats['total_sold'],
+                                                         stats['avg_rating'])
+        rows.sort(key=lambda x: x['popularity_score'], reverse=True)
+        return rows
+
+    def get_price_range(self) -> Dict[str, float]:
+        with self.lock:
+            low, high = self.connection.execute("SELECT MIN(price), MAX(price) FROM products").fetchone()
+        return {"min_price": float(low or 0), "max_price": float(high or 0)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        try:
+            categories = self.get_categories()
+            return {
+                'total_products': self.count(),
+                'total_searches': self.search_rollups.totals()['searches'],
+                'average_price': round(self._scalar("SELECT COALESCE(AVG(price), 0) FROM products"), 2),
+                'database_type': 'SQLite',
+                'categories_count': len(categories),
+                'categories': categories[:10],
+                'price_range': self.get_price_range()
+            }
+        except Exception as e:
+            self.logger.error(f"Error getting stats: {e}")
+            return {'error': str(e)}
+
+    def get_low_stock_products(self, threshold: int = 10) -> List[Dict]:
+        return self._query("SELECT * FROM products WHERE sold_count <= ? ORDER BY sold_count ASC LIMIT 50",
+                           (threshold,))
+
+    def get_top_products_by_metric(self, metric: str = 'sold_count', limit: int = 10) -> List[Dict]:
+        if metric not in TOP_METRICS:
+            metric = 'sold_count'
+        return self._query(f"SELECT * FROM products ORDER BY {metric} DESC LIMIT ?", (limit,))
+
+    def get_product_codes_by_prefix(self, prefix: str) -> List[str]:
+        # LIKE ของ SQLite ไม่สนตัวพิมพ์เล็ก/ใหญ่ ต่างจาก like ของ PostgREST จึงเทียบ prefix ตรงๆ
+        rows = self._query("SELECT product_code FROM products WHERE substr(product_code, 1, ?) = ?",
+                           (len(prefix), prefix))
+        return [row['product_code'] for row in rows]
+
+
+class InMemoryProductStore(ProductChangeNotifier):
+    """แคตตาล็อกสินค้าในหน่วยความจำแบบคอลัมน์ (ProductTable) - สำหรับทดสอบและ benchmark (ข้อมูลหายเมื่อปิดโปรแกรม)
+
+    การเขียนเก็บไว้ใน overlay (product_code -> แถว หรือ None เมื่อถูกลบ) แล้วรวมเข้าตารางครั้งเดียว
+    เมื่อมีการอ่านที่ต้องสแกนทั้งแคตตาล็อก จึงไม่ต้องสร้างตารางใหม่ทุกครั้งที่เขียน (เช่นระหว่าง bulk import)
+    """
+
+    engine = 'memory'
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.connected = True
+        self.lock = threading.RLock()
+        self._table = ProductTable.from_rows([])
+        self._overlay: Dict[str, Optional[Dict]] = {}
+        # log การค้นหาไม่เก็บแถวดิบ - นับเข้า rollup ใน SQLite ':memory:' โดยตรง
+        self.search_rollups = SearchRollups(sqlite3.connect(':memory:', check_same_thread=False), self.lock)
+        self._next_id = 1
+
+    def load_products(self, products: List[Dict]) -> int:
+        """โหลดแคตตาล็อกทั้งชุด (ทดสอบ/benchmark)"""
+        with self.lock:
+            for product in products:
+                row = {column: product.get(column) for column in PRODUCT_COLUMNS}
+                row['id'] = row['id'] or self._next_id
+                self._next_id = max(self._next_id, row['id']) + 1
+                self._overlay[row['product_code']] = row
+            self._compact()
+        return len(products)
+
+    @property
+    def table(self) -> ProductTable:
+        """ตารางคอลัมน์ล่าสุด (immutable) สำหรับโค้ดที่ต้องการกรอง/เรียงแบบ vectorized เอง"""
+        return self._compact()
+
+    def _compact(self) -> ProductTable:
+        """รวม overlay เข้าตาราง"""
+        with self.lock:
+            if self._overlay:
+                table = self._table
+                keep = np.ones(len(table), dtype=bool)
+                for code in self._overlay:
+                    index = table.index_of(code)
+                    if index is not None:
+                        keep[index] = False
+                changed = ProductTable.from_rows([row for row in self._overlay.values() if row])
+                self._table = table.take(np.flatnonzero(keep)).concat(changed)
+                self._overlay = {}
+            return self._table
+
+    def _get(self, product_code: str) -> Optional[Dict]:
+        """อ่านสินค้ารายตัวโดยไม่ต้องรวม overlay (ใช้ดัชนีรหัสของตาราง)"""
+        with self.lock:
+            if product_code in self._overlay:
+                row = self._overlay[product_code]
+                return dict(row) if row else None
+            index = self._table.index_of(product_code)
+            return self._table.row(index).to_dict() if index is not None else None
+
+    def count(self) -> int:
+        return len(self._compact())
+
+    # ===== การเขียน =====
+
+    def add_product(self, product_data: Dict[str, Any]) -> Optional[Dict]:
+        """เพิ่มสินค้าใหม่"""
+        try:
+            data = build_product_record(product_data)
+            with self.lock:
+                if self._get(data['product_code']):
+                    raise ValueError(f"duplicate product_code {data['product_code']}")
+                data['id'] = self._next_id
+                data['created_at'] = data['updated_at'] = datetime.now().isoformat()
+                self._next_id += 1
+                self._overlay[data['product_code']] = data
+
+            self.logger.info(f"Added product: {data['product_name']}")
+            self._notify_change('add', data['product_code'], dict(data))
+            return dict(data)
+
+        except Exception as e:
+            self.logger.error(f"Error adding product: {e}")
+            return None
+
+    def update_product(self, product_code: str, update_data: Dict) -> bool:
+        """อัปเดตข้อมูลสินค้า"""
+        with self.lock:
+            current = self._get(product_code)
+            if not current:
+                return False
+            current.update(_prepare_update(update_data, current))
+            self._overlay[product_code] = current
+        self._notify_change('update', product_code, dict(current))
+        return True
+
+    def delete_product(self, product_code: str) -> bool:
+        """ลบสินค้า"""
+        with self.lock:
+            if not self._get(product_code):
+                return False
+            self._overlay[product_code] = None
+        self._notify_change('delete', product_code)
+        return True
+
+    def bulk_update_products(self, product_codes: List[str], update_data: Dict[str, Any]) -> Dict[str, Any]:
+        """อัปเดตสินค้าหลายรายการพร้อมกัน"""
+        updated = [code for code in product_codes if self.update_product(code, dict(update_data))]
+        if 'price' in update_data or 'commission_rate' in update_data:
+            return {"success": True, "updated_count": len(updated), "updated_codes": updated}
+        return {"success": True, "updated_count": len(updated), "message": f"Updated {len(updated)} products"}
+
+    def bulk_delete_products(self, product_codes: List[str]) -> Dict[str, Any]:
+        """ลบสินค้าหลายรายการพร้อมกัน"""
+        deleted = sum(1 for code in product_codes if self.delete_product(code))
+        return {"success": True, "deleted_count": deleted, "message": f"Deleted {deleted} products"}
+
+    def log_search(self, query: str, result_count: int, user_id: str = None) -> bool:
+        """บันทึกการค้นหา"""
+        if not search_logging_enabled():
+            return False
+        self.search_rollups.record(query, result_count)
+        return True
+
+    # ===== การอ่าน =====
+
+    def search_products(self, query: str, limit: int = 5, offset: int = 0, category: str = None,
+                        min_price: float = None, max_price: float = None, order_by: str = 'created_at') -> Dict:
+        """ค้นหาสินค้าพร้อม pagination และ filtering"""
+        table = self._compact()
+        matches = np.flatnonzero(table.filter(query, category=category, min_price=min_price, max_price=max_price))
+        ordered = table.order(matches, SEARCH_ORDERING.get(order_by, DEFAULT_ORDERING))
+        products = table.to_dicts(ordered[offset:offset + limit])
+        self.log_search(query, len(products))
+
+        return {
+            "products": products,
+            "total": len(matches),
+            "has_more": (offset + limit) < len(matches),
+            "current_offset": offset,
+            "limit": limit
+        }
+
+    def get_product_by_code(self, product_code: str) -> Optional[Dict]:
+        return self._get(product_code)
+
+    def get_products_by_codes(self, product_codes: List[str]) -> List[Dict]:
+        return [row for row in map(self._get, product_codes) if row]
+
+    def get_all_products(self, limit: int = 100) -> List[Dict]:
+        table = self._compact()
+        return table.to_dicts(table.top_k('created_at', limit))
+
+    def get_products_page(self, after: str = None, limit: int = 500, updated_since: str = None) -> List[Dict]:
+        table = self._compact()
+        mask = table.at_least('updated_at', updated_since) if updated_since else None
+        return table.to_dicts(table.page_after('product_code', after, limit, mask))
+
+    def get_products_by_category(self, category: str) -> List[Dict]:
+        table = self._compact()
+        matches = np.flatnonzero(table.filter(category=category))
+        return table.to_dicts(table.order(matches, [('rating', True)]))
+
+    def get_products_by_category_bulk(self, categories: List[str], limit: int = 100) -> Dict[str, List[Dict]]:
+        table = self._compact()
+        return {
+            category: table.to_dicts(table.top_k('sold_count', limit, np.flatnonzero(table.filter(category=category))))
+            for category in categories
+        }
+
+    def get_popular_searches(self, limit: int = 10) -> List[Dict]:
+        return self.search_rollups.popular(limit)
+
+    def get_search_stats(self, days: int = 7, limit: int = 10) -> Dict[str, Any]:
+        return self.search_rollups.stats(days, limit)
+
+    def get_categories(self) -> List[str]:
+        return self._compact().categories()
+
+    def get_categories_with_stats(self) -> List[Dict[str, Any]]:
+        categories_with_stats = self._compact().category_stats(missing_name='อื่นๆ')
+        for stats in categories_with_stats:
+            stats['popularity_score'] = popularity_score(stats['product_count'], stats['total_sold'],
+                                                         stats['avg_rating'])
+        categories_with_stats.sort(key=lambda x: x['popularity_score'], reverse=True)
+        return categories_with_stats
+
+    def get_price_range(self) -> Dict[str, float]:
+        prices = self._compact().floats['price']
+        if not len(prices) or np.isnan(prices).all():
+            return {"min_price": 0.0, "max_price": 0.0}
+        return {"min_price": float(np.nanmin(prices)), "max_price": float(np.nanmax(prices))}
+
+    def get_stats(self) -> Dict[str, Any]:
+        table = self._compact()
+        prices = table.floats['price']
+        categories = table.categories()
+        return {
+            'total_products': len(table),
+            'total_searches': self.search_rollups.totals()['searches'],
+            'average_price': round(float(np.nanmean(prices)), 2) if len(prices) else 0,
+            'database_type': 'In-memory',
+            'categories_count': len(categories),
+            'categories': categories[:10],
+            'price_range': self.get_price_range()
+        }
+
+    def get_low_stock_products(self, threshold: int = 10) -> List[Dict]:
+        table = self._compact()
+        matches = np.flatnonzero(table.filter(max_sold=threshold))
+        return table.to_dicts(table.top_k('sold_count', 50, matches, desc=False))
+
+    def get_top_products_by_metric(self, metric: str = 'sold_count', limit: int = 10) -> List[Dict]:
+        if metric not in TOP_METRICS:
+            metric = 'sold_count'
+        table = self._compact()
+        return table.to_dicts(table.top_k(metric, limit))
+
+    def get_product_codes_by_prefix(self, prefix: str) -> List[str]:
+        return [code for code in self._compact().codes.decode_all() if code.startswith(prefix)]
+
+
+def _timed_methods(cls):
+    """จับเวลาทุกเมธอดของ engine ในเครื่อง (/metrics) เหมือน @instrumented ของ SupabaseDatabase"""
+    timed = metrics.timed('product_store_request_duration_seconds', 'Latency of local product store calls by method')
+    for name in STORE_METHODS:
+        setattr(cls, name, timed(getattr(cls, name)))
+    return cls
+
+
+_timed_methods(SQLiteProductStore)
+_timed_methods(InMemoryProductStore)
+
+LOCAL_ENGINES = {
+    'sqlite': SQLiteProductStore,
+    'memory': InMemoryProductStore,
+}
+_local_stores: Dict[str, ProductStore] = {}
+_local_lock = threading.Lock()
+
+
+def create_product_store(engine: str = None) -> ProductStore:
+    """สร้าง store ตาม PRODUCT_STORE_ENGINE (supabase | sqlite | memory)
+
+    engine ในเครื่องใช้ instance เดียวทั้ง process เพื่อให้ทุกโมดูลเห็นข้อมูลชุดเดียวกัน
+    """
+    engine = (engine or config.PRODUCT_STORE_ENGINE or 'supabase').lower()
+
+    if engine in LOCAL_ENGINES:
+        with _local_lock:
+            if engine not in _local_stores:
+                _local_stores[engine] = LOCAL_ENGINES[engine]()
+            return _local_stores[engine]
+
+    if engine != 'supabase':
+        logging.getLogger(__name__).error(f"Unknown PRODUCT_STORE_ENGINE '{engine}', using supabase")
+
+    from .supabase_database import SupabaseDatabase
+    return SupabaseDatabase()
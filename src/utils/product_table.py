@@ -0,0 +1,483 @@
+"""
+📁 src/utils/product_table.py
+🎯 แคตตาล็อกสินค้าแบบคอลัมน์ (columnar) ในหน่วยความจำ
+ตัวเลขเก็บเป็น NumPy array, หมวดหมู่/ร้านเก็บเป็นรหัสตัวเลข + รายชื่อ, ข้อความเก็บเป็น UTF-8 buffer ก้อนเดียว
+แทน list ของ dict ต่อสินค้า - กรอง/เรียง/top-K แบบ vectorized และใช้หน่วยความจำน้อยกว่าหลายเท่า
+"""
+
+import bisect
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+PRODUCT_COLUMNS = [
+    'id', 'product_code', 'product_name', 'price', 'sold_count', 'shop_name',
+    'commission_rate', 'commission_amount', 'product_link', 'offer_link', 'category',
+    'description', 'image_url', 'rating', 'created_at', 'updated_at'
+]
+FLOAT_COLUMNS = ('price', 'commission_rate', 'commission_amount', 'rating')
+INT_COLUMNS = ('id', 'sold_count')
+CATEGORICAL_COLUMNS = ('category', 'shop_name')
+STRING_COLUMNS = ('product_code', 'product_name', 'product_link', 'offer_link', 'description',
+                  'image_url', 'created_at', 'updated_at')
+SEARCH_FIELDS = ('product_name', 'description', 'category')
+
+NULL_INT = np.iinfo(np.int64).min
+ROW_SEPARATOR = b'\x00'
+FIELD_SEPARATOR = '\x1f'
+
+
+class StringColumn:
+    """ข้อความหลายแถวใน bytes ก้อนเดียว + offsets (ไม่มี object ของ Python ต่อแถว)"""
+
+    __slots__ = ('buffer', 'offsets', 'nulls')
+
+    def __init__(self, values: Sequence[Optional[str]], separator: bytes = b''):
+        encoded = [(value or '').encode('utf-8') + separator for value in values]
+        nulls = np.array([value is None for value in values], dtype=bool) if None in values else None
+        self._assign(encoded, nulls)
+
+    def _assign(self, encoded: List[bytes], nulls: Optional[np.ndarray]):
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+        self.buffer = b''.join(encoded)
+        self.nulls = nulls if nulls is not None and nulls.any() else None
+
+    def _slices(self, indices: Iterable[int]) -> List[bytes]:
+        buffer, offsets = self.buffer, self.offsets.tolist()
+        return [buffer[offsets[i]:offsets[i + 1]] for i in indices]
+
+    def _null_mask(self) -> np.ndarray:
+        return self.nulls if self.nulls is not None else np.zeros(len(self), dtype=bool)
+
+    def take(self, indices: np.ndarray) -> 'StringColumn':
+        """คอลัมน์ใหม่เฉพาะแถว indices (คัดลอก bytes โดยไม่ decode)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        lengths = self.offsets[indices + 1] - self.offsets[indices]
+        column = StringColumn.__new__(StringColumn)
+        column.offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=column.offsets[1:])
+        # คัดลอกเป็นช่วงของแถวที่ติดกัน (การรวม overlay ตัดออกเพียงไม่กี่แถว จึงมีไม่กี่ช่วง)
+        if len(indices):
+            breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+            run_starts = indices[np.concatenate([[0], breaks])].tolist()
+            run_ends = (indices[np.concatenate([breaks - 1, [len(indices) - 1]])] + 1).tolist()
+            offsets = self.offsets
+            column.buffer = b''.join(self.buffer[offsets[a]:offsets[b]] for a, b in zip(run_starts, run_ends))
+        else:
+            column.buffer = b''
+        nulls = self.nulls[indices] if self.nulls is not None else None
+        column.nulls = nulls if nulls is not None and nulls.any() else None
+        return column
+
+    def concat(self, other: 'StringColumn') -> 'StringColumn':
+        column = StringColumn.__new__(StringColumn)
+        column.buffer = self.buffer + other.buffer
+        column.offsets = np.concatenate([self.offsets, other.offsets[1:] + self.offsets[-1]])
+        nulls = None
+        if self.nulls is not None or other.nulls is not None:
+            nulls = np.concatenate([self._null_mask(), other._null_mask()])
+        column.nulls = nulls
+        return column
+
+    def values(self, indices: Iterable[int]) -> List[Optional[str]]:
+        indices = list(indices)
+        values = [item.decode('utf-8') for item in self._slices(indices)]
+        if self.nulls is not None:
+            values = [None if self.nulls[i] else value for i, value in zip(indices, values)]
+        return values
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if self.nulls is not None and self.nulls[index]:
+            return None
+        return self.buffer[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+    def decode_all(self) -> List[Optional[str]]:
+        return self.values(range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.buffer) + self.offsets.nbytes + (self.nulls.nbytes if self.nulls is not None else 0)
+
+
+class SearchIndex:
+    """ข้อความค้นหาตัวพิมพ์เล็กของทุกแถวต่อกันเป็น bytes ก้อนเดียว ค้นหา substring ด้วย bytes.find (ทำงานใน C)"""
+
+    __slots__ = ('column',)
+
+    def __init__(self, texts: Sequence[str], column: StringColumn = None):
+        # คั่นแต่ละแถวด้วย \x00 เพื่อไม่ให้คำที่ค้นหาคร่อมสองแถว
+        if column is None:
+            column = StringColumn([text.lower() for text in texts], separator=ROW_SEPARATOR)
+        self.column = column
+
+    def take(self, indices: np.ndarray) -> 'SearchIndex':
+        return SearchIndex((), self.column.take(indices))
+
+    def concat(self, other: 'SearchIndex') -> 'SearchIndex':
+        return SearchIndex((), self.column.concat(other.column))
+
+    def matches(self, needle: str) -> np.ndarray:
+        """index ของแถวที่มี needle (ไม่สนตัวพิมพ์เล็ก/ใหญ่) เรียงจากน้อยไปมาก"""
+        pattern = needle.lower().encode('utf-8')
+        if not pattern:
+            return np.arange(len(self.column))
+
+        buffer, offsets = self.column.buffer, self.column.offsets
+        rows = []
+        position = buffer.find(pattern)
+        while position != -1:
+            row = int(offsets.searchsorted(position, side='right')) - 1
+            rows.append(row)
+            # แถวนี้ตรงแล้ว ข้ามไปค้นต่อที่แถวถัดไป
+            position = buffer.find(pattern, int(offsets[row + 1]))
+        return np.asarray(rows, dtype=np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        return self.column.nbytes
+
+
+class ProductRow(Mapping):
+    """มุมมองของสินค้าหนึ่งแถว (อ่านอย่างเดียว ไม่คัดลอกข้อมูล) ใช้แทน dict ได้ในโค้ดที่อ่านค่า"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'ProductTable', index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str):
+        return self._table.value(key, self._index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(PRODUCT_COLUMNS)
+
+    def __len__(self) -> int:
+        return len(PRODUCT_COLUMNS)
+
+    def to_dict(self) -> Dict:
+        return {column: self._table.value(column, self._index) for column in PRODUCT_COLUMNS}
+
+    def __repr__(self) -> str:
+        return f"ProductRow({self._table.value('product_code', self._index)!r})"
+
+
+class ProductTable:
+    """ตารางสินค้าแบบคอลัมน์ (immutable) สร้างจาก list ของ dict ด้วย from_rows()"""
+
+    def __init__(self, floats: Dict[str, np.ndarray], ints: Dict[str, np.ndarray],
+                 categorical: Dict[str, Tuple[np.ndarray, List[str]]], strings: Dict[str, StringColumn],
+                 search: SearchIndex):
+        self.floats = floats
+        self.ints = ints
+        self.categorical = categorical
+        self.strings = strings
+        self.search_index = search
+        self.codes = strings['product_code']
+        self._code_index: Optional[Dict[str, int]] = None
+        self._ranks: Dict[str, np.ndarray] = {}
+        self._sorted: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict]) -> 'ProductTable':
+        rows = list(rows)
+        count = len(rows)
+
+        # None ใน array ชนิด float กลายเป็น NaN อัตโนมัติ
+        floats = {column: np.array([row.get(column) for row in rows], dtype=np.float64) for column in FLOAT_COLUMNS}
+        ints = {}
+        for column in INT_COLUMNS:
+            values = [row.get(column) for row in rows]
+            if None in values:
+                values = [NULL_INT if value is None else value for value in values]
+            ints[column] = np.array(values, dtype=np.int64)
+
+        categorical = {}
+        for column in CATEGORICAL_COLUMNS:
+            # ค่าซ้ำกันมาก (หมวดหมู่ ~10 ค่า, ร้าน ~ร้อยค่า) เก็บเป็นรหัส int32 + รายชื่อครั้งเดียว
+            vocabulary: Dict[str, int] = {}
+            codes = np.fromiter(
+                (-1 if row.get(column) is None else vocabulary.setdefault(row[column], len(vocabulary))
+                 for row in rows), dtype=np.int32, count=count)
+            categorical[column] = (codes, list(vocabulary))
+
+        strings = {column: StringColumn([row.get(column) for row in rows]) for column in STRING_COLUMNS}
+        search = SearchIndex([
+            FIELD_SEPARATOR.join(str(row.get(field) or '') for field in SEARCH_FIELDS) for row in rows
+        ])
+        return cls(floats, ints, categorical, strings, search)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    # ===== การอ่านค่า =====
+
+    def value(self, column: str, index: int):
+        """ค่าของคอลัมน์ในแถว index (เป็นชนิดของ Python เหมือนที่ PostgREST ส่งมา)"""
+        if column in self.floats:
+            value = self.floats[column][index]
+            return None if np.isnan(value) else float(value)
+        if column in self.ints:
+            value = self.ints[column][index]
+            return None if value == NULL_INT else int(value)
+        if column in self.categorical:
+            codes, vocabulary = self.categorical[column]
+            code = codes[index]
+            return None if code < 0 else vocabulary[code]
+        if column in self.strings:
+            return self.strings[column][index]
+        raise KeyError(column)
+
+    def row(self, index: int) -> ProductRow:
+        return ProductRow(self, int(index))
+
+    def rows(self, indices: Iterable[int]) -> List[ProductRow]:
+        return [ProductRow(self, int(index)) for index in indices]
+
+    def column_list(self, column: str, indices: Sequence[int]) -> List:
+        """ค่าของคอลัมน์ในแถว indices เป็น list ของ Python (แปลงทั้งคอลัมน์ครั้งเดียว)"""
+        if column in self.floats:
+            values = self.floats[column][indices]
+            return [None if value != value else value for value in values.tolist()]
+        if column in self.ints:
+            return [None if value == NULL_INT else value for value in self.ints[column][indices].tolist()]
+        if column in self.categorical:
+            codes, vocabulary = self.categorical[column]
+            lookup = vocabulary + [None]  # code -1 = None
+            return [lookup[code] for code in codes[indices].tolist()]
+        if column in self.strings:
+            return self.strings[column].values(indices)
+        raise KeyError(column)
+
+    def to_dicts(self, indices: Iterable[int] = None) -> List[Dict]:
+        """คัดลอกเป็น dict (สำหรับผลลัพธ์ที่ผู้เรียกจะแก้ไขต่อ)"""
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices, dtype=np.int64)
+        columns = [self.column_list(column, indices) for column in PRODUCT_COLUMNS]
+        return [dict(zip(PRODUCT_COLUMNS, values)) for values in zip(*columns)]
+
+    def take(self, indices: np.ndarray) -> 'ProductTable':
+        """ตารางใหม่เฉพาะแถว indices (ไม่ผ่าน dict)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        return ProductTable(
+            {column: values[indices] for column, values in self.floats.items()},
+            {column: values[indices] for column, values in self.ints.items()},
+            {column: (codes[indices], vocabulary) for column, (codes, vocabulary) in self.categorical.items()},
+            {column: values.take(indices) for column, values in self.strings.items()},
+            self.search_index.take(indices))
+
+    def concat(self, other: 'ProductTable') -> 'ProductTable':
+        """ต่อแถวของ other ท้ายตารางนี้ (รวมรายชื่อหมวดหมู่/ร้านและแปลงรหัสของ other)"""
+        categorical = {}
+        for column, (codes, vocabulary) in self.categorical.items():
+            other_codes, other_vocabulary = other.categorical[column]
+            merged = {name: code for code, name in enumerate(vocabulary)}
+            remap = np.array([merged.setdefault(name, len(merged)) for name in other_vocabulary] + [-1],
+                             dtype=np.int32)
+            categorical[column] = (np.concatenate([codes, remap[other_codes]]), list(merged))
+        return ProductTable(
+            {column: np.concatenate([values, other.floats[column]]) for column, values in self.floats.items()},
+            {column: np.concatenate([values, other.ints[column]]) for column, values in self.ints.items()},
+            categorical,
+            {column: values.concat(other.strings[column]) for column, values in self.strings.items()},
+            self.search_index.concat(other.search_index))
+
+    def index_of(self, product_code: str) -> Optional[int]:
+        if self._code_index is None:
+            self._code_index = {code: i for i, code in enumerate(self.codes.decode_all())}
+        return self._code_index.get(product_code)
+
+    def column_values(self, column: str) -> np.ndarray:
+        """array ของคอลัมน์ตัวเลข (ใช้ร่วมกับ mask/indices)"""
+        if column in self.floats:
+            return self.floats[column]
+        if column in self.ints:
+            return self.ints[column]
+        raise KeyError(f"{column} is not a numeric column")
+
+    # ===== กรอง =====
+
+    def category_code(self, category: str) -> Optional[int]:
+        codes, vocabulary = self.categorical['category']
+        try:
+            return vocabulary.index(category)
+        except ValueError:
+            return None
+
+    def filter(self, query: str = None, category: str = None, min_price: float = None,
+               max_price: float = None, min_rating: float = None, max_sold: int = None) -> np.ndarray:
+        """boolean mask ของแถวที่ตรงทุกเงื่อนไข"""
+        mask = np.ones(len(self), dtype=bool)
+        if category:
+            code = self.category_code(category)
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            mask &= self.categorical['category'][0] == code
+        price = self.floats['price']
+        if min_price is not None:
+            mask &= price >= min_price
+        if max_price is not None:
+            mask &= price <= max_price
+        if min_rating is not None:
+            mask &= self.floats['rating'] >= min_rating
+        if max_sold is not None:
+            sold = self.ints['sold_count']
+            mask &= (sold != NULL_INT) & (sold <= max_sold)
+        if query:
+            matched = np.zeros(len(self), dtype=bool)
+            matched[self.search_index.matches(query)] = True
+            mask &= matched
+        return mask
+
+    # ===== เรียงลำดับ =====
+
+    def _rank(self, column: str) -> np.ndarray:
+        """อันดับของค่าข้อความตามลำดับ code point (เท่ากับ BINARY collation ของ SQLite) - None เป็น NaN"""
+        rank = self._ranks.get(column)
+        if rank is not None:
+            return rank
+
+        if column in self.categorical:
+            codes, vocabulary = self.categorical[column]
+            order = sorted(range(len(vocabulary)), key=vocabulary.__getitem__)
+            vocabulary_rank = np.empty(len(vocabulary) + 1, dtype=np.float64)
+            vocabulary_rank[order] = np.arange(len(vocabulary))
+            vocabulary_rank[-1] = np.nan  # code -1 (None)
+            rank = vocabulary_rank[codes]
+        else:
+            values = self.strings[column].decode_all()
+            present = [i for i, value in enumerate(values) if value is not None]
+            present.sort(key=values.__getitem__)
+            rank = np.full(len(values), np.nan)
+            rank[present] = np.arange(len(present))
+        self._ranks[column] = rank
+        return rank
+
+    def _sort_key(self, column: str, desc: bool, indices: np.ndarray) -> np.ndarray:
+        if column in self.floats:
+            values = self.floats[column][indices]
+        elif column in self.ints:
+            raw = self.ints[column][indices]
+            values = np.where(raw == NULL_INT, np.nan, raw.astype(np.float64))
+        else:
+            values = self._rank(column)[indices]
+        # ค่าว่าง (NaN) อยู่ท้ายเสมอ ทั้งเรียงขึ้นและลง
+        values = -values if desc else values.copy()
+        values[np.isnan(values)] = np.inf
+        return values
+
+    def order(self, indices: np.ndarray, ordering: Sequence[Tuple[str, bool]]) -> np.ndarray:
+        """เรียง indices ตาม [(คอลัมน์, มากไปน้อย)] (stable - ค่าเท่ากันคงลำดับเดิม)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) < 2 or not ordering:
+            return indices
+        # lexsort ใช้ key ตัวสุดท้ายเป็นหลัก
+        keys = [self._sort_key(column, desc, indices) for column, desc in reversed(ordering)]
+        return indices[np.lexsort(keys)]
+
+    def top_k(self, column: str, k: int, indices: np.ndarray = None, desc: bool = True) -> np.ndarray:
+        """k แถวแรกตามคอลัมน์ตัวเลข ด้วย argpartition (O(n)) แล้วเรียงเฉพาะ k แถว"""
+        if indices is None:
+            indices = np.arange(len(self))
+        indices = np.asarray(indices, dtype=np.int64)
+        if k <= 0 or len(indices) == 0:
+            return indices[:0]
+        keys = self._sort_key(column, desc, indices)
+        if k < len(indices):
+            candidates = np.argpartition(keys, k - 1)[:k]
+            candidates = candidates[np.lexsort((candidates, keys[candidates]))]
+        else:
+            candidates = np.lexsort((np.arange(len(indices)), keys))
+        return indices[candidates]
+
+    # ===== keyset pagination =====
+
+    def _sorted_indices(self, column: str) -> np.ndarray:
+        """indices ของแถวที่คอลัมน์ข้อความไม่ว่าง เรียงตามค่า (cache ต่อคอลัมน์)"""
+        order = self._sorted.get(column)
+        if order is None:
+            rank = self._rank(column)
+            present = np.flatnonzero(~np.isnan(rank))
+            order = present[np.argsort(rank[present], kind='stable')]
+            self._sorted[column] = order
+        return order
+
+    def _bisect(self, column: str, value: str, right: bool) -> int:
+        """ตำแหน่งของ value ใน _sorted_indices(column) (ถอดรหัสเพียง O(log n) ค่า)"""
+        order = self._sorted_indices(column)
+        values = self.strings[column]
+        search = bisect.bisect_right if right else bisect.bisect_left
+        return search(range(len(order)), value, key=lambda position: values[int(order[position])])
+
+    def at_least(self, column: str, value: str) -> np.ndarray:
+        """boolean mask ของแถวที่คอลัมน์ข้อความ >= value (เช่น updated_at ตั้งแต่เวลาหนึ่ง)"""
+        order = self._sorted_indices(column)
+        mask = np.zeros(len(self), dtype=bool)
+        mask[order[self._bisect(column, value, right=False):]] = True
+        return mask
+
+    def page_after(self, column: str, after: Optional[str], limit: int, mask: np.ndarray = None) -> np.ndarray:
+        """limit แถวแรกที่คอลัมน์ > after เรียงตามคอลัมน์นั้น (after=None = เริ่มต้น)"""
+        order = self._sorted_indices(column)
+        candidates = order if after is None else order[self._bisect(column, after, right=True):]
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+        return candidates[:limit]
+
+    # ===== สถิติ =====
+
+    def category_stats(self, missing_name: str = None) -> List[Dict]:
+        """จำนวน, ยอดขายรวม, ราคาเฉลี่ย, คะแนนเฉลี่ย (เฉพาะที่ > 0) ต่อหมวดหมู่ ด้วย bincount
+
+        หมวดหมู่ว่าง ('' หรือ None) รวมอยู่ในชื่อ missing_name
+        """
+        codes, vocabulary = self.categorical['category']
+        names = [name or missing_name for name in vocabulary] + [missing_name]
+        # รวมรหัสที่ได้ชื่อเดียวกัน แล้วนับด้วย bincount ครั้งเดียวต่อคอลัมน์
+        slot_of_name: Dict[Optional[str], int] = {}
+        slot_of_code = np.array([slot_of_name.setdefault(name, len(slot_of_name)) for name in names], dtype=np.int64)
+        slots = slot_of_code[codes]  # code -1 ชี้ไปที่ช่องสุดท้าย (None)
+        size = len(slot_of_name)
+
+        count = np.bincount(slots, minlength=size)
+        sold = self.ints['sold_count']
+        total_sold = np.bincount(slots, weights=np.where(sold == NULL_INT, 0, sold), minlength=size)
+        price_sum = np.bincount(slots, weights=np.nan_to_num(self.floats['price']), minlength=size)
+        rating = np.nan_to_num(self.floats['rating'])
+        rated = rating > 0
+        rating_sum = np.bincount(slots, weights=np.where(rated, rating, 0), minlength=size)
+        rating_count = np.bincount(slots, weights=rated.astype(np.float64), minlength=size)
+
+        stats = []
+        for name, slot in slot_of_name.items():
+            if not count[slot]:
+                continue
+            stats.append({
+                'name': name,
+                'product_count': int(count[slot]),
+                'total_sold': int(total_sold[slot]),
+                'avg_price': float(price_sum[slot] / count[slot]),
+                'avg_rating': float(rating_sum[slot] / rating_count[slot]) if rating_count[slot] else 0.0
+            })
+        return stats
+
+    def categories(self) -> List[str]:
+        codes, vocabulary = self.categorical['category']
+        present = np.unique(codes[codes >= 0])
+        return sorted(vocabulary[code] for code in present if vocabulary[code])
+
+    @property
+    def nbytes(self) -> int:
+        """หน่วยความจำโดยประมาณของตาราง (ไม่รวมดัชนีรหัสสินค้า)"""
+        total = sum(array.nbytes for array in self.floats.values())
+        total += sum(array.nbytes for array in self.ints.values())
+        total += sum(codes.nbytes + sum(sys.getsizeof(name) for name in vocabulary)
+                     for codes, vocabulary in self.categorical.values())
+        total += sum(column.nbytes for column in self.strings.values())
+        return total + self.search_index.nbytes
@@ -7,6 +7,41 @@ import random
 from typing import Dict, List
 from datetime import datetime
 
+from .template_engine import compile_template
+
+# โครงข้อความของแต่ละสไตล์ (คอมไพล์ครั้งเดียวตอนโหลดโมดูล)
+CASUAL_TEMPLATE = compile_template("""{opening} 😊
+
+📦 {short_name}
+💰 {price:,.0f} บาท - {price_desc}
+✨ {benefit}{shop_desc}{stats}
+
+{ending}
+
+{hashtags}""")
+
+ENTHUSIASTIC_TEMPLATE = compile_template("""🔥 เจอของดีมาแชร์! 🔥
+
+✨ {short_name} ✨
+💸 ราคาเพียง {price:,.0f} บาท!
+
+👍 {benefit}
+🏪 ร้าน {shop} มีคนซื้อเยอะมาก!{extras}
+
+🛒 ใครกำลังหาอยู่ต้องลอง!
+💕 รับรองไม่ผิดหวัง!
+
+{hashtags}""")
+
+INFORMATIVE_TEMPLATE = compile_template("""📋 รีวิวสินค้า: {short_name}
+
+📊 ข้อมูลสินค้า:
+• ราคา: {price:,.0f} บาท
+• ร้านค้า: {shop}{extras}
+
+📝 สรุป: {price_desc}
+{ending}""")
+
 class PromotionGenerator:
     """คลาสสำหรับสร้างคำโปรโมตสินค้าอัตโนมัติ"""
     
@@ -91,6 +126,26 @@ class PromotionGenerator:
             "#ใช้ดีแนะนำ", "#คุณภาพดี", "#ราคาดี",
             "#shopee", "#ช้อปปี้", "#ซื้อของออนไลน์"
         ]
+        
+        # map หมวดหมู่สินค้า -> รายการข้อดี (คำนวณไว้ล่วงหน้า)
+        category_map = {
+            'สัตว์เลี้ยง': 'อาหารแมว',
+            'ความงาม': 'ความงาม',
+            'สุขภาพ': 'สุขภาพ',
+            'อิเล็กทรอนิกส์': 'อิเล็กทรอนิกส์'
+        }
+        self.default_benefits = self.product_benefits['อาหารแมว']
+        self.category_benefits = {
+            category: self.product_benefits.get(key, self.default_benefits)
+            for category, key in category_map.items()
+        }
+        
+        # ข้อดีลำดับรอง (ไม่รวมข้อแรก) สำหรับสไตล์ informative
+        self.default_secondary_benefits = self.default_benefits[1:]
+        self.category_secondary_benefits = {
+            category: [b for b in benefits if b != benefits[0]]
+            for category, benefits in self.category_benefits.items()
+        }
 
     def generate_promotion(self, product: Dict, style: str = "casual") -> str:
         """สร้างคำโปรโมตสินค้า
@@ -121,18 +176,8 @@ class PromotionGenerator:
     def _generate_casual_promotion(self, name: str, price: float, shop: str, rating: float, sold: int, category: str) -> str:
         """สร้างโปรโมตแบบสบายๆ เป็นธรรมชาติ"""
         
-        # เลือกคำเปิด
-        opening = random.choice(self.natural_openings)
-        
-        # สร้างชื่อสินค้า (ย่อให้อ่านง่าย)
-        short_name = self._shorten_product_name(name)
-        
         # เลือกข้อดี
         benefits = self._get_category_benefits(category)
-        benefit = random.choice(benefits) if benefits else "คุณภาพดี ใช้ได้จริง"
-        
-        # คำอธิบายราคา
-        price_desc = random.choice(self.price_phrases)
         
         # ข้อมูลร้านค้า (ถ้ามี)
         shop_desc = ""
@@ -147,81 +192,65 @@ class PromotionGenerator:
             stars = "⭐" * int(rating)
             stats += f" {stars} ({rating})"
         
-        # คำปิดท้าย
-        ending = random.choice(self.natural_endings)
-        
-        # Hashtags
-        hashtags = random.sample(self.natural_hashtags, 3)
-        hashtag_str = " ".join(hashtags)
-        
-        promotion = f"""{opening} 😊
-
-📦 {short_name}
-💰 {price:,.0f} บาท - {price_desc}
-✨ {benefit}{shop_desc}{stats}
-
-{ending}
-
-{hashtag_str}"""
-        
-        return promotion
+        return CASUAL_TEMPLATE.render_values({
+            'opening': random.choice(self.natural_openings),
+            'short_name': self._shorten_product_name(name),
+            'price': price,
+            'price_desc': random.choice(self.price_phrases),
+            'benefit': random.choice(benefits) if benefits else "คุณภาพดี ใช้ได้จริง",
+            'shop_desc': shop_desc,
+            'stats': stats,
+            'ending': random.choice(self.natural_endings),
+            'hashtags': " ".join(random.sample(self.natural_hashtags, 3))
+        })
 
     def _generate_enthusiastic_promotion(self, name: str, price: float, shop: str, rating: float, sold: int, category: str) -> str:
         """สร้างโปรโมตแบบกระตือรือร้น"""
         
-        short_name = self._shorten_product_name(name)
         benefits = self._get_category_benefits(category)
         
-        promotion = f"""🔥 เจอของดีมาแชร์! 🔥
-
-✨ {short_name} ✨
-💸 ราคาเพียง {price:,.0f} บาท!
-
-👍 {random.choice(benefits) if benefits else 'คุณภาพเกินราคา!'}
-🏪 ร้าน {shop} มีคนซื้อเยอะมาก!"""
-
+        extras = ""
         if sold > 5000:
-            promotion += f"\n🔥 ขายดีมาก! ไปแล้วกว่า {self._format_sold_count(sold)}"
+            extras += f"\n🔥 ขายดีมาก! ไปแล้วกว่า {self._format_sold_count(sold)}"
         
         if rating >= 4.5:
-            promotion += f"\n⭐⭐⭐⭐⭐ คะแนน {rating} ดาว!"
-
-        promotion += f"""
-
-🛒 ใครกำลังหาอยู่ต้องลอง!
-💕 รับรองไม่ผิดหวัง!
-
-{' '.join(random.sample(self.natural_hashtags, 4))}"""
+            extras += f"\n⭐⭐⭐⭐⭐ คะแนน {rating} ดาว!"
         
-        return promotion
+        return ENTHUSIASTIC_TEMPLATE.render_values({
+            'short_name': self._shorten_product_name(name),
+            'price': price,
+            'benefit': random.choice(benefits) if benefits else 'คุณภาพเกินราคา!',
+            'shop': shop,
+            'extras': extras,
+            'hashtags': ' '.join(random.sample(self.natural_hashtags, 4))
+        })
 
     def _generate_informative_promotion(self, name: str, price: float, shop: str, rating: float, sold: int, category: str) -> str:
         """สร้างโปรโมตแบบให้ข้อมูล"""
         
-        short_name = self._shorten_product_name(name)
         benefits = self._get_category_benefits(category)
         
-        promotion = f"""📋 รีวิวสินค้า: {short_name}
-
-📊 ข้อมูลสินค้า:
-• ราคา: {price:,.0f} บาท
-• ร้านค้า: {shop}"""
-
+        extras = ""
         if rating > 0:
-            promotion += f"\n• คะแนนรีวิว: {rating}/5.0 ⭐"
+            extras += f"\n• คะแนนรีวิว: {rating}/5.0 ⭐"
         
         if sold > 100:
-            promotion += f"\n• ยอดขาย: {self._format_sold_count(sold)} ชิ้น"
+            extras += f"\n• ยอดขาย: {self._format_sold_count(sold)} ชิ้น"
 
         if benefits:
-            promotion += f"\n\n✅ จุดเด่น:\n• {random.choice(benefits)}"
-            if len(benefits) > 1:
-                promotion += f"\n• {random.choice([b for b in benefits if b != benefits[0]])}"
+            extras += f"\n\n✅ จุดเด่น:\n• {random.choice(benefits)}"
+            secondary = self.category_secondary_benefits.get(category, self.default_secondary_benefits)
+            if secondary:
+                extras += f"\n• {random.choice(secondary)}"
 
-        promotion += f"\n\n📝 สรุป: {random.choice(self.price_phrases)}"
-        promotion += f"\n{random.choice(self.natural_endings)}"
-        
-        return promotion
+        return INFORMATIVE_TEMPLATE.render_values({
+            'short_name': self._shorten_product_name(name),
+            'price': price,
+            'shop': shop,
+            'extras': extras,
+            'price_desc': random.choice(self.price_phrases),
+            'ending': random.choice(self.natural_endings)
+        })
 
     def _shorten_product_name(self, name: str) -> str:
         """ย่อชื่อสินค้าให้อ่านง่าย"""
@@ -243,15 +272,7 @@ class PromotionGenerator:
 
     def _get_category_benefits(self, category: str) -> List[str]:
         """เลือกข้อดีตามหมวดหมู่"""
-        category_map = {
-            'สัตว์เลี้ยง': 'อาหารแมว',
-            'ความงาม': 'ความงาม',
-            'สุขภาพ': 'สุขภาพ',
-            'อิเล็กทรอนิกส์': 'อิเล็กทรอนิกส์'
-        }
-        
-        benefit_key = category_map.get(category, 'อาหารแมว')
-        return self.product_benefits.get(benefit_key, self.product_benefits['อาหารแมว'])
+        return self.category_benefits.get(category, self.default_benefits)
 
     def _format_sold_count(self, count: int) -> str:
         """แปลงจำนวนขายให้อ่านง่าย"""
@@ -0,0 +1,120 @@
+"""
+📁 src/utils/query_understanding.py
+🎯 แปลงคำค้นหาเป็นโครงสร้าง (คำขยาย, แบรนด์, หมวดหมู่, ช่วงราคา) พร้อม LRU cache
+regex ของราคาคอมไพล์ครั้งเดียวตอนโหลดโมดูล วลีราคา เช่น "ไม่เกิน 500" ถูกตัดออกจากข้อความค้นหา
+และคืนเป็น min_price/max_price เพื่อส่งต่อเป็นตัวกรองของ search_products
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from ..config import config
+from .thai_tokenizer import thai_tokenizer
+
+_NUMBER = r'(\d+(?:\.\d+)?)'
+_BAHT = r'(?:\s*(?:บาท|฿))?'
+
+# (pattern, ชนิด) - ตรวจตามลำดับ วลีที่ตรงแล้วถูกตัดออกก่อนตรวจแบบถัดไป ("ไม่เกิน" ต้องมาก่อน "เกิน")
+PRICE_PATTERNS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r'ราคา\s*(?:ระหว่าง\s*)?' + _NUMBER + r'\s*(?:-|–|ถึง|to)\s*' + _NUMBER + _BAHT), 'range'),
+    (re.compile(_NUMBER + r'\s*(?:-|–|ถึง|to)\s*' + _NUMBER + r'\s*(?:บาท|฿)'), 'range'),
+    (re.compile(r'(?:ราคา\s*)?(?:ไม่เกิน|ไม่ถึง|ต่ำกว่า|น้อยกว่า|ถูกกว่า|under|below)\s*' + _NUMBER + _BAHT), 'max'),
+    (re.compile(r'(?:ราคา\s*)?(?:มากกว่า|เกิน|สูงกว่า|ตั้งแต่|over|above)\s*' + _NUMBER + _BAHT), 'min'),
+    (re.compile(r'(?:ราคา\s*)?' + _NUMBER + _BAHT + r'\s*ขึ้นไป'), 'min'),
+    (re.compile(r'(?:ราคา\s*)?(?:ประมาณ|ราวๆ|ราว|around)\s*' + _NUMBER + _BAHT), 'around'),
+    (re.compile(r'(?:ราคา\s*)?' + _NUMBER + r'\s*(?:บาท|฿)'), 'around'),
+]
+_THOUSANDS = re.compile(r'(?<=\d),(?=\d{3})')
+_SPACES = re.compile(r'\s+')
+_DIGIT = re.compile(r'\d')
+
+
+def extract_price_range(query: str) -> Tuple[Optional[Dict], str]:
+    """ช่วงราคาจากวลีราคาใน query ({'min': ..., 'max': ...}) และข้อความที่เหลือหลังตัดวลีราคาออก"""
+    text = _THOUSANDS.sub('', query.lower())
+    price_range: Dict[str, float] = {}
+    for pattern, price_type in PRICE_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        values = [float(value) for value in match.groups()]
+        if price_type == 'range':
+            price_range.setdefault('min', min(values))
+            price_range.setdefault('max', max(values))
+        elif price_type == 'around':
+            price_range.setdefault('min', values[0] * 0.8)
+            price_range.setdefault('max', values[0] * 1.2)
+        else:
+            price_range.setdefault(price_type, values[0])
+        text = text[:match.start()] + ' ' + text[match.end():]
+    return price_range or None, _SPACES.sub(' ', text).strip()
+
+
+class QueryUnderstanding:
+    """แปลงคำค้นหาเป็น dict ที่ใช้ร่วมกันระหว่างการค้นหาและการจัดอันดับ (ผลถูก cache ตามข้อความค้นหา)
+
+    ผลลัพธ์ใช้ร่วมกันระหว่างผู้เรียกทุกคน จึงเป็น tuple และห้ามแก้ไข
+    """
+
+    def __init__(self, synonyms: Dict[str, List[str]], brands: Dict[str, List[str]],
+                 categories: Dict[str, List[str]], cache_size: int = None):
+        # แปลงตารางเป็นตัวพิมพ์เล็กครั้งเดียว (เดิมทำซ้ำทุกการค้นหา)
+        self._synonyms = [(word.lower(), tuple(terms)) for word, terms in synonyms.items()]
+        self._brands = [(brand, tuple(k.lower() for k in keywords), tuple(keywords)) for brand, keywords in brands.items()]
+        self._categories = [(category, tuple(k.lower() for k in keywords), tuple(keywords))
+                            for category, keywords in categories.items()]
+        self.parse = lru_cache(maxsize=cache_size or config.QUERY_CACHE_SIZE)(self._parse)
+
+    def _parse(self, query: str) -> Dict:
+        query_lower = query.lower().strip()
+        price_range, text = extract_price_range(query_lower)
+        original = text or query_lower
+
+        # ขยายคำค้นหาด้วย synonyms
+        expanded_terms = [original]
+        for thai_word, synonyms in self._synonyms:
+            if thai_word in original:
+                expanded_terms.extend(synonyms)
+
+        # ตรวจสอบแบรนด์
+        detected_brands = []
+        for brand, keywords_lower, keywords in self._brands:
+            if any(keyword in original for keyword in keywords_lower):
+                detected_brands.append(brand)
+                expanded_terms.extend(keywords)
+
+        # ตรวจสอบหมวดหมู่
+        detected_categories = []
+        for category, keywords_lower, keywords in self._categories:
+            if category in original:
+                detected_categories.append(category)
+                expanded_terms.extend(keywords)
+            elif any(keyword in original for keyword in keywords_lower):
+                detected_categories.append(category)
+                expanded_terms.append(category)
+
+        return {
+            'original': original,
+            'text': text,
+            'expanded_terms': tuple(dict.fromkeys(expanded_terms)),  # ลบคำซ้ำ (คำเดิมอยู่ตำแหน่งแรก)
+            'words': tuple(thai_tokenizer.keywords(original)),  # คำไทยที่ไม่มีช่องว่างถูกตัดเป็นคำ
+            'brands': tuple(detected_brands),
+            'categories': tuple(detected_categories),
+            'price_range': price_range,
+            'min_price': price_range.get('min') if price_range else None,
+            'max_price': price_range.get('max') if price_range else None,
+            'has_numbers': bool(_DIGIT.search(query_lower))
+        }
+
+    def search_filters(self, query: str, min_price: float = None, max_price: float = None) -> Tuple[str, Optional[float], Optional[float]]:
+        """(ข้อความค้นหา, min_price, max_price) สำหรับ search_products - ตัวกรองที่ผู้เรียกระบุเองมีผลก่อน"""
+        parsed = self.parse(query)
+        if parsed['price_range'] is None:
+            return query, min_price, max_price
+        return (parsed['text'],
+                min_price if min_price is not None else parsed['min_price'],
+                max_price if max_price is not None else parsed['max_price'])
+
+    def cache_info(self):
+        return self.parse.cache_info()
@@ -5,7 +5,8 @@
 
 import logging
 import random
-from typing import Dict, List, Optional
+import threading
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
 
 try:
@@ -15,13 +16,21 @@ except ImportError:
     OPENAI_AVAILABLE = False
 
 from ..config import config
+from .generation_cache import GenerationCache
+from .template_engine import compile_template
+
+# เปลี่ยนค่านี้ทุกครั้งที่แก้ prompt เพื่อไม่ให้ใช้ข้อความจาก prompt เดิมใน cache
+PROMPT_VERSION = "review-v1"
 
 class ReviewGenerator:
     """คลาสสำหรับสร้างรีวิวสินค้าอัตโนมัติ"""
     
-    def __init__(self):
+    def __init__(self, client=None, model: str = None, cache: GenerationCache = None):
         self.logger = logging.getLogger(__name__)
-        self.client = None
+        self.client = client
+        self.model = model or config.AI_REVIEW_MODEL
+        self.cache = cache
+        self._cache_lock = threading.Lock()
         
         # เทมเพลตรีวิวแบบต่างๆ
         self.review_templates = {
@@ -58,8 +67,14 @@ class ReviewGenerator:
             'อาหาร': 'อร่อย มีประโยชน์'
         }
         
-        # ตั้งค่า OpenAI
-        if OPENAI_AVAILABLE and config.OPENAI_API_KEY:
+        # ตัวคำนวณฟิลด์ของเทมเพลต และคอมไพล์เทมเพลตทั้งหมดล่วงหน้า
+        self.template_fields = self._build_template_fields()
+        for templates in self.review_templates.values():
+            for template in templates:
+                compile_template(template).validate(self.template_fields)
+        
+        # ตั้งค่า OpenAI (ถ้าไม่ได้ส่ง client มาเอง เช่น model จำลองสำหรับทดสอบ)
+        if self.client is None and OPENAI_AVAILABLE and config.OPENAI_API_KEY:
             try:
                 openai.api_key = config.OPENAI_API_KEY
                 self.client = openai
@@ -67,10 +82,14 @@ class ReviewGenerator:
             except Exception as e:
                 self.logger.error(f"Failed to initialize OpenAI client: {e}")
     
+    def can_use_ai(self) -> bool:
+        """ตรวจสอบว่าสร้างรีวิวด้วย AI ได้หรือไม่"""
+        return bool(self.client and config.USE_AI_SEARCH)
+    
     def generate_review(self, product: Dict, style: str = 'medium', use_ai: bool = False) -> str:
         """สร้างรีวิวสินค้า"""
         try:
-            if use_ai and self.client and config.USE_AI_SEARCH:
+            if use_ai and self.can_use_ai():
                 return self._generate_ai_review(product, style)
             else:
                 return self._generate_template_review(product, style)
@@ -81,83 +100,113 @@ class ReviewGenerator:
     def _generate_ai_review(self, product: Dict, style: str) -> str:
         """สร้างรีวิวด้วย AI"""
         try:
-            product_info = self._format_product_info(product)
-            
-            prompt = f"""
-            สร้างโพสต์รีวิวสินค้าสำหรับ affiliate marketing:
-            
-            ข้อมูลสินค้า:
-            {product_info}
-            
-            สไตล์: {style} (short=สั้น, medium=ปานกลาง, long=ยาว)
-            
-            ข้อกำหนด:
-            - ใช้ภาษาไทยที่เป็นกันเอง
-            - มีอีโมจิที่เหมาะสม
-            - เน้นจุดเด่นของสินค้า
-            - ระบุราคาและคอมมิชชัน
-            - มีลิงก์ affiliate
-            - ใช้แฮชแท็กที่เกี่ยวข้อง
-            - ความยาวเหมาะกับสไตล์ที่กำหนด
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "คุณเป็นนักการตลาด affiliate มืออาชีพที่เขียนรีวิวสินค้าได้น่าสนใจ"},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=400 if style == 'long' else 250,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content.strip()
+            return self.request_ai_review(product, style)
             
         except Exception as e:
             self.logger.error(f"AI review generation failed: {e}")
             return self._generate_template_review(product, style)
     
+    def request_ai_review(self, product: Dict, style: str, timeout: Optional[float] = None) -> str:
+        """เรียก OpenAI สร้างรีวิว (raise exception เมื่อล้มเหลว ให้ผู้เรียกจัดการ fallback เอง)
+        
+        ข้อความที่เคยสร้างสำหรับสินค้าเนื้อหาเดิม/สไตล์เดิม/model เดิม จะถูกดึงจาก cache แทน
+        """
+        cache = self._get_cache()
+        cache_key = cache.make_key(product, 'review', style, self.model, PROMPT_VERSION)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        review = self._complete_review(product, style, timeout)
+        cache.put(cache_key, review)
+        return review
+    
+    def _get_cache(self) -> GenerationCache:
+        """เปิด cache เมื่อใช้งาน AI ครั้งแรก (ไม่สร้างไฟล์ถ้าไม่เคยใช้ AI)"""
+        with self._cache_lock:
+            if self.cache is None:
+                self.cache = GenerationCache()
+            return self.cache
+    
+    def _complete_review(self, product: Dict, style: str, timeout: Optional[float] = None) -> str:
+        """ส่ง prompt ไปยัง model"""
+        product_info = self._format_product_info(product)
+        
+        prompt = f"""
+        สร้างโพสต์รีวิวสินค้าสำหรับ affiliate marketing:
+        
+        ข้อมูลสินค้า:
+        {product_info}
+        
+        สไตล์: {style} (short=สั้น, medium=ปานกลาง, long=ยาว)
+        
+        ข้อกำหนด:
+        - ใช้ภาษาไทยที่เป็นกันเอง
+        - มีอีโมจิที่เหมาะสม
+        - เน้นจุดเด่นของสินค้า
+        - ระบุราคาและคอมมิชชัน
+        - มีลิงก์ affiliate
+        - ใช้แฮชแท็กที่เกี่ยวข้อง
+        - ความยาวเหมาะกับสไตล์ที่กำหนด
+        """
+        
+        request_options = {'timeout': timeout} if timeout else {}
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "คุณเป็นนักการตลาด affiliate มืออาชีพที่เขียนรีวิวสินค้าได้น่าสนใจ"},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=400 if style == 'long' else 250,
+            temperature=0.7,
+            **request_options
+        )
+        
+        return response.choices[0].message.content.strip()
+    
     def _generate_template_review(self, product: Dict, style: str) -> str:
         """สร้างรีวิวจากเทมเพลต"""
         try:
-            # เตรียมข้อมูลสำหรับเทมเพลต
-            template_data = self._prepare_template_data(product)
-            
             # เลือกเทมเพลตแบบสุ่ม
             templates = self.review_templates.get(style, self.review_templates['medium'])
-            template = random.choice(templates)
-            
-            # เพิ่มข้อมูลพิเศษตามสไตล์
-            if style == 'medium':
-                template_data['highlights'] = self._generate_highlights(product)
-            elif style == 'long':
-                template_data['detailed_review'] = self._generate_detailed_review(product)
-                template_data['features'] = self._generate_features_list(product)
+            template = compile_template(random.choice(templates))
             
-            return template.format(**template_data)
+            # คำนวณเฉพาะฟิลด์ที่เทมเพลตนี้ใช้ (highlights/features/detailed_review ฯลฯ)
+            return template.render(product, self.template_fields)
             
         except Exception as e:
             self.logger.error(f"Template review generation failed: {e}")
             return self._generate_basic_review(product)
     
-    def _prepare_template_data(self, product: Dict) -> Dict:
-        """เตรียมข้อมูลสำหรับเทมเพลต"""
-        commission = product.get('commission_amount', 0)
-        price = product.get('price', 0)
-        rating = product.get('rating', 0)
+    def generate_template_reviews(self, products: List[Dict], style: str = 'medium') -> List[str]:
+        """สร้างรีวิวจากเทมเพลตให้สินค้าจำนวนมาก (สำหรับ export เนื้อหาแบบ bulk)"""
+        return [self._generate_template_review(product, style) for product in products]
+    
+    def _build_template_fields(self) -> Dict[str, Callable[[Dict], object]]:
+        """ตัวคำนวณค่าของแต่ละฟิลด์ในเทมเพลต (ถูกเรียกเฉพาะฟิลด์ที่เทมเพลตอ้างถึง)"""
+        def rating(product):
+            value = product.get('rating', 0)
+            return f"{value:.1f}" if value > 0 else "ไม่ระบุ"
+        
+        def description(product):
+            text = product.get('description', '')
+            return text[:100] + '...' if len(text) > 100 else text
         
         return {
-            'product_name': product.get('product_name', 'สินค้า'),
-            'price': price,
-            'shop_name': product.get('shop_name', 'ร้านค้า'),
-            'rating': f"{rating:.1f}" if rating > 0 else "ไม่ระบุ",
-            'sold_count': product.get('sold_count', 0),
-            'commission': commission,
-            'commission_rate': product.get('commission_rate', 0),
-            'category': product.get('category', 'สินค้า'),
-            'description': product.get('description', '')[:100] + '...' if len(product.get('description', '')) > 100 else product.get('description', ''),
-            'offer_link': product.get('offer_link', '#'),
-            'product_link': product.get('product_link', '#')
+            'product_name': lambda p: p.get('product_name', 'สินค้า'),
+            'price': lambda p: p.get('price', 0),
+            'shop_name': lambda p: p.get('shop_name', 'ร้านค้า'),
+            'rating': rating,
+            'sold_count': lambda p: p.get('sold_count', 0),
+            'commission': lambda p: p.get('commission_amount', 0),
+            'commission_rate': lambda p: p.get('commission_rate', 0),
+            'category': lambda p: p.get('category', 'สินค้า'),
+            'description': description,
+            'offer_link': lambda p: p.get('offer_link', '#'),
+            'product_link': lambda p: p.get('product_link', '#'),
+            'highlights': self._generate_highlights,
+            'features': self._generate_features_list,
+            'detailed_review': self._generate_detailed_review
         }
     
     def _generate_highlights(self, product: Dict) -> str:
@@ -0,0 +1,224 @@
+"""
+📁 src/utils/search_analytics.py
+🎯 สรุปสถิติการค้นหาล่วงหน้า (rollup) รายชั่วโมง/รายวัน ต่อคำค้นหาที่ normalize แล้ว
+ตัวบันทึก log อัปเดตแถวของคำค้นหานั้นแถวเดียวต่อ bucket ใน transaction เดียวกับการเขียน log ดิบ
+(ไม่มีแถวผลรวมกลางที่ทุกการค้นหาต้องแย่งกันอัปเดต - ผลรวมคำนวณจากแถวรายคำค้นหาตอนอ่าน)
+แถวดิบและ rollup ที่เก่ากว่าระยะเก็บถูกลบเป็นรอบ (compaction) จำนวนแถวที่อ่านจึงมีขอบเขตเสมอ
+"""
+
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..config import config
+
+SEARCH_ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_rollups (
+    bucket TEXT NOT NULL,           -- hour | day
+    query TEXT NOT NULL,            -- คำค้นหาที่ normalize แล้ว ('' = ค้นหาด้วยคำว่าง เช่น เปิดหมวดหมู่)
+    period TEXT NOT NULL,           -- 2026-01-31T14 | 2026-01-31
+    display_query TEXT,             -- รูปแบบล่าสุดที่ผู้ใช้พิมพ์
+    searches INTEGER NOT NULL DEFAULT 0,
+    results INTEGER NOT NULL DEFAULT 0,
+    zero_results INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, query, period)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_search_rollups_top ON search_rollups(bucket, period, searches);
+"""
+
+ROLLUP_BUCKETS = (('hour', '%Y-%m-%dT%H'), ('day', '%Y-%m-%d'))
+
+_UPSERT = """
+INSERT INTO search_rollups (bucket, query, period, display_query, searches, results, zero_results)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(bucket, query, period) DO UPDATE SET
+    display_query = excluded.display_query,
+    searches = searches + excluded.searches,
+    results = results + excluded.results,
+    zero_results = zero_results + excluded.zero_results
+"""
+
+
+def normalize_query(query: str) -> str:
+    """คีย์ของคำค้นหา: ตัวพิมพ์เล็ก ช่องว่างเดียว (เหมือน suggestion_index.normalize)"""
+    return ' '.join((query or '').lower().split())
+
+
+def _rollup_rows(query: str, result_count: int, at: datetime, searches: int = 1,
+                 zero_results: int = None) -> List[Tuple]:
+    """แถว upsert ของหนึ่งการค้นหา: หนึ่งแถวต่อ bucket ของคำค้นหานั้น"""
+    if zero_results is None:
+        zero_results = int(not result_count)
+    key, display = normalize_query(query), (query or '').strip()
+    return [(bucket, key, at.strftime(fmt), display, searches, result_count, zero_results)
+            for bucket, fmt in ROLLUP_BUCKETS]
+
+
+def _summary(searches: int, results: int, zero_results: int) -> Dict:
+    return {
+        'searches': searches,
+        'avg_results': round(results / searches, 2) if searches else 0,
+        'zero_result_rate': round(zero_results / searches * 100, 2) if searches else 0
+    }
+
+
+class SearchRollups:
+    """rollup ของตาราง log การค้นหาหนึ่งตาราง บน connection SQLite ของผู้ใช้ (ใช้ล็อกเดียวกับผู้ใช้)
+
+    raw_table/time_column/time_format ใช้ตอน compaction (ลบแถวดิบที่เก่ากว่า retention) และตอนสร้าง rollup
+    ครั้งแรกจาก log ที่มีอยู่แล้ว (raw_select คืน (คำค้นหา, จำนวนผลลัพธ์, เวลา))
+
+    การสร้าง object ไม่แตะฐานข้อมูล - ตารางถูกสร้างตอนใช้งานครั้งแรก (ensure) จึง import โมดูลที่สร้าง
+    instance ระดับโมดูลได้โดยไม่เขียนไฟล์ฐานข้อมูล
+    """
+
+    def __init__(self, connection: sqlite3.Connection, lock=None, raw_table: str = None,
+                 time_column: str = 'created_at', time_format: str = '%Y-%m-%dT%H:%M:%S',
+                 raw_select: str = None, clock: Callable[[], datetime] = datetime.now):
+        self.logger = logging.getLogger(__name__)
+        self.connection = connection
+        self.lock = lock or threading.RLock()
+        self.raw_table = raw_table
+        self.time_column = time_column
+        self.time_format = time_format
+        self.clock = clock
+        self.raw_select = raw_select
+        self._ready = False
+        self._last_compaction: Optional[datetime] = None
+
+    def ensure(self):
+        """สร้างตาราง rollup และ rollup จาก log เดิมครั้งแรกที่ใช้งาน
+
+        ผู้เขียน log ดิบเรียกก่อน INSERT แถวใหม่ (แถวนั้นจึงไม่ถูกนับซ้ำตอน backfill)
+        """
+        if self._ready:
+            return
+        with self.lock:
+            if self._ready:
+                return
+            self.connection.executescript(SEARCH_ROLLUP_SCHEMA)
+            if self.raw_table:
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.raw_table}_{self.time_column} "
+                                        f"ON {self.raw_table}({self.time_column})")
+            # rollup รุ่นแรกมีแถวผลรวม (bucket 'all' และ query '' ของทุกการค้นหา) ที่จะถูกนับซ้ำ - สร้างใหม่จาก log ดิบ
+            if self.connection.execute("SELECT 1 FROM search_rollups WHERE bucket = 'all' LIMIT 1").fetchone():
+                self.connection.execute("DELETE FROM search_rollups")
+            if self.raw_select:
+                self._backfill(self.raw_select)
+            self.connection.commit()
+            self._ready = True
+
+    def _backfill(self, raw_select: str):
+        """สร้าง rollup จาก log ดิบที่มีอยู่ (ครั้งเดียว เมื่อยังไม่มี rollup)"""
+        if self.connection.execute("SELECT 1 FROM search_rollups LIMIT 1").fetchone():
+            return
+        totals: Dict[Tuple, List] = {}
+        for query, result_count, at in self.connection.execute(raw_select):
+            try:
+                at = datetime.fromisoformat(at) if isinstance(at, str) else (at or self.clock())
+            except ValueError:
+                at = self.clock()
+            for bucket, key, period, display, searches, results, zero in _rollup_rows(query, int(result_count or 0), at):
+                entry = totals.setdefault((bucket, key, period), [display, 0, 0, 0])
+                entry[0] = display
+                entry[1] += searches
+                entry[2] += results
+                entry[3] += zero
+        if totals:
+            self.connection.executemany(_UPSERT, [key + tuple(values) for key, values in totals.items()])
+            self.logger.info(f"Search rollups built from {self.raw_table}: {len(totals)} rows")
+
+    # ===== การเขียน =====
+
+    def record(self, query: str, result_count: int, at: datetime = None, commit: bool = True):
+        """อัปเดต rollup ของหนึ่งการค้นหา (เรียกในล็อกเดียวกับการ INSERT log ดิบ)"""
+        at = at or self.clock()
+        self.ensure()
+        with self.lock:
+            self.connection.executemany(_UPSERT, _rollup_rows(query, int(result_count or 0), at))
+            if self._last_compaction is None or at - self._last_compaction >= timedelta(
+                    seconds=config.SEARCH_COMPACT_INTERVAL_SECONDS):
+                self.compact(at, commit=False)
+            if commit:
+                self.connection.commit()
+
+    def compact(self, now: datetime = None, commit: bool = True) -> Dict[str, int]:
+        """ลบแถวดิบ, rollup รายชั่วโมง และรายวันที่เก่ากว่าระยะเก็บ (0 = เก็บตลอด)"""
+        now = now or self.clock()
+        deleted = {'raw': 0, 'hour': 0, 'day': 0}
+        self.ensure()
+        with self.lock:
+            if self.raw_table and config.SEARCH_LOG_RETENTION_DAYS > 0:
+                cutoff = (now - timedelta(days=config.SEARCH_LOG_RETENTION_DAYS)).strftime(self.time_format)
+                deleted['raw'] = self.connection.execute(
+                    f"DELETE FROM {self.raw_table} WHERE {self.time_column} < ?", (cutoff,)).rowcount
+            for bucket, days in (('hour', config.SEARCH_ROLLUP_HOURLY_DAYS), ('day', config.SEARCH_ROLLUP_DAILY_DAYS)):
+                if days > 0:
+                    cutoff = (now - timedelta(days=days)).strftime(dict(ROLLUP_BUCKETS)[bucket])
+                    deleted[bucket] = self.connection.execute(
+                        "DELETE FROM search_rollups WHERE bucket = ? AND period < ?", (bucket, cutoff)).rowcount
+            if commit:
+                self.connection.commit()
+            self._last_compaction = now
+        if any(deleted.values()):
+            self.logger.debug(f"Search log compaction: {deleted}")
+        return deleted
+
+    # ===== การอ่าน =====
+
+    def _rows(self, sql: str, params: Tuple) -> List[Dict]:
+        self.ensure()
+        with self.lock:
+            cursor = self.connection.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def _since(self, bucket: str, periods: int) -> str:
+        """period แรกของช่วง periods ล่าสุด (รวมช่วงปัจจุบัน)"""
+        step = timedelta(hours=1) if bucket == 'hour' else timedelta(days=1)
+        return (self.clock() - step * (periods - 1)).strftime(dict(ROLLUP_BUCKETS)[bucket])
+
+    def popular(self, limit: int = 10, days: int = None) -> List[Dict]:
+        """คำค้นหายอดนิยมในช่วง days วันล่าสุด (ค่าเริ่มต้น SEARCH_POPULAR_DAYS) รวมจาก rollup รายวัน"""
+        since = self._since('day', days or config.SEARCH_POPULAR_DAYS)
+        # display_query มาจากแถวของวันล่าสุด (SQLite ใช้ค่าจากแถวที่ MAX(period) เลือก)
+        rows = self._rows(
+            "SELECT display_query, MAX(period) AS last_period, SUM(searches) AS total_searches, "
+            "SUM(results) AS total_results, SUM(zero_results) AS total_zero FROM search_rollups "
+            "WHERE bucket = 'day' AND period >= ? AND query != '' "
+            "GROUP BY query ORDER BY total_searches DESC, query LIMIT ?", (since, limit))
+        return [{'search_query': row['display_query'], 'search_count': row['total_searches'],
+                 **_summary(row['total_searches'], row['total_results'], row['total_zero'])} for row in rows]
+
+    def totals(self, days: int = None) -> Dict:
+        """จำนวนการค้นหา, จำนวนผลลัพธ์เฉลี่ย และอัตราไม่พบผลลัพธ์ (%) ในช่วง days วันล่าสุด
+        (None = ทุกวันที่ rollup รายวันยังเก็บอยู่)"""
+        since = self._since('day', days) if days else ''
+        row = self._rows(
+            "SELECT COALESCE(SUM(searches), 0) AS searches, COALESCE(SUM(results), 0) AS results, "
+            "COALESCE(SUM(zero_results), 0) AS zero_results FROM search_rollups "
+            "WHERE bucket = 'day' AND period >= ?", (since,))[0]
+        return _summary(row['searches'], row['results'], row['zero_results'])
+
+    def series(self, bucket: str = 'day', periods: int = 7, query: str = None) -> List[Dict]:
+        """สถิติรายช่วง (ล่าสุดก่อน) ของทุกคำค้นหารวมกัน หรือของคำค้นหาเดียว"""
+        since = self._since(bucket, periods)
+        where, params = "bucket = ? AND period >= ?", [bucket, since]
+        if query is not None:
+            where += " AND query = ?"
+            params.append(normalize_query(query))
+        rows = self._rows(
+            "SELECT period, SUM(searches) AS searches, SUM(results) AS results, SUM(zero_results) AS zero_results "
+            f"FROM search_rollups WHERE {where} GROUP BY period ORDER BY period DESC", tuple(params))
+        return [{'period': row['period'], **_summary(row['searches'], row['results'], row['zero_results'])}
+                for row in rows]
+
+    def stats(self, days: int = 7, limit: int = 10, popular_days: int = None) -> Dict:
+        """สรุปสำหรับหน้าสถิติ: ผลรวมและรายวันของ days วันล่าสุด และคำค้นหายอดนิยม"""
+        return {
+            **self.totals(days),
+            'popular_queries': self.popular(limit, popular_days),
+            'daily': self.series('day', days)
+        }
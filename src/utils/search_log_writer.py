@@ -0,0 +1,126 @@
+"""
+📁 src/utils/search_log_writer.py
+🎯 เขียน log การค้นหาลง product_searches ของ Supabase เป็นชุดใน thread เบื้องหลัง
+การค้นหาไม่ต้องรอ round trip ของการ INSERT (การค้นหาจาก product mirror จึงไม่ใช้เครือข่ายเลย)
+แถวที่ค้างอยู่ถูกเขียนทุก SEARCH_LOG_FLUSH_SECONDS หรือทันทีเมื่อครบ SEARCH_LOG_BATCH_SIZE แถว
+"""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import config
+from .metrics import metrics
+
+# จำนวนแถว log การค้นหาแยกตามผล (written | failed = เข้าคิวใหม่ | dropped = คิวเต็ม)
+search_log_rows = metrics.counter('search_log_rows_total', 'Search log rows by batch write result')
+
+
+class SearchLogWriter:
+    """คิว log การค้นหาหนึ่งชุดต่อ process (INSERT หลายแถวใน round trip เดียวต่อ client)
+
+    เขียนไม่สำเร็จ แถวถูกคืนเข้าคิวเพื่อเขียนรอบถัดไป คิวเก็บได้ไม่เกิน max_pending แถว (เกินแล้วทิ้งแถวเก่าสุด)
+    หลังเขียนสำเร็จเรียก compaction ของ log (อย่างมากหนึ่งครั้งต่อ SEARCH_COMPACT_INTERVAL_SECONDS)
+    """
+
+    def __init__(self, batch_size: int = None, flush_seconds: float = None, max_pending: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.batch_size = batch_size or config.SEARCH_LOG_BATCH_SIZE
+        self.flush_seconds = flush_seconds or config.SEARCH_LOG_FLUSH_SECONDS
+        self.max_pending = max_pending or config.SEARCH_LOG_MAX_PENDING
+        self._pending: List[Tuple[Any, Dict]] = []  # (client, แถว)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_compaction = 0.0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='search-log-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def add(self, client, query: str, result_count: int, user_id: str = None) -> bool:
+        """เข้าคิวหนึ่งการค้นหา (เวลาค้นหาจริงอยู่ใน created_at ไม่ใช่เวลาที่เขียน)"""
+        self._start()
+        row = {
+            'search_query': query,
+            'user_id': user_id,
+            'result_count': result_count,
+            'created_at': datetime.now(timezone.utc).isoformat()
+        }
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._pending.pop(0)
+                search_log_rows.inc(result='dropped')
+            self._pending.append((client, row))
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+        return True
+
+    def flush(self) -> int:
+        """เขียนแถวที่ค้างทั้งหมด คืนจำนวนแถวที่เขียนสำเร็จ"""
+        written = 0
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            batches: Dict[int, Tuple[Any, List[Dict]]] = {}
+            for client, row in pending:
+                batches.setdefault(id(client), (client, []))[1].append(row)
+
+            for client, rows in batches.values():
+                try:
+                    client.table('product_searches').insert(rows).execute()
+                except Exception as e:
+                    self.logger.error(f"Error writing {len(rows)} search logs: {e}")
+                    search_log_rows.inc(len(rows), result='failed')
+                    self._requeue(client, rows)
+                    continue
+                search_log_rows.inc(len(rows), result='written')
+                written += len(rows)
+                self.compact(client)
+        return written
+
+    def _requeue(self, client, rows: List[Dict]):
+        """คืนแถวที่เขียนไม่สำเร็จไว้หน้าคิว (เท่าที่คิวยังรับได้)"""
+        with self._lock:
+            room = max(self.max_pending - len(self._pending), 0)
+            kept = rows[len(rows) - room:] if room < len(rows) else rows
+            self._pending[:0] = [(client, row) for row in kept]
+        if len(kept) < len(rows):
+            search_log_rows.inc(len(rows) - len(kept), result='dropped')
+
+    def compact(self, client):
+        """ลบ log ดิบและ rollup รายชั่วโมง/รายวันที่เก่ากว่าระยะเก็บ (อย่างมากหนึ่งครั้งต่อ SEARCH_COMPACT_INTERVAL_SECONDS)"""
+        now = time.time()
+        if now - self._last_compaction < config.SEARCH_COMPACT_INTERVAL_SECONDS:
+            return
+        self._last_compaction = now
+        try:
+            client.rpc('compact_search_logs', {
+                'raw_days': config.SEARCH_LOG_RETENTION_DAYS,
+                'hourly_days': config.SEARCH_ROLLUP_HOURLY_DAYS,
+                'daily_days': config.SEARCH_ROLLUP_DAILY_DAYS
+            }).execute()
+        except Exception as e:
+            self.logger.error(f"Error compacting search logs: {e}")
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+
+# สร้าง instance สำหรับใช้งาน
+search_log_writer = SearchLogWriter()
@@ -0,0 +1,289 @@
+"""
+📁 src/utils/search_pipeline.py
+🎯 ค้นหาสินค้าแบบหลายขั้น (hybrid retrieval)
+1) candidates: รวบรวมสินค้าผู้สมัครหลักร้อยรายการจากหลายแหล่ง (lexical, แก้คำพิมพ์ผิด, หมวดหมู่, semantic)
+2) rerank: จัดอันดับด้วย feature ราคาถูกทุกรายการ แล้วใช้คะแนน AI (แพง) กับส่วนบนสุดเท่าที่งบเวลาเหลือ
+3) paginate: ตัดหน้าตาม offset/limit
+ทุกขั้นมีงบเวลา (ms) ของตัวเอง และบันทึกเวลาลง metrics
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..config import config
+from .ai_search import ai_search
+from .metrics import metrics
+from .product_store import search_logging_paused
+from .semantic_search import product_text, semantic_search
+from .spell_corrector import spell_corrector
+from .suggestion_index import normalize
+from .thai_tokenizer import thai_tokenizer
+
+stage_latency = metrics.histogram('search_stage_duration_seconds', 'Search pipeline latency by stage and source')
+stage_over_budget = metrics.counter('search_stage_over_budget_total', 'Search pipeline stages that ran past their budget')
+
+# น้ำหนักของ feature ใน re-ranker (ทุก feature อยู่ในช่วง 0-1)
+RANKING_WEIGHTS = {
+    'name_match': 3.0,    # พบทั้งวลีในชื่อสินค้า
+    'term_match': 2.0,    # สัดส่วนคำของ query ที่พบในข้อความสินค้า
+    'lexical': 1.0,       # มาจาก lexical search (หรือคำที่แก้แล้ว)
+    'semantic': 1.5,      # cosine จากดัชนี semantic
+    'category': 1.0,      # อยู่ในหมวดหมู่ที่ตรวจพบจาก query
+    'popularity': 0.7,    # ยอดขาย (log) เทียบกับสูงสุดในกลุ่มผู้สมัคร
+    'rating': 0.3,
+    'relevance': 2.0,     # คะแนนจาก AISearchEngine (เฉพาะส่วนบนสุด)
+}
+RELEVANCE_SCALE = 300.0  # คะแนน AISearchEngine สูงสุดโดยประมาณ ใช้ปรับให้อยู่ในช่วง 0-1
+
+
+def _in_price_range(product: Dict, min_price: Optional[float], max_price: Optional[float]) -> bool:
+    price = product.get('price') or 0
+    return (min_price is None or price >= min_price) and (max_price is None or price <= max_price)
+
+
+class _Candidate:
+    """สินค้าผู้สมัครหนึ่งรายการ พร้อมแหล่งที่มาและ feature"""
+
+    __slots__ = ('product', 'sources', 'features', 'score')
+
+    def __init__(self, product: Dict):
+        self.product = product
+        self.sources: List[str] = []
+        self.features: Dict[str, float] = {}
+        self.score = 0.0
+
+
+class _Budget:
+    """งบเวลาของขั้นหนึ่ง: จับเวลา, บันทึก metrics และบอกว่าเกินงบหรือยัง"""
+
+    def __init__(self, stage: str, budget_ms: float, report: Dict[str, Dict]):
+        self.stage = stage
+        self.budget_ms = budget_ms
+        self.report = report
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    @property
+    def exhausted(self) -> bool:
+        return self.elapsed_ms >= self.budget_ms
+
+    def finish(self, **details):
+        elapsed = self.elapsed_ms
+        stage_latency.observe(elapsed / 1000, stage=self.stage)
+        if elapsed > self.budget_ms:
+            stage_over_budget.inc(stage=self.stage)
+        self.report[self.stage] = {'ms': round(elapsed, 2), 'budget_ms': self.budget_ms, **details}
+
+
+class SearchPipeline:
+    """ค้นหาแบบ candidate generation -> re-ranking -> pagination
+
+    แหล่งผู้สมัครทำงานตามลำดับใน SOURCES เมื่อใช้งบของขั้น candidates หมด แหล่งที่เหลือจะถูกข้าม
+    (แหล่งแรก lexical ทำงานเสมอ) re-ranker ให้คะแนน feature ราคาถูกทุกรายการก่อน
+    แล้วจึงใช้คะแนน AISearchEngine กับ SEARCH_RERANK_DEPTH อันดับแรกจนกว่างบจะหมด
+    """
+
+    SOURCES = ('lexical', 'spelling', 'category', 'semantic')
+
+    def __init__(self, db_instance=None):
+        self.db = db_instance
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._categories: List[str] = []
+        self._categories_loaded = 0.0
+
+    def bind_database(self, db_instance):
+        """กำหนดฐานข้อมูลที่ใช้ค้นหา (ถ้ายังไม่มี)"""
+        if self.db is None and db_instance is not None:
+            self.db = db_instance
+
+    # ===== candidate generation =====
+
+    def detect_categories(self, query: str) -> List[str]:
+        """หมวดหมู่ในฐานข้อมูลที่ query พูดถึง (ตรงชื่อ หรือผ่านคำพ้องของ AISearchEngine)"""
+        if time.time() - self._categories_loaded > config.SUGGEST_REFRESH_SECONDS:
+            with self._lock:
+                self._categories = [c for c in (self.db.get_categories() or []) if c]
+                self._categories_loaded = time.time()
+
+        phrase = normalize(query)
+        concepts = {normalize(concept) for table in (ai_search.synonyms, ai_search.categories)
+                    for concept, terms in table.items()
+                    if any(normalize(term) in phrase for term in [concept] + terms)}
+
+        detected = []
+        for category in self._categories:
+            key = normalize(category)
+            if key in phrase or (len(phrase) >= 2 and phrase in key) or any(c in key or key in c for c in concepts):
+                detected.append(category)
+        return detected
+
+    def _source_lexical(self, query: str, limit: int, state: Dict) -> List[Tuple[Dict, float]]:
+        result = self.db.search_products(query, limit=limit, min_price=state['min_price'],
+                                         max_price=state['max_price'], order_by='popularity')
+        return [(product, 1.0) for product in result.get('products', [])]
+
+    def _source_spelling(self, query: str, limit: int, state: Dict) -> List[Tuple[Dict, float]]:
+        corrected = spell_corrector.correct(query)
+        if not corrected:
+            return []
+        products = self.db.search_products(corrected, limit=limit, min_price=state['min_price'],
+                                           max_price=state['max_price'], order_by='popularity').get('products', [])
+        if products:
+            state['corrected_query'] = corrected
+        return [(product, 1.0) for product in products]
+
+    def _source_category(self, query: str, limit: int, state: Dict) -> List[Tuple[Dict, float]]:
+        state['categories'] = self.detect_categories(query)[:2]
+        if not state['categories']:
+            return []
+        grouped = self.db.get_products_by_category_bulk(state['categories'], limit // len(state['categories']))
+        return [(product, 1.0) for products in grouped.values() for product in products]
+
+    def _source_semantic(self, query: str, limit: int, state: Dict) -> List[Tuple[Dict, float]]:
+        # ใช้เฉพาะเมื่อมีดัชนีสร้างไว้แล้ว (การสร้างดัชนีใหม่ช้าเกินงบของ request)
+        if not semantic_search.available():
+            return []
+        nearest = semantic_search.nearest(semantic_search.encoder.encode([normalize(query)])[0], limit)
+        known = state['known']
+        missing = [code for code, _ in nearest if code not in known]
+        products = {p['product_code']: p for p in self.db.get_products_by_codes(missing)} if missing else {}
+        return [(known.get(code) or products[code], max(score, 0.0))
+                for code, score in nearest if code in known or code in products]
+
+    def generate_candidates(self, query: str, report: Dict[str, Dict]) -> Tuple[List[_Candidate], Dict]:
+        """ผู้สมัครจากทุกแหล่ง (แหล่งละไม่เกินโควตา รวมรายการซ้ำ) ไม่เกิน SEARCH_CANDIDATES รายการ"""
+        budget = _Budget('candidates', config.SEARCH_CANDIDATE_BUDGET_MS, report)
+        limit = config.SEARCH_CANDIDATES
+        quota = max(limit // (len(self.SOURCES) - 1), 1)  # ต่อแหล่ง (spelling ใช้แทน lexical ที่ไม่พบ)
+        candidates: Dict[str, _Candidate] = {}
+        # วลีราคาใน query เป็นตัวกรอง (ส่งต่อให้ search_products และใช้กรองผู้สมัครจากแหล่งอื่น)
+        text, min_price, max_price = ai_search.query_parser.search_filters(query)
+        state = {'known': {}, 'categories': [], 'corrected_query': None, 'text': text,
+                 'min_price': min_price, 'max_price': max_price}
+        sources, skipped = {}, []
+
+        for name in self.SOURCES:
+            if name != self.SOURCES[0] and budget.exhausted:
+                skipped.append(name)
+                continue
+            if name == 'spelling' and candidates:
+                continue  # แก้คำเฉพาะเมื่อ query เดิมไม่พบอะไรเลย
+            started = time.perf_counter()
+            source: Callable = getattr(self, f'_source_{name}')
+            try:
+                found = source(text, quota, state)
+            except Exception as e:
+                self.logger.error(f"Search source '{name}' failed: {e}")
+                found = []
+            stage_latency.observe(time.perf_counter() - started, stage='candidates', source=name)
+
+            for product, strength in found:
+                code = product.get('product_code')
+                if not code or not _in_price_range(product, min_price, max_price):
+                    continue
+                candidate = candidates.get(code)
+                if candidate is None:
+                    if len(candidates) >= limit:
+                        continue
+                    candidate = candidates[code] = _Candidate(product)
+                    state['known'][code] = product
+                candidate.sources.append(name)
+                candidate.features[name] = max(candidate.features.get(name, 0.0), strength)
+            sources[name] = len(found)
+
+        budget.finish(sources=sources, skipped=skipped, count=len(candidates))
+        return list(candidates.values()), state
+
+    # ===== re-ranking =====
+
+    def _cheap_features(self, query: str, candidates: List[_Candidate], state: Dict):
+        phrase = normalize(state.get('corrected_query') or state['text'])
+        terms = thai_tokenizer.keywords(phrase) or [phrase]
+        categories = set(state['categories'])
+        max_sold = max((c.product.get('sold_count') or 0 for c in candidates), default=0)
+
+        for candidate in candidates:
+            product, features = candidate.product, candidate.features
+            text = normalize(product_text(product))
+            features['name_match'] = float(phrase in normalize(product.get('product_name')))
+            features['term_match'] = sum(term in text for term in terms) / len(terms)
+            features['lexical'] = max(features.pop('spelling', 0.0), features.get('lexical', 0.0))
+            features['category'] = float(product.get('category') in categories)
+            features['popularity'] = (math.log1p(product.get('sold_count') or 0) / math.log1p(max_sold)
+                                      if max_sold else 0.0)
+            features['rating'] = min((product.get('rating') or 0) / 5.0, 1.0)
+            candidate.score = sum(RANKING_WEIGHTS[name] * value for name, value in features.items()
+                                  if name in RANKING_WEIGHTS)
+
+    def rerank(self, query: str, candidates: List[_Candidate], state: Dict, depth: int,
+               report: Dict[str, Dict]) -> List[_Candidate]:
+        """เรียงผู้สมัครตามคะแนน feature แล้วเรียงส่วนบนใหม่ด้วยคะแนน AI เป็นชุดละ 25 รายการตามงบ"""
+        budget = _Budget('rerank', config.SEARCH_RERANK_BUDGET_MS, report)
+        self._cheap_features(query, candidates, state)
+        ranked = sorted(candidates, key=lambda c: -c.score)
+
+        scored = 0
+        head = ranked[:depth]
+        while scored < len(head) and not budget.exhausted:
+            batch = head[scored:scored + 25]
+            for candidate, relevance in zip(batch, ai_search.score_products(query, [c.product for c in batch])):
+                candidate.features['relevance'] = min(relevance / RELEVANCE_SCALE, 1.0)
+                candidate.score += RANKING_WEIGHTS['relevance'] * candidate.features['relevance']
+            scored += len(batch)
+
+        # เรียงใหม่เฉพาะส่วนที่ได้คะแนน AI ครบ ส่วนที่เหลือคงลำดับจากคะแนน feature
+        ranked[:scored] = sorted(ranked[:scored], key=lambda c: -c.score)
+        budget.finish(count=len(candidates), ai_scored=scored)
+        return ranked
+
+    # ===== pipeline =====
+
+    def search(self, query: str, limit: int = 5, offset: int = 0) -> Dict:
+        """ค้นหาแบบหลายขั้น คืน dict รูปแบบเดียวกับ search_products พร้อมเวลาของแต่ละขั้นใน 'stages'"""
+        report: Dict[str, Dict] = {}
+        try:
+            # แหล่ง lexical/spelling เรียก search_products หลายครั้งต่อ query - ผู้เรียกบันทึก log ครั้งเดียวเอง
+            with search_logging_paused():
+                candidates, state = self.generate_candidates(query, report)
+            ranked = self.rerank(query, candidates, state, max(config.SEARCH_RERANK_DEPTH, offset + limit), report)
+
+            budget = _Budget('paginate', config.SEARCH_PAGINATE_BUDGET_MS, report)
+            products = []
+            for candidate in ranked[offset:offset + limit]:
+                product = dict(candidate.product)
+                product['search_score'] = round(candidate.score, 4)
+                product['search_sources'] = candidate.sources
+                products.append(product)
+            budget.finish()
+
+            over = [stage for stage, info in report.items() if info['ms'] > info['budget_ms']]
+            if over:
+                self.logger.warning(f"Search pipeline over budget for '{query}': {over} {report}")
+
+            return {
+                "products": products,
+                "total": len(ranked),
+                "has_more": (offset + limit) < len(ranked),
+                "current_offset": offset,
+                "limit": limit,
+                "corrected_query": state.get('corrected_query'),
+                "categories": state['categories'],
+                "min_price": state['min_price'],
+                "max_price": state['max_price'],
+                "stages": report
+            }
+
+        except Exception as e:
+            self.logger.error(f"Search pipeline error: {e}")
+            return {"products": [], "total": 0, "has_more": False, "current_offset": offset, "limit": limit,
+                    "corrected_query": None, "categories": [], "min_price": None, "max_price": None, "stages": report}
+
+# สร้าง instance สำหรับใช้งาน
+search_pipeline = SearchPipeline()
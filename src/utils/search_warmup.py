@@ -0,0 +1,215 @@
+"""
+📁 src/utils/search_warmup.py
+🎯 cache ผลค้นหาและ Flex ที่ render แล้ว + งาน warm-up จากคำค้นหายอดนิยมใน product_searches
+คำค้นหา N อันดับแรกถูกค้นล่วงหน้าตอนเริ่มระบบและทุก SEARCH_WARMUP_INTERVAL_SECONDS ผ่านตัว warm ที่ลงทะเบียนไว้
+(search pipeline และเส้นทางค้นหาของ LINE) ทำให้คำค้นหายอดฮิตตอบจากหน่วยความจำได้ตั้งแต่ครั้งแรกหลัง deploy
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config import config
+from .metrics import metrics
+from .product_store import ProductChangeNotifier, search_logging_paused
+from .suggestion_index import normalize
+
+# จำนวนการเปิด cache แยกตาม cache, คำค้นหาที่ warm แล้วหรือไม่ และ hit/miss
+cache_lookups = metrics.counter('search_cache_lookups_total', 'Search cache lookups by cache, warmed and result')
+
+
+class SearchCache:
+    """cache แบบ LRU + TTL แยกตามชนิด (เช่น 'pipeline', 'line', 'flex') ล้างทั้งหมดเมื่อสินค้าเปลี่ยน
+
+    key ที่ warmer ใส่ไว้ถูกจำเป็น "warmed" เพื่อแยกอัตรา hit ของคำค้นหาที่ warm แล้ว/ยังไม่ warm
+    ค่าที่เก็บใช้ร่วมกันระหว่างผู้เรียกทุกคน ห้ามแก้ไข
+    """
+
+    def __init__(self, max_entries: int = None, ttl: int = None):
+        self.max_entries = max_entries or config.SEARCH_CACHE_SIZE
+        self.ttl = ttl or config.SEARCH_CACHE_TTL_SECONDS
+        self._lock = threading.Lock()
+        self._entries: Dict[str, OrderedDict] = {}  # ชนิด -> key -> (หมดอายุเมื่อ, ค่า)
+        self._warmed: set = set()  # (ชนิด, key)
+
+        ProductChangeNotifier.add_change_listener(self.on_product_change)
+
+    @staticmethod
+    def key(query: str, *parts) -> Tuple:
+        """key ของคำค้นหา (normalize ข้อความ) + พารามิเตอร์อื่นที่มีผลต่อผลลัพธ์"""
+        return (normalize(query),) + parts
+
+    def get(self, kind: str, key: Tuple) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entries = self._entries.get(kind)
+            entry = entries.get(key) if entries is not None else None
+            if entry is not None and entry[0] < now:
+                del entries[key]
+                entry = None
+            elif entry is not None:
+                entries.move_to_end(key)
+            warmed = (kind, key) in self._warmed
+
+        cache_lookups.inc(cache=kind, warmed=str(warmed).lower(), result='miss' if entry is None else 'hit')
+        return None if entry is None else entry[1]
+
+    def put(self, kind: str, key: Tuple, value: Any, warmed: bool = False):
+        with self._lock:
+            entries = self._entries.setdefault(kind, OrderedDict())
+            entries[key] = (time.time() + self.ttl, value)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            if warmed:
+                self._warmed.add((kind, key))
+
+    def get_or_compute(self, kind: str, key: Tuple, compute: Callable[[], Any]) -> Any:
+        """ค่าจาก cache หรือคำนวณใหม่แล้วเก็บไว้ (ค่า None ไม่ถูกเก็บ)"""
+        value = self.get(kind, key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.put(kind, key, value)
+        return value
+
+    def reset_warmed(self):
+        """เริ่มรอบ warm-up ใหม่ - key ที่หลุดจากอันดับยอดนิยมไม่นับเป็น warmed อีก"""
+        with self._lock:
+            self._warmed.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def on_product_change(self, action: str, product_code: str, data: Optional[Dict] = None):
+        """Listener สำหรับการเขียนสินค้า - ผลค้นหาอาจเปลี่ยนได้ทุกคำค้นหา จึงล้างทั้งหมด"""
+        self.clear()
+
+    def stats(self) -> Dict[str, Dict]:
+        """จำนวนรายการและอัตรา hit แยกตามชนิด cache และคำค้นหาที่ warm แล้ว/ยังไม่ warm"""
+        with self._lock:
+            sizes = {kind: len(entries) for kind, entries in self._entries.items()}
+            warmed_keys = len(self._warmed)
+
+        result: Dict[str, Dict] = {}
+        kinds = sorted({labels['cache'] for labels in cache_lookups.labels()} | set(sizes))
+        for kind in kinds:
+            summary = {'entries': sizes.get(kind, 0)}
+            for warmed in ('true', 'false'):
+                hits = cache_lookups.value(cache=kind, warmed=warmed, result='hit')
+                misses = cache_lookups.value(cache=kind, warmed=warmed, result='miss')
+                summary['warmed' if warmed == 'true' else 'unwarmed'] = {
+                    'hits': int(hits),
+                    'misses': int(misses),
+                    'hit_ratio': round(hits / (hits + misses), 3) if hits + misses else None
+                }
+            result[kind] = summary
+        result['warmed_keys'] = warmed_keys
+        return result
+
+
+class SearchWarmer:
+    """ค้นล่วงหน้าคำค้นหายอดนิยมจาก product_searches ผ่านตัว warm ทุกตัวที่ลงทะเบียนไว้
+
+    ตัว warm คือ callable(query) ที่ค้นหาแล้ว put ผลลง cache ด้วย warmed=True
+    การค้นหาระหว่าง warm-up ไม่ถูกบันทึกลง product_searches เพื่อไม่ให้อันดับยอดนิยมเพิ่มขึ้นเอง
+    """
+
+    def __init__(self, db_instance=None, cache: SearchCache = None, top_n: int = None, interval: int = None):
+        self.db = db_instance
+        self.cache = cache or search_cache
+        self.logger = logging.getLogger(__name__)
+        self.top_n = config.SEARCH_WARMUP_QUERIES if top_n is None else top_n
+        self.interval = interval or config.SEARCH_WARMUP_INTERVAL_SECONDS
+        self._warmers: List[Callable[[str], None]] = [self._warm_pipeline]
+        self._scheduler: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.last_run: Dict[str, Any] = {}
+
+    def bind_database(self, db_instance):
+        """กำหนดฐานข้อมูลที่ใช้อ่านคำค้นหายอดนิยม (ถ้ายังไม่มี)"""
+        if self.db is None and db_instance is not None:
+            self.db = db_instance
+
+    def add_warmer(self, warmer: Callable[[str], None]):
+        """ลงทะเบียนตัว warm เพิ่ม (เช่น เส้นทางค้นหา + render Flex ของ LINE handler)"""
+        if warmer not in self._warmers:
+            self._warmers.append(warmer)
+
+    def _warm_pipeline(self, query: str):
+        """ผลของ /api/search?ai=true หน้าแรกด้วยจำนวนผลลัพธ์ตั้งต้น"""
+        from .search_pipeline import search_pipeline
+
+        limit = config.MAX_RESULTS_PER_SEARCH
+        result = search_pipeline.search(query, limit, 0)
+        self.cache.put('pipeline', self.cache.key(query, limit, 0), result, warmed=True)
+
+    def popular_queries(self) -> List[str]:
+        """คำค้นหายอดนิยม top_n อันดับ (ไม่ซ้ำหลัง normalize)"""
+        if not self.db or self.top_n <= 0:
+            return []
+        searches = self.db.get_popular_searches(self.top_n) or []
+        queries = {}
+        for row in searches:
+            query = (row.get('search_query') or '').strip()
+            if query and normalize(query) not in queries:
+                queries[normalize(query)] = query
+        return list(queries.values())
+
+    def warm(self) -> Dict[str, Any]:
+        """ค้นล่วงหน้าทุกคำค้นหายอดนิยมผ่านตัว warm ทุกตัว คืนสรุปของรอบนี้"""
+        with self._lock:
+            started = time.perf_counter()
+            queries = self.popular_queries()
+            self.cache.reset_warmed()
+            failed = 0
+            with search_logging_paused():
+                for query in queries:
+                    for warmer in self._warmers:
+                        try:
+                            warmer(query)
+                        except Exception as e:
+                            failed += 1
+                            self.logger.error(f"Search warm-up failed for '{query}': {e}")
+
+            self.last_run = {
+                'queries': len(queries),
+                'warmers': len(self._warmers),
+                'failed': failed,
+                'seconds': round(time.perf_counter() - started, 3),
+                'finished_at': time.time()
+            }
+        self.logger.info(f"Search warm-up: {len(queries)} queries in {self.last_run['seconds']}s ({failed} failed)")
+        return self.last_run
+
+    def _warm_loop(self):
+        while True:
+            try:
+                self.warm()
+            except Exception as e:
+                self.logger.error(f"Search warm-up run failed: {e}")
+            time.sleep(self.interval)
+
+    def start(self):
+        """warm-up ครั้งแรกทันทีใน background thread แล้วทำซ้ำตามรอบเวลา (SEARCH_WARMUP_QUERIES=0 = ปิด)"""
+        if self._scheduler is None and self.db is not None and self.top_n > 0:
+            with self._lock:
+                if self._scheduler is None:
+                    self._scheduler = threading.Thread(target=self._warm_loop, name="search-warmup", daemon=True)
+                    self._scheduler.start()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.top_n > 0,
+            'top_n': self.top_n,
+            'interval_seconds': self.interval,
+            'last_run': self.last_run or None,
+            'cache': self.cache.stats()
+        }
+
+# สร้าง instance สำหรับใช้งาน
+search_cache = SearchCache()
+search_warmer = SearchWarmer()
@@ -0,0 +1,456 @@
+"""
+📁 src/utils/semantic_search.py
+🎯 ค้นหาสินค้าเชิงความหมาย (semantic search) ด้วย embedding + ดัชนี ANN แบบ IVF
+embedding ของสินค้าคำนวณล่วงหน้า (offline) เก็บเป็นเมทริกซ์ float32 แบบ memory-mapped เรียงตาม cluster
+ตอนค้นหาเทียบกับ centroid ก่อน แล้วคำนวณ cosine เฉพาะ cluster ที่ใกล้ที่สุด (nprobe) ผลลัพธ์ผสมกับคะแนน lexical
+
+ตัวอย่างสร้างดัชนี:
+    python -m src.utils.semantic_search --engine sqlite --output semantic_index
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import openai
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+from ..config import config
+from .ai_search import ai_search
+from .product_store import ProductChangeNotifier
+from .suggestion_index import normalize
+from .thai_tokenizer import thai_tokenizer
+
+# ฟิลด์ที่นำมาสร้าง embedding ของสินค้า
+TEXT_FIELDS = ('product_name', 'category', 'description')
+
+ENCODE_BATCH_SIZE = 256
+TRAIN_SAMPLE_PER_LIST = 40  # ใช้ตัวอย่าง ~40 เวกเตอร์ต่อ cluster ในการ train k-means
+
+
+def product_text(product: Dict) -> str:
+    """ข้อความของสินค้าที่ใช้สร้าง embedding"""
+    return ' '.join(str(product.get(field) or '') for field in TEXT_FIELDS)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """ปรับทุกแถวให้ยาว 1 (cosine = dot product) แถวศูนย์คงเป็นศูนย์"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+class HashingEncoder:
+    """encoder ในเครื่อง (ไม่ต้องใช้เครือข่าย): feature hashing ของคำ, char 3-gram และกลุ่มคำพ้องความหมาย
+
+    char 3-gram ช่วยกับชื่อภาษาไทยที่ไม่มีช่องว่าง ส่วนกลุ่มคำพ้องจาก ai_search (synonyms/categories/brands)
+    ทำให้ "phone" กับ "มือถือ" อยู่ใกล้กันแม้ไม่มีตัวอักษรร่วม
+    """
+
+    WORD_WEIGHT = 1.0
+    GRAM_WEIGHT = 0.5
+    CONCEPT_WEIGHT = 2.0
+
+    def __init__(self, dim: int = None):
+        self.dim = dim or config.SEMANTIC_DIM
+        self.name = f'hashing-v2-{self.dim}'  # v2: คำไทยตัดด้วย thai_tokenizer (ดัชนีเดิมถูกสร้างใหม่)
+        self._buckets: Dict[str, Tuple[int, float]] = {}
+        self._concepts: Dict[str, str] = {}
+        for table in (ai_search.synonyms, ai_search.categories, ai_search.brands):
+            for concept, terms in table.items():
+                for term in [concept] + terms:
+                    self._concepts.setdefault(normalize(term), concept)
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        """ตำแหน่งและเครื่องหมายของ feature (crc32 ให้ผลเหมือนกันทุก process ต่างจาก hash())"""
+        cached = self._buckets.get(feature)
+        if cached is None:
+            value = zlib.crc32(feature.encode('utf-8'))
+            cached = (value % self.dim, 1.0 if value & 0x80000000 else -1.0)
+            if len(self._buckets) < 500_000:
+                self._buckets[feature] = cached
+        return cached
+
+    def _features(self, text: str) -> Dict[str, float]:
+        text = normalize(text)
+        features: Dict[str, float] = {}
+        for word in thai_tokenizer.keywords(text):
+            key = 'w:' + word
+            features[key] = features.get(key, 0.0) + self.WORD_WEIGHT
+            padded = f' {word} '
+            for i in range(len(padded) - 2):
+                key = 'g:' + padded[i:i + 3]
+                features[key] = features.get(key, 0.0) + self.GRAM_WEIGHT
+        for term, concept in self._concepts.items():
+            if term in text:
+                key = 'c:' + concept
+                features[key] = features.get(key, 0.0) + self.CONCEPT_WEIGHT
+        return features
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """เมทริกซ์ (len(texts), dim) float32 ที่ normalize แล้ว (น้ำหนักแบบ sublinear: 1 + log)"""
+        rows, columns, values = [], [], []
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text).items():
+                column, sign = self._bucket(feature)
+                rows.append(row)
+                columns.append(column)
+                values.append(sign * (1.0 + math.log(weight)) if weight > 1 else sign * weight)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64)), values)
+        return _normalize_rows(matrix)
+
+
+class OpenAIEncoder:
+    """encoder ผ่าน OpenAI embeddings API (ใช้สร้างดัชนีแบบ offline และ encode คำค้นหา)"""
+
+    def __init__(self, client=None, model: str = None):
+        self.model = model or config.SEMANTIC_OPENAI_MODEL
+        self.name = f'openai-{self.model}'
+        self.client = client or openai.OpenAI(api_key=config.OPENAI_API_KEY)
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        response = self.client.embeddings.create(model=self.model, input=list(texts))
+        return _normalize_rows(np.asarray([item.embedding for item in response.data], dtype=np.float32))
+
+
+def create_encoder(name: str = None):
+    """สร้าง encoder ตาม SEMANTIC_ENCODER (hashing | openai) - ถ้าใช้ OpenAI ไม่ได้จะใช้ hashing แทน"""
+    name = (name or config.SEMANTIC_ENCODER or 'hashing').lower()
+    if name == 'openai':
+        if OPENAI_AVAILABLE and config.OPENAI_API_KEY:
+            return OpenAIEncoder()
+        logging.getLogger(__name__).warning("OpenAI embeddings not available - using hashing encoder")
+    elif name != 'hashing':
+        logging.getLogger(__name__).error(f"Unknown SEMANTIC_ENCODER '{name}', using hashing")
+    return HashingEncoder()
+
+
+class IVFIndex:
+    """ดัชนี inverted file (IVF): เวกเตอร์เรียงตาม cluster ของ spherical k-means
+
+    cluster c อยู่ที่แถว offsets[c]:offsets[c + 1] การค้นหาจึงอ่านเป็นช่วงต่อเนื่องจาก memmap
+    """
+
+    FILES = ('meta.json', 'codes.json', 'centroids.npy', 'offsets.npy', 'vectors.f32')
+
+    def __init__(self, codes: List[str], vectors: np.ndarray, centroids: np.ndarray, offsets: np.ndarray,
+                 encoder_name: str = ''):
+        self.codes = codes
+        self.vectors = vectors
+        self.centroids = centroids
+        self.offsets = offsets
+        self.encoder_name = encoder_name
+
+    @classmethod
+    def train(cls, codes: List[str], vectors: np.ndarray, nlist: int = None, iterations: int = 10,
+              seed: int = 0, encoder_name: str = '') -> 'IVFIndex':
+        """แบ่งเวกเตอร์เป็น nlist cluster (ค่าเริ่มต้น ~2 x sqrt(n)) แล้วเรียงแถวตาม cluster"""
+        count, dim = vectors.shape
+        if count == 0:
+            return cls([], np.zeros((0, dim), dtype=np.float32), np.zeros((0, dim), dtype=np.float32),
+                       np.zeros(1, dtype=np.int64), encoder_name)
+
+        nlist = max(1, min(nlist or int(2 * math.sqrt(count)), count))
+        rng = np.random.default_rng(seed)
+        sample = vectors[np.sort(rng.choice(count, min(count, nlist * TRAIN_SAMPLE_PER_LIST), replace=False))]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.stack([np.bincount(assign, weights=sample[:, d], minlength=nlist) for d in range(dim)], axis=1)
+            filled = np.bincount(assign, minlength=nlist) > 0  # cluster ว่างใช้ centroid เดิม
+            centroids[filled] = _normalize_rows(sums[filled].astype(np.float32))
+
+        assign = np.concatenate([
+            np.argmax(vectors[start:start + 8192] @ centroids.T, axis=1) for start in range(0, count, 8192)
+        ])
+        order = np.argsort(assign, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))]).astype(np.int64)
+        return cls([codes[i] for i in order], np.ascontiguousarray(vectors[order]), centroids, offsets, encoder_name)
+
+    def search(self, vector: np.ndarray, k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        """ตำแหน่งแถวและ cosine ของ k เวกเตอร์ที่ใกล้ที่สุดใน nprobe cluster ที่ใกล้ query ที่สุด"""
+        if not self.codes or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        centroid_scores = self.centroids @ vector
+        nprobe = min(nprobe, len(centroid_scores))
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        positions, scores = [], []
+        for cluster in probe:
+            start, end = int(self.offsets[cluster]), int(self.offsets[cluster + 1])
+            if end > start:
+                positions.append(np.arange(start, end))
+                scores.append(self.vectors[start:end] @ vector)
+        if not positions:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        positions, scores = np.concatenate(positions), np.concatenate(scores)
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            positions, scores = positions[top], scores[top]
+        order = np.argsort(-scores, kind='stable')
+        return positions[order], scores[order]
+
+    def save(self, path: str):
+        """เขียนดัชนีลงไดเรกทอรี (เขียนไฟล์ชั่วคราวก่อน แล้วเปลี่ยนชื่อ; meta.json เป็นไฟล์สุดท้าย)"""
+        os.makedirs(path, exist_ok=True)
+        meta = {'encoder': self.encoder_name, 'dim': int(self.centroids.shape[1]), 'count': len(self.codes),
+                'nlist': len(self.centroids), 'built_at': time.time()}
+        writers = {
+            'codes.json': lambda f: f.write(json.dumps(self.codes, ensure_ascii=False).encode('utf-8')),
+            'centroids.npy': lambda f: np.save(f, self.centroids),
+            'offsets.npy': lambda f: np.save(f, self.offsets),
+            'vectors.f32': lambda f: f.write(np.ascontiguousarray(self.vectors, dtype=np.float32).tobytes()),
+            'meta.json': lambda f: f.write(json.dumps(meta).encode('utf-8')),
+        }
+        for filename in self.FILES[1:] + self.FILES[:1]:
+            target = os.path.join(path, filename)
+            with open(target + '.tmp', 'wb') as f:
+                writers[filename](f)
+            os.replace(target + '.tmp', target)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['IVFIndex']:
+        """เปิดดัชนีจากไดเรกทอรี (เวกเตอร์เป็น memmap อ่านอย่างเดียว) หรือ None ถ้าไม่มี"""
+        if not os.path.exists(os.path.join(path, 'meta.json')):
+            return None
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(os.path.join(path, 'codes.json'), encoding='utf-8') as f:
+            codes = json.load(f)
+        centroids = np.load(os.path.join(path, 'centroids.npy'))
+        offsets = np.load(os.path.join(path, 'offsets.npy'))
+        if meta['count']:
+            vectors = np.memmap(os.path.join(path, 'vectors.f32'), dtype=np.float32, mode='r',
+                                shape=(meta['count'], meta['dim']))
+        else:
+            vectors = np.zeros((0, meta['dim']), dtype=np.float32)
+        return cls(codes, vectors, centroids, offsets, meta.get('encoder', ''))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class SemanticSearch:
+    """ค้นหาสินค้าเชิงความหมาย: ANN บนดัชนี IVF + คะแนน lexical ของผู้สมัคร
+
+    ดัชนีหลักสร้าง offline (build) แล้วเปิดเป็น memmap การเขียนสินค้าหลังจากนั้นเก็บใน overlay
+    (เวกเตอร์ของสินค้าที่เพิ่ม/แก้ และรหัสที่ถูกแทนที่/ลบ) จนกว่าจะสร้างดัชนีใหม่
+    """
+
+    def __init__(self, db_instance=None, encoder=None, index_path: str = None):
+        self.db = db_instance
+        self.logger = logging.getLogger(__name__)
+        self.index_path = config.SEMANTIC_INDEX_PATH if index_path is None else index_path
+        self._encoder = encoder
+
+        self._lock = threading.RLock()
+        self._index: Optional[IVFIndex] = None
+        self._positions: Dict[str, int] = {}
+        self._replaced: set = set()
+        self._extra: Dict[str, np.ndarray] = {}
+        self._extra_matrix: Optional[Tuple[List[str], np.ndarray]] = None
+
+        ProductChangeNotifier.add_change_listener(self.on_product_change)
+
+    def bind_database(self, db_instance):
+        """กำหนดฐานข้อมูลที่ใช้สร้างดัชนี (ถ้ายังไม่มี)"""
+        if self.db is None and db_instance is not None:
+            self.db = db_instance
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            self._encoder = create_encoder()
+        return self._encoder
+
+    # ===== ดัชนี =====
+
+    def _set_index(self, index: IVFIndex):
+        with self._lock:
+            self._index = index
+            self._positions = {code: i for i, code in enumerate(index.codes)}
+            self._replaced = set()
+            self._extra = {}
+            self._extra_matrix = None
+
+    def build(self, products: List[Dict] = None, nlist: int = None) -> IVFIndex:
+        """encode สินค้าทั้งหมด, train IVF แล้วบันทึกลง index_path (ถ้ากำหนด)"""
+        if products is None:
+            products = self.db.get_all_products(config.SEMANTIC_MAX_PRODUCTS) if self.db else []
+        products = [p for p in products if p.get('product_code')]
+
+        started = time.time()
+        batches = [self.encoder.encode([product_text(p) for p in products[i:i + ENCODE_BATCH_SIZE]])
+                   for i in range(0, len(products), ENCODE_BATCH_SIZE)]
+        dim = batches[0].shape[1] if batches else getattr(self.encoder, 'dim', config.SEMANTIC_DIM)
+        vectors = np.concatenate(batches) if batches else np.zeros((0, dim), dtype=np.float32)
+        index = IVFIndex.train([p['product_code'] for p in products], vectors, nlist=nlist,
+                               encoder_name=self.encoder.name)
+
+        if self.index_path:
+            index.save(self.index_path)
+            index = IVFIndex.load(self.index_path)
+        self._set_index(index)
+        self.logger.info(f"Semantic index built: {len(index)} products, {len(index.centroids)} lists "
+                         f"in {time.time() - started:.1f}s")
+        return index
+
+    def load(self) -> bool:
+        """เปิดดัชนีจาก index_path (ไม่ใช้ถ้าสร้างด้วย encoder คนละตัว)"""
+        if not self.index_path:
+            return False
+        try:
+            index = IVFIndex.load(self.index_path)
+        except Exception as e:
+            self.logger.error(f"Error loading semantic index: {e}")
+            return False
+        if index is None:
+            return False
+        if index.encoder_name != self.encoder.name:
+            self.logger.warning(f"Semantic index encoder '{index.encoder_name}' != '{self.encoder.name}', rebuilding")
+            return False
+        self._set_index(index)
+        return True
+
+    def ensure_index(self):
+        """เปิดดัชนีที่สร้างไว้ หรือสร้างใหม่จากฐานข้อมูลถ้ายังไม่มี (ครั้งแรกเท่านั้น)"""
+        if self._index is not None:
+            return
+        with self._lock:
+            if self._index is not None:
+                return
+            if not self.load():
+                try:
+                    self.build()
+                except Exception as e:
+                    self.logger.error(f"Semantic index build failed: {e}")
+                    self._set_index(IVFIndex.train([], np.zeros((0, 1), dtype=np.float32)))
+
+    def available(self) -> bool:
+        """มีดัชนีพร้อมใช้โดยไม่ต้องสร้างใหม่ (เปิดอยู่แล้ว หรือเปิดจาก index_path ได้)"""
+        if self._index is not None:
+            return True
+        with self._lock:
+            return self._index is not None or self.load()
+
+    def on_product_change(self, action: str, product_code: str, data: Optional[Dict] = None):
+        """Listener สำหรับการเขียนสินค้า: ย้ายสินค้าที่ข้อความเปลี่ยนเข้า overlay"""
+        if self._index is None:
+            return
+        if action != 'delete' and not (data and any(field in data for field in TEXT_FIELDS)):
+            return  # แก้เฉพาะราคา/ยอดขาย - embedding ไม่เปลี่ยน
+        try:
+            vector = None
+            if action != 'delete':
+                if not all(field in data for field in TEXT_FIELDS) and self.db:
+                    data = self.db.get_product_by_code(product_code) or data
+                vector = self.encoder.encode([product_text(data)])[0]
+            with self._lock:
+                self._replaced.add(product_code)
+                self._extra.pop(product_code, None)
+                if vector is not None:
+                    self._extra[product_code] = vector
+                self._extra_matrix = None
+        except Exception as e:
+            self.logger.error(f"Error updating semantic index for {product_code}: {e}")
+
+    # ===== การค้นหา =====
+
+    def nearest(self, vector: np.ndarray, k: int, nprobe: int = None) -> List[Tuple[str, float]]:
+        """(รหัสสินค้า, cosine) ที่ใกล้เวกเตอร์ที่สุด k รายการ จากดัชนีหลักและ overlay"""
+        self.ensure_index()
+        with self._lock:
+            index, replaced = self._index, self._replaced
+            if self._extra_matrix is None and self._extra:
+                self._extra_matrix = (list(self._extra), np.stack(list(self._extra.values())))
+            extra = self._extra_matrix if self._extra else None
+
+        # ขอเพิ่มตามจำนวนที่ถูกแทนที่ เพื่อให้ยังได้ครบ k หลังตัดออก
+        positions, scores = index.search(vector, k + len(replaced), nprobe or config.SEMANTIC_NPROBE)
+        results = [(index.codes[p], float(s)) for p, s in zip(positions, scores) if index.codes[p] not in replaced]
+        if extra:
+            results += zip(extra[0], (extra[1] @ vector).tolist())
+        results.sort(key=lambda item: -item[1])
+        return results[:k]
+
+    def search(self, query: str, limit: int = 5, candidates: int = None) -> List[Dict]:
+        """สินค้าที่ใกล้ความหมายของ query เรียงตามคะแนนผสม (1 - w) x cosine + w x lexical
+
+        คะแนน lexical = สัดส่วนคำของ query ที่พบในข้อความสินค้า (ครึ่งหนึ่ง) + พบทั้งวลี (อีกครึ่ง)
+        คิดเฉพาะกับผู้สมัครจาก ANN จึงไม่ต้องสแกนทั้งแคตตาล็อก
+        """
+        phrase = normalize(query)
+        if not phrase:
+            return []
+        try:
+            vector = self.encoder.encode([phrase])[0]
+            nearest = self.nearest(vector, candidates or max(limit * 5, 50))
+            if not nearest or not self.db:
+                return []
+
+            terms = thai_tokenizer.keywords(phrase) or [phrase]
+            weight = config.SEMANTIC_LEXICAL_WEIGHT
+            semantic = dict(nearest)
+            scored = []
+            for product in self.db.get_products_by_codes(list(semantic)):
+                text = normalize(product_text(product))
+                lexical = 0.5 * sum(term in text for term in terms) / len(terms) + 0.5 * (phrase in text)
+                score = (1 - weight) * semantic.get(product['product_code'], 0.0) + weight * lexical
+                scored.append((score, product))
+
+            scored.sort(key=lambda item: -item[0])
+            results = []
+            for score, product in scored[:limit]:
+                product = dict(product)
+                product['semantic_score'] = round(semantic.get(product['product_code'], 0.0), 4)
+                product['search_score'] = round(score, 4)
+                results.append(product)
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Semantic search error: {e}")
+            return []
+
+    def __len__(self) -> int:
+        index = self._index
+        return (len(index) if index else 0) - len(self._replaced) + len(self._extra)
+
+
+def main(argv: List[str] = None):
+    """สร้างดัชนี semantic search จาก product store แบบ offline"""
+    from .product_store import create_product_store
+
+    parser = argparse.ArgumentParser(description='สร้างดัชนี semantic search ของสินค้า')
+    parser.add_argument('--engine', help='PRODUCT_STORE_ENGINE ที่ใช้อ่านสินค้า (supabase | sqlite | memory)')
+    parser.add_argument('--output', default=config.SEMANTIC_INDEX_PATH, help='ไดเรกทอรีของดัชนี')
+    parser.add_argument('--encoder', help='hashing | openai (ค่าเริ่มต้น SEMANTIC_ENCODER)')
+    parser.add_argument('--limit', type=int, default=config.SEMANTIC_MAX_PRODUCTS, help='จำนวนสินค้าสูงสุด')
+    parser.add_argument('--nlist', type=int, help='จำนวน cluster ของ IVF (ค่าเริ่มต้น ~2 x sqrt(n))')
+    args = parser.parse_args(argv)
+
+    store = create_product_store(args.engine)
+    builder = SemanticSearch(store, encoder=create_encoder(args.encoder), index_path=args.output)
+    index = builder.build(store.get_all_products(args.limit), nlist=args.nlist)
+    print(f"[OK] semantic index: {len(index)} products, {len(index.centroids)} lists -> {args.output}")
+    return index
+
+# สร้าง instance สำหรับใช้งาน
+semantic_search = SemanticSearch()
+
+if __name__ == "__main__":
+    main()
@@ -8,22 +8,24 @@ from datetime import datetime, timedelta
 import json
 import logging
 
+from .user_profile_store import UserProfileStore
+from .trending_service import trending_service
+from .fanout import fanout
+
 class SmartRecommendationEngine:
     """เครื่องมือแนะนำสินค้าอัจฉริยะ"""
     
     def __init__(self, db_instance=None):
         self.db = db_instance
         self.logger = logging.getLogger(__name__)
+        self.trending = trending_service
+        self.trending.bind_database(db_instance)
         
-        # เก็บประวัติการค้นหาของผู้ใช้
-        self.user_interests = {}
-        
-        # กำหนดน้ำหนักความสนใจ
+        # กำหนดน้ำหนักความสนใจตามการกระทำ
         self.interest_weights = {
-            'search_count': 3,      # ค้นหาหลายครั้ง
-            'category_view': 2,     # ดูหมวดหมู่
-            'product_click': 4,     # คลิกดูสินค้า
-            'recent_activity': 2    # กิจกรรมล่าสุด
+            'search': 3,      # ค้นหา
+            'view': 2,        # ดูหมวดหมู่
+            'click': 4        # คลิกดูสินค้า
         }
         
         # หมวดหมู่และคำสำคัญที่เกี่ยวข้อง
@@ -36,64 +38,21 @@ class SmartRecommendationEngine:
             'สุขภาพ': ['ดูแลสุขภาพ', 'วิตามิน', 'ออกกำลังกาย', 'สุขภาพดี'],
             'กีฬา': ['ออกกำลังกาย', 'ฟิตเนส', 'สุขภาพ', 'ความแข็งแรง']
         }
+        
+        # โปรไฟล์ความสนใจแบบ vector ต่อผู้ใช้ (decay ตามเวลา ครึ่งชีวิต 7 วัน)
+        self.user_profiles = UserProfileStore(self.category_keywords.keys())
     
     def track_user_interest(self, user_id: str, action: str, category: str = None, product_id: str = None):
         """บันทึกความสนใจของผู้ใช้"""
-        if user_id not in self.user_interests:
-            self.user_interests[user_id] = {
-                'categories': {},
-                'last_activity': datetime.now(),
-                'total_searches': 0
-            }
+        weights = {}
+        if category and action in self.interest_weights:
+            weights[category] = self.interest_weights[action]
         
-        user_data = self.user_interests[user_id]
-        user_data['last_activity'] = datetime.now()
-        
-        if category:
-            if category not in user_data['categories']:
-                user_data['categories'][category] = {
-                    'search_count': 0,
-                    'view_count': 0,
-                    'click_count': 0,
-                    'last_seen': datetime.now()
-                }
-            
-            cat_data = user_data['categories'][category]
-            cat_data['last_seen'] = datetime.now()
-            
-            if action == 'search':
-                cat_data['search_count'] += 1
-                user_data['total_searches'] += 1
-            elif action == 'view':
-                cat_data['view_count'] += 1
-            elif action == 'click':
-                cat_data['click_count'] += 1
+        self.user_profiles.record(user_id, weights)
     
     def get_user_interest_score(self, user_id: str, category: str) -> float:
         """คำนวณคะแนนความสนใจของผู้ใช้ในหมวดหมู่"""
-        if user_id not in self.user_interests:
-            return 0.0
-        
-        user_data = self.user_interests[user_id]
-        if category not in user_data['categories']:
-            return 0.0
-        
-        cat_data = user_data['categories'][category]
-        
-        # คำนวณคะแนนจากการกระทำต่างๆ
-        score = (
-            cat_data['search_count'] * self.interest_weights['search_count'] +
-            cat_data['view_count'] * self.interest_weights['category_view'] +
-            cat_data['click_count'] * self.interest_weights['product_click']
-        )
-        
-        # เพิ่มคะแนนสำหรับกิจกรรมล่าสุด (ใน 7 วันที่ผ่านมา)
-        days_ago = (datetime.now() - cat_data['last_seen']).days
-        if days_ago <= 7:
-            recent_bonus = self.interest_weights['recent_activity'] * (8 - days_ago) / 7
-            score += recent_bonus
-        
-        return score
+        return self.user_profiles.score(user_id, category)
     
     def get_personalized_recommendations(self, user_id: str, limit: int = 5) -> List[Dict]:
         """แนะนำสินค้าตามความสนใจส่วนบุคคล"""
@@ -101,32 +60,28 @@ class SmartRecommendationEngine:
             return []
         
         try:
-            # หาหมวดหมู่ที่ผู้ใช้สนใจ
-            interest_scores = {}
-            for category in self.category_keywords.keys():
-                score = self.get_user_interest_score(user_id, category)
-                if score > 0:
-                    interest_scores[category] = score
+            # หาหมวดหมู่ที่ผู้ใช้สนใจ เรียงตามคะแนนความสนใจ
+            sorted_interests = self.user_profiles.top_interests(user_id, limit=len(self.category_keywords))
             
-            if not interest_scores:
+            if not sorted_interests:
                 # ถ้าไม่มีประวัติ แนะนำสินค้าขายดี
                 return self._get_trending_products(limit)
             
-            # เรียงตามคะแนนความสนใจ
-            sorted_interests = sorted(interest_scores.items(), key=lambda x: x[1], reverse=True)
-            
             recommendations = []
             products_per_category = max(1, limit // len(sorted_interests))
             
-            for category, score in sorted_interests:
-                # ค้นหาสินค้าในหมวดหมู่ที่สนใจ
-                category_products = self.db.search_products(
+            # ค้นหาสินค้าในทุกหมวดหมู่ที่สนใจพร้อมกัน แล้วรวมผลตามลำดับความสนใจ
+            results = fanout.run('interest_recommendations', *(
+                lambda category=category: self.db.search_products(
                     query="", 
                     category=category, 
                     limit=products_per_category,
                     order_by='rating'
                 )
-                
+                for category, _ in sorted_interests
+            ))
+            
+            for (category, score), category_products in zip(sorted_interests, results):
                 products = category_products.get('products', [])
                 for product in products:
                     product['recommendation_score'] = score
@@ -187,32 +142,17 @@ class SmartRecommendationEngine:
         return self._get_trending_products(limit)
     
     def _get_trending_products(self, limit: int) -> List[Dict]:
-        """ดึงสินค้าที่กำลังมาแรง (ขายดี + คะแนนสูง)"""
+        """ดึงสินค้าที่กำลังมาแรงจาก leaderboard (ยอดขาย + ความเร็วการขาย + คะแนนรีวิว)"""
         if not self.db:
             return []
         
         try:
-            # ดึงสินค้าขายดีที่มีคะแนนสูง
-            trending = self.db.search_products(
-                query="",
-                limit=limit,
-                order_by='sold_count'  # เรียงตามยอดขาย
-            )
-            
-            products = trending.get('products', [])
+            products = self.trending.top(limit)
             
-            # คำนวณคะแนน trending (ยอดขาย + คะแนนรีวิว)
             for product in products:
-                sold_count = product.get('sold_count', 0)
-                rating = product.get('rating', 0)
-                trending_score = (sold_count * 0.7) + (rating * 100 * 0.3)
-                product['trending_score'] = trending_score
                 product['recommendation_reason'] = "สินค้าที่กำลังมาแรง"
             
-            # เรียงใหม่ตามคะแนน trending
-            products.sort(key=lambda x: x.get('trending_score', 0), reverse=True)
-            
-            return products[:limit]
+            return products
             
         except Exception as e:
             self.logger.error(f"Error getting trending products: {e}")
@@ -0,0 +1,175 @@
+"""
+📁 src/utils/spell_corrector.py
+🎯 แก้คำค้นหาที่พิมพ์ผิด (ไทย/อังกฤษ) ด้วยดัชนีแบบ SymSpell
+เก็บคำที่ได้จากการลบตัวอักษร (deletion neighbourhood) ของทุกคำในแคตตาล็อกไว้ล่วงหน้า
+การแก้คำจึงเป็นแค่การ lookup dict ไม่กี่สิบครั้ง ไม่ต้องเทียบกับทุกคำ
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..config import config
+from .suggestion_index import normalize, suggestion_index
+
+# คำพิมพ์ผิดที่พบบ่อยในภาษาไทย (สระเอสองตัวแทนสระแอ ฯลฯ) แก้ก่อนเทียบระยะ
+THAI_TYPO_FIXES = (('เเ', 'แ'), ('ํา', 'ำ'))
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """ระยะแก้ไขแบบ Damerau-Levenshtein (optimal string alignment) หยุดเมื่อเกิน limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SpellCorrector:
+    """ดัชนี SymSpell ของคำในแคตตาล็อก (ชื่อสินค้า, หมวดหมู่, แบรนด์) ถ่วงน้ำหนักตามความนิยม
+
+    คำศัพท์ตามมาจาก suggestion_index ผ่าน term listener จึงอัปเดตทันทีเมื่อสินค้าเปลี่ยน
+    คำค้นหาของผู้ใช้ไม่ถูกนำมาเป็นคำศัพท์ เพราะคำที่พิมพ์ผิดบ่อยจะกลายเป็นคำที่ "ถูก"
+    """
+
+    def __init__(self, index=None, max_distance: int = None, prefix_length: int = 7):
+        self.logger = logging.getLogger(__name__)
+        self.max_distance = max_distance if max_distance is not None else config.SPELL_MAX_DISTANCE
+        self.prefix_length = prefix_length  # สร้างคำลบจากเฉพาะ prefix เพื่อจำกัดขนาดดัชนี (เหมือน SymSpell)
+        self.index = index
+
+        self._lock = threading.RLock()
+        self._words: Dict[str, float] = {}
+        self._deletes: Dict[str, Set[str]] = {}
+
+        if index is not None:
+            index.add_term_listener(self.on_term)
+
+    # ===== ดัชนี =====
+
+    def _edits(self, word: str, distance: int) -> Set[str]:
+        """คำที่ได้จากการลบตัวอักษรไม่เกิน distance ตัว (รวมคำเดิม)"""
+        results = {word}
+        frontier = {word}
+        for _ in range(distance):
+            frontier = {item[:i] + item[i + 1:] for item in frontier if len(item) > 1 for i in range(len(item))}
+            results |= frontier
+        return results
+
+    def add_word(self, word: str, weight: float = 1.0):
+        word = normalize(word)
+        if not word:
+            return
+        with self._lock:
+            if word not in self._words:
+                for variant in self._edits(word[:self.prefix_length], self.max_distance):
+                    self._deletes.setdefault(variant, set()).add(word)
+            self._words[word] = self._words.get(word, 0.0) + weight
+
+    def remove_word(self, word: str, weight: float = None):
+        word = normalize(word)
+        with self._lock:
+            if word not in self._words:
+                return
+            remaining = 0.0 if weight is None else self._words[word] - weight
+            if remaining > 1e-9:
+                self._words[word] = remaining
+                return
+            del self._words[word]
+            for variant in self._edits(word[:self.prefix_length], self.max_distance):
+                words = self._deletes.get(variant)
+                if words:
+                    words.discard(word)
+                    if not words:
+                        del self._deletes[variant]
+
+    def on_term(self, key: str, delta: float, kind: str):
+        """term listener ของ suggestion_index"""
+        if kind == 'query':
+            return
+        if delta > 0:
+            self.add_word(key, delta)
+        else:
+            self.remove_word(key, -delta)
+
+    # ===== การแก้คำ =====
+
+    def _allowed_distance(self, word: str) -> int:
+        """คำสั้นแก้ได้น้อยกว่า (คำ 1-3 ตัวอักษรไม่แก้ เพราะแทบทุกคำห่างกันแค่ 1-2)"""
+        if len(word) <= 3:
+            return 0
+        if len(word) <= 5:
+            return min(1, self.max_distance)
+        return self.max_distance
+
+    def lookup(self, word: str) -> Optional[Tuple[str, int]]:
+        """คำในแคตตาล็อกที่ใกล้ word ที่สุด (ระยะน้อยสุด แล้วน้ำหนักมากสุด) -> (คำ, ระยะ)"""
+        word = normalize(word)
+        for typo, fix in THAI_TYPO_FIXES:
+            word = word.replace(typo, fix)
+        if word in self._words:
+            return word, 0
+
+        limit = self._allowed_distance(word)
+        if limit == 0:
+            return None
+
+        best: Optional[Tuple[int, float, str]] = None
+        seen: Set[str] = set()
+        for variant in self._edits(word[:self.prefix_length], limit):
+            for candidate in self._deletes.get(variant, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = edit_distance(word, candidate, limit)
+                if distance > limit:
+                    continue
+                rank = (distance, -self._words.get(candidate, 0.0), candidate)
+                if best is None or rank < best:
+                    best = rank
+        return (best[2], best[0]) if best else None
+
+    def correct(self, query: str) -> Optional[str]:
+        """คำค้นหาที่แก้แล้ว หรือ None ถ้าไม่มีอะไรต้องแก้/แก้ไม่ได้
+
+        ลองแก้ทั้งวลีก่อน (ชื่อภาษาไทยมักไม่มีช่องว่าง) แล้วจึงแก้ทีละคำ
+        """
+        if self.index is not None:
+            self.index.ensure_fresh()
+
+        original = normalize(query)
+        if not original:
+            return None
+
+        whole = self.lookup(original)
+        if whole:
+            return whole[0] if whole[0] != original else None
+
+        corrected, changed = [], False
+        for word in original.split():
+            match = self.lookup(word)
+            if match and match[1] > 0:
+                corrected.append(match[0])
+                changed = True
+            else:
+                corrected.append(word)
+        return ' '.join(corrected) if changed else None
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+# สร้าง instance สำหรับใช้งาน
+spell_corrector = SpellCorrector(suggestion_index)
@@ -7,9 +7,15 @@ import sqlite3
 import json
 import os
 from typing import Dict, List, Tuple, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from ..config import config
 from .logger import system_logger, error_handler, performance_monitor
+from .search_analytics import SearchRollups
+
+
+def _utc_now() -> datetime:
+    """เวลา UTC แบบไม่มี tzinfo ให้ตรงกับ CURRENT_TIMESTAMP ของ search_logs"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 class SQLiteKnowledgeBaseManager:
     """คลาสสำหรับจัดการ Knowledge Base ด้วย SQLite"""
@@ -71,6 +77,13 @@ class SQLiteKnowledgeBaseManager:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_query ON search_logs(query)')
             
             self.connection.commit()
+            
+            # สถิติการค้นหาอ่านจาก rollup ที่อัปเดตพร้อม log (found = 1 ผลลัพธ์, ไม่พบ = 0)
+            # ตาราง rollup ถูกสร้างตอนบันทึก/อ่านสถิติครั้งแรก ไม่ใช่ตอน import
+            self.search_rollups = SearchRollups(
+                self.connection, raw_table='search_logs', time_column='timestamp',
+                time_format='%Y-%m-%d %H:%M:%S', clock=_utc_now,
+                raw_select="SELECT query, CAST(found AS INTEGER), timestamp FROM search_logs")
             system_logger.info(f"SQLite database initialized: {self.db_path}")
             
         except Exception as e:
@@ -182,11 +195,13 @@ class SQLiteKnowledgeBaseManager:
         """บันทึก search log แบบไม่บล็อก"""
         try:
             # ใช้ connection แยกเพื่อไม่บล็อก
+            self.search_rollups.ensure()
             cursor = self.connection.cursor()
             cursor.execute('''
                 INSERT INTO search_logs (query, found, result_key, source)
                 VALUES (?, ?, ?, ?)
             ''', (query, found, result_key, "line"))
+            self.search_rollups.record(query, int(found), commit=False)
             self.connection.commit()
         except:
             pass  # ไม่ให้ search log error กระทบการค้นหา
@@ -361,49 +376,28 @@ class SQLiteKnowledgeBaseManager:
     def _log_search(self, query: str, found: bool, result_key: Optional[str] = None, source: str = "api"):
         """บันทึก search log"""
         try:
+            self.search_rollups.ensure()
             cursor = self.connection.cursor()
             cursor.execute('''
                 INSERT INTO search_logs (query, found, result_key, source)
                 VALUES (?, ?, ?, ?)
             ''', (query, found, result_key, source))
+            self.search_rollups.record(query, int(found), commit=False)
             self.connection.commit()
             
         except Exception as e:
             system_logger.error(f"Failed to log search: {e}")
     
     def get_search_stats(self, limit: int = 10) -> Dict:
-        """ดึงสถิติการค้นหา"""
+        """ดึงสถิติการค้นหา (จาก rollup - ไม่ GROUP BY ทั้งตาราง search_logs)"""
         try:
-            cursor = self.connection.cursor()
-            
-            # คำค้นหายอดนิยม
-            cursor.execute('''
-                SELECT query, COUNT(*) as count 
-                FROM search_logs 
-                GROUP BY LOWER(query) 
-                ORDER BY count DESC 
-                LIMIT ?
-            ''', (limit,))
-            popular_queries = [dict(row) for row in cursor.fetchall()]
-            
-            # อัตราการพบผลลัพธ์
-            cursor.execute('SELECT AVG(CAST(found AS FLOAT)) * 100 as success_rate FROM search_logs')
-            success_rate = cursor.fetchone()['success_rate'] or 0
-            
-            # จำนวนการค้นหาต่อวัน (7 วันล่าสุด)
-            cursor.execute('''
-                SELECT DATE(timestamp) as date, COUNT(*) as searches
-                FROM search_logs 
-                WHERE timestamp >= DATE('now', '-7 days')
-                GROUP BY DATE(timestamp)
-                ORDER BY date DESC
-            ''')
-            daily_searches = [dict(row) for row in cursor.fetchall()]
+            stats = self.search_rollups.stats(days=7, limit=limit)
             
             return {
-                'popular_queries': popular_queries,
-                'success_rate': round(success_rate, 2),
-                'daily_searches': daily_searches
+                'popular_queries': [{'query': row['search_query'], 'count': row['search_count']}
+                                    for row in stats['popular_queries']],
+                'success_rate': round(100 - stats['zero_result_rate'], 2) if stats['searches'] else 0,
+                'daily_searches': [{'date': row['period'], 'searches': row['searches']} for row in stats['daily']]
             }
             
         except Exception as e:
@@ -0,0 +1,363 @@
+"""
+📁 src/utils/suggestion_index.py
+🎯 คำแนะนำขณะพิมพ์ (search-as-you-type) จาก prefix trie แบบบีบอัด (radix trie)
+รวมคำจากชื่อสินค้า, หมวดหมู่, แบรนด์ และคำค้นหายอดนิยม ถ่วงน้ำหนักตามความนิยม
+ทุก node เก็บ top-K ของคำที่ขึ้นต้นด้วย prefix นั้นไว้ล่วงหน้า การค้นจึงเป็นแค่การเดินตาม prefix
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..config import config
+from .ai_search import ai_search
+from .product_store import ProductChangeNotifier
+from .thai_tokenizer import thai_tokenizer
+
+# ตัวคั่นคำในชื่อสินค้า (ชื่อภาษาไทยมักไม่มีช่องว่าง คำที่ได้จึงเป็นวลี เช่น "ครีมกันแดด")
+TOKEN_SPLIT = re.compile(r"[\s/,|+()\[\]{}\"'!?:;*&]+")
+MIN_TOKEN_LENGTH = 2
+
+# เมื่อคำเดียวกันมาจากหลายแหล่ง แสดงชนิดที่สำคัญกว่า
+KIND_PRIORITY = {'category': 4, 'brand': 3, 'query': 2, 'product': 1}
+
+
+def normalize(text: str) -> str:
+    """คีย์ของคำ: ตัวพิมพ์เล็ก ช่องว่างเดียว"""
+    return ' '.join((text or '').lower().split())
+
+
+def tokenize(name: str) -> List[str]:
+    """คำจากชื่อสินค้า (ไม่เอาตัวเลขล้วน และคำที่สั้นกว่า 2 ตัวอักษร)"""
+    return [token for token in TOKEN_SPLIT.split(name or '')
+            if len(token) >= MIN_TOKEN_LENGTH and not token.replace('.', '').replace('-', '').isdigit()]
+
+
+class _Node:
+    """node ของ radix trie - children: อักษรตัวแรกของ edge -> (label, node)"""
+
+    __slots__ = ('children', 'key', 'top')
+
+    def __init__(self):
+        self.children: Dict[str, Tuple[str, '_Node']] = {}
+        self.key: Optional[str] = None  # คำที่จบที่ node นี้ (ถ้ามี)
+        self.top: List[str] = []        # top-K ของคำใต้ node นี้ เรียงตามน้ำหนัก
+
+
+class SuggestionIndex:
+    """prefix trie ของคำค้นหา ถ่วงน้ำหนักตามยอดขาย/จำนวนการค้นหา อัปเดตแบบ incremental
+
+    น้ำหนักของคำ = ผลรวมจากทุกสินค้าที่มีคำนั้น (1 + log ยอดขาย) + QUERY_WEIGHT x จำนวนครั้งที่ถูกค้นหา
+    อัปเดตเมื่อสินค้าถูกเขียน (ผ่าน change listener ของ ProductStore)
+    และสร้างใหม่จากฐานข้อมูลตามรอบเวลาใน background thread
+    """
+
+    QUERY_WEIGHT = 3.0  # คำที่ผู้ใช้ค้นจริงมีน้ำหนักมากกว่าคำจากชื่อสินค้า
+
+    def __init__(self, db_instance=None, top_k: int = None, refresh_interval: int = None):
+        self.db = db_instance
+        self.logger = logging.getLogger(__name__)
+        self.top_k = top_k or config.SUGGEST_TOP_K
+        self.refresh_interval = refresh_interval or config.SUGGEST_REFRESH_SECONDS
+
+        self._lock = threading.RLock()
+        self._root = _Node()
+        self._weights: Dict[str, float] = {}
+        self._entries: Dict[str, Tuple[str, str]] = {}  # key -> (ข้อความที่แสดง, ชนิด)
+        self._product_terms: Dict[str, Dict[str, Tuple[float, str, str]]] = {}  # code -> key -> (น้ำหนัก, ข้อความ, ชนิด)
+        self._products: Dict[str, Dict] = {}
+        self._query_terms: Dict[str, Tuple[float, str, str]] = {}
+        self._term_listeners: List[Callable[[str, float, str], None]] = []
+        self._last_refresh = 0.0
+        self._scheduler: Optional[threading.Thread] = None
+
+        ProductChangeNotifier.add_change_listener(self.on_product_change)
+
+    def add_term_listener(self, listener: Callable[[str, float, str], None]):
+        """ลงทะเบียน callback(key, delta, kind) ที่ถูกเรียกทุกครั้งที่น้ำหนักของคำเปลี่ยน (เช่น spell corrector)"""
+        with self._lock:
+            if listener in self._term_listeners:
+                return
+            self._term_listeners.append(listener)
+            # ส่งคำจากสินค้าที่มีอยู่แล้วให้ listener ที่มาทีหลัง
+            for terms in self._product_terms.values():
+                for key, (weight, _, kind) in terms.items():
+                    listener(key, weight, kind)
+
+    def bind_database(self, db_instance):
+        """กำหนดฐานข้อมูลที่ใช้สร้างดัชนี (ถ้ายังไม่มี)"""
+        if self.db is None and db_instance is not None:
+            self.db = db_instance
+
+    # ===== radix trie =====
+
+    def _path(self, key: str) -> List[_Node]:
+        """node ตั้งแต่ root ถึง node ของ key (สร้าง/แยก edge ตามต้องการ)"""
+        node, path, rest = self._root, [self._root], key
+        while rest:
+            edge = node.children.get(rest[0])
+            if edge is None:
+                child = _Node()
+                node.children[rest[0]] = (rest, child)
+                path.append(child)
+                return path
+
+            label, child = edge
+            common = 1
+            while common < len(label) and common < len(rest) and label[common] == rest[common]:
+                common += 1
+            if common < len(label):
+                # แยก edge เป็น label[:common] -> middle -> label[common:]
+                middle = _Node()
+                middle.children[label[common]] = (label[common:], child)
+                middle.top = list(child.top)
+                node.children[rest[0]] = (label[:common], middle)
+                child = middle
+            node, rest = child, rest[common:]
+            path.append(node)
+        return path
+
+    def _locate(self, prefix: str) -> Optional[_Node]:
+        """node ที่ทุกคำข้างใต้ขึ้นต้นด้วย prefix (prefix อาจจบกลาง edge)"""
+        node, rest = self._root, prefix
+        while rest:
+            edge = node.children.get(rest[0])
+            if edge is None:
+                return None
+            label, child = edge
+            if label.startswith(rest):
+                return child
+            if not rest.startswith(label):
+                return None
+            node, rest = child, rest[len(label):]
+        return node
+
+    def _adjust(self, key: str, delta: float, text: str, kind: str) -> Optional[List[_Node]]:
+        """เพิ่ม/ลดน้ำหนักของคำ คืนเส้นทางที่ต้องคำนวณ top-K ใหม่"""
+        weight = self._weights.get(key, 0.0) + delta
+        if not key or (key not in self._weights and weight <= 1e-9):
+            return None
+        path = self._path(key)
+
+        if weight > 1e-9:
+            self._weights[key] = weight
+            current = self._entries.get(key)
+            if current is None or KIND_PRIORITY[kind] > KIND_PRIORITY[current[1]]:
+                self._entries[key] = (text, kind)
+            path[-1].key = key
+        else:
+            self._weights.pop(key, None)
+            self._entries.pop(key, None)
+            path[-1].key = None
+        return path
+
+    def _update_top(self, node: _Node):
+        weights = self._weights
+        candidates = {node.key} if node.key else set()
+        for _, child in node.children.values():
+            candidates.update(child.top)
+        # top list ถูกแทนทั้งก้อน ผู้อ่านที่ไม่ถือ lock จึงเห็นรายการเก่าหรือใหม่เท่านั้น
+        node.top = sorted(candidates, key=lambda k: (-weights[k], k))[:self.top_k]
+
+    def _apply(self, changes: List[Tuple[str, float, str, str]]):
+        """ปรับน้ำหนักหลายคำ แล้วคำนวณ top-K ใหม่ครั้งเดียวต่อ node (จากล่างขึ้นบน)"""
+        touched = {change[0] for change in changes if self._adjust(*change)}
+        for listener in self._term_listeners:
+            for key, delta, _, kind in changes:
+                try:
+                    listener(key, delta, kind)
+                except Exception as e:
+                    self.logger.error(f"Term listener error: {e}")
+                    break
+        if len(touched) > 1000:
+            self._recompute_all()
+            return
+        # เดินเส้นทางใหม่หลังปรับครบ เพราะการแยก edge ของคำหลัง ๆ เปลี่ยนเส้นทางของคำก่อนหน้า
+        paths = [self._path(key) for key in touched]
+        nodes: Dict[int, Tuple[int, _Node]] = {}
+        for path in paths:
+            for depth, node in enumerate(path):
+                nodes[id(node)] = (depth, node)
+        for _, node in sorted(nodes.values(), key=lambda item: -item[0]):
+            self._update_top(node)
+
+    def _recompute_all(self):
+        """คำนวณ top-K ใหม่ทั้ง trie (post-order) ใช้ตอนสร้างดัชนีทั้งชุด"""
+        stack = [(self._root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if children_done:
+                self._update_top(node)
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for _, child in node.children.values())
+
+    # ===== แหล่งคำ =====
+
+    def _terms_for_product(self, product: Dict) -> Dict[str, Tuple[float, str, str]]:
+        """คำที่สินค้าหนึ่งชิ้นสร้าง: คำในชื่อ, หมวดหมู่ และแบรนด์ที่รู้จัก"""
+        weight = 1.0 + math.log1p(max(int(product.get('sold_count') or 0), 0))
+        terms: Dict[str, Tuple[float, str, str]] = {}
+
+        def add(text: str, kind: str):
+            key = normalize(text)
+            if key and (key not in terms or KIND_PRIORITY[kind] > KIND_PRIORITY[terms[key][2]]):
+                terms[key] = (weight, text, kind)
+
+        name = product.get('product_name') or ''
+        for token in tokenize(name):
+            add(token, 'product')
+        if product.get('category'):
+            add(product['category'], 'category')
+        lowered = name.lower()
+        for brand, keywords in ai_search.brands.items():
+            if any(keyword in lowered for keyword in keywords):
+                add(brand.title(), 'brand')
+        return terms
+
+    def _set_product(self, code: str, product: Optional[Dict]) -> List[Tuple[str, float, str, str]]:
+        """แทนคำของสินค้าเดิมด้วยคำชุดใหม่ (None = ลบสินค้า) คืนรายการปรับน้ำหนัก"""
+        old = self._product_terms.pop(code, {})
+        new = self._terms_for_product(product) if product else {}
+        changes = [(key, -weight, text, kind) for key, (weight, text, kind) in old.items()
+                   if key not in new or new[key][0] != weight]
+        changes += [(key, weight, text, kind) for key, (weight, text, kind) in new.items()
+                    if key not in old or old[key][0] != weight]
+        if product:
+            self._product_terms[code] = new
+            self._products[code] = {field: product.get(field)
+                                    for field in ('product_name', 'category', 'sold_count')}
+        else:
+            self._products.pop(code, None)
+        return changes
+
+    def _set_queries(self, searches: List[Dict]) -> List[Tuple[str, float, str, str]]:
+        """แทนคำค้นหายอดนิยมชุดเดิมด้วยชุดใหม่ คืนรายการปรับน้ำหนัก"""
+        new = {}
+        for search in searches:
+            text = ' '.join(str(search.get('search_query') or '').split())
+            key = normalize(text)
+            if len(key) >= MIN_TOKEN_LENGTH:
+                count = float(search.get('search_count') or 0) + (new[key][0] if key in new else 0)
+                new[key] = (count, text, 'query')
+        changes = [(key, -self.QUERY_WEIGHT * count, text, kind)
+                   for key, (count, text, kind) in self._query_terms.items()]
+        changes += [(key, self.QUERY_WEIGHT * count, text, kind) for key, (count, text, kind) in new.items()]
+        self._query_terms = new
+        return changes
+
+    # ===== การอัปเดต =====
+
+    def add_products(self, products: List[Dict]):
+        with self._lock:
+            changes = []
+            for product in products:
+                if product.get('product_code'):
+                    changes += self._set_product(product['product_code'], product)
+            self._apply(changes)
+
+    def on_product_change(self, action: str, product_code: str, data: Optional[Dict] = None):
+        """Listener สำหรับการเขียนสินค้า"""
+        with self._lock:
+            if action == 'delete':
+                self._apply(self._set_product(product_code, None))
+            elif data:
+                merged = dict(self._products.get(product_code, {}))
+                merged.update(data)
+                self._apply(self._set_product(product_code, merged))
+
+    def refresh(self) -> bool:
+        """สร้างดัชนีใหม่จากสินค้ายอดขายสูงและคำค้นหายอดนิยมในฐานข้อมูล"""
+        if not self.db:
+            return False
+
+        products = self.db.get_top_products_by_metric('sold_count', config.SUGGEST_MAX_PRODUCTS) or []
+        searches = self.db.get_popular_searches(config.SUGGEST_MAX_QUERIES) or []
+
+        with self._lock:
+            live_codes = {p.get('product_code') for p in products}
+            changes = []
+            for code in list(self._product_terms):
+                if code not in live_codes:
+                    changes += self._set_product(code, None)
+            for product in products:
+                if product.get('product_code'):
+                    changes += self._set_product(product['product_code'], product)
+            changes += self._set_queries(searches)
+            self._apply(changes)
+            self._last_refresh = time.time()
+
+        self.logger.debug(f"Suggestion index refreshed: {len(self._weights)} terms")
+        return True
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error(f"Suggestion index refresh failed: {e}")
+
+    def ensure_fresh(self):
+        """สร้างดัชนีครั้งแรกแบบ inline แล้วให้ background thread ดูแลต่อ"""
+        if self._last_refresh == 0.0 and not self._weights:
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error(f"Suggestion index build failed: {e}")
+                self._last_refresh = time.time()
+
+        if self._scheduler is None and self.db is not None:
+            with self._lock:
+                if self._scheduler is None:
+                    self._scheduler = threading.Thread(
+                        target=self._refresh_loop, name="suggestion-refresh", daemon=True
+                    )
+                    self._scheduler.start()
+
+    # ===== การอ่าน =====
+
+    def suggest(self, prefix: str, limit: int = 5, kinds: List[str] = None) -> List[Dict]:
+        """คำที่ขึ้นต้นด้วย prefix เรียงตามน้ำหนัก (prefix ว่าง = คำยอดนิยมทั้งหมด)"""
+        self.ensure_fresh()
+
+        node = self._locate(normalize(prefix))
+        if node is None:
+            return []
+
+        suggestions = []
+        for key in node.top:
+            entry = self._entries.get(key)
+            if entry is None or (kinds and entry[1] not in kinds):
+                continue
+            suggestions.append({'text': entry[0], 'kind': entry[1], 'score': round(self._weights.get(key, 0.0), 2)})
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+    def related(self, query: str, limit: int = 5, kinds: List[str] = None) -> List[str]:
+        """คำแนะนำสำหรับคำค้นหาที่ไม่พบสินค้า: ลองทั้งคำ, ทีละคำ แล้วตัด prefix ให้สั้นลงจนพบ"""
+        skip = normalize(query)
+        words = normalize(query).split()
+        prefixes = [skip] + words + [skip[:end] for end in range(len(skip) - 1, MIN_TOKEN_LENGTH - 1, -1)]
+
+        texts: List[str] = []
+        for prefix in dict.fromkeys(prefixes):
+            for item in self.suggest(prefix, limit, kinds):
+                if normalize(item['text']) != skip and item['text'] not in texts:
+                    texts.append(item['text'])
+            if len(texts) >= limit:
+                break
+        return texts[:limit]
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+# สร้าง instance สำหรับใช้งาน
+suggestion_index = SuggestionIndex()
+
+# คำจากแคตตาล็อก (ชื่อสินค้า/แบรนด์/หมวดหมู่) เพิ่มเข้าพจนานุกรมตัดคำไทย
+suggestion_index.add_term_listener(thai_tokenizer.on_term)
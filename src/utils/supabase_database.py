@@ -16,9 +16,23 @@ except ImportError:
     Client = None
 
 from ..config import config
+from .metrics import metrics
+from .product_mirror import ProductMirror
+from .product_store import ProductChangeNotifier, SQLiteProductStore, build_product_record, search_logging_enabled
+from .search_log_writer import search_log_writer
+from .tracing import tracer
 
-class SupabaseDatabase:
-    """คลาสสำหรับจัดการฐานข้อมูล Supabase"""
+_timed = metrics.timed('supabase_request_duration_seconds', 'Latency of Supabase calls by method')
+
+def instrumented(func):
+    """จับเวลาการเรียก Supabase แยกตามเมธอด (/metrics) และบันทึกลง trace ของ request ปัจจุบัน"""
+    return tracer.traced(_timed(func), kind='supabase')
+
+class SupabaseDatabase(ProductChangeNotifier):
+    """คลาสสำหรับจัดการฐานข้อมูล Supabase (engine 'supabase' ของ ProductStore)"""
+    
+    # สำเนา products ใน SQLite (USE_PRODUCT_MIRROR) - หนึ่งชุดต่อ process ใช้ร่วมกันทุก instance
+    mirror: Optional[ProductMirror] = None
     
     def __init__(self):
         self.client: Optional[Client] = None
@@ -33,7 +47,25 @@ class SupabaseDatabase:
             self.connect()
         except Exception as e:
             self.logger.error(f"Failed to connect to Supabase: {e}")
+        
+        if config.USE_PRODUCT_MIRROR:
+            self._start_mirror(self.client)
     
+    @classmethod
+    def _start_mirror(cls, client):
+        """สร้างสำเนา products (ถ้ายังไม่มี) และเริ่มซิงก์เบื้องหลังเมื่อมี client"""
+        if cls.mirror is None:
+            cls.mirror = ProductMirror()
+            cls.add_change_listener(cls.mirror.apply_change)
+        if client is not None:
+            cls.mirror.start(client)
+    
+    def _mirror(self) -> Optional[SQLiteProductStore]:
+        """store ของสำเนาที่พร้อมให้อ่าน (None = อ่านจาก Supabase)"""
+        mirror = self.mirror
+        return mirror.store if mirror is not None and mirror.ready else None
+    
+    @instrumented
     def connect(self) -> bool:
         """เชื่อมต่อกับ Supabase"""
         try:
@@ -53,6 +85,7 @@ class SupabaseDatabase:
             self.connected = False
             return False
     
+    @instrumented
     def create_tables(self) -> bool:
         """สร้างตารางในฐานข้อมูล (ใช้ SQL Editor ใน Supabase Dashboard)"""
         create_products_table = """
@@ -91,35 +124,20 @@ class SupabaseDatabase:
         self.logger.info(create_searches_table)
         return True
     
+    @instrumented
     def add_product(self, product_data: Dict[str, Any]) -> Optional[Dict]:
         """เพิ่มสินค้าใหม่"""
         if not self.connected:
             return None
         
         try:
-            # คำนวณ commission_amount
-            commission_amount = (product_data['price'] * product_data['commission_rate']) / 100
-            
-            data = {
-                'product_code': product_data['product_code'],
-                'product_name': product_data['product_name'],
-                'price': float(product_data['price']),
-                'sold_count': int(product_data.get('sold_count', 0)),
-                'shop_name': product_data['shop_name'],
-                'commission_rate': float(product_data['commission_rate']),
-                'commission_amount': commission_amount,
-                'product_link': product_data['product_link'],
-                'offer_link': product_data['offer_link'],
-                'category': product_data.get('category', ''),
-                'description': product_data.get('description', ''),
-                'image_url': product_data.get('image_url', ''),
-                'rating': float(product_data.get('rating', 0))
-            }
+            data = build_product_record(product_data)
             
             response = self.client.table('products').insert(data).execute()
             
             if response.data:
                 self.logger.info(f"Added product: {product_data['product_name']}")
+                self._notify_change('add', data['product_code'], response.data[0])
                 return response.data[0]
             return None
             
@@ -127,10 +145,17 @@ class SupabaseDatabase:
             self.logger.error(f"Error adding product: {e}")
             return None
     
+    @instrumented
     def search_products(self, query: str, limit: int = 5, offset: int = 0, 
                        category: str = None, min_price: float = None, 
                        max_price: float = None, order_by: str = 'created_at') -> Dict:
         """ค้นหาสินค้าพร้อม pagination และ filtering"""
+        mirror = self._mirror()
+        if mirror:
+            result = mirror.search_products(query, limit, offset, category, min_price, max_price, order_by)
+            self.log_search(query, len(result['products']))
+            return result
+        
         if not self.connected:
             return {"products": [], "total": 0, "has_more": False}
         
@@ -215,8 +240,13 @@ class SupabaseDatabase:
             self.logger.error(f"Error searching products: {e}")
             return {"products": [], "total": 0, "has_more": False}
     
+    @instrumented
     def get_product_by_code(self, product_code: str) -> Optional[Dict]:
         """ค้นหาสินค้าด้วยรหัสสินค้า"""
+        mirror = self._mirror()
+        if mirror:
+            return mirror.get_product_by_code(product_code)
+        
         if not self.connected:
             return None
         
@@ -233,6 +263,29 @@ class SupabaseDatabase:
             self.logger.error(f"Error getting product by code: {e}")
             return None
     
+    @instrumented
+    def get_products_by_codes(self, product_codes: List[str]) -> List[Dict]:
+        """ดึงสินค้าหลายรายการด้วยรหัสสินค้าใน query เดียว"""
+        mirror = self._mirror()
+        if mirror:
+            return mirror.get_products_by_codes(product_codes)
+        
+        if not self.connected or not product_codes:
+            return []
+        
+        try:
+            response = self.client.table('products')\
+                .select('*')\
+                .in_('product_code', list(product_codes))\
+                .execute()
+            
+            return response.data or []
+            
+        except Exception as e:
+            self.logger.error(f"Error getting products by codes: {e}")
+            return []
+    
+    @instrumented
     def update_product(self, product_code: str, update_data: Dict) -> bool:
         """อัปเดตข้อมูลสินค้า"""
         if not self.connected:
@@ -254,12 +307,15 @@ class SupabaseDatabase:
                 .eq('product_code', product_code)\
                 .execute()
             
+            if response.data:
+                self._notify_change('update', product_code, response.data[0])
             return len(response.data) > 0
             
         except Exception as e:
             self.logger.error(f"Error updating product: {e}")
             return False
     
+    @instrumented
     def delete_product(self, product_code: str) -> bool:
         """ลบสินค้า"""
         if not self.connected:
@@ -271,14 +327,21 @@ class SupabaseDatabase:
                 .eq('product_code', product_code)\
                 .execute()
             
+            if response.data:
+                self._notify_change('delete', product_code)
             return len(response.data) > 0
             
         except Exception as e:
             self.logger.error(f"Error deleting product: {e}")
             return False
     
+    @instrumented
     def get_all_products(self, limit: int = 100) -> List[Dict]:
         """ดึงสินค้าทั้งหมด"""
+        mirror = self._mirror()
+        if mirror:
+            return mirror.get_all_products(limit)
+        
         if not self.connected:
             return []
         
@@ -294,9 +357,39 @@ class SupabaseDatabase:
         except Exception as e:
             self.logger.error(f"Error getting all products: {e}")
             return []
-    
+
+    @instrumented
+    def get_products_page(self, after: str = None, limit: int = 500,
+                          updated_since: str = None) -> Optional[List[Dict]]:
+        """สินค้าหนึ่งหน้าเรียงตาม product_code ถัดจาก after (keyset - ทุกหน้าเร็วเท่ากัน ไม่ต้องนับ offset)
+
+        อ่านจาก Supabase โดยตรง (ไม่ผ่าน mirror) เพราะใช้ export/ซิงก์ต่อ, คืน None เมื่อผิดพลาด
+        เพื่อให้ผู้เรียกแยกออกจากหน้าว่าง (ไม่มีข้อมูลแล้ว)
+        """
+        if not self.connected:
+            return None
+
+        try:
+            builder = self.client.table('products').select('*')
+            if after is not None:
+                builder = builder.gt('product_code', after)
+            if updated_since:
+                builder = builder.gte('updated_at', updated_since)
+            response = builder.order('product_code').limit(limit).execute()
+
+            return response.data or []
+
+        except Exception as e:
+            self.logger.error(f"Error getting products page after {after!r}: {e}")
+            return None
+
+    @instrumented
     def get_products_by_category(self, category: str) -> List[Dict]:
         """ดึงสินค้าตามหมวดหมู่"""
+        mirror = self._mirror()
+        if mirror:
+            return mirror.get_products_by_category(category)
+        
         if not self.connected:
             return []
         
@@ -313,11 +406,16 @@ class SupabaseDatabase:
             self.logger.error(f"Error getting products by category: {e}")
             return []
     
+    @instrumented
     def log_search(self, query: str, result_count: int, user_id: str = None) -> bool:
         """บันทึกการค้นหา"""
-        if not self.connected:
+        if not self.connected or not search_logging_enabled():
             return False
         
+        if config.SEARCH_LOG_ASYNC:
+            # ไม่รอ round trip ระหว่างค้นหา - เข้าคิวแล้วเขียนเป็นชุดเบื้องหลัง (compaction ทำหลังเขียนแต่ละชุด)
+            return search_log_writer.add(self.client, query, result_count, user_id)
+        
         try:
             data = {
                 'search_query': query,
@@ -325,29 +423,53 @@ class SupabaseDatabase:
                 'result_count': result_count
             }
             
+            # trigger ของ product_searches อัปเดต search_rollups ใน transaction เดียวกัน (setup_search_rollups.sql)
             response = self.client.table('product_searches').insert(data).execute()
+            search_log_writer.compact(self.client)
             return len(response.data) > 0
             
         except Exception as e:
             self.logger.error(f"Error logging search: {e}")
             return False
     
+    @instrumented
     def get_popular_searches(self, limit: int = 10) -> List[Dict]:
         """ดึงคำค้นหาที่ได้รับความนิยม"""
         if not self.connected:
             return []
         
         try:
-            # สร้าง query ที่นับจำนวนการค้นหาแต่ละคำ
-            response = self.client.rpc('get_popular_searches', {'search_limit': limit}).execute()
+            # อ่านจาก rollup รายวันของ SEARCH_POPULAR_DAYS วันล่าสุด (ไม่ GROUP BY ตาราง product_searches ทั้งตาราง)
+            response = self.client.rpc('get_popular_searches', {
+                'search_limit': limit, 'days': config.SEARCH_POPULAR_DAYS}).execute()
             return response.data or []
             
         except Exception as e:
             self.logger.error(f"Error getting popular searches: {e}")
             return []
     
+    @instrumented
+    def get_search_stats(self, days: int = 7, limit: int = 10) -> Dict[str, Any]:
+        """สรุปสถิติการค้นหา (ผลรวม, คำค้นหายอดนิยม, รายวัน) จาก search_rollups ใน round trip เดียว"""
+        if not self.connected:
+            return {}
+        
+        try:
+            response = self.client.rpc('get_search_stats', {
+                'days': days, 'search_limit': limit, 'popular_days': config.SEARCH_POPULAR_DAYS}).execute()
+            return response.data or {}
+            
+        except Exception as e:
+            self.logger.error(f"Error getting search stats: {e}")
+            return {}
+    
+    @instrumented
     def get_categories(self) -> List[str]:
         """ดึงรายการหมวดหมู่ทั้งหมด"""
+        mirror = self._mirror()
+        if mirror:
+            return mirror.get_categories()
+        
         if not self.connected:
             return []
         
@@ -367,8 +489,13 @@ class SupabaseDatabase:
             self.logger.error(f"Error getting categories: {e}")
             return []
     
+    @instrumented
     def get_categories_with_stats(self) -> List[Dict[str, Any]]:
         """ดึงหมวดหมู่พร้อมสถิติความนิยม สำหรับ Smart grouping"""
+        mirror = self._mirror()
+        if mirror:
+            return mirror.get_categories_with_stats()
+        
         if not self.connected:
             return []
         
@@ -440,8 +567,13 @@ class SupabaseDatabase:
             self.logger.error(f"Error getting categories with stats: {e}")
             return []
     
+    @instrumented
     def get_price_range(self) -> Dict[str, float]:
         """ดึงช่วงราคาของสินค้าทั้งหมด"""
+        mirror = self._mirror()
+        if mirror:
+            return mirror.get_price_range()
+        
         if not self.connected:
             return {"min_price": 0, "max_price": 0}
         
@@ -471,8 +603,17 @@ class SupabaseDatabase:
             self.logger.error(f"Error getting price range: {e}")
             return {"min_price": 0, "max_price": 0}
 
+    @instrumented
     def get_stats(self) -> Dict[str, Any]:
         """ดึงสถิติต่างๆ"""
+        mirror = self._mirror()
+        if mirror:
+            # สินค้า ราคา หมวดหมู่จากสำเนา, จำนวนการค้นหาจากค่าที่สำเนาซิงก์ไว้ (ไม่เรียกเครือข่าย)
+            stats = mirror.get_stats()
+            if 'error' not in stats:
+                stats.update(total_searches=self.mirror.total_searches(), database_type='Supabase')
+            return stats
+        
         if not self.connected:
             return {}
         
@@ -480,8 +621,8 @@ class SupabaseDatabase:
             # นับจำนวนสินค้า
             products_count = self.client.table('products').select('*', count='exact').execute()
             
-            # นับจำนวนการค้นหา
-            searches_count = self.client.table('product_searches').select('*', count='exact').execute()
+            # จำนวนการค้นหาทั้งหมดรวมจาก rollup รายวัน (ไม่นับแถว product_searches)
+            searches_total = self.client.rpc('get_total_searches').execute()
             
             # คำนวณราคาเฉลี่ย
             avg_price = self.client.rpc('get_average_price').execute()
@@ -492,7 +633,7 @@ class SupabaseDatabase:
             
             return {
                 'total_products': products_count.count if products_count.count else 0,
-                'total_searches': searches_count.count if searches_count.count else 0,
+                'total_searches': searches_total.data or 0,
                 'average_price': avg_price.data if avg_price.data else 0,
                 'database_type': 'Supabase',
                 'categories_count': len(categories),
@@ -504,6 +645,7 @@ class SupabaseDatabase:
             self.logger.error(f"Error getting stats: {e}")
             return {'error': str(e)}
     
+    @instrumented
     def bulk_update_products(self, product_codes: List[str], update_data: Dict[str, Any]) -> Dict[str, Any]:
         """อัปเดตสินค้าหลายรายการพร้อมกัน"""
         if not self.connected:
@@ -533,6 +675,7 @@ class SupabaseDatabase:
                         
                         if response.data:
                             updated_products.append(code)
+                            self._notify_change('update', code, response.data[0])
                 
                 return {
                     "success": True,
@@ -548,6 +691,9 @@ class SupabaseDatabase:
                     .in_('product_code', product_codes)\
                     .execute()
                 
+                for row in response.data or []:
+                    self._notify_change('update', row.get('product_code'), row)
+                
                 return {
                     "success": True,
                     "updated_count": len(response.data),
@@ -558,6 +704,7 @@ class SupabaseDatabase:
             self.logger.error(f"Error in bulk update: {e}")
             return {"success": False, "message": str(e)}
     
+    @instrumented
     def bulk_delete_products(self, product_codes: List[str]) -> Dict[str, Any]:
         """ลบสินค้าหลายรายการพร้อมกัน"""
         if not self.connected:
@@ -569,6 +716,9 @@ class SupabaseDatabase:
                 .in_('product_code', product_codes)\
                 .execute()
             
+            for row in response.data or []:
+                self._notify_change('delete', row.get('product_code'))
+            
             return {
                 "success": True,
                 "deleted_count": len(response.data),
@@ -579,8 +729,13 @@ class SupabaseDatabase:
             self.logger.error(f"Error in bulk delete: {e}")
             return {"success": False, "message": str(e)}
     
+    @instrumented
     def get_products_by_category_bulk(self, categories: List[str], limit: int = 100) -> Dict[str, List[Dict]]:
         """ดึงสินค้าหลายหมวดหมู่พร้อมกัน"""
+        mirror = self._mirror()
+        if mirror:
+            return mirror.get_products_by_category_bulk(categories, limit)
+        
         if not self.connected:
             return {}
         
@@ -603,8 +758,13 @@ class SupabaseDatabase:
             self.logger.error(f"Error getting products by categories: {e}")
             return {}
     
+    @instrumented
     def get_low_stock_products(self, threshold: int = 10) -> List[Dict]:
         """ดึงสินค้าที่มียอดขายต่ำ (อาจต้องการปรับปรุง)"""
+        mirror = self._mirror()
+        if mirror:
+            return mirror.get_low_stock_products(threshold)
+        
         if not self.connected:
             return []
         
@@ -622,8 +782,13 @@ class SupabaseDatabase:
             self.logger.error(f"Error getting low stock products: {e}")
             return []
     
+    @instrumented
     def get_top_products_by_metric(self, metric: str = 'sold_count', limit: int = 10) -> List[Dict]:
         """ดึงสินค้าอันดับสูงตามเกณฑ์ที่กำหนด"""
+        mirror = self._mirror()
+        if mirror:
+            return mirror.get_top_products_by_metric(metric, limit)
+        
         if not self.connected:
             return []
         
@@ -645,8 +810,13 @@ class SupabaseDatabase:
             self.logger.error(f"Error getting top products by {metric}: {e}")
             return []
     
+    @instrumented
     def get_product_codes_by_prefix(self, prefix: str) -> List[str]:
         """ดึงรหัสสินค้าที่ขึ้นต้นด้วย prefix ที่ระบุ"""
+        mirror = self._mirror()
+        if mirror:
+            return mirror.get_product_codes_by_prefix(prefix)
+        
         if not self.connected:
             return []
         
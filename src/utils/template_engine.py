@@ -0,0 +1,64 @@
+"""
+📁 src/utils/template_engine.py
+🎯 Template compiler สำหรับ ReviewGenerator และ PromotionGenerator
+คอมไพล์เทมเพลต str.format ครั้งเดียว และคำนวณเฉพาะฟิลด์ที่เทมเพลตใช้จริง (lazy)
+"""
+
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Callable, Dict, FrozenSet, Mapping
+
+FieldProvider = Callable[[Dict], Any]
+
+
+class LazyFields(dict):
+    """dict ที่คำนวณค่าฟิลด์เมื่อถูกอ้างถึงครั้งแรก แล้วเก็บไว้ใช้ซ้ำในการ render เดียวกัน"""
+
+    __slots__ = ('source', 'providers')
+
+    def __init__(self, source: Dict, providers: Mapping[str, FieldProvider]):
+        super().__init__()
+        self.source = source
+        self.providers = providers
+
+    def __missing__(self, key: str):
+        value = self.providers[key](self.source)
+        self[key] = value
+        return value
+
+
+class CompiledTemplate:
+    """เทมเพลตที่ parse แล้ว พร้อมรายชื่อฟิลด์ที่ใช้"""
+
+    __slots__ = ('source', 'fields')
+
+    def __init__(self, source: str):
+        self.source = source
+        self.fields: FrozenSet[str] = frozenset(
+            field_name.split('.', 1)[0].split('[', 1)[0]
+            for _, field_name, _, _ in Formatter().parse(source)
+            if field_name
+        )
+
+    def validate(self, providers: Mapping[str, FieldProvider]):
+        """ตรวจว่าทุกฟิลด์ในเทมเพลตมีตัวคำนวณ"""
+        missing = self.fields - providers.keys()
+        if missing:
+            raise KeyError(f"Template references unknown fields: {', '.join(sorted(missing))}")
+
+    def render(self, source: Dict, providers: Mapping[str, FieldProvider]) -> str:
+        """render โดยคำนวณเฉพาะฟิลด์ที่เทมเพลตอ้างถึง"""
+        return self.source.format_map(LazyFields(source, providers))
+
+    def render_values(self, values: Mapping[str, Any]) -> str:
+        """render จากค่าที่เตรียมไว้แล้ว"""
+        return self.source.format_map(values)
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate(fields={sorted(self.fields)})"
+
+
+@lru_cache(maxsize=512)
+def compile_template(source: str) -> CompiledTemplate:
+    """คอมไพล์เทมเพลต (cache ตามข้อความเทมเพลต)"""
+    return CompiledTemplate(source)
@@ -0,0 +1,163 @@
+"""
+📁 src/utils/thai_tokenizer.py
+🎯 ตัดคำภาษาไทยแบบ maximal matching จากพจนานุกรม (คำพื้นฐาน + คำใหม่จากแคตตาล็อก)
+เลือกการตัดที่มีตัวอักษรที่ไม่รู้จักน้อยที่สุด แล้วจำนวนคำน้อยที่สุด โดยไม่ตัดกลางพยางค์ (สระ/วรรณยุกต์)
+ผลการตัดของแต่ละช่วงข้อความไทยถูก cache ไว้ ใช้ได้ทั้งตอนสร้างดัชนีและตอนแปลงคำค้นหา
+"""
+
+import logging
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+from ..config import config
+from .thai_words import THAI_WORDS
+
+# ช่วงข้อความไทย / ช่วงตัวอักษรอังกฤษและตัวเลข (เช่น "usb-c", "2.5") - อย่างอื่นเป็นตัวคั่น
+_RUNS = re.compile(r'([ก-๛]+)|([a-z0-9]+(?:[.\-][a-z0-9]+)*)')
+
+# ห้ามตัดหน้าสระหลัง/สระบนล่าง/วรรณยุกต์ และห้ามตัดหลังสระหน้า
+_NO_BREAK_BEFORE = frozenset('ะัาำิีึืฺุู็่้๊๋์ํๅ')
+_NO_BREAK_AFTER = frozenset('เแโใไ')
+# ห้ามตัดหน้าพยัญชนะการันต์ (เช่น "ท์" ใน "ไวท์", "ดิ์" ใน "ศักดิ์") - เป็นส่วนท้ายของพยางค์ก่อนหน้า
+_KARAN = '์'
+
+_WORD_END = ''  # คีย์ใน trie ที่บอกว่ามีคำจบที่ node นี้
+
+
+class ThaiTokenizer:
+    """ตัวตัดคำไทย (พจนานุกรมเป็น trie ของ dict) + ตัวแยกคำอังกฤษ/ตัวเลขตามช่องว่างและเครื่องหมาย
+
+    คำใหม่จากแคตตาล็อกมาทาง on_term (term listener ของ suggestion_index): เพิ่มเฉพาะส่วนที่ตัดแล้วไม่รู้จัก
+    เพื่อไม่ให้วลีที่ประกอบจากคำที่รู้จักอยู่แล้ว (เช่น "ครีมกันแดด") กลายเป็นคำเดียว
+    """
+
+    MIN_LEARNED_LENGTH = 3  # คำจากแคตตาล็อกที่สั้นกว่านี้มักเป็นเศษของการตัดผิด
+
+    def __init__(self, words: Iterable[str] = THAI_WORDS, cache_size: int = None):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._trie: Dict = {}
+        self._size = 0
+        self._segment_cached = lru_cache(maxsize=cache_size or config.THAI_SEGMENT_CACHE_SIZE)(self._segment)
+        self.add_words(words)
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ===== พจนานุกรม =====
+
+    def add_words(self, words: Iterable[str]) -> int:
+        """เพิ่มคำเข้าพจนานุกรม คืนจำนวนคำใหม่ (ล้าง cache ถ้ามีคำใหม่)"""
+        added = 0
+        with self._lock:
+            for word in words:
+                word = (word or '').strip().lower()
+                if not word:
+                    continue
+                node = self._trie
+                for char in word:
+                    node = node.setdefault(char, {})
+                if _WORD_END not in node:
+                    node[_WORD_END] = True
+                    added += 1
+            self._size += added
+        if added:
+            self._segment_cached.cache_clear()
+        return added
+
+    def __contains__(self, word: str) -> bool:
+        node = self._trie
+        for char in word.lower():
+            node = node.get(char)
+            if node is None:
+                return False
+        return _WORD_END in node
+
+    def learn(self, text: str) -> int:
+        """เพิ่มส่วนที่ไม่รู้จักในข้อความ (เช่น ชื่อแบรนด์ภาษาไทย) เป็นคำใหม่"""
+        unknown = [piece for run in _RUNS.findall(text.lower()) if run[0]
+                   for piece, known in self._segment_cached(run[0])
+                   if not known and len(piece) >= self.MIN_LEARNED_LENGTH]
+        return self.add_words(unknown) if unknown else 0
+
+    def on_term(self, key: str, delta: float, kind: str):
+        """term listener ของ suggestion_index (คำค้นหาของผู้ใช้ไม่นับ เหมือน spell corrector)"""
+        if delta > 0 and kind != 'query':
+            self.learn(key)
+
+    # ===== การตัดคำ =====
+
+    def _segment(self, text: str) -> Tuple[Tuple[str, bool], ...]:
+        """ตัดข้อความไทยหนึ่งช่วง -> ((คำ, รู้จักหรือไม่), ...) ด้วย dynamic programming"""
+        length = len(text)
+        breakable = [True] * (length + 1)
+        for i in range(1, length):
+            if text[i] in _NO_BREAK_BEFORE or text[i - 1] in _NO_BREAK_AFTER:
+                breakable[i] = False
+            elif _KARAN in text[i + 1:i + 3] and (text[i + 1] == _KARAN or text[i + 1] in 'ิุ'):
+                breakable[i] = False
+
+        # best[i] = (จำนวนตัวอักษรที่ไม่รู้จัก, จำนวนคำ, จุดเริ่ม, รู้จักหรือไม่) ของการตัด text[:i] ที่ดีที่สุด
+        infinity = (length + 1, length + 1, 0, False)
+        best = [infinity] * (length + 1)
+        best[0] = (0, 0, 0, True)
+        for start in range(length):
+            if not breakable[start] or best[start] is infinity:
+                continue
+            unknown, count = best[start][0], best[start][1]
+
+            node = self._trie
+            for end in range(start, length):
+                node = node.get(text[end])
+                if node is None:
+                    break
+                if _WORD_END in node and breakable[end + 1]:
+                    candidate = (unknown, count + 1, start, True)
+                    if candidate[:2] < best[end + 1][:2]:
+                        best[end + 1] = candidate
+
+            # หรือข้ามหนึ่งพยางค์เป็นตัวอักษรที่ไม่รู้จัก (ถึงจุดตัดถัดไป)
+            end = start + 1
+            while not breakable[end]:
+                end += 1
+            candidate = (unknown + end - start, count + 1, start, False)
+            if candidate[:2] < best[end][:2]:
+                best[end] = candidate
+
+        pieces: List[Tuple[str, bool]] = []
+        end = length
+        while end > 0:
+            _, _, start, known = best[end]
+            piece = text[start:end]
+            if not known and pieces and not pieces[-1][1]:
+                piece += pieces.pop()[0]  # รวมส่วนที่ไม่รู้จักที่ติดกันเป็นคำเดียว
+            pieces.append((piece, known))
+            end = start
+        return tuple(reversed(pieces))
+
+    def segment(self, text: str) -> List[str]:
+        """ตัดข้อความไทยที่ไม่มีช่องว่าง -> รายการคำ"""
+        return [piece for piece, _ in self._segment_cached(text.lower())] if text else []
+
+    def tokenize(self, text: str) -> List[str]:
+        """คำทั้งหมดในข้อความผสมไทย/อังกฤษ (ตัวพิมพ์เล็ก) สำหรับทั้งสร้างดัชนีและคำค้นหา"""
+        tokens: List[str] = []
+        for thai, other in _RUNS.findall((text or '').lower()):
+            if thai:
+                tokens.extend(piece for piece, _ in self._segment_cached(thai))
+            else:
+                tokens.append(other)
+        return tokens
+
+    def keywords(self, text: str) -> List[str]:
+        """คำสำหรับจับคู่/ให้คะแนน: ไม่ซ้ำ ไม่สั้นกว่า 2 ตัวอักษร และไม่ใช่ตัวเลขล้วน (เกณฑ์เดียวกับ suggestion_index)"""
+        return list(dict.fromkeys(token for token in self.tokenize(text)
+                                  if len(token) >= 2 and not token.replace('.', '').replace('-', '').isdigit()))
+
+    def cache_info(self):
+        return self._segment_cached.cache_info()
+
+# สร้าง instance สำหรับใช้งาน
+thai_tokenizer = ThaiTokenizer()
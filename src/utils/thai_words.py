@@ -0,0 +1,42 @@
+"""
+📁 src/utils/thai_words.py
+🎯 รายการคำภาษาไทยพื้นฐานสำหรับตัดคำ (คำทั่วไป + คำเกี่ยวกับสินค้าและการซื้อขาย)
+คำเฉพาะของแคตตาล็อก (แบรนด์, ชื่อสินค้าใหม่) ถูกเพิ่มตอนทำงานจากดัชนีคำแนะนำ
+"""
+
+THAI_WORDS = frozenset("""
+การ ความ ที่ และ หรือ กับ ของ ใน บน ใต้ จาก ถึง ให้ ได้ ไม่ มี เป็น อยู่ คือ จะ แล้ว ก็ ยัง ต้อง ควร อยาก
+หา ค้นหา ซื้อ ขาย ดู ใช้ ทำ ไป มา เอา ส่ง รับ เลือก ชอบ รัก ลอง ขอ ช่วย แนะนำ บอก ถาม ตอบ
+สำหรับ เพื่อ แบบไหน ยี่ห้อ แบรนด์ เล่น ใส่ ทา กิน ดื่ม ติด ข้าง หลัง หน้า เมตร เซน ลิตร กรัม กิโล นิ้ว
+นี้ นั้น โน้น อะไร ไหน ทำไม อย่างไร เท่าไหร่ เท่าไร กี่ ไหม มั้ย บ้าง ด้วย เลย มาก น้อย ที่สุด สุด กว่า เกิน
+ทุก บาง หลาย อื่น อีก เดียว แต่ละ ละ ต่อ ชิ้น อัน ตัว คู่ ชุด แพ็ค กล่อง ขวด ถุง ซอง หลอด กระปุก แผง เม็ด แผ่น
+หนึ่ง สอง สาม สี่ ห้า หก เจ็ด แปด เก้า สิบ ร้อย พัน หมื่น แสน ล้าน
+ราคา ถูก แพง ลด โปร โปรโมชั่น ส่วนลด คูปอง ฟรี แถม คุ้ม คุ้มค่า ประหยัด บาท
+สินค้า ของ ร้าน ร้านค้า ค้า ทางการ แท้ ของแท้ ปลอม ใหม่ เก่า มือสอง ยอดนิยม นิยม ยอด คะแนน รีวิว
+คุณภาพ ดี เยี่ยม สวย งาม น่ารัก เท่ ทน ทนทาน แข็งแรง เบา หนัก ใหญ่ เล็ก ยาว สั้น กว้าง แคบ หนา บาง
+รุ่น แบบ สี ขนาด ไซส์ พกพา พับ พับได้ กัน กันน้ำ กันแดด กันลม กันกระแทก กันลื่น ไร้สาย สาย ไฟ ไฟฟ้า
+อัตโนมัติ พิเศษ จำกัด ล่าสุด ง่าย สะดวก เร็ว ไว ด่วน ทันที
+ผู้ชาย ผู้หญิง ชาย หญิง เด็ก ทารก ผู้ใหญ่ วัยรุ่น ผู้สูงอายุ ครอบครัว แม่ พ่อ ลูก
+เสื้อ ผ้า เสื้อผ้า กางเกง กระโปรง ชุด ยืด เชิ้ต แจ็คเก็ต ฮู้ด ครอป เดรส นอน ว่ายน้ำ ชั้นใน
+ยีนส์ ขาสั้น ขายาว ถุงเท้า หมวก ผ้าพันคอ เข็มขัด แว่น แว่นตา นาฬิกา แหวน สร้อย ต่างหู เครื่องประดับ
+รองเท้า ผ้าใบ แตะ ส้นสูง บูท กีฬา วิ่ง
+กระเป๋า สะพาย เป้ สตางค์ ถือ เดินทาง ล้อลาก เอกสาร
+ความงาม เครื่องสำอาง ครีม เซรั่ม โลชั่น โทนเนอร์ บำรุง ผิว หน้า ผม ตา ปาก เล็บ
+ล้าง ล้างหน้า โฟม สบู่ แชมพู ครีมนวด นวด สครับ มาส์ก ลิป ลิปสติก แป้ง รองพื้น คอนซีลเลอร์ อายไลเนอร์
+มาสคาร่า บลัช น้ำหอม ระงับ กลิ่น ใส ขาว กระจ่าง ชุ่มชื้น ริ้วรอย สิว ฝ้า กระ
+สุขภาพ อาหารเสริม วิตามิน คอลลาเจน โปรตีน เวย์ ยา ยาดม สมุนไพร หน้ากาก อนามัย
+แอลกอฮอล์ เจล ปรอท วัด ความดัน ออกกำลัง ออกกำลังกาย กาย ลด น้ำหนัก ผอม
+อาหาร เครื่องดื่ม ขนม กาแฟ ชา เขียว นม น้ำ น้ำผึ้ง ผึ้ง น้ำตาล เกลือ ข้าว เส้น บะหมี่ กึ่งสำเร็จรูป
+ซอส น้ำปลา พริก ผลไม้ ผัก เนื้อ หมู ไก่ ปลา กุ้ง ไข่ ช็อกโกแลต คุกกี้ ลูกอม ถั่ว แห้ง อบ กรอบ
+สัตว์ สัตว์เลี้ยง แมว สุนัข หมา ปลา นก กระต่าย ทราย ของเล่น ขนม กรง ปลอกคอ
+บ้าน สวน ห้อง ครัว ห้องน้ำ ห้องนอน เฟอร์นิเจอร์ โต๊ะ เก้าอี้ ตู้ ชั้น เตียง ที่นอน หมอน ผ้าห่ม
+ม่าน พรม โคม ไฟ หลอดไฟ ถัง ขยะ ไม้ แขวน กรรไกร มีด จาน ชาม แก้ว ช้อน ส้อม กระทะ หม้อ
+เครื่อง ทอด ไร้น้ำมัน น้ำมัน พัดลม แอร์ ตู้เย็น ทีวี ซักผ้า ดูด ฝุ่น
+กาต้มน้ำ ต้ม ไมโครเวฟ เตา รีด เตารีด ไดร์ เป่า หุง ปั่น กรอง
+อิเล็กทรอนิกส์ โทรศัพท์ มือถือ สมาร์ทโฟน แท็บเล็ต เคส ฟิล์ม ชาร์จ แบต แบตเตอรี่ สำรอง
+หูฟัง ลำโพง ไมค์ กล้อง ขาตั้ง จอ หน้าจอ
+คอมพิวเตอร์ คอม โน้ตบุ๊ก โน๊ตบุ๊ค แล็ปท็อป เมาส์ คีย์บอร์ด แป้นพิมพ์ แรม การ์ด จอย เกม เกมมิ่ง
+เครื่องเขียน ปากกา ดินสอ สมุด กระดาษ หนังสือ นิยาย การ์ตูน
+กีฬา ฟิตเนส โยคะ เสื่อ ดัมเบล ลูก ฟุตบอล บอล จักรยาน เต็นท์ แคมป์ปิ้ง ตกปลา
+รถ รถยนต์ มอเตอร์ไซค์ ยาง หมวกกันน็อค
+""".split())
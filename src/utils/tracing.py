@@ -0,0 +1,304 @@
+"""
+📁 src/utils/tracing.py
+🎯 Tracing ระดับ request: บันทึกทุกการเรียก backend (Supabase, LINE API) ภายใต้ trace id เดียวต่อ webhook event
+ใช้ดูว่าข้อความ LINE หนึ่งข้อความเรียกฐานข้อมูลกี่ครั้ง ใช้เวลาเท่าไร และจับรูปแบบ N+1
+"""
+
+import functools
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ..config import config
+
+MAX_PARAM_LENGTH = 120
+MAX_SPANS_PER_TRACE = 500
+
+
+def _describe(args, kwargs) -> str:
+    """แปลงพารามิเตอร์เป็นข้อความสั้นๆ สำหรับเก็บใน span"""
+    parts = [repr(a) for a in args] + [f"{k}={v!r}" for k, v in kwargs.items()]
+    text = ', '.join(parts)
+    return text if len(text) <= MAX_PARAM_LENGTH else text[:MAX_PARAM_LENGTH - 3] + '...'
+
+
+class Span:
+    """การเรียก backend หนึ่งครั้ง"""
+
+    __slots__ = ('kind', 'method', 'params', 'start_ms', 'duration_ms', 'handler', 'error')
+
+    def __init__(self, kind: str, method: str, params: str, start_ms: float, handler: Optional[str]):
+        self.kind = kind
+        self.method = method
+        self.params = params
+        self.start_ms = start_ms
+        self.duration_ms = 0.0
+        self.handler = handler
+        self.error = None
+
+    def to_dict(self) -> Dict:
+        data = {
+            'kind': self.kind,
+            'method': self.method,
+            'params': self.params,
+            'start_ms': round(self.start_ms, 2),
+            'duration_ms': round(self.duration_ms, 2),
+            'handler': self.handler
+        }
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class Trace:
+    """ข้อมูลของ request หนึ่งรายการ (หนึ่ง webhook event)"""
+
+    def __init__(self, trace_id: str, name: str, attributes: Dict):
+        self.trace_id = trace_id
+        self.name = name
+        self.attributes = attributes
+        self.started = time.perf_counter()
+        self.duration_ms = 0.0
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self.handler_stack: List[str] = []
+        self.handler: Optional[str] = None
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def backend_time_ms(self) -> float:
+        return sum(span.duration_ms for span in self.spans)
+
+    def repeated_calls(self, threshold: int) -> List[Dict]:
+        """เมธอดที่ถูกเรียกซ้ำตั้งแต่ threshold ครั้งขึ้นไป (สัญญาณของ N+1)"""
+        counts = Counter((span.kind, span.method) for span in self.spans)
+        return [
+            {'kind': kind, 'method': method, 'count': count}
+            for (kind, method), count in counts.most_common() if count >= threshold
+        ]
+
+    def to_dict(self, n_plus_one_threshold: int) -> Dict:
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'handler': self.handler,
+            'attributes': self.attributes,
+            'duration_ms': round(self.duration_ms, 2),
+            'backend_calls': len(self.spans) + self.dropped_spans,
+            'backend_time_ms': round(self.backend_time_ms(), 2),
+            'n_plus_one': self.repeated_calls(n_plus_one_threshold),
+            'spans': [span.to_dict() for span in self.spans]
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('current_trace', default=None)
+
+
+class RequestTracer:
+    """ตัวจัดการ trace: เปิด trace ต่อ request, บันทึก span, และสรุปผลตาม handler"""
+
+    def __init__(self, enabled: bool = None, slow_ms: float = None,
+                 n_plus_one_threshold: int = None, keep_recent: int = 50):
+        self.logger = logging.getLogger(__name__)
+        self.enabled = config.TRACE_ENABLED if enabled is None else enabled
+        self.slow_ms = config.TRACE_SLOW_MS if slow_ms is None else slow_ms
+        self.n_plus_one_threshold = n_plus_one_threshold or config.TRACE_N_PLUS_ONE_THRESHOLD
+        self._lock = threading.Lock()
+        self._summary: Dict[str, Dict] = {}
+        self._listeners: List[Callable[[Trace], None]] = []
+        self.recent_slow = deque(maxlen=keep_recent)
+
+    # ===== การเปิด/ปิด trace =====
+
+    @contextmanager
+    def trace(self, name: str, trace_id: str = None, **attributes):
+        """เปิด trace สำหรับ request ปัจจุบัน (ถ้ามี trace อยู่แล้วจะใช้ trace เดิม)"""
+        if not self.enabled or _current_trace.get() is not None:
+            yield _current_trace.get()
+            return
+
+        trace = Trace(trace_id or uuid.uuid4().hex, name, attributes)
+        token = _current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            _current_trace.reset(token)
+            trace.duration_ms = trace.elapsed_ms()
+            self._finish(trace)
+
+    def current(self) -> Optional[Trace]:
+        return _current_trace.get()
+
+    # ===== การบันทึก span =====
+
+    def traced(self, func=None, kind: str = 'backend'):
+        """decorator บันทึกการเรียกฟังก์ชันเป็น span (ไม่มีผลเมื่อไม่มี trace ที่ทำงานอยู่)"""
+        if func is None:
+            return lambda f: self.traced(f, kind)
+
+        method = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            # ไม่เก็บ self ของเมธอด
+            params = _describe(args[1:] if args and hasattr(args[0], method) else args, kwargs)
+            return self._call(trace, kind, method, params, func, args, kwargs)
+        return wrapper
+
+    def instrument(self, target, methods: Iterable[str], kind: str):
+        """ห่อ object ภายนอก (เช่น LINE MessagingApi) ให้บันทึก span ของเมธอดที่ระบุ"""
+        return _TracedProxy(self, target, frozenset(methods), kind)
+
+    def _call(self, trace: Trace, kind: str, method: str, params: str, func, args, kwargs):
+        span = Span(kind, method, params, trace.elapsed_ms(),
+                    trace.handler_stack[-1] if trace.handler_stack else None)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - start) * 1000
+            if len(trace.spans) < MAX_SPANS_PER_TRACE:
+                trace.spans.append(span)
+            else:
+                trace.dropped_spans += 1
+
+    # ===== handler =====
+
+    def handler(self, func):
+        """decorator ระบุว่า span ที่เกิดในฟังก์ชันนี้เป็นของ handler ใด"""
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            if trace.handler is None:
+                trace.handler = name
+            trace.handler_stack.append(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                trace.handler_stack.pop()
+        return wrapper
+
+    def trace_handlers(self, cls, prefixes: Iterable[str] = ('_show_', '_handle_')):
+        """ผูก `handler` ให้ทุกเมธอดของคลาสที่ขึ้นต้นด้วย prefixes"""
+        prefixes = tuple(prefixes)
+        for attribute, value in list(vars(cls).items()):
+            if attribute.startswith(prefixes) and callable(value):
+                setattr(cls, attribute, self.handler(value))
+        return cls
+
+    # ===== สรุปผล =====
+
+    def add_listener(self, listener: Callable[[Trace], None]):
+        """ลงทะเบียน callback ที่ถูกเรียกเมื่อ trace จบ (เช่น load test ที่นับการเรียก backend)"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Trace], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _finish(self, trace: Trace):
+        for listener in list(self._listeners):
+            try:
+                listener(trace)
+            except Exception as e:
+                self.logger.error(f"Trace listener failed: {e}")
+
+        repeated = trace.repeated_calls(self.n_plus_one_threshold)
+        slow = trace.duration_ms >= self.slow_ms
+        handler = trace.handler or 'unhandled'
+
+        with self._lock:
+            stats = self._summary.get(handler)
+            if stats is None:
+                stats = self._summary[handler] = {
+                    'traces': 0, 'backend_calls': 0, 'max_backend_calls': 0,
+                    'total_ms': 0.0, 'max_ms': 0.0, 'backend_ms': 0.0,
+                    'slow_traces': 0, 'n_plus_one_traces': 0, 'methods': Counter()
+                }
+            calls = len(trace.spans) + trace.dropped_spans
+            stats['traces'] += 1
+            stats['backend_calls'] += calls
+            stats['max_backend_calls'] = max(stats['max_backend_calls'], calls)
+            stats['total_ms'] += trace.duration_ms
+            stats['max_ms'] = max(stats['max_ms'], trace.duration_ms)
+            stats['backend_ms'] += trace.backend_time_ms()
+            stats['slow_traces'] += int(slow)
+            stats['n_plus_one_traces'] += int(bool(repeated))
+            stats['methods'].update(f"{span.kind}.{span.method}" for span in trace.spans)
+
+        if slow or repeated:
+            data = trace.to_dict(self.n_plus_one_threshold)
+            data['slow'] = slow
+            self.recent_slow.append(data)
+            self.logger.warning(json.dumps({'event': 'slow_trace', **data}, ensure_ascii=False, default=str))
+
+    def get_summary(self) -> Dict[str, Dict]:
+        """สรุปตาม handler: จำนวน trace, จำนวนการเรียก backend เฉลี่ย/สูงสุด และเวลา"""
+        with self._lock:
+            summary = {}
+            for handler, stats in self._summary.items():
+                traces = stats['traces']
+                summary[handler] = {
+                    'traces': traces,
+                    'avg_backend_calls': round(stats['backend_calls'] / traces, 2),
+                    'max_backend_calls': stats['max_backend_calls'],
+                    'avg_ms': round(stats['total_ms'] / traces, 2),
+                    'max_ms': round(stats['max_ms'], 2),
+                    'avg_backend_ms': round(stats['backend_ms'] / traces, 2),
+                    'slow_traces': stats['slow_traces'],
+                    'n_plus_one_traces': stats['n_plus_one_traces'],
+                    'top_methods': dict(stats['methods'].most_common(5))
+                }
+            return summary
+
+    def reset(self):
+        with self._lock:
+            self._summary.clear()
+            self.recent_slow.clear()
+
+
+class _TracedProxy:
+    """proxy ที่บันทึก span ของเมธอดที่กำหนด ส่วนที่เหลือส่งต่อให้ object เดิม"""
+
+    def __init__(self, tracer: RequestTracer, target, methods: frozenset, kind: str):
+        self._tracer = tracer
+        self._target = target
+        self._methods = methods
+        self._kind = kind
+
+    def __getattr__(self, attribute):
+        value = getattr(self._target, attribute)
+        if attribute not in self._methods or not callable(value):
+            return value
+
+        tracer, kind = self._tracer, self._kind
+
+        @functools.wraps(value)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return value(*args, **kwargs)
+            return tracer._call(trace, kind, attribute, _describe(args, kwargs), value, args, kwargs)
+        return wrapper
+
+
+# สร้าง instance สำหรับใช้งาน
+tracer = RequestTracer()
@@ -0,0 +1,240 @@
+"""
+📁 src/utils/trending_service.py
+🎯 Leaderboard สินค้ามาแรงที่คำนวณไว้ล่วงหน้า และอัปเดตแบบ incremental
+ใช้ร่วมกันระหว่าง SmartRecommendationEngine และ AIProductRecommender
+"""
+
+import bisect
+import logging
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from ..config import config
+from .fanout import fanout
+from .product_store import ProductChangeNotifier
+
+
+def _parse_timestamp(value) -> Optional[float]:
+    """แปลง timestamp จาก PostgREST (ISO 8601) เป็น epoch seconds"""
+    if not value:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+class TrendingService:
+    """Leaderboard สินค้ามาแรงแบบ bounded (เรียงตาม trending_score เสมอ)
+
+    คะแนน trending = ยอดขายสะสม + ความเร็วการขาย (ชิ้น/วัน จาก delta ของ updated_at) + เรตติ้ง
+    อัปเดตเมื่อสินค้าถูกเขียน (ผ่าน change listener ของ ProductStore)
+    และ refresh จากฐานข้อมูลตามรอบเวลาใน background thread
+    ประวัติการขาย (_observations) เก็บเฉพาะสินค้าที่อยู่ใน leaderboard
+    """
+    
+    # น้ำหนักของแต่ละองค์ประกอบ (ยอดขายและความเร็วใช้ log เพื่อไม่ให้สินค้าขายดีมาก ๆ ครองทุกอันดับ)
+    SOLD_WEIGHT = 10.0
+    VELOCITY_WEIGHT = 20.0
+    RATING_WEIGHT = 10.0
+    
+    def __init__(self, db_instance=None, capacity: int = None, refresh_interval: int = None):
+        self.db = db_instance
+        self.logger = logging.getLogger(__name__)
+        self.capacity = capacity or config.TRENDING_CAPACITY
+        self.refresh_interval = refresh_interval or config.TRENDING_REFRESH_SECONDS
+        
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Tuple[float, Dict]] = {}   # product_code -> (score, product)
+        self._board: List[Tuple[float, str]] = []            # (-score, product_code) เรียงจากน้อยไปมาก
+        self._observations: Dict[str, Tuple[int, float, float]] = {}  # code -> (sold_count, updated_ts, velocity)
+        self._last_refresh = 0.0
+        self._scheduler: Optional[threading.Thread] = None
+        
+        ProductChangeNotifier.add_change_listener(self.on_product_change)
+    
+    def bind_database(self, db_instance):
+        """กำหนดฐานข้อมูลที่ใช้ refresh (ถ้ายังไม่มี)"""
+        if self.db is None and db_instance is not None:
+            self.db = db_instance
+    
+    # ===== การคำนวณคะแนน =====
+    
+    def _observe_velocity(self, product: Dict) -> float:
+        """คำนวณความเร็วการขาย (ชิ้น/วัน) จาก delta ระหว่างการอัปเดตสองครั้ง"""
+        code = product.get('product_code')
+        sold_count = int(product.get('sold_count') or 0)
+        updated_ts = _parse_timestamp(product.get('updated_at'))
+        previous = self._observations.get(code)
+        
+        if previous and updated_ts and updated_ts > previous[1]:
+            days = (updated_ts - previous[1]) / 86400.0
+            velocity = max(sold_count - previous[0], 0) / max(days, 1 / 24)
+        elif previous:
+            velocity = previous[2]
+        else:
+            # ยังไม่มีประวัติ - ประมาณจากยอดขายสะสมตั้งแต่สร้างสินค้า
+            created_ts = _parse_timestamp(product.get('created_at'))
+            age_days = (time.time() - created_ts) / 86400.0 if created_ts else 30.0
+            velocity = sold_count / max(age_days, 1.0)
+        
+        self._observations[code] = (sold_count, updated_ts or (previous[1] if previous else 0.0), velocity)
+        return velocity
+    
+    def score(self, product: Dict, velocity: float = 0.0) -> float:
+        """คะแนน trending ของสินค้า"""
+        sold_count = max(int(product.get('sold_count') or 0), 0)
+        rating = float(product.get('rating') or 0)
+        return round(
+            self.SOLD_WEIGHT * math.log1p(sold_count) +
+            self.VELOCITY_WEIGHT * math.log1p(velocity) +
+            self.RATING_WEIGHT * rating,
+            2
+        )
+    
+    # ===== การอัปเดต leaderboard =====
+    
+    def _drop(self, code: str):
+        """เอาสินค้าออกจาก leaderboard พร้อมประวัติการขาย (ไม่ให้ _observations โตเกิน capacity)"""
+        self._remove(code)
+        self._observations.pop(code, None)
+    
+    def _remove(self, code: str):
+        entry = self._entries.pop(code, None)
+        if entry:
+            index = bisect.bisect_left(self._board, (-entry[0], code))
+            if index < len(self._board) and self._board[index][1] == code:
+                del self._board[index]
+    
+    def observe(self, product: Dict):
+        """ใส่/อัปเดตสินค้าใน leaderboard"""
+        code = product.get('product_code')
+        if not code:
+            return
+        
+        with self._lock:
+            velocity = self._observe_velocity(product)
+            score = self.score(product, velocity)
+            
+            self._remove(code)
+            entry = dict(product)
+            entry['trending_score'] = score
+            entry['sales_velocity'] = round(velocity, 2)
+            self._entries[code] = (score, entry)
+            bisect.insort(self._board, (-score, code))
+            
+            # จำกัดขนาด - ตัดอันดับท้ายสุดออก
+            while len(self._board) > self.capacity:
+                _, dropped = self._board.pop()
+                self._entries.pop(dropped, None)
+                self._observations.pop(dropped, None)
+    
+    def on_product_change(self, action: str, product_code: str, data: Optional[Dict] = None):
+        """Listener สำหรับการเขียนสินค้า"""
+        with self._lock:
+            if action == 'delete':
+                self._drop(product_code)
+                return
+            
+            if not data:
+                return
+            
+            current = self._entries.get(product_code)
+            if current:
+                merged = dict(current[1])
+                merged.update(data)
+                self.observe(merged)
+            elif 'sold_count' in data and 'rating' in data:
+                self.observe(data)
+    
+    def _candidates(self) -> List[Dict]:
+        """สินค้าที่อาจติดอันดับ ตามทุกองค์ประกอบของคะแนน
+
+        ยอดขายสูง, เรตติ้งสูง, อัปเดตภายใน TRENDING_VELOCITY_WINDOW_HOURS (ความเร็วการขายเปลี่ยน)
+        และสินค้าที่อยู่ใน leaderboard แล้ว (ข้อมูลล่าสุด)
+        """
+        since = datetime.fromtimestamp(time.time() - config.TRENDING_VELOCITY_WINDOW_HOURS * 3600).isoformat()
+        with self._lock:
+            board_codes = list(self._entries)
+        
+        results = fanout.run(
+            'trending_refresh',
+            lambda: self.db.get_top_products_by_metric('sold_count', self.capacity),
+            lambda: self.db.get_top_products_by_metric('rating', self.capacity),
+            lambda: self.db.get_products_page(None, self.capacity, since),
+            lambda: self.db.get_products_by_codes(board_codes) if board_codes else [],
+            return_exceptions=True
+        )
+        
+        candidates: Dict[str, Dict] = {}
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.warning(f"Trending candidate query failed: {result}")
+                continue
+            for product in result or []:
+                candidates.setdefault(product.get('product_code'), product)
+        candidates.pop(None, None)
+        return list(candidates.values())
+    
+    def refresh(self) -> bool:
+        """โหลดสินค้าที่อาจติดอันดับจากฐานข้อมูลมาคำนวณ leaderboard ใหม่"""
+        if not self.db:
+            return False
+        
+        products = self._candidates()
+        if not products:
+            self._last_refresh = time.time()
+            return False
+        
+        with self._lock:
+            live_codes = {p.get('product_code') for p in products}
+            for code in list(self._entries):
+                if code not in live_codes:
+                    self._drop(code)
+            for product in products:
+                self.observe(product)
+            self._last_refresh = time.time()
+        
+        self.logger.debug(f"Trending leaderboard refreshed: {len(self._board)} products")
+        return True
+    
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error(f"Trending refresh failed: {e}")
+    
+    def _ensure_fresh(self):
+        """refresh ครั้งแรกแบบ inline แล้วให้ background thread ดูแลต่อ"""
+        if self._last_refresh == 0.0 and not self._board:
+            self.refresh()
+        
+        if self._scheduler is None and self.db is not None:
+            with self._lock:
+                if self._scheduler is None:
+                    self._scheduler = threading.Thread(
+                        target=self._refresh_loop, name="trending-refresh", daemon=True
+                    )
+                    self._scheduler.start()
+    
+    # ===== การอ่าน =====
+    
+    def top(self, limit: int = 5) -> List[Dict]:
+        """สินค้ามาแรง N อันดับแรก (ไม่มี database round trip หลังโหลดครั้งแรก)"""
+        self._ensure_fresh()
+        
+        with self._lock:
+            return [dict(self._entries[code][1]) for _, code in self._board[:limit]]
+    
+    def __len__(self) -> int:
+        return len(self._board)
+
+# สร้าง instance สำหรับใช้งาน
+trending_service = TrendingService()
@@ -0,0 +1,199 @@
+"""
+📁 src/utils/user_profile_store.py
+🎯 เก็บโปรไฟล์ความสนใจของผู้ใช้แบบ vector ขนาดคงที่ (array-backed)
+ใช้ร่วมกันระหว่าง SmartRecommendationEngine และ AIProductRecommender
+"""
+
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class UserProfileStore:
+    """ที่เก็บโปรไฟล์ผู้ใช้: หนึ่งแถว float32 ต่อผู้ใช้ ตาม vocabulary ของหมวดหมู่
+
+    คะแนนในแต่ละแถวถูกเก็บ ณ เวลาอัปเดตล่าสุดของแถวนั้น (last_update)
+    และจะถูก decay แบบ exponential เมื่อมีการอัปเดตหรืออ่านค่า
+    ทำให้การบันทึกแต่ละครั้งเป็น O(1) ต่อผู้ใช้ (ความยาว vector คงที่)
+    """
+
+    def __init__(self, vocabulary: Iterable[str], half_life_days: float = 7.0,
+                 initial_capacity: int = 1024):
+        self.vocabulary: List[str] = list(dict.fromkeys(vocabulary))
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.vocabulary)}
+        self.decay_rate = math.log(2) / (half_life_days * 86400.0)
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+
+        capacity = max(int(initial_capacity), 16)
+        size = len(self.vocabulary)
+        self._scores = np.zeros((capacity, size), dtype=np.float32)
+        self._last_update = np.zeros(capacity, dtype=np.float64)
+        self._interactions = np.zeros(capacity, dtype=np.uint32)
+        self._result_sum = np.zeros(capacity, dtype=np.float32)
+        self._result_events = np.zeros(capacity, dtype=np.uint32)
+        self._hours = np.zeros((capacity, 24), dtype=np.uint8)
+
+    # ===== การจัดการแถว =====
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._rows
+
+    def _grow(self):
+        """ขยายความจุของ arrays ครั้งละ 1.5 เท่า"""
+        capacity = self._scores.shape[0] * 3 // 2
+        self._scores = self._resize(self._scores, capacity)
+        self._last_update = self._resize(self._last_update, capacity)
+        self._interactions = self._resize(self._interactions, capacity)
+        self._result_sum = self._resize(self._result_sum, capacity)
+        self._result_events = self._resize(self._result_events, capacity)
+        self._hours = self._resize(self._hours, capacity)
+
+    @staticmethod
+    def _resize(array: np.ndarray, capacity: int) -> np.ndarray:
+        resized = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+        resized[:array.shape[0]] = array
+        return resized
+
+    def _row_for(self, user_id: str) -> int:
+        row = self._rows.get(user_id)
+        if row is None:
+            row = len(self._rows)
+            if row >= self._scores.shape[0]:
+                self._grow()
+            self._rows[user_id] = row
+        return row
+
+    def _decay_factor(self, row: int, now: float) -> float:
+        elapsed = now - self._last_update[row]
+        if elapsed <= 0:
+            return 1.0
+        return math.exp(-self.decay_rate * elapsed)
+
+    # ===== การบันทึก =====
+
+    def record(self, user_id: str, weights: Dict[str, float], now: Optional[float] = None,
+               result_count: Optional[int] = None, count_interaction: bool = True):
+        """บันทึกความสนใจ: decay แถวของผู้ใช้ แล้วบวกน้ำหนักของแต่ละหมวด"""
+        now = time.time() if now is None else now
+
+        with self._lock:
+            row = self._row_for(user_id)
+            if self._last_update[row] > 0:
+                factor = self._decay_factor(row, now)
+                if factor < 1.0:
+                    self._scores[row] *= factor
+
+            for name, weight in weights.items():
+                column = self.index.get(name)
+                if column is not None:
+                    self._scores[row, column] += weight
+
+            self._last_update[row] = max(now, self._last_update[row])
+
+            if count_interaction:
+                self._interactions[row] += 1
+                hour = datetime.fromtimestamp(now).hour
+                if self._hours[row, hour] == 255:
+                    # ฮิสโตแกรมเต็ม - ลดครึ่งทั้งแถวเพื่อคงสัดส่วนไว้
+                    self._hours[row] //= 2
+                self._hours[row, hour] += 1
+
+            if result_count:
+                self._result_sum[row] += result_count
+                self._result_events[row] += 1
+
+    # ===== การอ่านค่า =====
+
+    def vector(self, user_id: str, now: Optional[float] = None) -> np.ndarray:
+        """ดึง vector ความสนใจ ณ เวลาปัจจุบัน (สำเนา)"""
+        row = self._rows.get(user_id)
+        if row is None:
+            return np.zeros(len(self.vocabulary), dtype=np.float32)
+        now = time.time() if now is None else now
+        return self._scores[row] * np.float32(self._decay_factor(row, now))
+
+    def score(self, user_id: str, name: str, now: Optional[float] = None) -> float:
+        """คะแนนความสนใจของผู้ใช้ในหมวดเดียว"""
+        row = self._rows.get(user_id)
+        column = self.index.get(name)
+        if row is None or column is None:
+            return 0.0
+        now = time.time() if now is None else now
+        return float(self._scores[row, column]) * self._decay_factor(row, now)
+
+    def top_interests(self, user_id: str, limit: int = 3,
+                      now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """หมวดที่ผู้ใช้สนใจมากที่สุด (เฉพาะคะแนน > 0)"""
+        row = self._rows.get(user_id)
+        if row is None or limit <= 0:
+            return []
+
+        scores = self._scores[row]
+        limit = min(limit, scores.shape[0])
+        if limit < scores.shape[0]:
+            candidates = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            candidates = np.arange(scores.shape[0])
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        now = time.time() if now is None else now
+        factor = self._decay_factor(row, now)
+        return [
+            (self.vocabulary[i], round(float(scores[i]) * factor, 4))
+            for i in candidates if scores[i] > 0
+        ]
+
+    def top_users(self, name: str, limit: int = 10,
+                  now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """ผู้ใช้ที่สนใจหมวดนี้มากที่สุด (คำนวณแบบ vectorized ทั้งตาราง)"""
+        column = self.index.get(name)
+        count = len(self._rows)
+        if column is None or count == 0 or limit <= 0:
+            return []
+
+        now = time.time() if now is None else now
+        elapsed = np.maximum(now - self._last_update[:count], 0.0)
+        scores = self._scores[:count, column] * np.exp(-self.decay_rate * elapsed)
+
+        limit = min(limit, count)
+        candidates = np.argpartition(-scores, limit - 1)[:limit]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        users = list(self._rows)
+        return [(users[i], round(float(scores[i]), 4)) for i in candidates if scores[i] > 0]
+
+    def summary(self, user_id: str) -> Dict:
+        """สรุปข้อมูลการใช้งานของผู้ใช้"""
+        row = self._rows.get(user_id)
+        if row is None:
+            return {'interaction_count': 0, 'last_activity': None, 'preferences': {}}
+
+        preferences = {}
+        if self._result_events[row]:
+            preferences['avg_search_results'] = float(self._result_sum[row]) / int(self._result_events[row])
+
+        hours = self._hours[row]
+        if hours.any():
+            order = np.argsort(-hours.astype(np.int16), kind='stable')[:3]
+            preferences['preferred_hours'] = [(int(h), int(hours[h])) for h in order if hours[h] > 0]
+
+        return {
+            'interaction_count': int(self._interactions[row]),
+            'last_activity': datetime.fromtimestamp(self._last_update[row]).isoformat(),
+            'preferences': preferences
+        }
+
+    def memory_usage(self) -> int:
+        """จำนวนไบต์ที่ arrays ใช้อยู่"""
+        return sum(array.nbytes for array in (
+            self._scores, self._last_update, self._interactions,
+            self._result_sum, self._result_events, self._hours
+        ))
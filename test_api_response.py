@@ -0,0 +1,81 @@
+"""
+🧪 Test API Response
+ทดสอบ FastJSONProvider (ผลเหมือน json มาตรฐาน), การบีบอัด gzip ตาม Accept-Encoding และ ?fields= ของ /api/products
+"""
+
+import gzip
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks.catalog import generate_catalog
+from src.utils.api_response import FastJSONProvider, parse_fields, select_fields
+from src.utils.http_cache import response_cache
+from src.utils.product_store import InMemoryProductStore
+
+def test_api_response():
+    """ทดสอบ JSON provider, การบีบอัด และการเลือกฟิลด์"""
+    print("Testing API Response...")
+    import main
+
+    # 1. ผลของ provider อ่านกลับได้เหมือน json มาตรฐาน (ภาษาไทยเป็น UTF-8, ค่าพิเศษผ่าน default)
+    print("\n1. Testing JSON Provider...")
+    provider = FastJSONProvider(main.app)
+    payload = {'name': 'ครีมกันแดด', 'price': Decimal('199.50'), 'at': datetime(2026, 1, 31, 12),
+               'big': 2 ** 70, 'b': 1, 'a': [1, 2.5, None, True]}
+    text = provider.dumps(payload)
+    print(text)
+    assert 'ครีมกันแดด' in text and text.index('"a"') < text.index('"b"')
+    assert json.loads(text) == json.loads(DefaultJSONProvider(main.app).dumps(payload)) == {
+        **payload, 'price': '199.50', 'at': 'Sat, 31 Jan 2026 12:00:00 GMT'}
+    del payload['big']  # ไม่มี int เกิน 64 บิต -> ใช้ orjson
+    assert json.loads(provider.dumps(payload)) == json.loads(DefaultJSONProvider(main.app).dumps(payload))
+    with main.app.app_context():
+        assert json.loads(provider.response(payload).get_data())['name'] == 'ครีมกันแดด'
+
+    # 2. เลือกฟิลด์
+    print("\n2. Testing Field Selection...")
+    assert parse_fields(' product_code, price,,price ') == ['product_code', 'price']
+    rows = [{'product_code': 'A1', 'price': 10, 'description': 'x'}]
+    assert select_fields(rows, ['price', 'missing']) == [{'price': 10}]
+    assert select_fields(rows, []) == rows
+
+    store = InMemoryProductStore()
+    store.load_products(generate_catalog(300))
+    original_db, main.db = main.db, store
+    try:
+        client = main.app.test_client()
+        response_cache.clear()
+
+        projected = client.get('/api/products?limit=20&fields=product_code,price').get_json()
+        assert projected['count'] == 20
+        assert all(set(product) == {'product_code', 'price'} for product in projected['products'])
+
+        # 3. บีบอัด gzip เมื่อใหญ่กว่าเกณฑ์และ client รองรับ, ETag เป็นแบบ weak และยังได้ 304
+        print("\n3. Testing Compression...")
+        plain = client.get('/api/products?limit=50')
+        compressed = client.get('/api/products?limit=50', headers={'Accept-Encoding': 'gzip, deflate'})
+        print(f"Plain: {len(plain.get_data())} B, gzip: {len(compressed.get_data())} B")
+        assert 'Content-Encoding' not in plain.headers
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in compressed.headers['Vary']
+        assert gzip.decompress(compressed.get_data()) == plain.get_data()
+        assert len(compressed.get_data()) < len(plain.get_data()) / 3
+        assert compressed.headers['ETag'].startswith('W/')
+        again = client.get('/api/products?limit=50', headers={'Accept-Encoding': 'gzip',
+                                                             'If-None-Match': compressed.headers['ETag']})
+        assert again.status_code == 304
+
+        # response เล็กไม่บีบอัด
+        small = client.get('/api/products?limit=1&fields=price', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in small.headers
+    finally:
+        main.db = original_db
+
+    print("\nAPI Response test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_api_response()
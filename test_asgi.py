@@ -0,0 +1,75 @@
+"""
+🧪 Test ASGI Entry Point
+ทดสอบว่า asgi.app รัน request ของ Flask พร้อมกันใน thread pool (ไม่ต่อคิวบน thread เดียว)
+"""
+
+import asyncio
+import importlib.util
+import threading
+import time
+
+def call(app, path: str = '/'):
+    """ส่ง HTTP GET หนึ่งครั้งเข้า ASGI app โดยตรง คืน (status, body)"""
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'', 'root_path': '',
+             'http_version': '1.1', 'headers': [], 'server': ('testserver', 80), 'client': ('127.0.0.1', 1234)}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    async def run():
+        await app(scope, receive, send)
+        status = next(m['status'] for m in messages if m['type'] == 'http.response.start')
+        body = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+        return status, body
+    return run()
+
+def test_asgi():
+    """ทดสอบ request พร้อมกันผ่าน asgi.app"""
+    print("Testing ASGI Entry Point...")
+    if importlib.util.find_spec('asgiref') is None:
+        print("asgiref not installed - skipped")
+        return True
+
+    import asgi
+    import main
+
+    threads = set()
+    lock = threading.Lock()
+
+    def slow_view():
+        with lock:
+            threads.add(threading.current_thread().name)
+        time.sleep(0.3)
+        return 'ok'
+
+    original_view = main.app.view_functions['home']
+    main.app.view_functions['home'] = slow_view
+    try:
+        # 1. 4 request ที่ใช้เวลา 300ms ต้องทำงานซ้อนกัน (รวมไม่ถึง 4 x 300ms)
+        print("\n1. Testing Concurrent Requests...")
+        async def fire():
+            return await asyncio.gather(*(call(asgi.app) for _ in range(4)))
+        started = time.perf_counter()
+        results = asyncio.run(fire())
+        elapsed = time.perf_counter() - started
+        print(f"4 x 300ms requests: {elapsed * 1000:.0f}ms on threads {sorted(threads)}")
+        assert all(status == 200 and body == b'ok' for status, body in results)
+        assert elapsed < 0.9
+        assert len(threads) == 4 and all(name.startswith('asgi-request') for name in threads)
+    finally:
+        main.app.view_functions['home'] = original_view
+
+    # 2. route จริงตอบผ่าน adapter ได้ตามปกติ
+    print("\n2. Testing Flask Route...")
+    status, body = asyncio.run(call(asgi.app, '/'))
+    assert status == 200 and body
+
+    print("\nASGI Entry Point test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_asgi()
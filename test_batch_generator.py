@@ -0,0 +1,117 @@
+"""
+🧪 Test Batch Generator
+ทดสอบ /api/review/batch ด้วย model จำลอง: งาน AI ที่เกินเวลา/ล้มเหลวใช้เทมเพลตแทน,
+การจำกัดคำขอ AI พร้อมกันรวมทั้ง process และการตรวจ product_codes
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+from benchmarks.catalog import generate_catalog
+from src.config import config
+from src.utils.batch_generator import BatchContentGenerator
+from src.utils.generation_cache import GenerationCache
+from src.utils.product_store import InMemoryProductStore
+from src.utils.review_generator import ReviewGenerator
+
+class StubAIClient:
+    """model จำลอง (interface เหมือน openai) - ช้าเมื่อ prompt มี slow_name, ล้มเหลวเมื่อมี fail_name"""
+
+    def __init__(self, slow_name: str = None, fail_name: str = None, delay: float = 0.05):
+        self.slow_name, self.fail_name, self.delay = slow_name, fail_name, delay
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        prompt = messages[-1]['content']
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if self.fail_name and self.fail_name in prompt:
+                raise RuntimeError("model unavailable")
+            time.sleep(1.0 if self.slow_name and self.slow_name in prompt else self.delay)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="รีวิวจาก AI"))])
+        finally:
+            with self._lock:
+                self.active -= 1
+
+def stub_generator(tmp_dir: str, name: str, client: StubAIClient, timeout: float) -> BatchContentGenerator:
+    cache = GenerationCache(db_path=os.path.join(tmp_dir, f'{name}.db'), max_bytes=1024 * 1024)
+    reviews = ReviewGenerator(client=client, model='stub', cache=cache)
+    return BatchContentGenerator(reviews=reviews, timeout=timeout)
+
+def read_ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line]
+
+def test_batch_generator():
+    """ทดสอบ endpoint, timeout ต่อรายการ และ fallback เป็นเทมเพลต"""
+    print("Testing Batch Generator...")
+    import main
+
+    catalog = generate_catalog(8)
+    codes = [row['product_code'] for row in catalog]
+    # ใช้ชื่อสินค้าใน prompt แยกสินค้าที่ model จำลองทำงานช้า/ล้มเหลว
+    slow_name, fail_name = catalog[1]['product_name'], catalog[2]['product_name']
+    store = InMemoryProductStore()
+    store.load_products(catalog)
+
+    original_db, original_generator = main.db, main.batch_generator
+    original_ai = config.USE_AI_SEARCH
+    config.USE_AI_SEARCH = True
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            client = StubAIClient(slow_name=slow_name, fail_name=fail_name)
+            main.db = store
+            main.batch_generator = stub_generator(tmp_dir, 'endpoint', client, timeout=0.3)
+            app = main.app.test_client()
+
+            # 1. endpoint: งานที่ช้า/ล้มเหลวได้เทมเพลตแทน ส่วนที่เหลือได้ผลจาก AI
+            print("\n1. Testing Endpoint With Fallback...")
+            started = time.perf_counter()
+            response = app.post('/api/review/batch', json={'product_codes': codes[:4] + ['MISSING'], 'ai': True})
+            lines = read_ndjson(response)  # stream ทำงานตอนอ่าน body
+            elapsed = time.perf_counter() - started
+            sources = {line['product_code']: line['source'] for line in lines if 'source' in line}
+            print(f"Sources: {sources} in {elapsed * 1000:.0f}ms")
+            assert response.status_code == 200
+            assert sources[codes[0]] == 'ai' and sources[codes[3]] == 'ai'
+            assert sources[codes[1]] == 'template_fallback'  # เกิน timeout ต่อรายการ
+            assert sources[codes[2]] == 'template_fallback'  # model ล้มเหลว
+            assert {'product_code': 'MISSING', 'error': 'ไม่พบสินค้า'} in lines
+            assert lines[-1]['done'] and lines[-1]['count'] == 4
+            assert elapsed < 0.9  # ไม่รอรายการที่ช้าจนเสร็จ
+
+            # 2. AI_MAX_CONCURRENCY จำกัดรวมทุก batch ที่ทำงานพร้อมกัน
+            print("\n2. Testing Process-wide Concurrency Limit...")
+            shared = StubAIClient()
+            generators = [stub_generator(tmp_dir, f'batch{i}', shared, timeout=5) for i in range(3)]
+            threads = [threading.Thread(target=lambda g=g: list(g.generate(catalog, ['short'], use_ai=True)))
+                       for g in generators]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            print(f"Peak concurrent AI calls: {shared.peak} (limit {config.AI_MAX_CONCURRENCY})")
+            assert 1 <= shared.peak <= config.AI_MAX_CONCURRENCY
+
+            # 3. product_codes ต้องเป็นรายการของ string
+            print("\n3. Testing Validation...")
+            for payload in ({'product_codes': 'ABC123'}, {'product_codes': {'a': 1}},
+                            {'product_codes': ['A', 1]}, ['A'], {}):
+                response = app.post('/api/review/batch', json=payload)
+                assert response.status_code == 400, payload
+    finally:
+        main.db, main.batch_generator = original_db, original_generator
+        config.USE_AI_SEARCH = original_ai
+
+    print("\nBatch Generator test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_batch_generator()
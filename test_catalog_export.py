@@ -0,0 +1,95 @@
+"""
+🧪 Test Catalog Export
+ทดสอบการอ่านแบบ keyset ของทุก engine และ /api/products/export (NDJSON/CSV, fields, updated_since)
+"""
+
+import csv
+import io
+import json
+
+from benchmarks.catalog import generate_catalog
+from benchmarks.fake_postgrest import FakeSupabaseClient
+from src.utils.catalog_export import CatalogExport
+from src.utils.product_store import InMemoryProductStore, SQLiteProductStore
+from src.utils.supabase_database import SupabaseDatabase
+
+def export_codes(store, page_size: int, updated_since: str = None):
+    """product_code ทั้งหมดที่ได้จากการวน get_products_page"""
+    codes, after = [], None
+    while True:
+        page = store.get_products_page(after, page_size, updated_since)
+        codes.extend(row['product_code'] for row in page)
+        if len(page) < page_size:
+            return codes
+        after = page[-1]['product_code']
+
+def test_catalog_export():
+    """ทดสอบ keyset pagination และ endpoint export"""
+    print("Testing Catalog Export...")
+    catalog = generate_catalog(1200)
+    client = FakeSupabaseClient()
+    client.load_products(catalog)
+    supabase = SupabaseDatabase()
+    supabase.client, supabase.connected = client, True
+    engines = {'sqlite': SQLiteProductStore(':memory:'), 'memory': InMemoryProductStore(), 'supabase': supabase}
+    for name in ('sqlite', 'memory'):
+        engines[name].load_products(catalog)
+
+    # 1. ทุก engine ได้ทุกสินค้าครั้งเดียว เรียงตาม product_code (รวมหน้าสุดท้ายที่เต็มพอดี)
+    print("\n1. Testing Keyset Parity...")
+    since = sorted(row['updated_at'] for row in catalog)[900]
+    expected = sorted(row['product_code'] for row in catalog)
+    expected_since = sorted(row['product_code'] for row in catalog if row['updated_at'] >= since)
+    for name, store in engines.items():
+        for page_size in (100, 333):
+            assert export_codes(store, page_size) == expected, name
+        assert export_codes(store, 128, since) == expected_since, name
+        print(f"{name:<8} {len(expected)} products, {len(expected_since)} updated since {since}")
+
+    # เขียนระหว่างทาง: memory engine เห็นการแก้ไขใน overlay
+    memory = engines['memory']
+    memory.update_product(expected[5], {'price': 1.0})
+    assert memory.get_products_page(expected[4], 1)[0]['price'] == 1.0
+
+    # 2. Supabase ใช้ไม่ได้ -> None (ไม่ใช่หน้าว่าง) และ export แจ้ง error ก่อนเริ่ม stream
+    print("\n2. Testing Errors...")
+    offline = SupabaseDatabase()
+    offline.connected = False
+    assert offline.get_products_page() is None
+    try:
+        CatalogExport(offline).first_page()
+        raise AssertionError("export ต้องล้มเหลว")
+    except Exception as e:
+        assert 'Failed to read products' in str(e)
+
+    # 3. endpoint: NDJSON ทีละหน้า + บรรทัดสรุป, CSV พร้อม header, fields และ updated_since
+    print("\n3. Testing Export Endpoint...")
+    import main
+    original_db, main.db = main.db, engines['sqlite']
+    try:
+        http = main.app.test_client()
+        response = http.get('/api/products/export', buffered=False)
+        assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in response.get_data().decode('utf-8').splitlines()]
+        assert [row['product_code'] for row in lines[:-1]] == expected
+        assert lines[-1] == {'done': True, 'count': len(expected), 'max_updated_at': max(r['updated_at'] for r in catalog)}
+
+        response = http.get(f'/api/products/export?format=csv&fields=product_code,price&updated_since={since}')
+        assert response.headers['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(response.get_data().decode('utf-8-sig'))))
+        assert [row['product_code'] for row in rows] == expected_since
+        assert set(rows[0]) == {'product_code', 'price'}
+
+        assert http.get('/api/products/export?format=xml').status_code == 400
+        assert http.get('/api/products/export?updated_since=yesterday').status_code == 400
+
+        main.db = offline
+        assert http.get('/api/products/export').status_code == 503
+    finally:
+        main.db = original_db
+
+    print("\nCatalog Export test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_catalog_export()
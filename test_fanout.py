@@ -0,0 +1,133 @@
+"""
+🧪 Test Backend Fan-out
+ทดสอบการเรียก backend ที่ไม่ขึ้นต่อกันพร้อมกัน (fanout.run / fanout.gather), การส่งต่อ context และ error
+และคำแนะนำส่วนบุคคล/สถิติที่เปลี่ยนมาใช้ fan-out ว่าได้ผลเหมือนการเรียกตามลำดับ
+"""
+
+import asyncio
+import importlib.util
+import threading
+import time
+
+from benchmarks.catalog import generate_catalog
+from src.config import config
+from src.utils.fanout import FanOut, fanout, fanout_duration
+from src.utils.product_store import InMemoryProductStore, search_logging_enabled, search_logging_paused
+from src.utils.smart_recommendation_engine import SmartRecommendationEngine
+from src.utils.tracing import tracer
+
+def slow(value, seconds=0.2):
+    def call():
+        time.sleep(seconds)
+        return value
+    return call
+
+def fail():
+    raise ValueError("backend down")
+
+def test_fanout():
+    """ทดสอบ FanOut และจุดที่ใช้งาน"""
+    print("Testing Backend Fan-out...")
+    original_enabled = config.FANOUT_ENABLED
+    config.FANOUT_ENABLED = True
+    try:
+        _run_checks()
+    finally:
+        config.FANOUT_ENABLED = original_enabled
+
+    print("\nBackend Fan-out test completed!")
+    return True
+
+def _run_checks():
+    # 1. เวลารวม ≈ การเรียกที่ช้าที่สุด และผลลัพธ์เรียงตามลำดับ calls
+    print("\n1. Testing Concurrency...")
+    fanout_duration.clear()
+    started = time.perf_counter()
+    results = fanout.run('test', slow('a'), slow('b'), slow('c'), slow('d'))
+    elapsed = time.perf_counter() - started
+    print(f"4 x 200ms calls: {elapsed * 1000:.0f}ms -> {results}")
+    assert results == ['a', 'b', 'c', 'd']
+    assert elapsed < 0.5
+    assert fanout_duration.snapshot(name='test', mode='concurrent')['count'] == 1
+
+    # ปิดด้วย FANOUT_ENABLED=false = เรียกตามลำดับ (พฤติกรรมเดิม)
+    config.FANOUT_ENABLED = False
+    started = time.perf_counter()
+    assert fanout.run('test', slow('a', 0.05), slow('b', 0.05)) == ['a', 'b']
+    assert time.perf_counter() - started >= 0.1
+    assert fanout_duration.snapshot(name='test', mode='sequential')['count'] == 1
+    config.FANOUT_ENABLED = True
+
+    # 2. error ถูกส่งต่อ หรือคืนเป็นค่าเมื่อ return_exceptions=True
+    print("\n2. Testing Errors...")
+    try:
+        fanout.run('test', slow('a', 0), fail)
+        assert False, "expected ValueError"
+    except ValueError as e:
+        print(f"Raised: {e}")
+    results = fanout.run('test', slow('a', 0), fail, return_exceptions=True)
+    assert results[0] == 'a' and isinstance(results[1], ValueError)
+
+    # 3. context ของผู้เรียก (trace, การพัก log การค้นหา) ตามไปใน thread pool
+    print("\n3. Testing Context Propagation...")
+    with tracer.trace('fanout-test') as trace, search_logging_paused():
+        seen = fanout.run('test', tracer.current, search_logging_enabled,
+                          lambda: threading.current_thread().name)
+    print(f"Worker thread: {seen[2]}")
+    assert seen[0] is trace and seen[1] is False
+    assert seen[2].startswith('fanout')
+    assert search_logging_enabled() and tracer.current() is None
+
+    # fan-out ซ้อนใน worker รันตามลำดับ (ไม่รอ thread ของ pool เดียวกัน)
+    small = FanOut(max_workers=1)
+    nested = lambda: small.run('inner', slow('x', 0), slow('y', 0))
+    assert small.run('outer', nested, slow('z', 0)) == [['x', 'y'], 'z']
+
+    # 4. โค้ด async (ASGI) ใช้ gather ตรง ๆ
+    print("\n4. Testing Async Gather...")
+    async def handler():
+        return await fanout.gather('test', slow(1, 0.1), slow(2, 0.1), slow(3, 0.1))
+    started = time.perf_counter()
+    assert asyncio.run(handler()) == [1, 2, 3]
+    assert time.perf_counter() - started < 0.25
+
+    # 5. คำแนะนำตามความสนใจได้ผลเหมือนการเรียกตามลำดับ
+    print("\n5. Testing Recommendations...")
+    store = InMemoryProductStore()
+    store.load_products(generate_catalog(300))
+    engine = SmartRecommendationEngine(store)
+    engine.user_profiles.record('U1', {'ความงาม': 3, 'สัตว์เลี้ยง': 2, 'โทรศัพท์มือถือ': 1})
+    concurrent = engine.get_personalized_recommendations('U1', limit=5)
+    config.FANOUT_ENABLED = False
+    sequential = engine.get_personalized_recommendations('U1', limit=5)
+    config.FANOUT_ENABLED = True
+    print(f"Recommended: {[p['product_code'] for p in concurrent]}")
+    assert concurrent and [p['product_code'] for p in concurrent] == [p['product_code'] for p in sequential]
+    assert concurrent[0]['recommendation_reason'] == 'ตามความสนใจในความงาม'
+
+    # 6. /api/stats ผ่าน Flask test client
+    print("\n6. Testing Stats API...")
+    import main
+    from src.utils.http_cache import response_cache
+    original_db, main.db = main.db, store
+    response_cache.clear()
+    try:
+        store.log_search('serum', 4)
+        data = main.app.test_client().get('/api/stats').get_json()
+    finally:
+        main.db = original_db
+        response_cache.clear()
+    assert data['database']['total_products'] == 300
+    assert data['popular_searches'][0]['search_query'] == 'serum'
+    assert data['search_analytics']['searches'] >= 1
+
+    # 7. ASGI entry point (เมื่อติดตั้ง asgiref)
+    print("\n7. Testing ASGI Entry Point...")
+    if importlib.util.find_spec('asgiref') is None:
+        print("asgiref not installed - skipped")
+    else:
+        import asgi
+        assert asgi.flask_app is main.app and callable(asgi.app)
+
+if __name__ == "__main__":
+    test_fanout()
@@ -0,0 +1,85 @@
+"""
+🧪 Test Generation Cache
+ทดสอบ cache ของรีวิวที่สร้างด้วย AI โดยใช้ model จำลองในเครื่อง
+"""
+
+import os
+import tempfile
+from types import SimpleNamespace
+
+from src.utils.generation_cache import GenerationCache
+from src.utils.review_generator import ReviewGenerator
+
+class LocalStandInModel:
+    """model จำลองที่มี interface เหมือน openai (chat.completions.create)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        text = f"รีวิวจาก {model} ครั้งที่ {self.calls}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+def test_generation_cache():
+    """ทดสอบการใช้ cache และการสร้างใหม่เมื่อข้อมูลสินค้าเปลี่ยน"""
+    print("Testing Generation Cache...")
+
+    product = {
+        'product_code': 'TEST001',
+        'product_name': 'ครีมกันแดด SPF50',
+        'price': 299.0,
+        'shop_name': 'Beauty Shop',
+        'category': 'ความงาม',
+        'rating': 4.8,
+        'sold_count': 120,
+        'commission_rate': 8.0,
+        'commission_amount': 23.92,
+        'offer_link': 'https://example.com/offer'
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = GenerationCache(db_path=os.path.join(tmp_dir, 'cache.db'), max_bytes=1024 * 1024)
+        model = LocalStandInModel()
+        generator = ReviewGenerator(client=model, model='local-stand-in', cache=cache)
+
+        # 1. ครั้งแรกต้องเรียก model ครั้งต่อไปใช้ cache
+        print("\n1. Testing Cache Hit...")
+        first = generator.request_ai_review(product, 'short')
+        second = generator.request_ai_review(product, 'short')
+        print(f"Review: {first} | model calls: {model.calls}")
+        assert first == second
+        assert model.calls == 1
+
+        # 2. ฟิลด์ที่ไม่มีผลต่อข้อความไม่ทำให้สร้างใหม่
+        print("\n2. Testing Irrelevant Field Change...")
+        generator.request_ai_review(dict(product, updated_at='2025-07-27T10:00:00'), 'short')
+        assert model.calls == 1
+
+        # 3. ราคาเปลี่ยน / สไตล์ต่าง ต้องสร้างใหม่
+        print("\n3. Testing Content Change...")
+        generator.request_ai_review(dict(product, price=259.0), 'short')
+        generator.request_ai_review(product, 'long')
+        print(f"Model calls: {model.calls}")
+        assert model.calls == 3
+
+        # 4. Eviction ตามขนาด
+        print("\n4. Testing Size-based Eviction...")
+        small_cache = GenerationCache(db_path=os.path.join(tmp_dir, 'small.db'), max_bytes=200)
+        for i in range(20):
+            small_cache.put(f"key-{i}", "ข้อความ" * 5)
+        stats = small_cache.get_stats()
+        print(f"Small cache stats: {stats}")
+        assert stats['total_bytes'] <= 200
+        assert small_cache.get("key-19") is not None
+        assert small_cache.get("key-0") is None
+
+        cache.connection.close()
+        small_cache.connection.close()
+
+    print("\nGeneration Cache test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_generation_cache()
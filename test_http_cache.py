@@ -0,0 +1,91 @@
+"""
+🧪 Test HTTP Response Cache
+ทดสอบ cache ของ /api/products, /api/search, /api/stats: ETag/Last-Modified, 304 และการล้างเมื่อสินค้าเปลี่ยน
+"""
+
+from benchmarks.catalog import generate_catalog
+from src.utils.http_cache import catalog_version, http_cache_requests, response_cache
+from src.utils.product_store import InMemoryProductStore
+
+def test_http_cache():
+    """ทดสอบ response cache ผ่าน Flask test client"""
+    print("Testing HTTP Response Cache...")
+    import main
+
+    # ใช้ store ในหน่วยความจำแทนฐานข้อมูลที่ตั้งค่าไว้ (ทดสอบได้แบบ offline)
+    store = InMemoryProductStore()
+    store.load_products(generate_catalog(500))
+    original_db, main.db = main.db, store
+    try:
+        _run_checks(main.app.test_client())
+    finally:
+        main.db = original_db
+
+    print("\nHTTP Response Cache test completed!")
+    return True
+
+def _run_checks(client):
+    import main
+
+    response_cache.clear()
+    http_cache_requests.clear()
+
+    # 1. ครั้งแรก miss -> ครั้งต่อไปตอบ body เดิมจาก cache (ลำดับพารามิเตอร์ไม่มีผล)
+    print("\n1. Testing Cache Hit...")
+    first = client.get('/api/products?limit=5&category=')
+    etag = first.headers['ETag']
+    print(f"ETag: {etag}, Cache-Control: {first.headers['Cache-Control']}")
+    assert first.status_code == 200 and first.headers['Last-Modified']
+    assert etag.strip('"').startswith(f"{catalog_version.value}-")
+    assert 'must-revalidate' in first.headers['Cache-Control']
+    second = client.get('/api/products?limit=5')
+    assert second.get_data() == first.get_data() and second.headers['ETag'] == etag
+
+    # 2. conditional GET -> 304 ไม่มี body
+    print("\n2. Testing Conditional GET...")
+    not_modified = client.get('/api/products?limit=5', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304 and not not_modified.get_data()
+    since = client.get('/api/products?limit=5', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert since.status_code == 304
+
+    # 3. เขียนสินค้า -> เวอร์ชันเพิ่ม, ETag เดิมใช้ไม่ได้
+    print("\n3. Testing Invalidation...")
+    version = catalog_version.value
+    code = 'HTTPCACHE001'
+    created = client.post('/api/products', json={
+        'product_code': code, 'product_name': 'เซรั่มทดสอบ cache', 'price': 150, 'category': 'ความงาม',
+        'shop_name': 'ร้านทดสอบ', 'commission_rate': 10, 'product_link': 'https://example.com/p',
+        'offer_link': 'https://example.com/o'
+    })
+    try:
+        assert created.status_code == 200 and catalog_version.value > version
+        changed = client.get('/api/products?limit=5', headers={'If-None-Match': etag})
+        assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    finally:
+        client.delete(f'/api/products?code={code}')
+
+    # 4. search ที่ตอบจาก cache ยังนับในสถิติการค้นหา, stats ไม่ผูกกับเวอร์ชัน
+    print("\n4. Testing Search and Stats...")
+    client.get('/api/search?query=serum&limit=3')
+    before = main.db.get_search_stats(1, 100)['searches']
+    hit = client.get('/api/search?limit=3&query=serum')
+    assert hit.status_code == 200
+    assert main.db.get_search_stats(1, 100)['searches'] == before + 1
+
+    stats = client.get('/api/stats')
+    assert stats.status_code == 200
+    assert not stats.headers['ETag'].strip('"').startswith(f"{catalog_version.value}-")
+    assert client.get('/api/stats', headers={'If-None-Match': stats.headers['ETag']}).status_code == 304
+    summary = response_cache.stats()
+    print(summary)
+    assert summary['requests']['/api/products']['not_modified'] == 2
+    assert summary['requests']['/api/search']['hit'] == 1
+
+    # 5. error ไม่ถูก cache
+    print("\n5. Testing Uncacheable Responses...")
+    assert client.get('/api/search?query=').status_code == 400
+    assert client.get('/api/search?query=').status_code == 400
+    assert 'ETag' not in client.get('/api/search?query=').headers
+
+if __name__ == "__main__":
+    test_http_cache()
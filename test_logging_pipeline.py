@@ -0,0 +1,87 @@
+"""
+🧪 Test Logging Pipeline
+ทดสอบ SystemLogger แบบ queue: เขียนไฟล์ผ่าน background thread, JSON format และ debug sampling
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+
+from src.config import config
+from src.utils.logger import SystemLogger
+
+def test_logging_pipeline():
+    """ทดสอบว่า log ถูกเขียนลงไฟล์โดย listener และ DEBUG ถูก sampling"""
+    print("Testing Logging Pipeline...")
+
+    original = (config.LOG_DIR, config.LOG_FORMAT, config.LOG_DEBUG_SAMPLE_RATE, config.DEBUG)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config.LOG_DIR = tmp_dir
+        config.LOG_FORMAT = 'json'
+        config.LOG_DEBUG_SAMPLE_RATE = 0.0
+        config.DEBUG = True
+        try:
+            system_logger = SystemLogger("PipelineTest")
+            logger = system_logger.get_child('handler')
+
+            # 1. หลาย thread เขียนพร้อมกัน
+            print("\n1. Testing Concurrent Logging...")
+            def work(worker):
+                for i in range(200):
+                    logger.info(f"worker {worker} message {i}")
+                    logger.debug(f"debug {i}")
+
+            threads = [threading.Thread(target=work, args=(w,)) for w in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            try:
+                raise ValueError("ทดสอบ")
+            except ValueError as e:
+                logger.error(f"Handler failed: {e}", exc_info=True)
+
+            system_logger.shutdown()
+            stats = system_logger.get_stats()
+            print(f"Stats: {stats}")
+
+            # 2. ไฟล์หลักเป็น JSON ครบทุกบรรทัด
+            print("\n2. Testing JSON Output...")
+            with open(os.path.join(tmp_dir, 'smart_service.log'), encoding='utf-8') as f:
+                records = [json.loads(line) for line in f if line.strip()]
+            assert len(records) == 801
+            assert records[0]['logger'] == 'PipelineTest.handler'
+            assert all(r['level'] != 'DEBUG' for r in records)
+            assert stats['debug_sampled_out'] == 800
+
+            # 3. ไฟล์ error มี traceback
+            print("\n3. Testing Error File...")
+            with open(os.path.join(tmp_dir, 'errors.log'), encoding='utf-8') as f:
+                error = json.loads(f.readline())
+            assert 'ValueError' in error['exception']
+
+            # 4. process อื่นที่ใช้โฟลเดอร์เดียวกัน (เช่น gunicorn worker) เขียนไฟล์ของตัวเองแยกตาม pid
+            print("\n4. Testing Single Writer Per File...")
+            script = ("from src.utils.logger import system_logger; system_logger.info('from worker'); "
+                      "system_logger.shutdown(); print(system_logger.log_path)")
+            worker = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=120,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)),
+                                    env=dict(os.environ, LOG_DIR=tmp_dir, LOG_FORMAT='text'))
+            worker_path = worker.stdout.strip().splitlines()[-1]
+            print(f"Worker log file: {os.path.basename(worker_path)}")
+            assert system_logger.log_path == os.path.join(tmp_dir, 'smart_service.log')
+            assert os.path.basename(worker_path).startswith('smart_service.') and worker_path != system_logger.log_path
+            with open(worker_path, encoding='utf-8') as f:
+                assert 'from worker' in f.read()
+        finally:
+            config.LOG_DIR, config.LOG_FORMAT, config.LOG_DEBUG_SAMPLE_RATE, config.DEBUG = original
+
+    print("\nLogging Pipeline test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_logging_pipeline()
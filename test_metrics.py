@@ -0,0 +1,85 @@
+"""
+🧪 Test Metrics
+ทดสอบ histogram/counter ของระบบ metrics และการจับเวลาแบบหลาย thread
+"""
+
+import threading
+import time
+
+from src.utils.metrics import MetricsRegistry, bucket_index, bucket_upper_bound
+from src.utils.logger import PerformanceMonitor, system_logger
+
+def test_metrics():
+    """ทดสอบความแม่นยำของ percentile, thread safety และ Prometheus output"""
+    print("Testing Metrics...")
+    registry = MetricsRegistry()
+
+    # 1. ช่อง histogram ครอบคลุมค่าต่อเนื่องและคลาดเคลื่อนไม่เกิน ~3%
+    print("\n1. Testing Histogram Buckets...")
+    for value in [0, 1, 63, 64, 65, 127, 128, 1000, 123456, 10_000_000]:
+        upper = bucket_upper_bound(bucket_index(value))
+        assert value <= upper <= value * 1.04 + 1, (value, upper)
+
+    # 2. Percentile
+    print("\n2. Testing Percentiles...")
+    histogram = registry.histogram('test_latency_seconds', 'Test latency')
+    for ms in range(1, 1001):
+        histogram.observe(ms / 1000, operation='search')
+    snapshot = histogram.snapshot(operation='search')
+    print(f"Snapshot: {snapshot}")
+    assert snapshot['count'] == 1000
+    assert abs(snapshot['p50'] - 0.5) < 0.02
+    assert abs(snapshot['p95'] - 0.95) < 0.04
+    assert abs(snapshot['p99'] - 0.99) < 0.04
+    assert snapshot['max'] == 1.0
+
+    # 3. Counter หลาย thread
+    print("\n3. Testing Thread Safety...")
+    counter = registry.counter('test_events_total', 'Test events')
+
+    def work():
+        for _ in range(1000):
+            counter.inc(kind='a')
+            with registry.timer('test_work_seconds'):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value(kind='a') == 8000
+    assert registry.histogram('test_work_seconds').snapshot()['count'] == 8000
+
+    # 4. PerformanceMonitor จับเวลา operation เดียวกันพร้อมกันได้
+    print("\n4. Testing Concurrent PerformanceMonitor...")
+    monitor = PerformanceMonitor(system_logger, registry)
+    durations = []
+
+    def timed_operation(delay):
+        monitor.start_timer("shared_operation")
+        time.sleep(delay)
+        durations.append(monitor.end_timer("shared_operation"))
+
+    threads = [threading.Thread(target=timed_operation, args=(d,)) for d in (0.05, 0.01)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"Durations: {durations}")
+    assert min(durations) >= 0.01 and max(durations) >= 0.05
+    assert monitor.histogram.snapshot(operation="shared_operation")['count'] == 2
+
+    # 5. Prometheus text
+    print("\n5. Testing Prometheus Output...")
+    text = registry.render_prometheus()
+    print(text[:300])
+    assert '# TYPE test_latency_seconds summary' in text
+    assert 'test_latency_seconds{operation="search",quantile="0.99"}' in text
+    assert 'test_events_total{kind="a"} 8000' in text
+
+    print("\nMetrics test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_metrics()
@@ -0,0 +1,104 @@
+"""
+🧪 Test Product Mirror
+ทดสอบสำเนา products ใน SQLite: ซิงก์ครั้งแรก, ซิงก์ตาม updated_at, การลบ และผลการอ่านที่ตรงกับ PostgREST
+"""
+
+from benchmarks.catalog import generate_catalog
+from benchmarks.fake_postgrest import FakeSupabaseClient
+from src.utils.product_mirror import ProductMirror
+from src.utils.search_log_writer import search_log_writer
+from src.utils.supabase_database import SupabaseDatabase
+
+def test_product_mirror():
+    """ทดสอบการซิงก์และเมธอดอ่านของ ProductMirror"""
+    print("Testing Product Mirror...")
+    client = FakeSupabaseClient()
+    client.load_products(generate_catalog(2000))
+    mirror = ProductMirror(db_path=':memory:', page_size=300)
+    assert not mirror.ready
+
+    # 1. ซิงก์ครั้งแรก (หลายหน้า)
+    print("\n1. Testing Full Sync...")
+    assert mirror.sync(client) == 2000
+    assert mirror.ready and mirror.count() == 2000
+
+    # 2. ผลการค้นหาตรงกับ PostgREST
+    print("\n2. Testing Search Parity...")
+    result = mirror.store.search_products('ครีม', limit=5, order_by='popularity', max_price=2000)
+    remote = client.table('products').select('*', count='exact')\
+        .or_('product_name.ilike.%ครีม%,description.ilike.%ครีม%,category.ilike.%ครีม%')\
+        .lte('price', 2000).order('sold_count', desc=True).range(0, 4).execute()
+    print(f"Mirror total: {result['total']}, PostgREST total: {remote.count}")
+    assert result['total'] == remote.count
+    assert [p['product_code'] for p in result['products']] == [p['product_code'] for p in remote.data]
+
+    # 3. ซิงก์เฉพาะแถวที่เปลี่ยน และลบแถวที่หายไป
+    print("\n3. Testing Incremental Sync and Reconcile...")
+    client.table('products').update({'price': 99.0, 'updated_at': '2030-01-01T00:00:00'})\
+        .eq('product_code', 'PHN0000000').execute()
+    client.table('products').delete().eq('product_code', 'PHN0000012').execute()
+    assert mirror.sync(client) >= 1  # รวมแถวในช่วง overlap ของ watermark
+    assert mirror.store.get_product_by_code('PHN0000000')['price'] == 99.0
+    assert mirror.reconcile(client) == 1
+    assert mirror.store.get_product_by_code('PHN0000012') is None
+
+    # 4. การเขียนของ worker เอง (change listener)
+    print("\n4. Testing Change Listener...")
+    mirror.apply_change('update', 'BTY0000001', {**mirror.store.get_product_by_code('BTY0000001'), 'sold_count': 10 ** 9})
+    assert mirror.store.get_top_products_by_metric('sold_count', 1)[0]['product_code'] == 'BTY0000001'
+    mirror.apply_change('delete', 'BTY0000001')
+    assert mirror.store.get_product_by_code('BTY0000001') is None
+    print(f"Status: {mirror.get_status()}")
+
+    # 5. reconcile ไม่ล้างสำเนาเมื่อรายการจาก Supabase ว่าง (error ชั่วคราว/แบ่งหน้าผิด)
+    print("\n5. Testing Reconcile Guard...")
+    empty = FakeSupabaseClient()
+    rows = mirror.count()
+    assert mirror.reconcile(empty) == 0 and mirror.count() == rows
+
+    # 6. แถวที่ถูกอัปเดตระหว่างซิงก์ (ย้ายไปท้ายลำดับ updated_at) ไม่ทำให้แถวอื่นถูกข้าม
+    print("\n6. Testing Keyset Paging During Updates...")
+    moving = FakeSupabaseClient()
+    moving.load_products(generate_catalog(1000))
+    pager = ProductMirror(db_path=':memory:', page_size=100)
+    seen = set()
+    for page, rows in enumerate(pager._fetch_pages(moving)):
+        seen.update(row['product_code'] for row in rows)
+        if page < 3:
+            moving.table('products').update({'updated_at': f'2030-01-0{page + 1}T00:00:00'})\
+                .eq('product_code', rows[0]['product_code']).execute()
+    codes = set()
+    for rows in pager._fetch_pages(moving, columns='product_code'):
+        codes.update(row['product_code'] for row in rows)
+        if len(codes) == 100:
+            moving.table('products').delete().eq('product_code', rows[0]['product_code']).execute()
+    print(f"Rows seen: {len(seen)}, codes listed: {len(codes)}")
+    assert len(seen) == 1000 and len(codes) == 1000
+
+    # 7. SupabaseDatabase อ่านจากสำเนาโดยไม่เรียกเครือข่าย (รวม get_stats) และ log การค้นหาเขียนเป็นชุดเบื้องหลัง
+    print("\n7. Testing Reads Without Round Trips...")
+    db = SupabaseDatabase()
+    db.client, db.connected = client, True
+    original_mirror, SupabaseDatabase.mirror = SupabaseDatabase.mirror, mirror
+    try:
+        client.table('product_searches').insert({'search_query': 'serum', 'result_count': 3}).execute()
+        assert mirror.sync_search_total(client) == 1
+        before = client.round_trips
+        result = db.search_products('ครีม', limit=5)
+        stats = db.get_stats()
+        print(f"Round trips: {client.round_trips - before}, stats: {stats['total_products']} products, "
+              f"{stats['total_searches']} searches, {search_log_writer.pending} pending logs")
+        assert result['products'] and client.round_trips == before
+        assert stats['total_products'] == mirror.count() and stats['total_searches'] == 1
+        assert stats['database_type'] == 'Supabase'
+        assert search_log_writer.flush() >= 1
+        logged = client.table('product_searches').select('*').eq('search_query', 'ครีม').execute().data
+        assert len(logged) == 1 and logged[0]['result_count'] == 5
+    finally:
+        SupabaseDatabase.mirror = original_mirror
+
+    print("\nProduct Mirror test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_product_mirror()
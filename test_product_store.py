@@ -0,0 +1,91 @@
+"""
+🧪 Test Product Store
+ทดสอบ engine ของแคตตาล็อกสินค้า (SQLite, in-memory) เทียบกับ PostgREST จำลอง และการเลือก engine
+"""
+
+from benchmarks.catalog import generate_catalog
+from benchmarks.fake_postgrest import FakeSupabaseClient
+from src.config import config
+from src.utils.product_store import (
+    InMemoryProductStore, ProductChangeNotifier, ProductStore, SQLiteProductStore, create_product_store
+)
+
+def test_product_store():
+    """ทดสอบผลการค้นหาที่ตรงกันทุก engine, CRUD และ change listener"""
+    print("Testing Product Store...")
+    catalog = generate_catalog(3000)
+    client = FakeSupabaseClient()
+    client.load_products(catalog)
+    engines = {'sqlite': SQLiteProductStore(':memory:'), 'memory': InMemoryProductStore()}
+    for store in engines.values():
+        assert isinstance(store, ProductStore)
+        store.load_products(catalog)
+
+    # 1. ผลการค้นหาตรงกับ PostgREST (ilike ใน ชื่อ/คำอธิบาย/หมวดหมู่)
+    print("\n1. Testing Search Parity...")
+    cases = [('ครีมกันแดด', 'popularity'), ('serum', 'price_low'), ('แมว', 'rating'),
+             ('Samsung', 'price_high'), ('ไม่มีสินค้านี้', 'created_at')]
+    for query, order_by in cases:
+        pattern = f'%{query}%'
+        remote = client.table('products').select('*', count='exact')\
+            .or_(f'product_name.ilike.{pattern},description.ilike.{pattern},category.ilike.{pattern}')\
+            .lte('price', 3000).execute()
+        for name, store in engines.items():
+            result = store.search_products(query, limit=10, max_price=3000, order_by=order_by)
+            print(f"{name:<7} '{query}' ({order_by}): {result['total']} / PostgREST {remote.count}")
+            assert result['total'] == remote.count
+            assert len(result['products']) == min(10, remote.count)
+
+    sqlite_page = engines['sqlite'].search_products('serum', limit=20, order_by='price_low')['products']
+    memory_page = engines['memory'].search_products('serum', limit=20, order_by='price_low')['products']
+    assert [p['price'] for p in sqlite_page] == [p['price'] for p in memory_page]
+    assert [p['price'] for p in sqlite_page] == sorted(p['price'] for p in sqlite_page)
+
+    # 2. สถิติหมวดหมู่และช่วงราคาเหมือนกัน
+    print("\n2. Testing Stats Parity...")
+    sqlite_stats = engines['sqlite'].get_categories_with_stats()
+    memory_stats = engines['memory'].get_categories_with_stats()
+    assert [c['name'] for c in sqlite_stats] == [c['name'] for c in memory_stats]
+    assert engines['sqlite'].get_price_range() == engines['memory'].get_price_range()
+    assert engines['sqlite'].get_categories() == engines['memory'].get_categories()
+
+    # 3. CRUD และ change listener
+    print("\n3. Testing CRUD and Change Listener...")
+    changes = []
+    listener = lambda action, code, data: changes.append((action, code))
+    ProductChangeNotifier.add_change_listener(listener)
+    try:
+        for name, store in engines.items():
+            product = store.add_product({
+                'product_code': 'TEST001', 'product_name': 'ครีมทดสอบ', 'price': 200,
+                'shop_name': 'Test Shop', 'commission_rate': 10, 'product_link': 'https://example.com/p',
+                'offer_link': 'https://example.com/o', 'category': 'ความงาม'
+            })
+            assert product['commission_amount'] == 20
+            assert store.add_product({**product, 'commission_rate': 5}) is None  # รหัสซ้ำ
+            assert store.update_product('TEST001', {'price': 300})
+            assert store.get_product_by_code('TEST001')['commission_amount'] == 30
+            result = store.bulk_update_products(['TEST001', 'BTY0000001'], {'commission_rate': 20})
+            assert result['updated_count'] == 2
+            assert store.get_product_by_code('TEST001')['commission_amount'] == 60
+            assert store.search_products('ครีมทดสอบ')['total'] == 1
+            assert store.delete_product('TEST001')
+            assert store.search_products('ครีมทดสอบ')['total'] == 0
+            assert not store.delete_product('TEST001')
+            print(f"{name}: {changes}")
+            assert [action for action, _ in changes] == ['add', 'update', 'update', 'update', 'delete']
+            changes.clear()
+    finally:
+        ProductChangeNotifier.remove_change_listener(listener)
+
+    # 4. engine ในเครื่องเป็น instance เดียวทั้ง process
+    print("\n4. Testing Engine Selection...")
+    config.PRODUCT_STORE_PATH = ':memory:'
+    assert create_product_store('memory') is create_product_store('memory')
+    assert isinstance(create_product_store('sqlite'), SQLiteProductStore)
+
+    print("\nProduct Store test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_product_store()
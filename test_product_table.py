@@ -0,0 +1,63 @@
+"""
+🧪 Test Product Table
+ทดสอบตารางสินค้าแบบคอลัมน์: การแปลงกลับเป็น dict, การกรอง/เรียง/top-K เทียบกับ Python และการรวมตาราง
+"""
+
+import numpy as np
+
+from benchmarks.catalog import generate_catalog
+from src.utils.product_table import ProductRow, ProductTable
+
+def test_product_table():
+    """ทดสอบ ProductTable เทียบกับการทำงานบน list ของ dict"""
+    print("Testing Product Table...")
+    rows = generate_catalog(2000)
+    rows[3]['description'] = None
+    rows[4]['category'] = None
+    rows[5]['rating'] = None
+    table = ProductTable.from_rows(rows)
+
+    # 1. ข้อมูลกลับมาเหมือนเดิม (รวมค่า None)
+    print("\n1. Testing Round Trip...")
+    assert len(table) == 2000
+    assert table.to_dicts() == [{column: row.get(column) for column in table.row(0)} for row in rows]
+    view = table.row(table.index_of(rows[5]['product_code']))
+    assert isinstance(view, ProductRow) and view['rating'] is None and dict(view) == view.to_dict()
+    print(f"Memory: {table.nbytes / 1024:.0f} KB for {len(table)} products")
+
+    # 2. กรองและค้นหา
+    print("\n2. Testing Filters...")
+    mask = table.filter('serum', min_price=100, max_price=1500)
+    expected = [i for i, row in enumerate(rows)
+                if any('serum' in (row.get(field) or '').lower() for field in ('product_name', 'description', 'category'))
+                and 100 <= row['price'] <= 1500]
+    print(f"'serum' 100-1500: {int(mask.sum())} products")
+    assert np.flatnonzero(mask).tolist() == expected
+    category = rows[0]['category']
+    assert int(table.filter(category=category).sum()) == sum(1 for row in rows if row['category'] == category)
+    assert not table.filter(category='ไม่มีหมวดนี้').any()
+
+    # 3. เรียงหลายคอลัมน์ (None อยู่ท้าย) และ top-K
+    print("\n3. Testing Order and Top-K...")
+    ordered = table.order(np.arange(len(table)), [('category', False), ('sold_count', True)])
+    keys = [(rows[i]['category'] is None, rows[i]['category'] or '', -rows[i]['sold_count']) for i in ordered]
+    assert keys == sorted(keys)
+    by_rating = table.order(np.arange(len(table)), [('rating', True)])
+    assert rows[by_rating[-1]]['rating'] is None
+    top = table.top_k('sold_count', 10)
+    assert [rows[i]['sold_count'] for i in top] == sorted((row['sold_count'] for row in rows), reverse=True)[:10]
+
+    # 4. ตัด/ต่อตารางโดยไม่ผ่าน dict
+    print("\n4. Testing Take and Concat...")
+    extra = ProductTable.from_rows([{**rows[0], 'product_code': 'NEW001', 'category': 'หมวดใหม่'}])
+    merged = table.take(np.arange(1, len(table))).concat(extra)
+    assert len(merged) == 2000 and merged.index_of(rows[0]['product_code']) is None
+    assert merged.row(merged.index_of('NEW001'))['category'] == 'หมวดใหม่'
+    assert merged.to_dicts(range(10)) == table.to_dicts(range(1, 11))
+    assert int(merged.filter(category='หมวดใหม่').sum()) == 1
+
+    print("\nProduct Table test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_product_table()
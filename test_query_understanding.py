@@ -0,0 +1,70 @@
+"""
+🧪 Test Query Understanding
+ทดสอบการแยกวลีราคา, การแปลงคำค้นหาแบบ cache และการส่งช่วงราคาเป็นตัวกรองของ search_products
+"""
+
+from benchmarks.catalog import generate_catalog
+from src.utils.ai_search import ai_search
+from src.utils.product_store import InMemoryProductStore
+from src.utils.query_understanding import extract_price_range
+from src.utils.search_pipeline import SearchPipeline
+
+def test_query_understanding():
+    """ทดสอบ QueryUnderstanding และการใช้ช่วงราคาเป็นตัวกรอง"""
+    print("Testing Query Understanding...")
+
+    # 1. วลีราคาภาษาไทย/อังกฤษ -> ช่วงราคา + ข้อความที่เหลือ
+    print("\n1. Testing Price Phrases...")
+    cases = {
+        'ครีมกันแดด ไม่เกิน 500': ({'max': 500.0}, 'ครีมกันแดด'),
+        'ครีม ราคา 100-500 บาท': ({'min': 100.0, 'max': 500.0}, 'ครีม'),
+        'กระเป๋า 1,500 บาทขึ้นไป': ({'min': 1500.0}, 'กระเป๋า'),
+        'เสื้อ เกิน 200 ไม่เกิน 800': ({'min': 200.0, 'max': 800.0}, 'เสื้อ'),
+        'หูฟัง ประมาณ 1000': ({'min': 800.0, 'max': 1200.0}, 'หูฟัง'),
+        'laptop under 20000': ({'max': 20000.0}, 'laptop'),
+        'iphone 15': (None, 'iphone 15'),
+    }
+    for query, expected in cases.items():
+        result = extract_price_range(query)
+        print(f"'{query}' -> {result}")
+        assert result == expected
+
+    # 2. ผลการแปลงถูก cache และเหมือนเดิมทุกครั้ง
+    print("\n2. Testing Cache...")
+    parser = ai_search.query_parser
+    parser.parse.cache_clear()
+    parsed = ai_search._preprocess_query('samsung มือถือ ไม่เกิน 5000')
+    assert parsed is ai_search._preprocess_query('samsung มือถือ ไม่เกิน 5000')
+    assert parsed['original'] == 'samsung มือถือ' and parsed['expanded_terms'][0] == 'samsung มือถือ'
+    assert parsed['brands'] == ('samsung',) and parsed['max_price'] == 5000.0 and parsed['min_price'] is None
+    assert ai_search._extract_price_range('ราคา 100 ถึง 300') == {'min': 100.0, 'max': 300.0}
+    info = parser.cache_info()
+    print(info)
+    assert info.hits == 1 and info.misses == 1
+
+    # 3. ตัวกรองราคาถูกส่งต่อให้ search_products (ค่าที่ผู้เรียกระบุมีผลก่อน)
+    print("\n3. Testing Filter Pushdown...")
+    assert parser.search_filters('serum ไม่เกิน 500') == ('serum', None, 500.0)
+    assert parser.search_filters('serum ไม่เกิน 500', max_price=300) == ('serum', None, 300)
+    assert parser.search_filters('Serum') == ('Serum', None, None)
+
+    store = InMemoryProductStore()
+    rows = generate_catalog(2000)
+    store.load_products(rows)
+    text, min_price, max_price = parser.search_filters('serum ไม่เกิน 500')
+    filtered = store.search_products(text, limit=100, min_price=min_price, max_price=max_price)
+    expected = sum(1 for row in rows if 'serum' in f"{row['product_name']} {row['description']}".lower()
+                   and row['price'] <= 500)
+    print(f"'serum ไม่เกิน 500': {filtered['total']} products")
+    assert filtered['total'] == expected > 0
+    assert all(product['price'] <= 500 for product in filtered['products'])
+
+    result = SearchPipeline(store).search('serum ไม่เกิน 500', 10)
+    assert result['max_price'] == 500.0 and result['products']
+    assert all(product['price'] <= 500 for product in result['products'])
+
+    print("\nQuery Understanding test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_query_understanding()
@@ -0,0 +1,114 @@
+"""
+🧪 Test Search Analytics
+ทดสอบ rollup สถิติการค้นหารายชั่วโมง/รายวัน/ทั้งหมด, การสร้าง rollup จาก log เดิม และ compaction
+"""
+
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+from benchmarks.fake_postgrest import FakeSupabaseClient
+from src.utils.product_store import InMemoryProductStore, SQLiteProductStore
+from src.utils.search_analytics import SEARCH_ROLLUP_SCHEMA, SearchRollups
+from src.utils.sqlite_database import SQLiteKnowledgeBaseManager
+
+def test_search_analytics():
+    """ทดสอบ SearchRollups และสถิติการค้นหาของทุก engine"""
+    print("Testing Search Analytics...")
+
+    # 1. rollup เหมือนกันทุก engine (normalize คำค้นหา, อัตราไม่พบผลลัพธ์, รายวัน)
+    print("\n1. Testing Store Rollups...")
+    for store in (SQLiteProductStore(':memory:'), InMemoryProductStore()):
+        for query, results in (('Serum', 4), ('serum ', 6), ('  SERUM', 0), ('ครีม', 2), ('ไม่มีสินค้านี้', 0), ('', 12)):
+            store.log_search(query, results)
+        popular = store.get_popular_searches(5)
+        print(f"{type(store).__name__}: {popular}")
+        assert [row['search_count'] for row in popular] == [3, 1, 1]
+        assert popular[0]['search_query'] == 'SERUM'  # รูปแบบล่าสุดที่พิมพ์
+        assert popular[0]['avg_results'] == 3.33 and popular[0]['zero_result_rate'] == 33.33
+
+        stats = store.get_search_stats(7, 10)
+        assert stats['searches'] == 6 and stats['zero_result_rate'] == 33.33
+        assert len(stats['daily']) == 1 and stats['daily'][0]['searches'] == 6
+        assert store.get_stats()['total_searches'] == 6
+
+    # 2. rollup ครั้งแรกจาก log ดิบที่มีอยู่แล้ว
+    print("\n2. Testing Backfill...")
+    connection = sqlite3.connect(':memory:')
+    connection.execute("CREATE TABLE product_searches (search_query TEXT, result_count INTEGER, created_at TEXT)")
+    connection.executemany("INSERT INTO product_searches VALUES (?, ?, ?)", [
+        ('serum', 5, '2026-01-30T10:15:00'), ('Serum', 0, '2026-01-31T09:00:00'), ('ครีม', 3, '2026-01-31T09:30:00')
+    ])
+    clock = lambda: datetime(2026, 1, 31, 12)
+    rollups = SearchRollups(connection, raw_table='product_searches', clock=clock,
+                            raw_select="SELECT search_query, result_count, created_at FROM product_searches")
+    assert rollups.popular(1) == [{'search_query': 'Serum', 'search_count': 2, 'searches': 2,
+                                   'avg_results': 2.5, 'zero_result_rate': 50.0}]
+    assert [row['period'] for row in rollups.series('day', 7)] == ['2026-01-31', '2026-01-30']
+    assert rollups.series('hour', 24, query='ครีม')[0] == {'period': '2026-01-31T09', 'searches': 1,
+                                                          'avg_results': 3.0, 'zero_result_rate': 0.0}
+    # สร้างใหม่อีกครั้งต้องไม่นับซ้ำ
+    rollups = SearchRollups(connection, raw_table='product_searches', clock=clock,
+                            raw_select="SELECT search_query, result_count, created_at FROM product_searches")
+    assert rollups.totals()['searches'] == 3
+
+    # 3. compaction ลบ log ดิบ/rollup รายชั่วโมงที่เก่า แต่ยอดรวมยังอยู่
+    print("\n3. Testing Compaction...")
+    now = datetime(2026, 6, 1, 12)
+    old = now - timedelta(days=60)
+    connection.execute("INSERT INTO product_searches VALUES ('serum', 1, ?)", (old.strftime('%Y-%m-%dT%H:%M:%S'),))
+    rollups.record('serum', 1, at=old)  # compaction ครั้งแรกในตัวบันทึก ลบ log เดือนมกราคมแล้ว
+    assert connection.execute("SELECT COUNT(*) FROM product_searches").fetchone()[0] == 1
+    deleted = rollups.compact(now)
+    print(deleted)
+    assert deleted == {'raw': 1, 'hour': 1, 'day': 0}  # แถวรายชั่วโมงของ 'serum'
+    assert connection.execute("SELECT COUNT(*) FROM product_searches").fetchone()[0] == 0
+    assert not connection.execute("SELECT 1 FROM search_rollups WHERE bucket = 'hour'").fetchone()
+    assert rollups.popular(1)[0]['search_count'] == 3 and rollups.totals()['searches'] == 4
+
+    # คำค้นหายอดนิยมนับเฉพาะ SEARCH_POPULAR_DAYS วันล่าสุด (คำค้นหาเก่าไม่ค้างอันดับต้นตลอดไป)
+    rollups.clock = lambda: now
+    assert rollups.popular(5) == [] and rollups.popular(5, days=90)[0]['search_count'] == 1
+    assert rollups.totals()['searches'] == 4 and rollups.totals(days=7)['searches'] == 0
+
+    # rollup รุ่นก่อน (มีแถวผลรวม bucket 'all') ถูกสร้างใหม่จาก log ดิบ ไม่ถูกนับซ้ำ
+    legacy = sqlite3.connect(':memory:')
+    legacy.execute("CREATE TABLE product_searches (search_query TEXT, result_count INTEGER, created_at TEXT)")
+    legacy.execute("INSERT INTO product_searches VALUES ('serum', 2, '2026-01-31T09:00:00')")
+    legacy.executescript(SEARCH_ROLLUP_SCHEMA)
+    legacy.executemany("INSERT INTO search_rollups VALUES (?, ?, ?, '', 1, 2, 0)",
+                       [('all', '', ''), ('day', '', '2026-01-31'), ('day', 'serum', '2026-01-31')])
+    rollups = SearchRollups(legacy, raw_table='product_searches', clock=clock,
+                            raw_select="SELECT search_query, result_count, created_at FROM product_searches")
+    assert rollups.totals()['searches'] == 1 and rollups.popular(5)[0]['search_count'] == 1
+
+    # 4. Supabase (trigger จำลองใน FakeSupabaseClient) ผ่าน rpc
+    print("\n4. Testing PostgREST RPC...")
+    client = FakeSupabaseClient()
+    for query, results in (('serum', 4), ('Serum', 0), ('ครีม', 2)):
+        client.table('product_searches').insert({'search_query': query, 'result_count': results}).execute()
+    popular = client.rpc('get_popular_searches', {'search_limit': 1}).execute().data
+    assert popular[0]['search_count'] == 2 and popular[0]['zero_result_rate'] == 50.0
+    assert client.rpc('get_search_stats', {'days': 7, 'search_limit': 5}).execute().data['searches'] == 3
+
+    # 5. สถิติของ knowledge base (search_logs) ยังคืนรูปแบบเดิม
+    print("\n5. Testing Knowledge Base Stats...")
+    path = os.path.join(tempfile.mkdtemp(), 'kb.db')
+    manager = SQLiteKnowledgeBaseManager(path)
+    # การสร้าง manager (เช่น instance ตอน import) ไม่สร้างตาราง rollup - สร้างตอนใช้งานครั้งแรก
+    assert not manager.connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'search_rollups'").fetchone()
+    for query, found in (('ค่าห้อง', True), ('ค่าห้อง', False), ('xray', True)):
+        manager._log_search(query, found)
+    stats = manager.get_search_stats()
+    print(stats)
+    assert stats['popular_queries'][0] == {'query': 'ค่าห้อง', 'count': 2}
+    assert stats['success_rate'] == 66.67 and stats['daily_searches'][0]['searches'] == 3
+    manager.close()
+
+    print("\nSearch Analytics test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_search_analytics()
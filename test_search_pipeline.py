@@ -0,0 +1,82 @@
+"""
+🧪 Test Search Pipeline
+ทดสอบการค้นหาหลายขั้น: ผู้สมัครจากหลายแหล่ง, การจัดอันดับ, การแบ่งหน้า และงบเวลาของแต่ละขั้น
+"""
+
+from benchmarks.catalog import generate_catalog
+from src.config import config
+from src.utils.metrics import metrics
+from src.utils.product_store import InMemoryProductStore
+from src.utils.search_pipeline import SearchPipeline
+from src.utils.suggestion_index import suggestion_index
+
+def test_search_pipeline():
+    """ทดสอบ SearchPipeline บนแคตตาล็อกสังเคราะห์"""
+    print("Testing Search Pipeline...")
+    store = InMemoryProductStore()
+    store.load_products(generate_catalog(3000))
+    pipeline = SearchPipeline(store)
+
+    # 1. ผู้สมัครจาก lexical + หมวดหมู่ที่ตรวจพบ แล้วจัดอันดับให้ชื่อที่ตรงขึ้นก่อน
+    print("\n1. Testing Candidates and Ranking...")
+    result = pipeline.search('ครีมกันแดด', 5)
+    stages = result['stages']
+    print(f"total={result['total']} categories={result['categories']} stages={stages}")
+    assert set(stages) == {'candidates', 'rerank', 'paginate'}
+    assert stages['candidates']['sources']['lexical'] > 0 and stages['candidates']['sources']['category'] > 0
+    assert result['categories'] == ['ความงาม'] and result['total'] <= config.SEARCH_CANDIDATES
+    assert all('ครีมกันแดด' in product['product_name'] for product in result['products'])
+    assert stages['rerank']['ai_scored'] > 0
+    assert metrics.get('search_stage_duration_seconds').snapshot(stage='rerank')['count'] >= 1
+
+    # 2. แบ่งหน้าต่อกันได้ตรงกับการขอครั้งเดียว
+    print("\n2. Testing Pagination...")
+    codes = [p['product_code'] for p in pipeline.search('serum', 10)['products']]
+    page1, page2 = pipeline.search('serum', 5), pipeline.search('serum', 5, offset=5)
+    assert [p['product_code'] for p in page1['products'] + page2['products']] == codes
+    assert page1['has_more'] and page2['current_offset'] == 5
+
+    # 3. ไม่พบด้วยคำเดิม - ใช้คำที่แก้แล้วเป็นแหล่งผู้สมัคร
+    print("\n3. Testing Typo Correction Source...")
+    suggestion_index.db = store
+    suggestion_index.refresh()
+    typo = pipeline.search('samsnug', 5)
+    print(f"'samsnug' -> {typo['corrected_query']} ({typo['total']} candidates)")
+    assert typo['corrected_query'] == 'samsung' and typo['products']
+    assert all('spelling' in product['search_sources'] for product in typo['products'])
+
+    # 4. งบเวลาหมด: ข้ามแหล่งที่เหลือ (lexical ทำงานเสมอ) และไม่ใช้คะแนน AI
+    print("\n4. Testing Budgets...")
+    budgets = config.SEARCH_CANDIDATE_BUDGET_MS, config.SEARCH_RERANK_BUDGET_MS
+    config.SEARCH_CANDIDATE_BUDGET_MS = config.SEARCH_RERANK_BUDGET_MS = 0
+    try:
+        limited = pipeline.search('ครีมกันแดด', 5)
+    finally:
+        config.SEARCH_CANDIDATE_BUDGET_MS, config.SEARCH_RERANK_BUDGET_MS = budgets
+    print(limited['stages'])
+    assert limited['stages']['candidates']['skipped'] == ['spelling', 'category', 'semantic']
+    assert limited['stages']['rerank']['ai_scored'] == 0 and limited['products']
+
+    # 5. pipeline ไม่บันทึก log เอง (ค้นหาหลายครั้งต่อ query), /api/search บันทึกครั้งเดียวด้วยคำที่ใช้ตอบจริง
+    print("\n5. Testing Search Logging...")
+    assert store.get_stats()['total_searches'] == 0
+    import main
+    from src.utils.http_cache import response_cache
+    original_db, main.db = main.db, store
+    response_cache.clear()
+    try:
+        client = main.app.test_client()
+        assert client.get('/api/search?query=samsnug').get_json()['corrected_query'] == 'samsung'
+        client.get('/api/search?query=samsnug')  # ตอบจาก response cache ก็นับเหมือนเดิม
+    finally:
+        main.db = original_db
+        response_cache.clear()
+    popular = store.get_popular_searches(5)
+    print(popular)
+    assert [(row['search_query'], row['search_count']) for row in popular] == [('samsung', 2)]
+
+    print("\nSearch Pipeline test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_search_pipeline()
@@ -0,0 +1,108 @@
+"""
+🧪 Test Search Warm-up
+ทดสอบการ warm คำค้นหายอดนิยมจาก product_searches ลง cache ผลค้นหา/Flex และอัตรา hit ของคำค้นหาที่ warm แล้ว
+"""
+
+from benchmarks.catalog import generate_catalog
+from src.handlers.affiliate_handler import AffiliateLineHandler
+from src.utils.product_store import InMemoryProductStore, SQLiteProductStore
+from src.utils.search_pipeline import search_pipeline
+from src.utils.search_warmup import SearchWarmer, cache_lookups, search_cache
+
+class DummyEvent:
+    """event ของข้อความ LINE สำหรับทดสอบ"""
+
+    class Source:
+        user_id = "warmup_user"
+
+    def __init__(self, text: str):
+        self.message = type('Message', (), {'text': text})()
+        self.source = self.Source()
+        self.reply_token = "dummy_token"
+
+class RecordingApi:
+    """เก็บข้อความที่ handler ตอบกลับ"""
+
+    def __init__(self):
+        self.replies = []
+
+    def reply_message(self, request):
+        self.replies.append(request.messages[0])
+
+def test_search_warmup():
+    """ทดสอบ SearchWarmer + SearchCache กับเส้นทางค้นหาของ LINE"""
+    print("Testing Search Warm-up...")
+
+    store = InMemoryProductStore()
+    rows = generate_catalog(2000)
+    store.load_products(rows)
+    for query, count in (('serum', 3), ('ครีม', 2), ('anker', 1)):
+        for _ in range(count):
+            store.log_search(query, 5)
+
+    handler = AffiliateLineHandler()
+    handler.db = store
+    handler.line_bot_api = RecordingApi()
+    search_pipeline.db = store
+    search_cache.clear()
+    cache_lookups.clear()
+
+    # 1. warm-up อ่านคำค้นหา top-N และไม่บันทึกการค้นหาของตัวเองลง product_searches
+    print("\n1. Testing Warm-up Run...")
+    warmer = SearchWarmer(store, cache=search_cache, top_n=2)
+    warmer.add_warmer(handler.warm_search)
+    assert warmer.popular_queries() == ['serum', 'ครีม']
+    searches_before = len(store.get_popular_searches(100))
+    summary = warmer.warm()
+    print(summary)
+    assert summary['queries'] == 2 and summary['failed'] == 0
+    assert store.get_popular_searches(1)[0]['search_count'] == 3
+    assert len(store.get_popular_searches(100)) == searches_before
+    stats = search_cache.stats()
+    assert stats['line']['entries'] == 2 and stats['flex']['entries'] == 2 and stats['pipeline']['entries'] == 2
+
+    # 2. ครั้งแรกหลัง warm-up ตอบจาก cache ทั้งผลค้นหาและ Flex (และยังนับเป็นการค้นหา)
+    print("\n2. Testing Warmed Query...")
+    handler.handle_message(DummyEvent('serum'))
+    reply = handler.line_bot_api.replies[-1]
+    key = search_cache.key('serum', 1, None, None, None, 'created_at')
+    assert reply == search_cache.get('flex', key)
+    assert store.get_popular_searches(1)[0]['search_count'] == 4
+
+    # 3. คำค้นหาที่ไม่ได้ warm: miss ครั้งแรก แล้ว hit ครั้งต่อไป (บันทึกการค้นหาครั้งเดียวต่อข้อความทั้งสองกรณี)
+    print("\n3. Testing Unwarmed Query...")
+    handler.handle_message(DummyEvent('anker'))
+    handler.handle_message(DummyEvent('anker'))
+    assert handler.line_bot_api.replies[-1] == handler.line_bot_api.replies[-2]
+
+    stats = search_cache.stats()
+    print(stats)
+    assert stats['line']['warmed'] == {'hits': 1, 'misses': 0, 'hit_ratio': 1.0}
+    assert stats['line']['unwarmed'] == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+    assert stats['flex']['warmed']['hits'] == 2  # รวมการเปิดใน assert ข้อ 2
+    assert warmer.get_status()['last_run']['queries'] == 2
+
+    # 4. สินค้าเปลี่ยน -> ล้าง cache ทั้งหมด
+    print("\n4. Testing Invalidation...")
+    store.update_product(rows[0]['product_code'], {'price': 99.0})
+    stats = search_cache.stats()
+    assert stats['line']['entries'] == 0 and stats['flex']['entries'] == 0
+
+    # 5. cache miss และ hit บันทึกการค้นหาครั้งเดียวพร้อม user_id ของผู้ค้นหาเหมือนกัน
+    print("\n5. Testing Search Logging...")
+    logged = SQLiteProductStore(':memory:')
+    logged.load_products(rows)
+    handler.db = logged
+    search_cache.clear()
+    handler.handle_message(DummyEvent('anker'))
+    handler.handle_message(DummyEvent('anker'))
+    users = [row[0] for row in logged.connection.execute(
+        "SELECT user_id FROM product_searches WHERE search_query = 'anker'")]
+    print(f"Logged users: {users}")
+    assert users == ['warmup_user', 'warmup_user']
+
+    print("\nSearch Warm-up test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_search_warmup()
@@ -0,0 +1,76 @@
+"""
+🧪 Test Semantic Search
+ทดสอบ encoder ในเครื่อง, ดัชนี IVF บนไฟล์ memmap, การผสมคะแนน lexical และ overlay ของสินค้าที่เปลี่ยน
+"""
+
+import tempfile
+
+import numpy as np
+
+from benchmarks.catalog import generate_catalog
+from src.utils.product_store import InMemoryProductStore
+from src.utils.semantic_search import HashingEncoder, IVFIndex, SemanticSearch
+
+def test_semantic_search():
+    """ทดสอบ SemanticSearch บนแคตตาล็อกสังเคราะห์"""
+    print("Testing Semantic Search...")
+
+    # 1. encoder: เวกเตอร์ยาว 1, ผลเหมือนเดิมทุกครั้ง, คำพ้องความหมายอยู่ใกล้กัน
+    print("\n1. Testing Hashing Encoder...")
+    encoder = HashingEncoder(dim=256)
+    vectors = encoder.encode(['มือถือ', 'smartphone', 'อาหารแมว'])
+    assert vectors.dtype == np.float32 and vectors.shape == (3, 256)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    assert np.array_equal(vectors, HashingEncoder(dim=256).encode(['มือถือ', 'smartphone', 'อาหารแมว']))
+    print(f"cos(มือถือ, smartphone)={vectors[0] @ vectors[1]:.2f}, cos(มือถือ, อาหารแมว)={vectors[0] @ vectors[2]:.2f}")
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+
+    # 2. IVF: บันทึก/เปิดเป็น memmap และผลใกล้เคียงการค้นหาแบบเทียบทุกแถว
+    print("\n2. Testing IVF Index...")
+    rows = generate_catalog(3000)
+    store = InMemoryProductStore()
+    store.load_products(rows)
+    path = tempfile.mkdtemp()
+    search = SemanticSearch(store, encoder=encoder, index_path=path)
+    search.build()
+    index = IVFIndex.load(path)
+    assert isinstance(index.vectors, np.memmap) and len(index) == 3000
+    assert index.offsets[-1] == 3000 and index.encoder_name == encoder.name
+
+    query = encoder.encode(['ครีมกันแดด'])[0]
+    exact = np.sort(np.asarray(index.vectors) @ query)[::-1][:10]
+    positions, scores = index.search(query, 10, nprobe=len(index.centroids))
+    assert np.allclose(scores, exact, atol=1e-5)  # probe ทุก cluster = ค้นหาแบบ exact
+    positions, scores = index.search(query, 10, nprobe=8)
+    print(f"nprobe=8 top-10 cosine: {scores.min():.3f}-{scores.max():.3f} (exact {exact.min():.3f}-{exact.max():.3f})")
+    assert len(positions) == 10 and scores[0] >= exact[-1]
+
+    # 3. ค้นหาผ่าน store: ผลมีคะแนน, คำพ้องความหมายได้สินค้าหมวดที่ตรง
+    print("\n3. Testing Blended Search...")
+    reopened = SemanticSearch(store, encoder=HashingEncoder(dim=256), index_path=path)
+    results = reopened.search('ครีมกันแดด', 5)
+    print([product['product_name'] for product in results])
+    assert len(results) == 5 and 'ครีมกันแดด' in results[0]['product_name']
+    assert all('semantic_score' in product and 'search_score' in product for product in results)
+    assert [p['search_score'] for p in results] == sorted((p['search_score'] for p in results), reverse=True)
+    phone = reopened.search('มือถือ', 5)
+    assert sum(product['category'] == 'โทรศัพท์มือถือ' for product in phone) >= 3
+
+    # 4. สินค้าที่เพิ่ม/ลบหลังสร้างดัชนีเห็นผลทันที (overlay)
+    print("\n4. Testing Overlay Updates...")
+    store.add_product({**rows[0], 'product_code': 'SEM001', 'product_name': 'ไม้แขวนเสื้อพับได้ hanger',
+                       'category': 'ของใช้ในบ้าน', 'description': ''})
+    assert reopened.search('ไม้แขวนเสื้อ', 1)[0]['product_code'] == 'SEM001'
+    store.delete_product('SEM001')
+    top = results[0]['product_code']
+    store.delete_product(top)
+    assert all(product['product_code'] not in ('SEM001', top) for product in reopened.search('ครีมกันแดด', 10))
+
+    # 5. ดัชนีที่สร้างด้วย encoder คนละตัวไม่ถูกใช้
+    assert not SemanticSearch(store, encoder=HashingEncoder(dim=128), index_path=path).load()
+
+    print("\nSemantic Search test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_semantic_search()
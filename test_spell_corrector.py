@@ -0,0 +1,61 @@
+"""
+🧪 Test Spell Corrector
+ทดสอบการแก้คำค้นหาที่พิมพ์ผิดด้วยดัชนี SymSpell และการอัปเดตคำศัพท์ตามแคตตาล็อก
+"""
+
+from benchmarks.catalog import generate_catalog
+from src.utils.product_store import InMemoryProductStore
+from src.utils.spell_corrector import SpellCorrector, edit_distance
+from src.utils.suggestion_index import SuggestionIndex
+
+def test_spell_corrector():
+    """ทดสอบ SpellCorrector ทั้งแบบเพิ่มคำเองและแบบรับคำจาก suggestion index"""
+    print("Testing Spell Corrector...")
+
+    # 1. ระยะแก้ไข (สลับตัวอักษรนับเป็น 1)
+    print("\n1. Testing Edit Distance...")
+    assert edit_distance('samsung', 'samsnug', 2) == 1
+    assert edit_distance('serum', 'serun', 2) == 1
+    assert edit_distance('ครีมกันแดด', 'ครีมกนแดด', 2) == 1
+    assert edit_distance('apple', 'xiaomi', 2) == 3  # เกิน limit หยุดก่อน
+
+    # 2. แก้คำจากคำศัพท์ที่เพิ่มเอง (ระยะน้อยก่อน แล้วน้ำหนักมากก่อน)
+    print("\n2. Testing Lookup...")
+    corrector = SpellCorrector(max_distance=2)
+    for word, weight in [('samsung', 50), ('serum', 20), ('ครีมกันแดด', 30), ('อาหารแมว', 10), ('sensor', 1)]:
+        corrector.add_word(word, weight)
+    cases = {
+        'samsnug': 'samsung', 'serun': 'serum', 'ครีมกนแดด': 'ครีมกันแดด',
+        'อาหารเเมว': 'อาหารแมว',  # สระเอสองตัวแทนสระแอ
+        'samsnug serun': 'samsung serum', 'serum': None, 'xyzxyz': None, 'sam': None
+    }
+    for query, expected in cases.items():
+        corrected = corrector.correct(query)
+        print(f"'{query}' -> {corrected}")
+        assert corrected == expected
+    corrector.remove_word('serum')
+    assert corrector.correct('serun') is None
+
+    # 3. คำศัพท์ตามแคตตาล็อกผ่าน suggestion index (คำค้นหาของผู้ใช้ไม่นับ)
+    print("\n3. Testing Catalog Vocabulary...")
+    store = InMemoryProductStore()
+    products = generate_catalog(500)
+    store.load_products(products)
+    for _ in range(5):
+        store.log_search('ซัมซุงงง', 0)
+    index = SuggestionIndex(store)
+    assert index.refresh()
+    catalog_corrector = SpellCorrector(index)
+    print(f"Vocabulary: {len(catalog_corrector)} words")
+    assert 'ซัมซุงงง' not in catalog_corrector._words
+    assert catalog_corrector.correct('samsnug') == 'samsung'
+    store.update_product(products[0]['product_code'], {'product_name': 'Zephyrus Lamp'})
+    assert catalog_corrector.correct('zephyrsu') == 'zephyrus'
+    store.delete_product(products[0]['product_code'])
+    assert catalog_corrector.correct('zephyrsu') is None
+
+    print("\nSpell Corrector test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_spell_corrector()
@@ -0,0 +1,62 @@
+"""
+🧪 Test Suggestion Index
+ทดสอบคำแนะนำขณะพิมพ์: prefix trie, การถ่วงน้ำหนัก, การอัปเดตเมื่อสินค้าเปลี่ยน และ /api/suggest
+"""
+
+from benchmarks.catalog import generate_catalog
+from src.utils.product_store import InMemoryProductStore
+from src.utils.suggestion_index import suggestion_index
+
+def test_suggestion_index():
+    """ทดสอบ suggestion_index กับแคตตาล็อกจำลอง"""
+    print("Testing Suggestion Index...")
+    store = InMemoryProductStore()
+    products = generate_catalog(1000)
+    store.load_products(products)
+    for _ in range(5):
+        store.log_search('ครีมกันแดด', 3)
+    index = suggestion_index
+    index.db = store
+    assert index.refresh()
+
+    # 1. completion ตาม prefix เรียงตามน้ำหนัก
+    print("\n1. Testing Prefix Completion...")
+    for prefix in ['คร', 'ครีม', 'sa', 'Sam']:
+        suggestions = index.suggest(prefix, 5)
+        print(f"'{prefix}': {[item['text'] for item in suggestions]}")
+        assert suggestions
+        assert all(item['text'].lower().startswith(prefix.lower()) for item in suggestions)
+        assert [item['score'] for item in suggestions] == sorted((item['score'] for item in suggestions), reverse=True)
+    assert index.suggest('ครีมกันแดด')[0]['kind'] == 'query'
+    assert index.suggest('sam')[0] == {**index.suggest('sam')[0], 'text': 'Samsung', 'kind': 'brand'}
+    assert index.suggest('ไม่มีคำนี้แน่นอน') == []
+    assert all(item['kind'] == 'category' for item in index.suggest('', 5, kinds=['category']))
+
+    # 2. อัปเดตตามการเขียนสินค้า (change listener)
+    print("\n2. Testing Incremental Updates...")
+    code = products[0]['product_code']
+    store.update_product(code, {'product_name': 'Zephyr โคมไฟตั้งโต๊ะ', 'sold_count': 10 ** 6})
+    assert index.suggest('zep')[0]['text'] == 'Zephyr'
+    store.delete_product(code)
+    assert index.suggest('zep') == []
+
+    # 3. คำแนะนำเมื่อค้นหาไม่พบ
+    print("\n3. Testing Related Suggestions...")
+    related = index.related('ครีมกันแดดสูตรใหม่ล่าสุด', 3)
+    print(f"related: {related}")
+    assert related and related[0] == 'ครีมกันแดด'
+
+    # 4. /api/suggest
+    print("\n4. Testing /api/suggest...")
+    import main
+    response = main.app.test_client().get('/api/suggest?q=ครี&limit=3')
+    body = response.get_json()
+    print(f"/api/suggest: {body}")
+    assert response.status_code == 200 and body['suggestions'][0]['text'] == 'ครีมกันแดด'
+    assert main.app.test_client().get('/api/suggest?q=a&limit=x').status_code == 400
+
+    print("\nSuggestion Index test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_suggestion_index()
@@ -0,0 +1,63 @@
+"""
+🧪 Test Thai Tokenizer
+ทดสอบการตัดคำไทยแบบ maximal matching, การเรียนคำจากแคตตาล็อก และ cache ของการตัดคำ
+"""
+
+from src.utils.ai_search import ai_search
+from src.utils.thai_tokenizer import ThaiTokenizer
+
+def test_thai_tokenizer():
+    """ทดสอบ ThaiTokenizer"""
+    print("Testing Thai Tokenizer...")
+    tokenizer = ThaiTokenizer()
+
+    # 1. ตัดคำไทยที่ไม่มีช่องว่าง
+    print("\n1. Testing Segmentation...")
+    cases = {
+        'ครีมกันแดด': ['ครีม', 'กันแดด'],
+        'โน้ตบุ๊กสำหรับเล่นเกม': ['โน้ตบุ๊ก', 'สำหรับ', 'เล่น', 'เกม'],
+        'รองเท้าผ้าใบผู้ชาย': ['รองเท้า', 'ผ้าใบ', 'ผู้ชาย'],
+        'หูฟังไร้สายราคาถูก': ['หูฟัง', 'ไร้สาย', 'ราคา', 'ถูก'],
+    }
+    for text, expected in cases.items():
+        result = tokenizer.segment(text)
+        print(f"'{text}' -> {result}")
+        assert result == expected
+
+    # 2. ข้อความผสมไทย/อังกฤษ/ตัวเลข
+    print("\n2. Testing Mixed Text...")
+    tokens = tokenizer.tokenize('เคสiPhone 15 Pro กันกระแทก usb-c 2.5ม.')
+    print(tokens)
+    assert tokens[:4] == ['เคส', 'iphone', '15', 'pro'] and 'กันกระแทก' in tokens and 'usb-c' in tokens
+    assert tokenizer.keywords('กระเป๋า 2 ใบ กระเป๋า') == ['กระเป๋า', 'ใบ']
+
+    # 3. คำที่ไม่รู้จักไม่ถูกตัดกลางพยางค์ และเรียนเป็นคำใหม่จากแคตตาล็อกได้
+    print("\n3. Testing Learned Words...")
+    before = tokenizer.segment('เซรั่มสโนว์ไวท์')
+    print(f"before: {before}")
+    assert before[0] == 'เซรั่ม' and ''.join(before) == 'เซรั่มสโนว์ไวท์'
+    tokenizer.on_term('สโนว์ไวท์', 1.0, 'query')  # คำค้นหาของผู้ใช้ไม่ถูกเรียน
+    assert 'สโนว์ไวท์' not in tokenizer
+    tokenizer.on_term('เซรั่มสโนว์ไวท์', 1.0, 'product')
+    assert 'สโนว์ไวท์' in tokenizer and 'เซรั่มสโนว์ไวท์' not in tokenizer
+    assert tokenizer.segment('เซรั่มสโนว์ไวท์') == ['เซรั่ม', 'สโนว์ไวท์']
+
+    # 4. ผลการตัดถูก cache
+    print("\n4. Testing Cache...")
+    tokenizer.tokenize('กระเป๋าเดินทางล้อลาก')
+    hits = tokenizer.cache_info().hits
+    tokenizer.tokenize('กระเป๋าเดินทางล้อลาก')
+    print(tokenizer.cache_info())
+    assert tokenizer.cache_info().hits == hits + 1
+
+    # 5. คำของ query ใช้จับคู่ระดับคำตอนให้คะแนน
+    print("\n5. Testing Query Words...")
+    words = ai_search._preprocess_query('ครีมกันแดดสำหรับผิวหน้า')['words']
+    print(words)
+    assert words == ('ครีม', 'กันแดด', 'สำหรับ', 'ผิว', 'หน้า')
+
+    print("\nThai Tokenizer test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_thai_tokenizer()
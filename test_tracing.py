@@ -0,0 +1,68 @@
+"""
+🧪 Test Request Tracing
+ทดสอบการบันทึกการเรียก backend ต่อ request และการตรวจจับรูปแบบ N+1
+"""
+
+from src.utils.tracing import RequestTracer
+
+def test_tracing():
+    """ทดสอบ span, การระบุ handler และสรุปผลตาม handler"""
+    print("Testing Request Tracing...")
+    tracer = RequestTracer(enabled=True, slow_ms=10_000, n_plus_one_threshold=5)
+
+    class FakeDatabase:
+        @tracer.traced
+        def get_categories(self):
+            return [f"หมวด {i}" for i in range(8)]
+
+        @tracer.traced
+        def search_products(self, query, category=None, limit=5):
+            return {'products': [], 'total': 0}
+
+    class FakeHandler:
+        def __init__(self):
+            self.db = FakeDatabase()
+
+        def _show_categories(self):
+            for category in self.db.get_categories():
+                self.db.search_products("", category=category, limit=1)
+
+        def _handle_search(self, query):
+            return self.db.search_products(query)
+
+    tracer.trace_handlers(FakeHandler)
+    handler = FakeHandler()
+
+    # 1. ไม่มี trace - ไม่บันทึกอะไร
+    print("\n1. Testing Without Active Trace...")
+    handler._handle_search("ครีม")
+    assert tracer.get_summary() == {}
+
+    # 2. N+1 ใน _show_categories
+    print("\n2. Testing N+1 Detection...")
+    with tracer.trace('line_message', trace_id='event-1', user_id='U1') as trace:
+        handler._show_categories()
+    print(f"Trace {trace.trace_id}: {len(trace.spans)} spans, handler={trace.handler}")
+    assert trace.handler == '_show_categories'
+    assert len(trace.spans) == 9
+    assert trace.spans[1].params == "'', category='หมวด 0', limit=1"
+    assert tracer.recent_slow[-1]['n_plus_one'][0]['count'] == 8
+
+    # 3. สรุปตาม handler
+    print("\n3. Testing Handler Summary...")
+    for query in ["ครีม", "หูฟัง"]:
+        with tracer.trace('line_message'):
+            handler._handle_search(query)
+    summary = tracer.get_summary()
+    print(f"Summary: {summary}")
+    assert summary['_show_categories']['max_backend_calls'] == 9
+    assert summary['_show_categories']['n_plus_one_traces'] == 1
+    assert summary['_handle_search']['traces'] == 2
+    assert summary['_handle_search']['avg_backend_calls'] == 1
+    assert summary['_handle_search']['n_plus_one_traces'] == 0
+
+    print("\nRequest Tracing test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_tracing()
@@ -0,0 +1,106 @@
+"""
+🧪 Test Trending Service
+ทดสอบคะแนน trending, การอัปเดตอันดับแบบ incremental, การตัดตาม capacity และการ refresh จากทุกองค์ประกอบของคะแนน
+"""
+
+from datetime import datetime, timedelta
+
+from benchmarks.catalog import generate_catalog
+from src.utils.product_store import InMemoryProductStore, ProductChangeNotifier
+from src.utils.trending_service import TrendingService
+
+def product(code: str, sold_count: int, rating: float = 4.0, updated_at: str = '2025-01-01T00:00:00') -> dict:
+    return {'product_code': code, 'product_name': code, 'sold_count': sold_count, 'rating': rating,
+            'created_at': '2024-12-02T00:00:00', 'updated_at': updated_at}
+
+def codes(service: TrendingService, limit: int = 10):
+    return [p['product_code'] for p in service.top(limit)]
+
+def test_trending_service():
+    """ทดสอบ TrendingService"""
+    print("Testing Trending Service...")
+    services = []
+    try:
+        _run_checks(services)
+    finally:
+        for service in services:
+            ProductChangeNotifier.remove_change_listener(service.on_product_change)
+
+    print("\nTrending Service test completed!")
+    return True
+
+def _run_checks(services):
+    # 1. คะแนนเพิ่มตามยอดขาย เรตติ้ง และความเร็วการขาย (จาก delta ของ updated_at)
+    print("\n1. Testing Scoring...")
+    service = TrendingService(capacity=10)
+    services.append(service)
+    service._last_refresh = 1.0  # ไม่มีฐานข้อมูล - ไม่ refresh
+    assert service.score(product('A', 100)) > service.score(product('A', 10))
+    assert service.score(product('A', 100, rating=5.0)) > service.score(product('A', 100, rating=3.0))
+    assert service.score(product('A', 100), velocity=20) > service.score(product('A', 100))
+
+    service.observe(product('V1', 100, updated_at='2025-01-01T00:00:00'))
+    service.observe(product('V1', 148, updated_at='2025-01-03T00:00:00'))
+    velocity = service.top(1)[0]['sales_velocity']
+    print(f"Velocity after +48 sold in 2 days: {velocity}/day")
+    assert velocity == 24.0
+
+    # 2. อันดับอัปเดตทันทีเมื่อสินค้าถูกเขียน และลบออกเมื่อสินค้าถูกลบ
+    print("\n2. Testing Incremental Rank Updates...")
+    service = TrendingService(capacity=10)
+    services.append(service)
+    service._last_refresh = 1.0
+    for code, sold in (('P1', 500), ('P2', 300), ('P3', 100)):
+        service.observe(product(code, sold))
+    assert codes(service) == ['P1', 'P2', 'P3']
+
+    service.on_product_change('update', 'P3', {'sold_count': 5000, 'updated_at': '2025-01-01T12:00:00'})
+    print(f"After P3 sales jump: {codes(service)}")
+    assert codes(service)[0] == 'P3'
+    service.on_product_change('update', 'P9', {'price': 10.0})  # ไม่อยู่ในอันดับ และข้อมูลไม่พอคำนวณคะแนน
+    assert 'P9' not in codes(service)
+    service.on_product_change('add', 'P4', product('P4', 400))
+    assert codes(service) == ['P3', 'P1', 'P4', 'P2']
+    service.on_product_change('delete', 'P1')
+    assert 'P1' not in codes(service) and 'P1' not in service._observations
+
+    # 3. capacity ตัดอันดับท้ายออกทั้งจาก leaderboard และประวัติการขาย
+    print("\n3. Testing Capacity Trimming...")
+    service = TrendingService(capacity=5)
+    services.append(service)
+    service._last_refresh = 1.0
+    for i in range(50):
+        service.observe(product(f'C{i:02d}', (i * 37) % 50 * 10))
+    print(f"Board: {len(service)}, observations: {len(service._observations)}")
+    assert len(service) == 5 and len(service._observations) == 5
+    assert set(service._observations) == set(codes(service))
+    scores = [p['trending_score'] for p in service.top(5)]
+    assert scores == sorted(scores, reverse=True)
+
+    # 4. refresh ดึงผู้สมัครจากยอดขาย เรตติ้ง และสินค้าที่เพิ่งอัปเดต (ไม่ใช่แค่ sold_count)
+    print("\n4. Testing Refresh Candidates...")
+    catalog = generate_catalog(40)
+    for row in catalog:
+        row['rating'] = 3.0
+    catalog[5].update(sold_count=0, rating=5.0)
+    recent = (datetime.now() - timedelta(hours=1)).isoformat()
+    catalog[7].update(sold_count=0, updated_at=recent)
+    store = InMemoryProductStore()
+    store.load_products(catalog)
+    top_sold = [p['product_code'] for p in store.get_top_products_by_metric('sold_count', 3)]
+
+    service = TrendingService(store, capacity=3)
+    services.append(service)
+    candidates = {p['product_code'] for p in service._candidates()}
+    print(f"Candidates: {sorted(candidates)}")
+    assert set(top_sold) <= candidates
+    assert catalog[5]['product_code'] in candidates and catalog[7]['product_code'] in candidates
+
+    assert service.refresh()
+    assert len(service) == 3 and len(service._observations) == 3
+    store.delete_product(codes(service)[0])
+    service.refresh()
+    assert len(service._observations) == len(service) <= 3
+
+if __name__ == "__main__":
+    test_trending_service()
@@ -0,0 +1,57 @@
+"""
+🧪 Test User Profile Store
+ทดสอบโปรไฟล์ความสนใจแบบ vector พร้อม time decay
+"""
+
+import time
+
+from src.utils.user_profile_store import UserProfileStore
+
+def test_user_profiles():
+    """ทดสอบการบันทึก decay และการจัดอันดับความสนใจ"""
+    print("Testing User Profile Store...")
+
+    store = UserProfileStore(['แฟชั่น', 'ความงาม', 'กีฬา'], half_life_days=7.0, initial_capacity=16)
+    now = time.time()
+
+    # 1. บันทึกความสนใจ
+    print("\n1. Testing Interest Recording...")
+    store.record("user_a", {'แฟชั่น': 3}, now=now)
+    store.record("user_a", {'กีฬา': 4, 'หมวดที่ไม่รู้จัก': 10}, now=now)
+    top = store.top_interests("user_a", limit=3, now=now)
+    print(f"Top interests: {top}")
+    assert [name for name, _ in top] == ['กีฬา', 'แฟชั่น']
+
+    # 2. Decay ครึ่งหนึ่งหลังผ่านไป 1 half-life
+    print("\n2. Testing Exponential Decay...")
+    later = now + 7 * 86400
+    decayed = store.score("user_a", 'กีฬา', now=later)
+    print(f"Score after 7 days: {decayed:.3f}")
+    assert abs(decayed - 2.0) < 1e-3
+
+    store.record("user_a", {'แฟชั่น': 3}, now=later)
+    assert abs(store.score("user_a", 'แฟชั่น', now=later) - 4.5) < 1e-3
+
+    # 3. ขยายความจุอัตโนมัติ
+    print("\n3. Testing Capacity Growth...")
+    for i in range(100):
+        store.record(f"user_{i}", {'ความงาม': i + 1}, now=now, result_count=5)
+    print(f"Users: {len(store)}, memory: {store.memory_usage():,} bytes")
+    assert len(store) == 101
+
+    top_users = store.top_users('ความงาม', limit=3, now=now)
+    print(f"Top users for ความงาม: {top_users}")
+    assert [user for user, _ in top_users] == ['user_99', 'user_98', 'user_97']
+
+    # 4. สรุปโปรไฟล์
+    print("\n4. Testing Profile Summary...")
+    summary = store.summary("user_5")
+    print(f"Summary: {summary}")
+    assert summary['interaction_count'] == 1
+    assert summary['preferences']['avg_search_results'] == 5
+
+    print("\nUser Profile Store test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_user_profiles()
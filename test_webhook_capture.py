@@ -0,0 +1,52 @@
+"""
+🧪 Test Webhook Capture
+ทดสอบว่า /callback บันทึก webhook ลง WEBHOOK_CAPTURE_PATH เฉพาะเมื่อลายเซ็นถูกต้องและประมวลผลสำเร็จ
+"""
+
+import json
+import os
+import tempfile
+
+from linebot.v3.webhook import WebhookHandler
+
+from benchmarks.load_webhook import sign
+from src.config import config
+
+def test_webhook_capture():
+    """ทดสอบการบันทึก webhook สำหรับ replay"""
+    print("Testing Webhook Capture...")
+    import main
+
+    secret = 'capture-test-secret'
+    body = json.dumps({'destination': 'U0', 'events': []})
+    original_handler, original_path = main.affiliate_handler.handler, config.WEBHOOK_CAPTURE_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        capture_path = os.path.join(tmp_dir, 'webhooks.jsonl')
+        main.affiliate_handler.handler = WebhookHandler(secret)
+        config.WEBHOOK_CAPTURE_PATH = capture_path
+        try:
+            app = main.app.test_client()
+
+            # 1. ลายเซ็นผิด - ตอบ 400 และไม่เขียนไฟล์
+            print("\n1. Testing Invalid Signature...")
+            response = app.post('/callback', data=body, headers={'X-Line-Signature': sign(body, 'wrong-secret')})
+            assert response.status_code == 400
+            assert not os.path.exists(capture_path)
+
+            # 2. ลายเซ็นถูกต้อง - บันทึก body หนึ่งบรรทัด
+            print("\n2. Testing Valid Signature...")
+            response = app.post('/callback', data=body, headers={'X-Line-Signature': sign(body, secret)})
+            assert response.status_code == 200
+            with open(capture_path, encoding='utf-8') as f:
+                lines = [json.loads(line) for line in f]
+            print(f"Captured: {len(lines)} webhook(s)")
+            assert len(lines) == 1 and lines[0]['body'] == body
+        finally:
+            main.affiliate_handler.handler = original_handler
+            config.WEBHOOK_CAPTURE_PATH = original_path
+
+    print("\nWebhook Capture test completed!")
+    return True
+
+if __name__ == "__main__":
+    test_webhook_capture()